@@ -11,18 +11,135 @@ Description:
 
 """
 
-from typing import List, Dict
+import argparse
+import bisect
+import copy
+import heapq
+import random
+import sys
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager, nullcontext
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from auth import SessionManager, preset_hash, spend_verification, stored_password, stored_passwords, verify_password
+
+
+# Per-item statuses returned by RegistrationSystem.register_batch and drop_batch
+BATCH_OK = "ok"
+BATCH_FULL = "full"
+BATCH_DUPLICATE = "duplicate"
+BATCH_UNKNOWN = "unknown"
+BATCH_NOT_REGISTERED = "not_registered"
+BATCH_CONFLICT = "conflict"
+BATCH_PREREQUISITE = "prerequisite"
+BATCH_CREDIT_LIMIT = "credit_limit"
+BATCH_INVALID = "invalid"
+
+# Day names used when reading and showing course meeting times (Monday is day 0)
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class EnrollmentSet:
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Iterable[str] = ()):
+        """
+        Creates an ordered group of IDs (student IDs or course IDs).
+
+        The IDs stay in the order they were added, like a list, but checking,
+        adding and removing an ID takes the same short time no matter how many
+        IDs are stored (it uses a dictionary underneath instead of a list).
+
+        Arguments:
+            items (Iterable[str], optional): IDs to start with. Duplicates are ignored.
+        """
+        self._items: Dict[str, None] = dict.fromkeys(items)
+
+    def add(self, item: str) -> bool:
+        """
+        Adds an ID to the end of the group if it's not already there.
+
+        Argument:
+            item (str): The ID to add.
+
+        Returns:
+            bool: True if the ID was added, False if it was already there.
+        """
+        if item in self._items:
+            return False
+        self._items[item] = None
+        return True
+
+    def discard(self, item: str) -> bool:
+        """
+        Removes an ID from the group if it's there.
+
+        Argument:
+            item (str): The ID to remove.
+
+        Returns:
+            bool: True if the ID was removed, False if it was not there.
+        """
+        if item in self._items:
+            del self._items[item]
+            return True
+        return False
+
+    def to_list(self) -> List[str]:
+        """
+        Makes a copy of the IDs as a normal list, in the order they were added.
+
+        Returns:
+            List[str]: The IDs in the group.
+        """
+        return list(self._items)
+
+    def page_after(self, after: Optional[str], count: int) -> List[str]:
+        """
+        Gets the next IDs in sorted order, for reading a large group page by page.
+
+        Nothing is kept between calls: each page picks its IDs with a heap in one pass over the group,
+        so adding and removing stay quick. Because a page starts after the last ID of the one before,
+        IDs added or removed in between never make another ID repeat or go missing.
+
+        Arguments:
+            after (str): The last ID of the previous page, or None for the first page.
+            count (int): The most IDs to return.
+
+        Returns:
+            List[str]: Up to count IDs that sort after `after`.
+        """
+        if after is None:
+            return heapq.nsmallest(count, self._items)
+        return heapq.nsmallest(count, (item for item in self._items if item > after))
+
+    def __contains__(self, item) -> bool:
+        return item in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"EnrollmentSet({list(self._items)!r})"
 
 
 class User:
 
+    __slots__ = ("user_id", "password")
+
     def __init__(self, user_id: str, password: str):
         """
         Creates a new User with a user ID and password.
 
         Arguments:
             user_id (str): A name or ID to identify the user.
-            password (str): The user's password to log in.
+            password (str): The user's stored password: a salted hash made by auth.hash_password
+                (plain text is still accepted, for data saved before passwords were hashed).
         """
         self.user_id = user_id
         self.password = password
@@ -31,30 +148,41 @@ class User:
         """
         Checks if the given password is correct.
 
+        This is slow on purpose (see auth.py); check it once per login, not once per request.
+
         Argument:
             password (str): The password you want to check.
 
         Returns:
             bool: Returns True if the password is right, False if it's wrong.
         """
-        return self.password == password
+        return verify_password(password, self.password)
 
 
 class Student(User):
 
-    def __init__(self, user_id: str, password: str):
+    __slots__ = ("registered_courses", "completed_courses", "standing")
+
+    def __init__(self, user_id: str, password: str, standing: int = 0):
         """
         Creates a new Student using the User class.
 
         Arguments:
             user_id (str): A name or ID to identify the student.
-            password (str): The student's password to log in.
+            password (str): The student's stored password (see User).
+            standing (int, optional): The student's class standing (like 1 for first year, 4 for senior).
+                Used to order waitlists when they go by standing. Default is 0.
 
         Attributes:
-            registered_courses (List[str]): A list of course names or IDs the student is signed up for.
+            registered_courses (EnrollmentSet): The course names or IDs the student is signed up for,
+                in the order they were added.
+            completed_courses (EnrollmentSet): The course IDs the student has already passed,
+                used to check prerequisites.
         """
         super().__init__(user_id, password)
-        self.registered_courses = []
+        self.registered_courses = EnrollmentSet()
+        self.completed_courses = EnrollmentSet()
+        self.standing = standing
 
     def register_course(self, course_id: str):
         """
@@ -63,8 +191,7 @@ class Student(User):
         Argument:
             course_id (str): The name or ID of the course to add.
         """
-        if course_id not in self.registered_courses:
-            self.registered_courses.append(course_id)
+        self.registered_courses.add(course_id)
 
     def drop_course(self, course_id: str):
         """
@@ -73,8 +200,7 @@ class Student(User):
         Argument:
             course_id (str): The ID of the course to remove.
         """
-        if course_id in self.registered_courses:
-            self.registered_courses.remove(course_id)
+        self.registered_courses.discard(course_id)
 
     def view_registered_courses(self) -> List[str]:
         """
@@ -83,16 +209,39 @@ class Student(User):
         Returns:
             List[str]: A list of course names or IDs.
         """
-        return self.registered_courses
+        return self.registered_courses.to_list()
+
+    def snapshot_copy(self) -> "Student":
+        """
+        Makes a copy of the student with its own course lists, so later changes to this student don't show in it.
+
+        Returns:
+            Student: The copy.
+        """
+        student = copy.copy(self)
+        student.registered_courses = EnrollmentSet(self.registered_courses.to_list())
+        student.completed_courses = EnrollmentSet(self.completed_courses.to_list())
+        return student
 
 
 class Admin(User):
     """For now, no extra methods required; actions done through RegistrationSystem class."""
 
+    __slots__ = ()
+
 
 class Course:
 
-    def __init__(self, course_id: str, title: str, description: str, credits: int, capacity: int):
+    __slots__ = ("course_id", "title", "description", "credits", "capacity", "meetings", "prerequisites",
+                 "registered_students")
+
+    # Column layout shared by the course table header, each course row and the report exports
+    TABLE_FORMAT = "{:<10} {:<30} {:<8} {:<10} {:<12} {:<40}"
+    # One line of a student's schedule: course ID, title and credits
+    SCHEDULE_FORMAT = "{}: {} ({} credits)"
+
+    def __init__(self, course_id: str, title: str, description: str, credits: int, capacity: int,
+                 meetings=(), prerequisites: Iterable[str] = ()):
         """
         Creates a new Course with the provided details (Arguments).
 
@@ -102,18 +251,30 @@ class Course:
             description (str): A short summary of what the course is about.
             credits (int): How many credits the course is worth.
             capacity (int): The maximum number of students allowed in the course.
+            meetings (str or Iterable, optional): When the course meets each week, as text like
+                "Mon 09:00-10:15, Wed 09:00-10:15" or (day, start minute, end minute) values.
+                Default is no meeting times.
+            prerequisites (Iterable[str], optional): The codes of the courses a student must complete
+                before registering. Default is none.
 
         Attributes:
-            registered_students (List[str]): A list of student IDs who signed up for the course.
+            meetings (Tuple[Tuple[int, int, int], ...]): (day, start minute, end minute) for each
+                weekly meeting, with Monday as day 0 and minutes counted from midnight.
+            prerequisites (Tuple[str, ...]): The direct prerequisite course codes (uppercase).
+            registered_students (EnrollmentSet): The student IDs who signed up for the course,
+                in the order they signed up.
         """
         self.course_id = course_id.upper()
         self.title = title
         self.description = description
         self.credits = credits
         self.capacity = capacity
-        self.registered_students = []
+        self.meetings = Course.parse_meetings(meetings)
+        self.prerequisites = tuple(dict.fromkeys(cid.upper() for cid in prerequisites))
+        self.registered_students = EnrollmentSet()
 
-    def update_details(self, title=None, description=None, credits=None, capacity=None):
+    def update_details(self, title=None, description=None, credits=None, capacity=None, meetings=None,
+                       prerequisites=None):
         """
         Changes the course details
 
@@ -122,6 +283,8 @@ class Course:
         - description
         - credits
         - capacity
+        - meetings
+        - prerequisites
 
         Only the values you provide will be updated.
 
@@ -130,6 +293,8 @@ class Course:
             description (str, optional): New summary of the course.
             credits (int, optional): New number of credits.
             capacity (int, optional): New student limit.
+            meetings (str or Iterable, optional): New weekly meeting times (see __init__).
+            prerequisites (Iterable[str], optional): New prerequisite course codes.
         """
         if title is not None:
             self.title = title
@@ -139,6 +304,10 @@ class Course:
             self.credits = credits
         if capacity is not None:
             self.capacity = capacity
+        if meetings is not None:
+            self.meetings = Course.parse_meetings(meetings)
+        if prerequisites is not None:
+            self.prerequisites = tuple(dict.fromkeys(cid.upper() for cid in prerequisites))
 
     def is_full(self) -> bool:
         """
@@ -160,7 +329,7 @@ class Course:
             Exception: If the course is full or the student is already on the list.
         """
         if not self.is_full() and student_id not in self.registered_students:
-            self.registered_students.append(student_id)
+            self.registered_students.add(student_id)
         else:
             raise Exception("Course is full or student already registered.")
 
@@ -171,12 +340,78 @@ class Course:
         Argument:
             student_id (str): The ID of the student to remove.
         """
-        if student_id in self.registered_students:
-            self.registered_students.remove(student_id)
+        self.registered_students.discard(student_id)
+
+    def snapshot_copy(self) -> "Course":
+        """
+        Makes a copy of the course with its own roster, so later changes to this course don't show in it.
+
+        Returns:
+            Course: The copy.
+        """
+        course = copy.copy(self)
+        course.registered_students = EnrollmentSet(self.registered_students.to_list())
+        return course
+
+    @staticmethod
+    def parse_meetings(meetings) -> Tuple[Tuple[int, int, int], ...]:
+        """
+        Reads weekly meeting times.
+
+        Argument:
+            meetings (str or Iterable): Text like "Mon 09:00-10:15, Wed 09:00-10:15"
+                (an empty string means no meetings), or (day, start minute, end minute) values.
+
+        Returns:
+            Tuple[Tuple[int, int, int], ...]: (day, start minute, end minute) values sorted by day and time.
+
+        Raises:
+            Exception: If a meeting time can't be read, or ends before it starts.
+        """
+        if isinstance(meetings, str):
+            parsed = []
+            for part in meetings.split(","):
+                if not part.strip():
+                    continue
+                try:
+                    day, times = part.split()
+                    start, end = times.split("-")
+                    parsed.append((DAY_NAMES.index(day.capitalize()[:3]), Course._minutes(start), Course._minutes(end)))
+                except ValueError:
+                    raise Exception(f"Invalid meeting time: {part.strip()} (use a form like Mon 09:00-10:15).")
+            meetings = parsed
+        result = []
+        for day, start, end in meetings:
+            day, start, end = int(day), int(start), int(end)
+            if not 0 <= day < 7 or not 0 <= start < end <= 24 * 60:
+                raise Exception(f"Invalid meeting time: day {day}, {start}-{end} minutes.")
+            result.append((day, start, end))
+        return tuple(sorted(result))
+
+    @staticmethod
+    def _minutes(text: str) -> int:
+        hours, minutes = text.split(":")
+        if len(minutes) != 2:
+            raise ValueError(text)
+        return int(hours) * 60 + int(minutes)
+
+    @staticmethod
+    def format_meetings(meetings: Iterable[Tuple[int, int, int]]) -> str:
+        """
+        Shows meeting times as text that parse_meetings can read back.
+
+        Argument:
+            meetings (Iterable[Tuple[int, int, int]]): (day, start minute, end minute) values.
+
+        Returns:
+            str: For example "Mon 09:00-10:15, Wed 09:00-10:15", or "" if there are none.
+        """
+        return ", ".join(f"{DAY_NAMES[day]} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+                         for day, start, end in meetings)
 
     @staticmethod
     def get_table_header() -> str:
-        return "{:<10} {:<30} {:<8} {:<10} {:<12} {:<40}".format(
+        return Course.TABLE_FORMAT.format(
             "Course ID", "Title", "Credits", "Capacity", "Registered", "Description"
         )
 
@@ -187,7 +422,7 @@ class Course:
         Returns:
             str: A summary including course ID, title, credits, capacity, and how many students are registered.
         """
-        return "{:<10} {:<30} {:<8} {:<10} {:<12} {:<40}".format(
+        return Course.TABLE_FORMAT.format(
             self.course_id,
             self.title,
             self.credits,
@@ -197,162 +432,1964 @@ class Course:
         )
 
 
-class RegistrationSystem:
+class Waitlist:
+
+    def __init__(self, by_standing: bool = False):
+        """
+        Creates an empty waitlist for a full course.
+
+        The waitlist is a heap, so adding a student and taking the next one off both take
+        O(log n) time. By default it's first come, first served. With by_standing, students
+        with a higher class standing go first, and students with the same standing keep
+        first come, first served order.
+
+        Students who leave are only marked as gone and skipped later (instead of being
+        searched for in the heap), and the heap is tidied up when too many of these pile up.
+
+        Argument:
+            by_standing (bool, optional): Order by class standing before arrival time.
+
+        Attributes:
+            _heap (List[Tuple[int, int, str]]): (priority, arrival number, student ID) entries.
+            _entries (Dict[str, Tuple[int, int, str]]): The live heap entry of each waiting student.
+        """
+        self.by_standing = by_standing
+        self._heap: List[Tuple[int, int, str]] = []
+        self._entries: Dict[str, Tuple[int, int, str]] = {}
+        self._arrivals = 0
+
+    def add(self, student_id: str, standing: int = 0) -> bool:
+        """
+        Puts a student at their place on the waitlist.
+
+        Arguments:
+            student_id (str): The student's ID.
+            standing (int, optional): The student's class standing (only used with by_standing).
+
+        Returns:
+            bool: True if added, False if the student was already waiting.
+        """
+        if student_id in self._entries:
+            return False
+        entry = (-standing if self.by_standing else 0, self._arrivals, student_id)
+        self._arrivals += 1
+        self._entries[student_id] = entry
+        heapq.heappush(self._heap, entry)
+        return True
+
+    def remove(self, student_id: str) -> bool:
+        """
+        Takes a student off the waitlist if they are on it.
+
+        Argument:
+            student_id (str): The student's ID.
+
+        Returns:
+            bool: True if the student was removed, False if they weren't waiting.
+        """
+        if self._entries.pop(student_id, None) is None:
+            return False
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+        return True
+
+    def pop(self) -> Optional[str]:
+        """
+        Takes the next student off the waitlist.
+
+        Returns:
+            str: The student's ID, or None if nobody is waiting.
+        """
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if self._entries.get(entry[2]) is entry:
+                del self._entries[entry[2]]
+                return entry[2]
+        return None
+
+    def peek(self) -> Optional[str]:
+        """
+        Finds the next student without taking them off the waitlist.
+
+        Returns:
+            str: The student's ID, or None if nobody is waiting.
+        """
+        heap = self._heap
+        while heap:
+            entry = heap[0]
+            if self._entries.get(entry[2]) is entry:
+                return entry[2]
+            heapq.heappop(heap)
+        return None
+
+    def position(self, student_id: str) -> int:
+        """
+        Finds a student's place in line (1 means next to get a seat).
+
+        This counts the waiting students ahead of them, so it takes time proportional to the waitlist size.
+
+        Argument:
+            student_id (str): The student's ID.
+
+        Returns:
+            int: The position, or 0 if the student is not waiting.
+        """
+        mine = self._entries.get(student_id)
+        if mine is None:
+            return 0
+        return 1 + sum(1 for entry in self._entries.values() if entry < mine)
+
+    def to_list(self) -> List[str]:
+        """
+        Gets the waiting students in the order they will get seats.
+
+        Returns:
+            List[str]: Student IDs.
+        """
+        return [entry[2] for entry in sorted(self._entries.values())]
+
+    def __contains__(self, student_id) -> bool:
+        return student_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MeetingIndex:
+
+    __slots__ = ("_days", "_longest")
 
     def __init__(self):
         """
-        Starts the registration system with empty lists of courses, students, and admins.
+        Creates an empty index of one student's weekly meeting times.
 
-        Also pre-registers default admin and student accounts with preset credentials.
+        Each day keeps its meetings sorted by start time, so checking a new meeting for
+        a clash is a binary search instead of comparing it with every registered course.
+        Only meetings that start less than the longest meeting's length before the new one
+        can still be running when it starts, so only those few are looked at.
 
         Attributes:
-            courses (Dict[str, Course]): A dictionary mapping course IDs to Course objects.
-            students (Dict[str, Student]): A dictionary mapping student IDs to Student objects.
-            admins (Dict[str, Admin]): A dictionary mapping admin IDs to Admin objects.
+            _days (Dict[int, List[Tuple[int, int, str]]]): (start, end, course ID) entries for each day.
+            _longest (int): The longest meeting in minutes ever added.
         """
-        self.courses: Dict[str, Course] = {}
-        self.students: Dict[str, Student] = {}
-        self.admins: Dict[str, Admin] = {}
+        self._days: Dict[int, List[Tuple[int, int, str]]] = {}
+        self._longest = 0
 
-        # Pre-Registered Admin Accounts
-        self.admins['admin'] = Admin('admin', 'password')
+    def add(self, course_id: str, meetings: Iterable[Tuple[int, int, int]]):
+        """
+        Adds a course's meetings.
 
-        # Pre-Registered Student Accounts
-        self.students['student1'] = Student('student1', 'pass123')
-        self.students['student2'] = Student('student2', 'pass123')
+        Arguments:
+            course_id (str): The course code.
+            meetings (Iterable[Tuple[int, int, int]]): (day, start minute, end minute) values.
+        """
+        for day, start, end in meetings:
+            bisect.insort(self._days.setdefault(day, []), (start, end, course_id))
+            if end - start > self._longest:
+                self._longest = end - start
 
-    def authenticate_user(self, user_id: str, password: str) -> User:
+    def remove(self, course_id: str, meetings: Iterable[Tuple[int, int, int]]):
         """
-        Checks if a user as admin or student can log in with the given ID and password.
+        Removes a course's meetings.
 
         Arguments:
-            user_id (str): The username to check.
-            password (str): The password to check.
+            course_id (str): The course code.
+            meetings (Iterable[Tuple[int, int, int]]): The same values given to add.
+        """
+        for day, start, end in meetings:
+            slots = self._days.get(day)
+            if not slots:
+                continue
+            i = bisect.bisect_left(slots, (start, end, course_id))
+            if i < len(slots) and slots[i] == (start, end, course_id):
+                del slots[i]
+                if not slots:
+                    del self._days[day]
+
+    def conflict(self, meetings: Iterable[Tuple[int, int, int]], ignore: Optional[str] = None) -> Optional[str]:
+        """
+        Finds a course whose meetings overlap any of the given meetings.
+
+        Meetings that only touch (one ends at 10:00, the next starts at 10:00) don't overlap.
+
+        Arguments:
+            meetings (Iterable[Tuple[int, int, int]]): (day, start minute, end minute) values.
+            ignore (str, optional): A course code to leave out (for example the course being changed).
 
         Returns:
-            User: The user object if login is successful.
+            str: The code of an overlapping course, or None if there is no clash.
+        """
+        for day, start, end in meetings:
+            slots = self._days.get(day)
+            if not slots:
+                continue
+            first = bisect.bisect_left(slots, (start - self._longest + 1,))
+            last = bisect.bisect_left(slots, (end,))
+            for _, other_end, course_id in slots[first:last]:
+                if other_end > start and course_id != ignore:
+                    return course_id
+        return None
+
+    def overlaps(self) -> Set[Tuple[str, str]]:
+        """
+        Finds every pair of courses in the index whose meetings overlap (a sweep line).
 
-        Raises:
-            Exception: If the username or password is wrong.
+        Each day's meetings are walked in start order while a heap holds the ones still running,
+        ordered by end time. Every new meeting first drops the ones that have ended and then
+        overlaps all that remain.
+
+        Returns:
+            Set[Tuple[str, str]]: (course_id, other_course_id) pairs in alphabetical order.
         """
-        user_id = user_id.lower()
-        if user_id == 'admin' and user_id in self.admins:
-            admin = self.admins[user_id]
-            if admin.authenticate(password):
-                return admin
-        elif user_id in self.students:
-            student = self.students[user_id]
-            if student.authenticate(password):
-                return student
-        raise Exception("Invalid username or password.")
+        pairs = set()
+        for slots in self._days.values():
+            running: List[Tuple[int, str]] = []
+            for start, end, course_id in slots:
+                while running and running[0][0] <= start:
+                    heapq.heappop(running)
+                for _, other in running:
+                    if other != course_id:
+                        pairs.add((course_id, other) if course_id < other else (other, course_id))
+                heapq.heappush(running, (end, course_id))
+        return pairs
+
+    def __bool__(self) -> bool:
+        return bool(self._days)
 
-    # Admins/Menu Management Functions
 
-    def add_course(self, course_id: str, title: str, description: str, credits: int, capacity: int):
+class PrerequisiteGraph:
+
+    def __init__(self):
         """
-        Adds a new course to the system.
+        Creates an empty prerequisite graph.
+
+        Every course mentioned gets a small whole number (its index), and sets of courses are
+        stored as bitsets: Python ints where bit i stands for the course with index i.
+        Besides the direct prerequisites, the graph keeps the transitive closure of every course
+        (all prerequisites of its prerequisites, and so on). It is updated when a course's
+        prerequisites change, so eligibility checks and cycle checks are single bit operations
+        instead of walking the chain on every registration.
+
+        Attributes:
+            version (int): Goes up by one on every change, so callers can tell when
+                bitsets they computed earlier are out of date.
+            _direct (List[Tuple[int, ...]]): The direct prerequisites of each course, as indices.
+            _direct_bits (List[int]): The same as a bitset.
+            _closure (List[int]): Every direct and indirect prerequisite of each course, as a bitset.
+            _dependents (List[Set[int]]): The courses that list each course as a direct prerequisite.
+        """
+        self.version = 0
+        self._index: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._direct: List[Tuple[int, ...]] = []
+        self._direct_bits: List[int] = []
+        self._closure: List[int] = []
+        self._dependents: List[Set[int]] = []
+
+    def _node(self, course_id: str) -> int:
+        i = self._index.get(course_id)
+        if i is None:
+            i = len(self._names)
+            self._index[course_id] = i
+            self._names.append(course_id)
+            self._direct.append(())
+            self._direct_bits.append(0)
+            self._closure.append(0)
+            self._dependents.append(set())
+        return i
+
+    def _names_of(self, bits: int) -> List[str]:
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self._names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+    def set_prerequisites(self, course_id: str, prerequisite_ids: Iterable[str]):
+        """
+        Sets the direct prerequisites of a course and updates the closure of every course that depends on it.
 
         Arguments:
-            course_id (str): The course code (like "CS101").
-            title (str): The name of the course.
-            description (str): A short explanation of what the course is about.
-            credits (int): How many credits the course gives.
-            capacity (int): The max number of students who can join.
+            course_id (str): The course code.
+            prerequisite_ids (Iterable[str]): The codes of the courses that must be completed first.
 
         Raises:
-            Exception: If the course ID already exists.
+            Exception: If the change would make a course (directly or indirectly) require itself.
+                Nothing is changed in that case.
         """
-        course_id = course_id.upper()
-        if course_id in self.courses:
-            raise Exception("Course with this ID already exists.")
-        self.courses[course_id] = Course(course_id, title, description, credits, capacity)
+        i = self._node(course_id)
+        direct = tuple(dict.fromkeys(self._node(cid) for cid in prerequisite_ids))
+        for j in direct:
+            if j == i:
+                raise Exception(f"A course can't be its own prerequisite: {course_id}.")
+            if self._closure[j] >> i & 1:
+                raise Exception(f"Prerequisite cycle: {self._names[j]} already requires {course_id}.")
+        for j in self._direct[i]:
+            self._dependents[j].discard(i)
+        for j in direct:
+            self._dependents[j].add(i)
+        self._direct[i] = direct
+        self._direct_bits[i] = sum(1 << j for j in direct)
+        # Recompute the closures of this course and everything that depends on it, prerequisites first
+        for k in self._dependent_order(i):
+            closure = 0
+            for j in self._direct[k]:
+                closure |= self._closure[j] | (1 << j)
+            self._closure[k] = closure
+        self.version += 1
+
+    def _dependent_order(self, start: int) -> List[int]:
+        """
+        Lists a course and every course that depends on it (directly or not) in topological order,
+        using a depth-first search over the dependents and reversing the finishing order.
+        """
+        order = []
+        seen = {start}
+        stack = [(start, iter(self._dependents[start]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append((child, iter(self._dependents[child])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+        order.reverse()
+        return order
 
-    def remove_course(self, course_id: str):
+    def remove(self, course_id: str) -> List[str]:
         """
-        Removes a course from the system and removes it from all students' lists.
+        Takes a removed course out of the graph.
+
+        The course loses its own prerequisites and is taken off the prerequisite list of every course that had it.
+
+        Argument:
+            course_id (str): The course code.
+
+        Returns:
+            List[str]: The courses that had it as a direct prerequisite.
+        """
+        i = self._index.get(course_id)
+        if i is None:
+            return []
+        dependents = sorted(self._dependents[i])
+        for k in dependents:
+            self.set_prerequisites(self._names[k], [self._names[j] for j in self._direct[k] if j != i])
+        self.set_prerequisites(course_id, [])
+        return [self._names[k] for k in dependents]
+
+    def dependents(self, course_id: str) -> List[str]:
+        """
+        Gets the courses that list a course as a direct prerequisite.
+
+        Argument:
+            course_id (str): The course code.
+
+        Returns:
+            List[str]: The dependent course codes.
+        """
+        i = self._index.get(course_id)
+        if i is None:
+            return []
+        return [self._names[k] for k in sorted(self._dependents[i])]
+
+    def prerequisites(self, course_id: str) -> List[str]:
+        """
+        Gets the direct prerequisites of a course.
+        """
+        i = self._index.get(course_id)
+        return [] if i is None else [self._names[j] for j in self._direct[i]]
+
+    def all_prerequisites(self, course_id: str) -> List[str]:
+        """
+        Gets every direct and indirect prerequisite of a course.
+        """
+        i = self._index.get(course_id)
+        return [] if i is None else self._names_of(self._closure[i])
+
+    def requires(self, course_id: str, other_id: str) -> bool:
+        """
+        Checks if a course needs another one first, directly or through a chain of prerequisites.
+        """
+        i = self._index.get(course_id)
+        j = self._index.get(other_id)
+        return i is not None and j is not None and bool(self._closure[i] >> j & 1)
+
+    def credit_bits(self, completed: Iterable[str]) -> int:
+        """
+        Builds the bitset of courses a student gets credit for.
+
+        A completed course also gives credit for everything it requires, so a student who
+        completed CS201 (which needs CS101) counts as having CS101.
+
+        Argument:
+            completed (Iterable[str]): The codes of the student's completed courses.
+
+        Returns:
+            int: The bitset.
+        """
+        bits = 0
+        for cid in completed:
+            i = self._index.get(cid)
+            if i is not None:
+                bits |= self._closure[i] | (1 << i)
+        return bits
+
+    def missing(self, course_id: str, credit: int) -> List[str]:
+        """
+        Finds the direct prerequisites of a course that a student has no credit for.
+
+        Arguments:
+            course_id (str): The course code.
+            credit (int): The student's bitset from credit_bits.
+
+        Returns:
+            List[str]: The missing prerequisite codes in the order they were listed
+            (empty if the student is eligible).
+        """
+        i = self._index.get(course_id)
+        if i is None or not self._direct_bits[i] & ~credit:
+            return []
+        return [self._names[j] for j in self._direct[i] if not credit >> j & 1]
+
+    def eligible(self, course_id: str, credit: int) -> bool:
+        """
+        Checks in one bit operation if a student has credit for every direct prerequisite of a course.
+        """
+        i = self._index.get(course_id)
+        return i is None or not self._direct_bits[i] & ~credit
+
+
+class CreditLedger:
+
+    def __init__(self):
+        """
+        Creates an empty ledger of how many credits each student is registered for.
+
+        Totals are kept up to date as students register and drop (one addition each), so a
+        student's load is known without adding up their courses. Students are also grouped by
+        their total, so finding everyone above or below a limit only looks at the groups past
+        the limit (there are only as many groups as different totals) instead of every student.
+
+        Attributes:
+            _totals (Dict[str, int]): Each student's registered credits.
+            _groups (Dict[int, Set[str]]): The students with each total.
+        """
+        self._lock = threading.Lock()
+        self._totals: Dict[str, int] = {}
+        self._groups: Dict[int, Set[str]] = {}
+
+    def add(self, student_id: str, total: int = 0):
+        """
+        Starts tracking a student (usually a new one with no courses yet).
+
+        Arguments:
+            student_id (str): The student's ID.
+            total (int, optional): The credits they are registered for already.
+        """
+        with self._lock:
+            old = self._totals.get(student_id)
+            if old is not None:
+                self._move(student_id, old, total)
+            else:
+                self._totals[student_id] = total
+                self._groups.setdefault(total, set()).add(student_id)
+
+    def _move(self, student_id: str, old: int, new: int):
+        group = self._groups[old]
+        group.discard(student_id)
+        if not group:
+            del self._groups[old]
+        self._totals[student_id] = new
+        self._groups.setdefault(new, set()).add(student_id)
+
+    def change(self, student_id: str, amount: int):
+        """
+        Adds credits to (or, with a negative amount, takes credits from) a student's total.
+
+        Arguments:
+            student_id (str): The student's ID.
+            amount (int): The credits of the course registered for (negative when dropped).
+        """
+        if amount:
+            with self._lock:
+                old = self._totals.get(student_id)
+                if old is None:
+                    old = self._totals[student_id] = 0
+                    self._groups.setdefault(0, set()).add(student_id)
+                self._move(student_id, old, old + amount)
+
+    def change_all(self, student_ids: Iterable[str], amount: int):
+        """
+        Changes the total of every given student by the same amount (used when a course's credits change).
+
+        Arguments:
+            student_ids (Iterable[str]): The students, each listed once.
+            amount (int): The credits to add to each (negative to take away).
+        """
+        for student_id in student_ids:
+            self.change(student_id, amount)
+
+    def total(self, student_id: str) -> int:
+        """
+        Gets a student's registered credits.
+
+        Argument:
+            student_id (str): The student's ID.
+
+        Returns:
+            int: The total, or 0 for a student the ledger doesn't know.
+        """
+        return self._totals.get(student_id, 0)
+
+    def above(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Finds the students registered for more than a number of credits.
+
+        Argument:
+            limit (int): The highest total that is still fine.
+
+        Returns:
+            List[Tuple[str, int]]: (student ID, total) pairs, highest total first, then by ID.
+        """
+        with self._lock:
+            found = [(sid, total) for total, group in self._groups.items() if total > limit for sid in group]
+        found.sort(key=lambda pair: (-pair[1], pair[0]))
+        return found
+
+    def below(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Finds the students registered for fewer than a number of credits.
+
+        Argument:
+            limit (int): The lowest total that is fine.
+
+        Returns:
+            List[Tuple[str, int]]: (student ID, total) pairs, lowest total first, then by ID.
+        """
+        with self._lock:
+            found = [(sid, total) for total, group in self._groups.items() if total < limit for sid in group]
+        found.sort(key=lambda pair: (pair[1], pair[0]))
+        return found
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+
+class CourseSearchIndex:
+
+    GRAM_SIZE = 3
+
+    def __init__(self):
+        """
+        Creates an empty search index over course IDs and titles.
+
+        Every piece of text up to 3 letters long (an "n-gram") inside a course ID or title
+        points to the courses that contain it. A search then only looks at the courses
+        that share all of the search term's n-grams instead of checking every course.
+
+        Attributes:
+            _postings (Dict[str, Set[str]]): Maps each n-gram to the course IDs that contain it.
+            _entries (Dict[str, Tuple[int, str, str]]): Maps each course ID to its catalog order,
+                its lowercase ID and its lowercase title.
+        """
+        self._postings: Dict[str, Set[str]] = {}
+        self._entries: Dict[str, Tuple[int, str, str]] = {}
+        self._next_order = 0
+
+    @classmethod
+    def _grams(cls, text: str) -> Set[str]:
+        """
+        Gets every piece of the text that is 1 to 3 letters long.
+
+        Argument:
+            text (str): Lowercase text to split.
+
+        Returns:
+            Set[str]: All n-grams found in the text.
+        """
+        grams = set()
+        for size in range(1, cls.GRAM_SIZE + 1):
+            for i in range(len(text) - size + 1):
+                grams.add(text[i:i + size])
+        return grams
+
+    def _index(self, course_id: str, key_id: str, key_title: str):
+        for gram in self._grams(key_id) | self._grams(key_title):
+            self._postings.setdefault(gram, set()).add(course_id)
+
+    def _unindex(self, course_id: str, key_id: str, key_title: str):
+        for gram in self._grams(key_id) | self._grams(key_title):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(course_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def add(self, course_id: str, title: str):
+        """
+        Adds a course to the index. New courses go to the end of the catalog order.
+
+        Arguments:
+            course_id (str): The course code.
+            title (str): The course title.
+        """
+        if course_id in self._entries:
+            self.remove(course_id)
+        entry = (self._next_order, course_id.lower(), title.lower())
+        self._next_order += 1
+        self._entries[course_id] = entry
+        self._index(course_id, entry[1], entry[2])
+
+    def update(self, course_id: str, title: str):
+        """
+        Re-indexes a course after its title changed. The course keeps its place in the catalog order.
+
+        Arguments:
+            course_id (str): The course code.
+            title (str): The new course title.
+        """
+        order, key_id, key_title = self._entries[course_id]
+        new_title = title.lower()
+        if new_title == key_title:
+            return
+        self._unindex(course_id, key_id, key_title)
+        self._entries[course_id] = (order, key_id, new_title)
+        self._index(course_id, key_id, new_title)
+
+    def remove(self, course_id: str):
+        """
+        Takes a course out of the index if it's there.
+
+        Argument:
+            course_id (str): The course code.
+        """
+        entry = self._entries.pop(course_id, None)
+        if entry is not None:
+            self._unindex(course_id, entry[1], entry[2])
+
+    def search(self, search_term: str, ranked: bool = False, limit: Optional[int] = None) -> List[str]:
+        """
+        Finds the course IDs whose ID or title contains the search term (ignoring case).
+
+        Arguments:
+            search_term (str): The text to look for.
+            ranked (bool, optional): If True, exact ID matches come first, then courses whose
+                ID or title starts with the term, then all other matches.
+                If False, results are in the order the courses were added.
+            limit (int, optional): The most results to return. Default is no limit.
+
+        Returns:
+            List[str]: Matching course IDs.
+        """
+        term = search_term.lower()
+        if not term:
+            candidates = self._entries.keys()
+        elif len(term) <= self.GRAM_SIZE:
+            # Short terms are n-grams themselves, so the posting list is the exact answer
+            candidates = self._postings.get(term, ())
+        else:
+            postings = []
+            for i in range(len(term) - self.GRAM_SIZE + 1):
+                ids = self._postings.get(term[i:i + self.GRAM_SIZE])
+                if not ids:
+                    return []
+                postings.append(ids)
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            # Sharing every n-gram doesn't guarantee the whole term is there, so double check
+            candidates = [cid for cid in candidates
+                          if term in self._entries[cid][1] or term in self._entries[cid][2]]
+
+        entries = self._entries
+        if ranked:
+            def sort_key(cid):
+                order, key_id, key_title = entries[cid]
+                if key_id == term:
+                    rank = 0
+                elif key_id.startswith(term) or key_title.startswith(term):
+                    rank = 1
+                else:
+                    rank = 2
+                return rank, order
+        else:
+            def sort_key(cid):
+                return entries[cid][0]
+
+        if limit is not None:
+            return heapq.nsmallest(limit, candidates, key=sort_key)
+        return sorted(candidates, key=sort_key)
+
+
+class CatalogView:
+
+    def __init__(self):
+        """
+        Creates an empty catalog view: the rows students see when they list courses, ready to print.
+
+        Each course's row (its table line plus "Full"/"Available") is built once and reused
+        until that course changes. The view also keeps the catalog order and the list of courses
+        with free seats, so a page of courses (or of available courses) is a quick slice
+        instead of a pass over every course.
+
+        Attributes:
+            _courses (Dict[str, Course]): The courses in the view.
+            _positions (Dict[str, int]): Each course's place in the catalog order.
+            _ids (Dict[int, str]): The course ID at each place.
+            _all (List[int]): Sorted places of every course.
+            _open (List[int]): Sorted places of courses that still have free seats.
+            _rows (Dict[str, str]): Ready-made rows. A course is missing here until its row is needed again.
+        """
+        self._lock = threading.Lock()
+        self._courses: Dict[str, Course] = {}
+        self._positions: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._all: List[int] = []
+        self._open: List[int] = []
+        self._rows: Dict[str, str] = {}
+        self._next_position = 0
+
+    def add(self, course: Course):
+        """
+        Adds a new course to the end of the catalog.
+
+        Argument:
+            course (Course): The course to add.
+        """
+        with self._lock:
+            position = self._next_position
+            self._next_position += 1
+            self._courses[course.course_id] = course
+            self._positions[course.course_id] = position
+            self._ids[position] = course.course_id
+            self._all.append(position)
+            if not course.is_full():
+                self._open.append(position)
+
+    def remove(self, course_id: str):
+        """
+        Takes a course out of the catalog if it's there.
+
+        Argument:
+            course_id (str): The course code.
+        """
+        with self._lock:
+            position = self._positions.pop(course_id, None)
+            if position is None:
+                return
+            del self._courses[course_id]
+            del self._ids[position]
+            self._rows.pop(course_id, None)
+            self._discard(self._all, position)
+            self._discard(self._open, position)
+
+    def update(self, course_id: str):
+        """
+        Marks a course as changed: its row is rebuilt next time, and its free-seat status is checked.
+
+        Call this after a course's details or its list of students change.
+
+        Argument:
+            course_id (str): The course code.
+        """
+        with self._lock:
+            position = self._positions.get(course_id)
+            if position is None:
+                return
+            self._rows.pop(course_id, None)
+            is_open = not self._courses[course_id].is_full()
+            i = bisect.bisect_left(self._open, position)
+            listed = i < len(self._open) and self._open[i] == position
+            if is_open and not listed:
+                self._open.insert(i, position)
+            elif listed and not is_open:
+                del self._open[i]
+
+    @staticmethod
+    def _discard(positions: List[int], position: int):
+        i = bisect.bisect_left(positions, position)
+        if i < len(positions) and positions[i] == position:
+            del positions[i]
+
+    def _row(self, course_id: str) -> str:
+        row = self._rows.get(course_id)
+        if row is None:
+            course = self._courses[course_id]
+            status = "Full" if course.is_full() else "Available"
+            row = f"{course} - Status: {status}"
+            self._rows[course_id] = row
+        return row
+
+    def rows(self, available_only: bool = False, start: int = 0, count: Optional[int] = None) -> List[str]:
+        """
+        Gets ready-to-print catalog rows in catalog order.
+
+        Arguments:
+            available_only (bool, optional): If True, only courses with free seats.
+            start (int, optional): How many rows to skip (for paging).
+            count (int, optional): The most rows to return. Default is all the rest.
+
+        Returns:
+            List[str]: The rows.
+        """
+        with self._lock:
+            positions = self._open if available_only else self._all
+            stop = None if count is None else start + count
+            ids = self._ids
+            return [self._row(ids[p]) for p in positions[start:stop]]
+
+    def size(self, available_only: bool = False) -> int:
+        """
+        Counts the courses in the catalog.
+
+        Argument:
+            available_only (bool, optional): If True, only count courses with free seats.
+
+        Returns:
+            int: The number of courses.
+        """
+        return len(self._open if available_only else self._all)
+
+    def clear(self):
+        """
+        Removes every course from the view.
+        """
+        with self._lock:
+            self._courses.clear()
+            self._positions.clear()
+            self._ids.clear()
+            self._all.clear()
+            self._open.clear()
+            self._rows.clear()
+            self._next_position = 0
+
+
+class LockTable:
+
+    def __init__(self):
+        """
+        Creates an empty table of locks, one lock per key, made the first time a key is used.
+
+        Keys are tuples like ("course", "CS101") or ("student", "student1").
+        Locks are always taken in sorted key order, so two threads can never wait on each
+        other in a circle (a deadlock). Because ("catalog", ...) < ("course", ...) < ("student", ...),
+        a thread that already holds some locks may only ask for keys that sort after them.
+
+        The table can also be paused (see paused), which keeps every new hold waiting
+        until the pause ends, so the whole system can be read with no change half made.
+        """
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+        # Threads inside a hold (counted once per thread however deeply nested), and whether a pause is on
+        self._gate = threading.Condition()
+        self._active = 0
+        self._paused = False
+        self._local = threading.local()
+
+    def lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        """
+        Gets the lock for a key, creating it if needed.
+
+        Argument:
+            key (Tuple[str, str]): The kind of record and its ID.
+
+        Returns:
+            threading.Lock: The lock for that key.
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+        return lock
+
+    @contextmanager
+    def hold(self, keys: Iterable[Tuple[str, str]]):
+        """
+        Holds the locks for all the keys until the with-block ends.
+
+        Argument:
+            keys (Iterable[Tuple[str, str]]): The keys to lock. Duplicates are ignored.
+        """
+        locks = [self.lock_for(key) for key in sorted(set(keys))]
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            with self._gate:
+                while self._paused:
+                    self._gate.wait()
+                self._active += 1
+        local.depth = depth + 1
+        try:
+            for lock in locks:
+                lock.acquire()
+            try:
+                yield
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+        finally:
+            local.depth = depth
+            if depth == 0:
+                with self._gate:
+                    self._active -= 1
+                    if self._active == 0:
+                        self._gate.notify_all()
+
+    @contextmanager
+    def paused(self):
+        """
+        Waits for every hold under way to end, then keeps new holds waiting until the with-block ends.
+
+        Raises:
+            Exception: If the calling thread is inside a hold (it would wait for itself).
+        """
+        if getattr(self._local, "depth", 0):
+            raise Exception("Changes can't be paused from inside a change.")
+        with self._gate:
+            while self._paused:
+                self._gate.wait()
+            self._paused = True
+            while self._active:
+                self._gate.wait()
+        try:
+            yield
+        finally:
+            with self._gate:
+                self._paused = False
+                self._gate.notify_all()
+
+
+class LotteryResult:
+
+    def __init__(self, seed: int, order: List[str], assignments: Dict[str, List[str]], stats: Dict[str, float]):
+        """
+        The outcome of one seat lottery (see RegistrationSystem.run_lottery).
+
+        Arguments:
+            seed (int): The seed the lottery order was drawn with. Running again with the
+                same preferences, seats and seed gives the same result.
+            order (List[str]): Student IDs in the drawn lottery order.
+            assignments (Dict[str, List[str]]): The courses each student was given, in the order they were picked.
+            stats (Dict[str, float]): Fairness numbers (see run_lottery).
+
+        Attributes:
+            statuses (List[Tuple[str, str, str]]): register_batch statuses from applying the assignments.
+                Empty if the result wasn't applied.
+        """
+        self.seed = seed
+        self.order = order
+        self.assignments = assignments
+        self.stats = stats
+        self.statuses: List[Tuple[str, str, str]] = []
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        """
+        Lists every assigned seat as (student_id, course_id), in lottery order.
+        """
+        return [(sid, cid) for sid in self.order for cid in self.assignments.get(sid, ())]
+
+
+class RegistrationSystem:
+
+    def __init__(self, thread_safe: bool = False, waitlist_by_standing: bool = False,
+                 max_credits: Optional[int] = None, min_credits: int = 0):
+        """
+        Starts the registration system with empty lists of courses, students, and admins.
+
+        Also pre-registers default admin and student accounts with preset credentials.
+
+        Arguments:
+            thread_safe (bool, optional): If True, registering, dropping and course changes
+                take a lock per course and per student, so many threads can use the system at once.
+                Work on different courses still runs side by side. Default is False (no locking).
+            waitlist_by_standing (bool, optional): If True, waitlists give seats to students with a
+                higher class standing first. Default is False (first come, first served).
+            max_credits (int, optional): The most credits a student may register for at once.
+                Default is None (no limit).
+            min_credits (int, optional): The fewest credits a student should be registered for.
+                Not enforced; underloaded_students lists the students below it. Default is 0.
+
+        Attributes:
+            courses (Dict[str, Course]): A dictionary mapping course IDs to Course objects.
+            students (Dict[str, Student]): A dictionary mapping student IDs to Student objects.
+            admins (Dict[str, Admin]): A dictionary mapping admin IDs to Admin objects.
+            search_index (CourseSearchIndex): The n-gram index used by search_courses.
+            catalog (CatalogView): Ready-made catalog rows used by catalog_rows.
+            waitlists (Dict[str, Waitlist]): The waitlist of each full course that has one.
+            timetables (Dict[str, MeetingIndex]): The meeting times of each student's registered
+                courses, used to stop time conflicts at registration.
+            prerequisites (PrerequisiteGraph): Which courses require which, with the transitive closure.
+            credit_loads (CreditLedger): How many credits each student is registered for.
+            preferences (Dict[str, Tuple[str, ...]]): Each student's ranked course choices for the
+                next seat lottery, in the order they were submitted.
+            auto_promote (bool): If True, a freed seat is given to the next waitlisted student
+                right away (after a drop or a capacity increase).
+            journal (optional): An operation log (like persistence.OperationLog). When set, every
+                change to courses, students or enrollments is passed to its append method.
+            metrics (optional): Call counters and timings (a metrics.Metrics), set by metrics.instrument.
+                Shown in the admin menu when set.
+            analytics (optional): The enrollment matrix (an analytics.EnrollmentMatrix) that follows
+                this system, set when the admin menu first shows the enrollment reports.
+            snapshots (List[Snapshot]): The snapshots that are still open (see snapshot).
+        """
+        self.courses: Dict[str, Course] = {}
+        self.students: Dict[str, Student] = {}
+        self.admins: Dict[str, Admin] = {}
+        self.search_index = CourseSearchIndex()
+        self.catalog = CatalogView()
+        self.waitlists: Dict[str, Waitlist] = {}
+        self.timetables: Dict[str, MeetingIndex] = {}
+        self.prerequisites = PrerequisiteGraph()
+        # Student ID -> (graph version, credit bitset), rebuilt when the graph or the student's completions change
+        self._credit: Dict[str, Tuple[int, int]] = {}
+        self.credit_loads = CreditLedger()
+        self.preferences: Dict[str, Tuple[str, ...]] = {}
+        self.waitlist_by_standing = waitlist_by_standing
+        self.max_credits = max_credits
+        self.min_credits = min_credits
+        self.auto_promote = True
+        self.thread_safe = thread_safe
+        self._locks: Optional[LockTable] = LockTable() if thread_safe else None
+        self.journal = None
+        self.metrics = None
+        self.analytics = None
+        self.snapshots: List["Snapshot"] = []
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_version = 0
+
+        # Pre-Registered Admin Accounts
+        self.admins['admin'] = Admin('admin', preset_hash('password'))
+
+        # Pre-Registered Student Accounts
+        self.students['student1'] = self._new_student('student1', preset_hash('pass123'))
+        self.students['student2'] = self._new_student('student2', preset_hash('pass123'))
+        for student_id in self.students:
+            self.credit_loads.add(student_id)
+
+    def authenticate_user(self, user_id: str, password: str) -> User:
+        """
+        Checks if a user as admin or student can log in with the given ID and password.
+
+        The password check is slow on purpose; auth.SessionManager runs it once per login
+        on worker threads and gives out a session token for later requests.
+
+        Arguments:
+            user_id (str): The username to check.
+            password (str): The password to check.
+
+        Returns:
+            User: The user object if login is successful.
+
+        Raises:
+            Exception: If the username or password is wrong.
+        """
+        user_id = user_id.lower()
+        if user_id == 'admin' and user_id in self.admins:
+            admin = self.admins[user_id]
+            if admin.authenticate(password):
+                return admin
+        elif user_id in self.students:
+            student = self.students[user_id]
+            if student.authenticate(password):
+                return student
+        else:
+            spend_verification(password)
+        raise Exception("Invalid username or password.")
+
+    def _locked(self, *keys: Tuple[str, str]):
+        """
+        Gets a with-block guard that holds the locks for the given keys.
+
+        Keys look like ("catalog", ""), ("course", course_id) or ("student", student_id).
+        When the system is not thread safe this does nothing.
+
+        Arguments:
+            keys (Tuple[str, str]): The records to lock.
+
+        Returns:
+            A context manager for use in a with-statement.
+        """
+        if self._locks is None:
+            return nullcontext()
+        return self._locks.hold(keys)
+
+    def changes_paused(self):
+        """
+        Gets a with-block guard that lets the changes under way finish and holds back new ones
+        until the block ends, so the whole state can be read (for example to save it) with
+        no change half made. When the system is not thread safe this does nothing.
+
+        Returns:
+            A context manager for use in a with-statement.
+        """
+        if self._locks is None:
+            return nullcontext()
+        return self._locks.paused()
+
+    def _record(self, operation: str, *args):
+        """
+        Writes a change to the journal, if one is attached.
+
+        Arguments:
+            operation (str): The name of the RegistrationSystem method that made the change.
+            args: The (already normalized) arguments needed to make the same change again.
+        """
+        if self.journal is not None:
+            self.journal.append(operation, args)
+
+    def snapshot(self) -> "Snapshot":
+        """
+        Takes a read-only, point-in-time view of the courses, students and enrollments.
+
+        Nothing is copied when the snapshot is taken, so it takes the same short time
+        however many courses and students there are. Afterwards, every change to a course,
+        a student or an enrollment first hands the open snapshots a copy of the records it is
+        about to change (copy on write), so a report read from the snapshot sees one moment
+        in time while registrations carry on. Close the snapshot (or use it in a with-statement)
+        when the report is done, so changes stop paying for the copies.
+        When other threads make changes while the snapshot is read, the system must be thread safe.
+
+        Returns:
+            Snapshot: The snapshot.
+        """
+        with self._snapshot_lock:
+            self._snapshot_version += 1
+            snapshot = Snapshot(self, self._snapshot_version)
+            self.snapshots.append(snapshot)
+        return snapshot
+
+    def _release_snapshot(self, snapshot: "Snapshot"):
+        """
+        Forgets a closed snapshot, so changes stop saving copies for it.
+        """
+        with self._snapshot_lock:
+            if snapshot in self.snapshots:
+                self.snapshots.remove(snapshot)
+
+    def _preserve(self, course_ids: Iterable[str] = (), student_ids: Iterable[str] = ()):
+        """
+        Gives every open snapshot a copy of some records as they are now, just before they change.
+
+        Every change saves all the records it will touch in one call, before touching any of them
+        (and while holding their locks), so a snapshot never sees half of a change.
+        Snapshots that already have a copy of a record keep the one they have, and records that
+        don't exist yet are saved as missing, so they stay out of the snapshot once added.
+
+        Arguments:
+            course_ids (Iterable[str], optional): The courses about to change (a list or tuple).
+            student_ids (Iterable[str], optional): The students about to change (a list or tuple).
+        """
+        if not self.snapshots:
+            return
+        with self._snapshot_lock:
+            for snapshot in self.snapshots:
+                snapshot.courses.save(course_ids)
+                snapshot.students.save(student_ids)
+
+    def reindex(self):
+        """
+        Rebuilds the search index, the catalog view, the students' timetables, the prerequisite
+        graph and the credit totals from the course records.
+
+        Only needed after course or enrollment records were changed directly
+        instead of through the RegistrationSystem methods (for example when loading saved data).
+        """
+        self.search_index = CourseSearchIndex()
+        self.catalog = CatalogView()
+        self.timetables = {}
+        self.prerequisites = PrerequisiteGraph()
+        self._credit = {}
+        self.credit_loads = CreditLedger()
+        for student_id in self.students:
+            self.credit_loads.add(student_id)
+        for course_id, course in self.courses.items():
+            self.search_index.add(course_id, course.title)
+            self.catalog.add(course)
+            for sid in course.registered_students:
+                self._timetable_add(sid, course)
+                self.credit_loads.change(sid, course.credits)
+            if course.prerequisites:
+                self.prerequisites.set_prerequisites(course_id, course.prerequisites)
+
+    def _missing_prerequisites(self, student: Student, course: Course) -> List[str]:
+        """
+        Finds the prerequisites of a course that a student has no credit for yet.
+
+        The student's credit bitset is cached until the graph or their completed courses change,
+        so the usual check is a single bit operation.
+
+        Returns:
+            List[str]: The missing course codes (empty if the student is eligible).
+        """
+        if not course.prerequisites:
+            return []
+        graph = self.prerequisites
+        cached = self._credit.get(student.user_id)
+        if cached is None or cached[0] != graph.version:
+            cached = (graph.version, graph.credit_bits(student.completed_courses))
+            self._credit[student.user_id] = cached
+        if graph.eligible(course.course_id, cached[1]):
+            return []
+        return graph.missing(course.course_id, cached[1])
+
+    def _check_prerequisites(self, course_id: str, prerequisites: Iterable[str]) -> List[str]:
+        """
+        Makes prerequisite codes uppercase and checks that the courses exist.
+
+        Raises:
+            Exception: If any of the prerequisite courses does not exist.
+        """
+        prerequisites = list(dict.fromkeys(cid.upper() for cid in prerequisites))
+        missing = [cid for cid in prerequisites if cid not in self.courses and cid != course_id]
+        if missing:
+            raise Exception(f"Prerequisite not found: {', '.join(missing)}.")
+        return prerequisites
+
+    def _timetable_conflict(self, student_id: str, course: Course) -> Optional[str]:
+        """
+        Finds a registered course of the student that meets at the same time as the given course.
+
+        Returns:
+            str: The clashing course code, or None.
+        """
+        if not course.meetings:
+            return None
+        timetable = self.timetables.get(student_id)
+        return timetable.conflict(course.meetings) if timetable else None
+
+    def _timetable_add(self, student_id: str, course: Course):
+        if course.meetings:
+            timetable = self.timetables.get(student_id)
+            if timetable is None:
+                timetable = self.timetables[student_id] = MeetingIndex()
+            timetable.add(course.course_id, course.meetings)
+
+    def _timetable_remove(self, student_id: str, course: Course):
+        if course.meetings:
+            timetable = self.timetables.get(student_id)
+            if timetable is not None:
+                timetable.remove(course.course_id, course.meetings)
+                if not timetable:
+                    del self.timetables[student_id]
+
+    def _credit_overload(self, student_id: str, course: Course) -> Optional[int]:
+        """
+        Checks whether registering for a course would put a student over max_credits.
+
+        Returns:
+            int: The total the student would have, or None if it is within the limit (or there is no limit).
+        """
+        if self.max_credits is None:
+            return None
+        load = self.credit_loads.total(student_id) + course.credits
+        return load if load > self.max_credits else None
+
+    def _new_student(self, student_id: str, password: str, standing: int = 0) -> Student:
+        """
+        Creates the Student object for a new account.
+
+        Subclasses can override this to change how student records are stored.
+
+        Arguments:
+            student_id (str): The student's ID (already lowercase).
+            password (str): The student's stored (hashed) password.
+            standing (int, optional): The student's class standing.
+
+        Returns:
+            Student: The new student.
+        """
+        return Student(student_id, password, standing)
+
+    def _new_course(self, course_id: str, title: str, description: str, credits: int, capacity: int,
+                    meetings=(), prerequisites: Iterable[str] = ()) -> Course:
+        """
+        Creates the Course object for a new course.
+
+        Subclasses can override this to change how course records are stored.
+
+        Arguments:
+            course_id (str): The course code (already uppercase).
+            title (str): The name of the course.
+            description (str): A short explanation of what the course is about.
+            credits (int): How many credits the course gives.
+            capacity (int): The max number of students who can join.
+            meetings (str or Iterable, optional): Weekly meeting times (see Course).
+            prerequisites (Iterable[str], optional): Direct prerequisite course codes.
+
+        Returns:
+            Course: The new course.
+        """
+        return Course(course_id, title, description, credits, capacity, meetings, prerequisites)
+
+    # Admins/Menu Management Functions
+
+    def add_student(self, student_id: str, password: str, standing: int = 0):
+        """
+        Adds a new student account to the system.
+
+        Arguments:
+            student_id (str): The student's ID (automatically made lowercase).
+            password (str): The student's password to log in. It is stored (and journaled) as a salted
+                hash; a password already hashed by auth.hash_password is kept as it is.
+            standing (int, optional): The student's class standing (for example 1 for first year
+                up to 4 for final year). Only used by waitlists ordered by standing.
+
+        Raises:
+            Exception: If the student ID already exists.
+        """
+        student_id = student_id.lower()
+        password = stored_password(password)
+        with self._locked(("student", student_id)):
+            if student_id in self.students:
+                raise Exception("Student with this ID already exists.")
+            self._preserve(student_ids=(student_id,))
+            self.students[student_id] = self._new_student(student_id, password, standing)
+            self.credit_loads.add(student_id)
+            self._record("add_student", student_id, password, standing)
+
+    def add_students_batch(self, rows: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Adds many student accounts in one call.
+
+        Instead of raising an exception, every row gets a status:
+        "ok" if the account was added, or "duplicate" if the ID already exists
+        (or appeared earlier in the same batch).
+
+        Arguments:
+            rows (Iterable[Tuple[str, str]]): (student_id, password) rows. Plain passwords are hashed,
+                several at a time; ones already hashed by auth.hash_password are kept as they are.
+
+        Returns:
+            List[Tuple[str, str]]: (student_id, status) for each row, in input order.
+        """
+        rows = [(student_id.lower(), password) for student_id, password in rows]
+        # Hash the plain passwords on all cores before taking any locks
+        rows = list(zip([row[0] for row in rows], stored_passwords(row[1] for row in rows)))
+        results = []
+        added = []
+        student_keys = [("student", row[0]) for row in rows] if self._locks is not None else ()
+        with self._locked(*student_keys):
+            self._preserve(student_ids=[row[0] for row in rows])
+            for student_id, password in rows:
+                if student_id in self.students:
+                    results.append((student_id, BATCH_DUPLICATE))
+                else:
+                    self.students[student_id] = self._new_student(student_id, password)
+                    self.credit_loads.add(student_id)
+                    results.append((student_id, BATCH_OK))
+                    added.append((student_id, password))
+            if added:
+                self._record("add_students_batch", added)
+        return results
+
+    def add_course(self, course_id: str, title: str, description: str, credits: int, capacity: int,
+                   meetings=(), prerequisites: Iterable[str] = ()):
+        """
+        Adds a new course to the system.
+
+        Arguments:
+            course_id (str): The course code (like "CS101").
+            title (str): The name of the course.
+            description (str): A short explanation of what the course is about.
+            credits (int): How many credits the course gives.
+            capacity (int): The max number of students who can join.
+            meetings (str or Iterable, optional): Weekly meeting times, like "Mon 09:00-10:15, Wed 09:00-10:15".
+                Default is no meeting times (the course never clashes with another).
+            prerequisites (Iterable[str], optional): Codes of existing courses a student must complete first.
+
+        Raises:
+            Exception: If the course ID already exists, a meeting time can't be read,
+                a prerequisite doesn't exist, or the prerequisites would form a cycle.
+        """
+        course_id = course_id.upper()
+        meetings = Course.parse_meetings(meetings)
+        with self._locked(("catalog", ""), ("course", course_id)):
+            if course_id in self.courses:
+                raise Exception("Course with this ID already exists.")
+            prerequisites = self._check_prerequisites(course_id, prerequisites)
+            self._preserve((course_id,))
+            self.prerequisites.set_prerequisites(course_id, prerequisites)
+            self.courses[course_id] = self._new_course(course_id, title, description, credits, capacity,
+                                                       meetings, prerequisites)
+            self.search_index.add(course_id, title)
+            self.catalog.add(self.courses[course_id])
+            self._record("add_course", course_id, title, description, credits, capacity, meetings, prerequisites)
+
+    def add_courses_batch(self, rows: Iterable[Tuple[str, str, str, int, int]]) -> List[Tuple[str, str]]:
+        """
+        Adds many courses in one call.
+
+        Instead of raising an exception, every row gets a status:
+        "ok" if the course was added, "invalid" if its meeting times can't be read,
+        "duplicate" if the ID already exists (or appeared earlier in the same batch),
+        or "prerequisite" if a prerequisite doesn't exist or the course would require itself.
+        Meeting times are read before anything changes, so a bad row never leaves half a batch behind.
+
+        Arguments:
+            rows (Iterable[Tuple[str, str, str, int, int]]):
+                (course_id, title, description, credits, capacity) rows, optionally followed by
+                meeting times as a sixth value and prerequisite codes as a seventh. A prerequisite
+                may be a course added by an earlier row of the same batch.
+
+        Returns:
+            List[Tuple[str, str]]: (course_id, status) for each row, in input order.
+        """
+        rows = [(row[0].upper(),) + tuple(row[1:]) for row in rows]
+        invalid = set()
+        for i, row in enumerate(rows):
+            if len(row) > 5:
+                try:
+                    rows[i] = row[:5] + (Course.parse_meetings(row[5]),) + row[6:]
+                except Exception:
+                    invalid.add(i)
+        results = []
+        added = []
+        course_keys = [("course", row[0]) for row in rows] if self._locks is not None else ()
+        with self._locked(("catalog", ""), *course_keys):
+            self._preserve([row[0] for row in rows])
+            for i, row in enumerate(rows):
+                if i in invalid:
+                    results.append((row[0], BATCH_INVALID))
+                    continue
+                course_id = row[0]
+                if course_id in self.courses:
+                    results.append((course_id, BATCH_DUPLICATE))
+                    continue
+                if len(row) > 6:
+                    try:
+                        prerequisites = self._check_prerequisites(course_id, row[6])
+                        self.prerequisites.set_prerequisites(course_id, prerequisites)
+                    except Exception:
+                        results.append((course_id, BATCH_PREREQUISITE))
+                        continue
+                    row = row[:6] + (prerequisites,)
+                self.courses[course_id] = self._new_course(*row)
+                self.search_index.add(course_id, row[1])
+                self.catalog.add(self.courses[course_id])
+                results.append((course_id, BATCH_OK))
+                added.append(row)
+            if added:
+                self._record("add_courses_batch", added)
+        return results
+
+    def remove_course(self, course_id: str):
+        """
+        Removes a course from the system and removes it from all students' lists.
+
+        Only the students on the course's own list are visited, so the work depends
+        on how many students are registered and not on the total number of students.
+
+        Arguments:
+            course_id (str): The course code to remove.
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        with self._locked(("catalog", ""), ("course", course_id)):
+            if course_id not in self.courses:
+                raise Exception("Course not found.")
+            course = self.courses[course_id]
+            roster = course.registered_students.to_list()
+            # Remove course from the students registered in it
+            with self._locked(*(("student", sid) for sid in roster)):
+                self._preserve([course_id] + self.prerequisites.dependents(course_id), roster)
+                for sid in roster:
+                    student = self.students.get(sid)
+                    if student:
+                        student.drop_course(course_id)
+                    self._timetable_remove(sid, course)
+                    self.credit_loads.change(sid, -course.credits)
+            self._forget_prerequisite(course_id)
+            del self.courses[course_id]
+            self.waitlists.pop(course_id, None)
+            self.search_index.remove(course_id)
+            self.catalog.remove(course_id)
+            self._record("remove_course", course_id)
+
+    def remove_courses(self, course_ids: Iterable[str]):
+        """
+        Removes several courses at once and removes them from all students' lists.
+
+        All course IDs are checked first, so if one is missing nothing is removed.
+        Each affected student is visited only once, even if they were in several of the courses.
+
+        Arguments:
+            course_ids (Iterable[str]): The course codes to remove.
+
+        Raises:
+            Exception: If any of the courses does not exist.
+        """
+        course_ids = list(dict.fromkeys(cid.upper() for cid in course_ids))
+        with self._locked(("catalog", ""), *(("course", cid) for cid in course_ids)):
+            missing = [cid for cid in course_ids if cid not in self.courses]
+            if missing:
+                raise Exception(f"Course not found: {', '.join(missing)}.")
+            # Group the dropped courses by student
+            drops: Dict[str, List[str]] = {}
+            for cid in course_ids:
+                for sid in self.courses[cid].registered_students:
+                    drops.setdefault(sid, []).append(cid)
+            with self._locked(*(("student", sid) for sid in drops)):
+                if self.snapshots:
+                    dependents = [dependent for cid in course_ids for dependent in self.prerequisites.dependents(cid)]
+                    self._preserve(course_ids + dependents, list(drops))
+                for sid, cids in drops.items():
+                    student = self.students.get(sid)
+                    for cid in cids:
+                        if student:
+                            student.drop_course(cid)
+                        self._timetable_remove(sid, self.courses[cid])
+                    self.credit_loads.change(sid, -sum(self.courses[cid].credits for cid in cids))
+            for cid in course_ids:
+                self._forget_prerequisite(cid)
+            for cid in course_ids:
+                del self.courses[cid]
+                self.waitlists.pop(cid, None)
+                self.search_index.remove(cid)
+                self.catalog.remove(cid)
+            self._record("remove_courses", course_ids)
+
+    def _forget_prerequisite(self, course_id: str):
+        """
+        Takes a course that is being removed out of the prerequisite graph and off other courses' prerequisite lists.
+        """
+        for dependent in self.prerequisites.remove(course_id):
+            if dependent in self.courses:
+                self.courses[dependent].update_details(prerequisites=self.prerequisites.prerequisites(dependent))
+
+    def check_consistency(self) -> List[str]:
+        """
+        Checks that course lists and student lists agree with each other.
+
+        Every student in a course must have that course in their list, and every
+        course in a student's list must exist and have that student in its list.
+        Each student's credit total must also match the credits of their courses.
+
+        Returns:
+            List[str]: A message for each problem found. Empty if everything matches.
+        """
+        problems = []
+        for cid, course in self.courses.items():
+            for sid in course.registered_students:
+                student = self.students.get(sid)
+                if student is None:
+                    problems.append(f"{cid} lists unknown student {sid}.")
+                elif cid not in student.registered_courses:
+                    problems.append(f"{cid} lists {sid}, but {sid} does not list {cid}.")
+        for sid, student in self.students.items():
+            for cid in student.registered_courses:
+                course = self.courses.get(cid)
+                if course is None:
+                    problems.append(f"{sid} lists unknown course {cid}.")
+                elif sid not in course.registered_students:
+                    problems.append(f"{sid} lists {cid}, but {cid} does not list {sid}.")
+            load = self.credit_loads.total(sid)
+            actual = sum(self.courses[cid].credits for cid in student.registered_courses if cid in self.courses)
+            if load != actual:
+                problems.append(f"{sid} counts {load} credits, but is registered for {actual}.")
+        return problems
+
+    def find_conflicts(self) -> List[Tuple[str, str, str]]:
+        """
+        Finds every student who is registered for two courses that meet at the same time.
+
+        Registration already stops new clashes, but a change to a course's meeting times can create some.
+        Each student's timetable keeps every day's meetings sorted by start time, so one sweep through
+        them finds all clashes without comparing every pair of courses. The work grows with the
+        total number of enrollments, not with the number of course pairs.
+
+        Returns:
+            List[Tuple[str, str, str]]: Sorted (student_id, course_id, other_course_id) entries,
+            with the two course IDs in alphabetical order.
+        """
+        conflicts = []
+        for student_id, timetable in list(self.timetables.items()):
+            conflicts.extend((student_id, first, second) for first, second in timetable.overlaps())
+        conflicts.sort()
+        return conflicts
+
+    def update_course(self, course_id: str, title=None, description=None, credits=None, capacity=None,
+                      meetings=None, prerequisites=None):
+        """
+        Changes details of an existing course.
+
+        Only the information you give will be changed. If you leave something out, it stays the same.
+        Changing the meeting times doesn't drop students whose schedules now clash;
+        find_conflicts lists them. Changing the credits updates the credit totals of the course's
+        students only; any that end up over the limit are listed by overloaded_students.
+
+        Arguments:
+            course_id (str): The course code to update.
+            title (str, optional): New course name. Default is no change.
+            description (str, optional): New course summary. Default is no change.
+            credits (int, optional): New number of credits. Default is no change.
+            capacity (int, optional): New max students allowed. Default is no change.
+            meetings (str or Iterable, optional): New weekly meeting times ("" for none). Default is no change.
+            prerequisites (Iterable[str], optional): New prerequisite course codes (empty for none).
+                Default is no change. Students already registered stay registered.
+
+        Raises:
+            Exception: If the course does not exist, a meeting time can't be read,
+                a prerequisite doesn't exist, or the prerequisites would form a cycle.
+        """
+        course_id = course_id.upper()
+        if meetings is not None:
+            meetings = Course.parse_meetings(meetings)
+        with self._locked(("catalog", ""), ("course", course_id)):
+            if course_id not in self.courses:
+                raise Exception("Course not found.")
+            course = self.courses[course_id]
+            self._preserve((course_id,))
+            if prerequisites is not None:
+                prerequisites = self._check_prerequisites(course_id, prerequisites)
+                self.prerequisites.set_prerequisites(course_id, prerequisites)
+                course.update_details(prerequisites=prerequisites)
+            if meetings is not None and meetings != course.meetings:
+                roster = course.registered_students.to_list()
+                with self._locked(*(("student", sid) for sid in roster)):
+                    for sid in roster:
+                        self._timetable_remove(sid, course)
+                    course.update_details(meetings=meetings)
+                    for sid in roster:
+                        self._timetable_add(sid, course)
+            if credits is not None and credits != course.credits:
+                # Only this course's students have totals that change
+                roster = course.registered_students.to_list()
+                with self._locked(*(("student", sid) for sid in roster)):
+                    self.credit_loads.change_all(roster, credits - course.credits)
+                    course.update_details(credits=credits)
+            course.update_details(title, description, credits, capacity)
+            if title is not None:
+                self.search_index.update(course_id, title)
+            self.catalog.update(course_id)
+            self._record("update_course", course_id, title, description, credits, capacity, meetings, prerequisites)
+        if capacity is not None and self.auto_promote:
+            self.promote_waitlist(course_id)
+
+    def search_courses(self, search_term: str, ranked: bool = False, limit: Optional[int] = None) -> List[Course]:
+        """
+        Finds courses by its ID or title.
+
+        The search ignores uppercase or lowercase letters. It uses the search index,
+        so it does not have to check every course in the system.
+
+        Arguments:
+            search_term (str): The word to look for in course IDs and titles.
+            ranked (bool, optional): If True, an exact course ID match comes first, then courses
+                whose ID or title starts with the word, then the rest. Default is catalog order.
+            limit (int, optional): The most courses to return. Default is no limit.
+
+        Returns:
+            List[Course]: A list of courses that match the search. Empty if none found.
+        """
+        return [self.courses[cid] for cid in self.search_index.search(search_term, ranked, limit)]
+
+    def list_students_for_course(self, course_id: str) -> List[str]:
+        """
+        Gets the list of students signed up for a given course.
+
+        Arguments:
+            course_id (str): The course code to check.
+
+        Returns:
+            List[str]: Student IDs registered in the course.
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        if course_id not in self.courses:
+            raise Exception("Course not found.")
+        return self.courses[course_id].registered_students.to_list()
+
+    def list_students_after(self, course_id: str, after: Optional[str], count: int) -> List[str]:
+        """
+        Gets the next students of a course's roster in student ID order, for reading it page by page.
+
+        Arguments:
+            course_id (str): The course code to check.
+            after (str): The last student ID of the previous page, or None for the first page.
+            count (int): The most student IDs to return.
+
+        Returns:
+            List[str]: Up to count student IDs that sort after `after`.
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        if course_id not in self.courses:
+            raise Exception("Course not found.")
+        return self.courses[course_id].registered_students.page_after(after, count)
+
+    def list_courses_for_student(self, student_id: str) -> List[str]:
+        """
+        Gets the list of courses a student is signed up for.
+
+        Arguments:
+            student_id (str): The student's ID.
+
+        Returns:
+            List[str]: Course IDs the student is registered in.
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        return self.students[student_id].view_registered_courses()
+
+    # Students/Menu Management Functions
+
+    def view_available_courses(self) -> List[Course]:
+        """
+        Shows all courses in the system.
+
+        This returns every course
+
+        Returns:
+            List[Course]: A list of all courses.
+        """
+        return list(self.courses.values())
+
+    def catalog_rows(self, available_only: bool = False, page: int = 0, page_size: Optional[int] = None) -> List[str]:
+        """
+        Gets the catalog as ready-to-print rows (course details plus "Full" or "Available").
+
+        Rows come from the catalog view, which only rebuilds a row when its course changes,
+        so listing the catalog again and again doesn't redo the formatting for every course.
+
+        Arguments:
+            available_only (bool, optional): If True, only courses with free seats are listed.
+            page (int, optional): Which page to get, starting at 0. Only used with page_size.
+            page_size (int, optional): Rows per page. Default is every row on one page.
+
+        Returns:
+            List[str]: Rows in the order the courses were added. Print Course.get_table_header() above them.
+        """
+        if page_size is None:
+            return self.catalog.rows(available_only)
+        return self.catalog.rows(available_only, page * page_size, page_size)
+
+    def catalog_size(self, available_only: bool = False) -> int:
+        """
+        Counts the courses in the catalog (for working out how many pages there are).
+
+        Argument:
+            available_only (bool, optional): If True, only count courses with free seats.
+
+        Returns:
+            int: The number of courses.
+        """
+        return self.catalog.size(available_only)
+
+    def seat_totals(self) -> Tuple[int, int, int, int, int]:
+        """
+        Adds up the seats of every course (used for the metrics gauges).
+
+        Returns:
+            Tuple[int, int, int, int, int]: The number of courses, enrolled students, total seats,
+            free seats and full courses.
+        """
+        enrolled = capacity = free = full = 0
+        for course in self.courses.values():
+            taken = len(course.registered_students)
+            enrolled += taken
+            capacity += course.capacity
+            if taken < course.capacity:
+                free += course.capacity - taken
+            else:
+                full += 1
+        return len(self.courses), enrolled, capacity, free, full
+
+    def student_course_register(self, student_id: str, course_id: str):
+        """
+        Signs a student up for a course.
+
+        Checks if the student and course exist, makes sure the course is not full,
+        and that the student is not already signed up.
+
+        Arguments:
+            student_id (str): The student's ID.
+            course_id (str): The course code.
+
+        Raises:
+            Exception: If student or course is not found,
+                       if the course is full,
+                       if the student is already signed up for the course,
+                       if the student hasn't completed the course's prerequisites,
+                       if the course meets at the same time as one of the student's courses,
+                       or if the course's credits would put the student over max_credits.
+        """
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        if course_id not in self.courses:
+            raise Exception("Course not found.")
+        student = self.students[student_id]
+        course = self.courses[course_id]
+        # The full check and the add must happen under the same lock, or two threads could take the last seat
+        with self._locked(("course", course_id), ("student", student_id)):
+            if self.courses.get(course_id) is not course:
+                raise Exception("Course not found.")
+            if course.is_full():
+                raise Exception("Course is full.")
+            if course_id in student.registered_courses:
+                raise Exception("Student already registered for this course.")
+            missing = self._missing_prerequisites(student, course)
+            if missing:
+                raise Exception(f"Missing prerequisites: {', '.join(missing)}.")
+            clash = self._timetable_conflict(student_id, course)
+            if clash is not None:
+                raise Exception(f"Time conflict with {clash}.")
+            load = self._credit_overload(student_id, course)
+            if load is not None:
+                raise Exception(f"Credit limit exceeded: {load} of {self.max_credits} credits.")
+            self._preserve((course_id,), (student_id,))
+            # Store the shared ID strings from the records, not the copies made by lower()/upper()
+            course.add_student(student.user_id)
+            student.register_course(course.course_id)
+            self._timetable_add(student.user_id, course)
+            self.credit_loads.change(student.user_id, course.credits)
+            waitlist = self.waitlists.get(course_id)
+            if waitlist is not None:
+                waitlist.remove(student_id)
+            self.catalog.update(course_id)
+            self._record("student_course_register", student_id, course_id)
+
+    def student_course_remove(self, student_id: str, course_id: str):
+        """
+        Removes a course from student's registered courses.
+
+        Checks that the student and course exist, and that the student is registered.
+        Updates both the course and student records. If the course has a waitlist,
+        the freed seat goes to the next student on it.
 
         Arguments:
-            course_id (str): The course code to remove.
+            student_id (str): The student's ID.
+            course_id (str): The course code.
 
         Raises:
-            Exception: If the course does not exist.
+            Exception: If student or course is not found,
+                       or if the student is not registered for the course.
         """
+        student_id = student_id.lower()
         course_id = course_id.upper()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
         if course_id not in self.courses:
             raise Exception("Course not found.")
-        # Remove course from all students
-        for student in self.students.values():
-            if course_id in student.registered_courses:
-                student.drop_course(course_id)
-        del self.courses[course_id]
-
-    def update_course(self, course_id: str, title=None, description=None, credits=None, capacity=None):
+        student = self.students[student_id]
+        course = self.courses[course_id]
+        with self._locked(("course", course_id), ("student", student_id)):
+            if self.courses.get(course_id) is not course:
+                raise Exception("Course not found.")
+            if course_id not in student.registered_courses:
+                raise Exception("Student is not registered for this course.")
+            self._preserve((course_id,), (student_id,))
+            course.remove_student(student_id)
+            student.drop_course(course_id)
+            self._timetable_remove(student_id, course)
+            self.credit_loads.change(student_id, -course.credits)
+            self.catalog.update(course_id)
+            self._record("student_course_remove", student_id, course_id)
+        if self.auto_promote:
+            self.promote_waitlist(course_id)
+
+    def complete_course(self, student_id: str, course_id: str):
         """
-        Changes details of an existing course.
+        Records that a student has passed a course, so it counts toward prerequisites.
 
-        Only the information you give will be changed. If you leave something out, it stays the same.
+        This doesn't change the student's current registrations.
 
         Arguments:
-            course_id (str): The course code to update.
-            title (str, optional): New course name. Default is no change.
-            description (str, optional): New course summary. Default is no change.
-            credits (int, optional): New number of credits. Default is no change.
-            capacity (int, optional): New max students allowed. Default is no change.
+            student_id (str): The student's ID.
+            course_id (str): The course code.
 
         Raises:
-            Exception: If the course does not exist.
+            Exception: If student or course is not found,
+                       or if the course is already on the student's completed list.
         """
+        student_id = student_id.lower()
         course_id = course_id.upper()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
         if course_id not in self.courses:
             raise Exception("Course not found.")
-        self.courses[course_id].update_details(title, description, credits, capacity)
-
-    def search_courses(self, search_term: str) -> List[Course]:
+        student = self.students[student_id]
+        course = self.courses[course_id]
+        with self._locked(("student", student_id)):
+            self._preserve(student_ids=(student_id,))
+            if not student.completed_courses.add(course.course_id):
+                raise Exception("Student has already completed this course.")
+            self._credit.pop(student_id, None)
+            self._record("complete_course", student_id, course_id)
+
+    def completed_courses(self, student_id: str) -> List[str]:
         """
-        Finds courses by its ID or title.
+        Lists the courses a student has completed.
 
-        The search ignores uppercase or lowercase letters.
-
-        Arguments:
-            search_term (str): The word to look for in course IDs and titles.
+        Argument:
+            student_id (str): The student's ID.
 
         Returns:
-            List[Course]: A list of courses that match the search. Empty if none found.
+            List[str]: Course codes, in the order they were recorded.
+
+        Raises:
+            Exception: If the student does not exist.
         """
-        search_term = search_term.lower()
-        results = []
-        for course in self.courses.values():
-            if search_term in course.course_id.lower() or search_term in course.title.lower():
-                results.append(course)
-        return results
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        return self.students[student_id].completed_courses.to_list()
 
-    def list_students_for_course(self, course_id: str) -> List[str]:
+    def eligible_courses(self, student_id: str) -> List[str]:
         """
-        Gets the list of students signed up for a given course.
+        Lists every course a student meets the prerequisites for and hasn't completed or registered for yet.
 
-        Arguments:
-            course_id (str): The course code to check.
+        Each course is checked with one bit operation against the student's credit bitset,
+        so the whole catalog is checked without walking any prerequisite chains.
+        Full courses are included (the student could join their waitlists).
+
+        Argument:
+            student_id (str): The student's ID.
 
         Returns:
-            List[str]: Student IDs registered in the course.
+            List[str]: Course codes in catalog order.
 
         Raises:
-            Exception: If the course does not exist.
+            Exception: If the student does not exist.
         """
-        course_id = course_id.upper()
-        if course_id not in self.courses:
-            raise Exception("Course not found.")
-        return self.courses[course_id].registered_students
-
-    def list_courses_for_student(self, student_id: str) -> List[str]:
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        student = self.students[student_id]
+        graph = self.prerequisites
+        credit = graph.credit_bits(student.completed_courses)
+        done = student.completed_courses
+        registered = student.registered_courses
+        return [cid for cid, course in list(self.courses.items())
+                if (not course.prerequisites or graph.eligible(cid, credit))
+                and cid not in done and cid not in registered]
+
+    def credit_load(self, student_id: str) -> int:
         """
-        Gets the list of courses a student is signed up for.
+        Gets how many credits a student is registered for.
 
-        Arguments:
+        The total is kept up to date on every register and drop, so nothing is added up here.
+
+        Argument:
             student_id (str): The student's ID.
 
         Returns:
-            List[str]: Course IDs the student is registered in.
+            int: The student's registered credits.
 
         Raises:
             Exception: If the student does not exist.
@@ -360,27 +2397,43 @@ class RegistrationSystem:
         student_id = student_id.lower()
         if student_id not in self.students:
             raise Exception("Student not found.")
-        return self.students[student_id].view_registered_courses()
+        return self.credit_loads.total(student_id)
 
-    # Students/Menu Management Functions
+    def overloaded_students(self, max_credits: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Lists the students registered for more credits than allowed.
 
-    def view_available_courses(self) -> List[Course]:
+        Registration stops students going over max_credits, but raising a course's credits
+        (or lowering the limit) can leave some over it.
+
+        Argument:
+            max_credits (int, optional): The limit to check against. Default is the system's max_credits.
+
+        Returns:
+            List[Tuple[str, int]]: (student ID, credits) pairs, most credits first.
+            Empty if there is no limit.
         """
-        Shows all courses in the system.
+        limit = self.max_credits if max_credits is None else max_credits
+        return [] if limit is None else self.credit_loads.above(limit)
 
-        This returns every course
+    def underloaded_students(self, min_credits: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Lists the students registered for fewer credits than the minimum.
+
+        Argument:
+            min_credits (int, optional): The minimum to check against. Default is the system's min_credits.
 
         Returns:
-            List[Course]: A list of all courses.
+            List[Tuple[str, int]]: (student ID, credits) pairs, fewest credits first.
         """
-        return list(self.courses.values())
+        return self.credit_loads.below(self.min_credits if min_credits is None else min_credits)
 
-    def student_course_register(self, student_id: str, course_id: str):
+    def join_waitlist(self, student_id: str, course_id: str):
         """
-        Signs a student up for a course.
+        Puts a student on the waitlist of a full course.
 
-        Checks if the student and course exist, makes sure the course is not full,
-        and that the student is not already signed up.
+        When a seat frees up, the next student on the waitlist is registered automatically
+        (see promote_waitlist).
 
         Arguments:
             student_id (str): The student's ID.
@@ -388,8 +2441,12 @@ class RegistrationSystem:
 
         Raises:
             Exception: If student or course is not found,
-                       if the course is full,
-                       or if the student is already signed up for the course.
+                       if the student is already signed up for the course,
+                       if the course still has seats,
+                       if the student hasn't completed the course's prerequisites,
+                       if the course meets at the same time as one of the student's courses,
+                       if the course's credits would put the student over max_credits,
+                       or if the student is already on the waitlist.
         """
         student_id = student_id.lower()
         course_id = course_id.upper()
@@ -399,40 +2456,569 @@ class RegistrationSystem:
             raise Exception("Course not found.")
         student = self.students[student_id]
         course = self.courses[course_id]
-        if course.is_full():
-            raise Exception("Course is full.")
-        if course_id in student.registered_courses:
-            raise Exception("Student already registered for this course.")
-        course.add_student(student_id)
-        student.register_course(course_id)
-
-    def student_course_remove(self, student_id: str, course_id: str):
+        with self._locked(("course", course_id), ("student", student_id)):
+            if self.courses.get(course_id) is not course:
+                raise Exception("Course not found.")
+            if course_id in student.registered_courses:
+                raise Exception("Student already registered for this course.")
+            if not course.is_full():
+                raise Exception("Course is not full. Register for it instead.")
+            missing = self._missing_prerequisites(student, course)
+            if missing:
+                raise Exception(f"Missing prerequisites: {', '.join(missing)}.")
+            clash = self._timetable_conflict(student_id, course)
+            if clash is not None:
+                raise Exception(f"Time conflict with {clash}.")
+            load = self._credit_overload(student_id, course)
+            if load is not None:
+                raise Exception(f"Credit limit exceeded: {load} of {self.max_credits} credits.")
+            waitlist = self.waitlists.get(course_id)
+            if waitlist is None:
+                waitlist = self.waitlists[course_id] = Waitlist(self.waitlist_by_standing)
+            if not waitlist.add(student.user_id, student.standing):
+                raise Exception("Student is already on the waitlist for this course.")
+            self._record("join_waitlist", student_id, course_id)
+
+    def leave_waitlist(self, student_id: str, course_id: str):
         """
-        Removes a course from student's registered courses.
-
-        Checks that the student and course exist, and that the student is registered.
-        Updates both the course and student records.
+        Takes a student off a course's waitlist.
 
         Arguments:
             student_id (str): The student's ID.
             course_id (str): The course code.
 
         Raises:
-            Exception: If student or course is not found,
-                       or if the student is not registered for the course.
+            Exception: If the student is not on the course's waitlist.
         """
         student_id = student_id.lower()
         course_id = course_id.upper()
-        if student_id not in self.students:
+        with self._locked(("course", course_id)):
+            waitlist = self.waitlists.get(course_id)
+            if waitlist is None or not waitlist.remove(student_id):
+                raise Exception("Student is not on the waitlist for this course.")
+            if not waitlist:
+                del self.waitlists[course_id]
+            self._record("leave_waitlist", student_id, course_id)
+
+    def waitlist_position(self, student_id: str, course_id: str) -> int:
+        """
+        Finds a student's place on a course's waitlist.
+
+        Arguments:
+            student_id (str): The student's ID.
+            course_id (str): The course code.
+
+        Returns:
+            int: The position (1 means next to get a seat), or 0 if the student is not waiting.
+        """
+        waitlist = self.waitlists.get(course_id.upper())
+        return waitlist.position(student_id.lower()) if waitlist is not None else 0
+
+    def student_waitlists(self, student_id: str) -> List[Tuple[str, int]]:
+        """
+        Lists every waitlist a student is on.
+
+        Argument:
+            student_id (str): The student's ID.
+
+        Returns:
+            List[Tuple[str, int]]: (course ID, position) pairs.
+        """
+        student_id = student_id.lower()
+        return [(cid, waitlist.position(student_id))
+                for cid, waitlist in list(self.waitlists.items()) if student_id in waitlist]
+
+    def promote_waitlist(self, course_id: str) -> List[str]:
+        """
+        Gives every free seat in a course to the next students on its waitlist.
+
+        This runs by itself after a drop or a capacity increase when auto_promote is on.
+        Students who were removed from the system since they joined, who have since
+        registered for a course at the same time, who no longer meet the prerequisites
+        (if they were changed), or whose credits would now go over max_credits,
+        are skipped and taken off the waitlist.
+
+        Argument:
+            course_id (str): The course code.
+
+        Returns:
+            List[str]: The students who were registered, in order.
+        """
+        course_id = course_id.upper()
+        promoted = []
+        # Take the course lock first, then one student lock at a time (same order as everywhere else)
+        with self._locked(("course", course_id)):
+            course = self.courses.get(course_id)
+            waitlist = self.waitlists.get(course_id)
+            if course is None or waitlist is None:
+                return promoted
+            while not course.is_full():
+                student_id = waitlist.pop()
+                if student_id is None:
+                    break
+                student = self.students.get(student_id)
+                if student is None:
+                    continue
+                with self._locked(("student", student_id)):
+                    if course_id in student.registered_courses:
+                        continue
+                    if self._timetable_conflict(student_id, course) is not None:
+                        continue
+                    if self._missing_prerequisites(student, course):
+                        continue
+                    if self._credit_overload(student_id, course) is not None:
+                        continue
+                    self._preserve((course_id,), (student_id,))
+                    course.add_student(student.user_id)
+                    student.register_course(course.course_id)
+                    self._timetable_add(student.user_id, course)
+                    self.credit_loads.change(student.user_id, course.credits)
+                promoted.append(student_id)
+            if not waitlist:
+                del self.waitlists[course_id]
+            if promoted:
+                self.catalog.update(course_id)
+                self._record("promote_waitlist", course_id)
+        return promoted
+
+    def _group_pairs(self, pairs: Iterable[Tuple[str, str]]):
+        """
+        Normalizes (student_id, course_id) pairs and groups their positions by course.
+
+        Arguments:
+            pairs (Iterable[Tuple[str, str]]): The pairs to group.
+
+        Returns:
+            Tuple: The normalized student IDs, the normalized course IDs, a status list
+                   filled with "unknown", and a dictionary mapping each course ID to the
+                   positions of its pairs.
+        """
+        student_ids = []
+        course_ids = []
+        groups: Dict[str, List[int]] = {}
+        for i, (student_id, course_id) in enumerate(pairs):
+            student_id = student_id.lower()
+            course_id = course_id.upper()
+            student_ids.append(student_id)
+            course_ids.append(course_id)
+            positions = groups.get(course_id)
+            if positions is None:
+                groups[course_id] = [i]
+            else:
+                positions.append(i)
+        return student_ids, course_ids, [BATCH_UNKNOWN] * len(student_ids), groups
+
+    def _student_keys(self, student_ids: List[str], positions: List[int]) -> List[Tuple[str, str]]:
+        """
+        Gets the lock keys for the students at the given positions (none if the system is not thread safe).
+        """
+        if self._locks is None:
+            return []
+        return [("student", student_ids[i]) for i in positions]
+
+    def register_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """
+        Signs up many students for courses in one call.
+
+        The pairs are grouped by course, so each course is looked up, locked and
+        checked for free seats only once per batch. Problems don't raise an exception;
+        instead every pair gets a status:
+            "ok"        - the student was registered.
+            "full"      - the course had no seats left.
+            "duplicate" - the student was already registered (or listed twice in the batch).
+            "prerequisite" - the student hasn't completed the course's prerequisites.
+            "conflict"  - the course meets at the same time as one of the student's courses.
+            "credit_limit" - the course's credits would put the student over max_credits.
+            "unknown"   - the student or course does not exist.
+
+        Pairs for the same course are handled in the order given, so when seats run out
+        the earlier pairs get them. Throughput target: at least 1.2 times the pairs per second
+        of calling student_course_register in a loop, and at least 1.5 times when the system is
+        thread safe, since locks are taken once per course instead of once per pair
+        (see benchmarks/bench_batch.py).
+
+        Arguments:
+            pairs (Iterable[Tuple[str, str]]): (student_id, course_id) pairs to register.
+
+        Returns:
+            List[Tuple[str, str, str]]: (student_id, course_id, status) for each pair, in input order.
+        """
+        student_ids, course_ids, statuses, groups = self._group_pairs(pairs)
+        students = self.students
+        for course_id, positions in groups.items():
+            course = self.courses.get(course_id)
+            if course is None:
+                continue
+            with self._locked(("course", course_id), *self._student_keys(student_ids, positions)):
+                if self.courses.get(course_id) is not course:
+                    continue
+                if self.snapshots:
+                    self._preserve((course_id,), [student_ids[i] for i in positions])
+                roster = course.registered_students
+                seats = course.capacity - len(roster)
+                waitlist = self.waitlists.get(course_id)
+                timed = bool(course.meetings)
+                gated = bool(course.prerequisites)
+                credits = course.credits
+                limit = self.max_credits
+                loads = self.credit_loads
+                for i in positions:
+                    student_id = student_ids[i]
+                    student = students.get(student_id)
+                    if student is None:
+                        continue
+                    if student_id in roster:
+                        statuses[i] = BATCH_DUPLICATE
+                    elif gated and self._missing_prerequisites(student, course):
+                        statuses[i] = BATCH_PREREQUISITE
+                    elif timed and self._timetable_conflict(student_id, course) is not None:
+                        statuses[i] = BATCH_CONFLICT
+                    elif limit is not None and loads.total(student_id) + credits > limit:
+                        statuses[i] = BATCH_CREDIT_LIMIT
+                    elif seats <= 0:
+                        statuses[i] = BATCH_FULL
+                    else:
+                        roster.add(student.user_id)
+                        student.registered_courses.add(course.course_id)
+                        if timed:
+                            self._timetable_add(student.user_id, course)
+                        loads.change(student.user_id, credits)
+                        if waitlist is not None:
+                            waitlist.remove(student_id)
+                        seats -= 1
+                        statuses[i] = BATCH_OK
+                self.catalog.update(course_id)
+                if self.journal is not None:
+                    done = [(student_ids[i], course_id) for i in positions if statuses[i] == BATCH_OK]
+                    if done:
+                        self._record("register_batch", done)
+        return list(zip(student_ids, course_ids, statuses))
+
+    def drop_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """
+        Removes many students from courses in one call.
+
+        Works like register_batch: pairs are grouped by course and every pair gets a status
+        instead of raising an exception:
+            "ok"             - the student was removed from the course.
+            "not_registered" - the student was not in the course.
+            "unknown"        - the student or course does not exist.
+
+        Arguments:
+            pairs (Iterable[Tuple[str, str]]): (student_id, course_id) pairs to drop.
+
+        Returns:
+            List[Tuple[str, str, str]]: (student_id, course_id, status) for each pair, in input order.
+        """
+        student_ids, course_ids, statuses, groups = self._group_pairs(pairs)
+        students = self.students
+        for course_id, positions in groups.items():
+            course = self.courses.get(course_id)
+            if course is None:
+                continue
+            with self._locked(("course", course_id), *self._student_keys(student_ids, positions)):
+                if self.courses.get(course_id) is not course:
+                    continue
+                if self.snapshots:
+                    self._preserve((course_id,), [student_ids[i] for i in positions])
+                roster = course.registered_students
+                for i in positions:
+                    student_id = student_ids[i]
+                    student = students.get(student_id)
+                    if student is None:
+                        continue
+                    if roster.discard(student_id):
+                        student.registered_courses.discard(course_id)
+                        self._timetable_remove(student_id, course)
+                        self.credit_loads.change(student_id, -course.credits)
+                        statuses[i] = BATCH_OK
+                    else:
+                        statuses[i] = BATCH_NOT_REGISTERED
+                self.catalog.update(course_id)
+                if self.journal is not None:
+                    done = [(student_ids[i], course_id) for i in positions if statuses[i] == BATCH_OK]
+                    if done:
+                        self._record("drop_batch", done)
+            if self.auto_promote and course_id in self.waitlists:
+                self.promote_waitlist(course_id)
+        return list(zip(student_ids, course_ids, statuses))
+
+    def submit_preferences(self, student_id: str, course_ids: Iterable[str]):
+        """
+        Enters a student in the next seat lottery with their ranked course choices.
+
+        Instead of racing to register the moment registration opens, students hand in the courses
+        they want, best first, any time before the lottery runs. A new submission replaces the
+        student's earlier one.
+
+        Arguments:
+            student_id (str): The student's ID.
+            course_ids (Iterable[str]): Course codes, most wanted first.
+
+        Raises:
+            Exception: If the student does not exist, if no courses are given,
+                       if a course does not exist, or if a course is listed twice.
+        """
+        student_id = student_id.lower()
+        ranked = [cid.upper() for cid in course_ids]
+        student = self.students.get(student_id)
+        if student is None:
             raise Exception("Student not found.")
-        if course_id not in self.courses:
-            raise Exception("Course not found.")
-        student = self.students[student_id]
-        course = self.courses[course_id]
-        if course_id not in student.registered_courses:
-            raise Exception("Student is not registered for this course.")
-        course.remove_student(student_id)
-        student.drop_course(course_id)
+        if not ranked:
+            raise Exception("No courses given.")
+        seen = set()
+        for course_id in ranked:
+            if course_id in seen:
+                raise Exception(f"Course listed twice: {course_id}.")
+            if course_id not in self.courses:
+                raise Exception(f"Course not found: {course_id}.")
+            seen.add(course_id)
+        with self._locked(("student", student.user_id)):
+            self._store_preferences(student.user_id, tuple(ranked))
+            self._record("submit_preferences", student.user_id, ranked)
+
+    def _store_preferences(self, student_id: str, course_ids: Tuple[str, ...]):
+        # Submitting again moves the student to the end, like a new submission
+        self.preferences.pop(student_id, None)
+        self.preferences[student_id] = course_ids
+
+    def withdraw_preferences(self, student_id: str):
+        """
+        Takes a student out of the next seat lottery.
+
+        Argument:
+            student_id (str): The student's ID.
+
+        Raises:
+            Exception: If the student has no preferences in.
+        """
+        student_id = student_id.lower()
+        with self._locked(("student", student_id)):
+            if self.preferences.pop(student_id, None) is None:
+                raise Exception("Student has no lottery preferences.")
+            self._record("withdraw_preferences", student_id)
+
+    def lottery_preferences(self, student_id: str) -> List[str]:
+        """
+        Gets a student's ranked choices for the next seat lottery.
+
+        Argument:
+            student_id (str): The student's ID.
+
+        Returns:
+            List[str]: Course codes, most wanted first. Empty if the student hasn't submitted any.
+        """
+        return list(self.preferences.get(student_id.lower(), ()))
+
+    def clear_preferences(self):
+        """
+        Forgets every submitted lottery preference (run_lottery does this after applying its result).
+        """
+        with self._locked():
+            self.preferences.clear()
+            self._record("clear_preferences")
+
+    def _all_preferences(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Gets every student's lottery choices (student ID -> course codes, most wanted first).
+        """
+        return dict(self.preferences)
+
+    def run_lottery(self, seed: Optional[int] = None, max_courses: Optional[int] = None,
+                    apply: bool = True) -> LotteryResult:
+        """
+        Gives out seats to everyone who submitted preferences, all in one pass.
+
+        The students are put in a random order (drawn from the seed). Seats are then handed out in
+        rounds, like a draft: in each round every student, in lottery order, gets their most wanted
+        course that still has a seat and that they can take. The order is reversed every other round,
+        so the student who picks first in one round picks last in the next. Taking one course per turn
+        spreads the popular courses over more students than letting each student take their whole list
+        at once would. Like any draft, it is not strategyproof: a student who expects their first
+        choice to stay open can sometimes gain by listing a course that fills sooner ahead of it.
+
+        A choice is passed over when the course is gone or full, the student is already registered,
+        hasn't completed its prerequisites, it clashes with a course they have or were just given,
+        or it would put them over max_credits. None of these can change back during the lottery, so
+        each student's list is only walked once and the whole allocation takes time in proportion
+        to the number of preferences. Waitlists are not used for lottery seats.
+
+        The assignments are then applied with one register_batch call, so they go into the normal
+        enrollment records (and the journal) in bulk, and the preferences are cleared.
+        For thread-safe systems, run the lottery while registration is closed.
+
+        Arguments:
+            seed (int, optional): Seed for the lottery order. The same seed, preferences and seats
+                always give the same result. Default is a new random seed (saved in the result).
+            max_courses (int, optional): The most courses one student can get. Default is no limit
+                (each student can get every course on their list).
+            apply (bool, optional): If False, only work out the result (a dry run). Preferences are kept.
+
+        Returns:
+            LotteryResult: The order, assignments and these fairness stats:
+                students             - students in the lottery
+                requested            - choices they made in total (for courses that still exist)
+                assigned             - seats given out
+                students_placed      - share of students given at least one course
+                first_choice         - share of students given their first choice
+                mean_rank            - average rank (1 = first choice) of the courses given
+                fill_rate            - average share of each student's wanted courses they got
+                                       (wanted = their list, up to max_courses)
+                position_gap         - fill rate of the first fifth of the order minus that of the
+                                       last fifth (near 0 means the order barely mattered)
+                oversubscribed       - courses more students asked for than they had seats
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        preferences = self._all_preferences()
+        # Sorting first makes the order depend only on the seed, not on who submitted first
+        order = sorted(preferences)
+        random.Random(seed).shuffle(order)
+
+        # Course ID -> [free seats, meetings, credits, has prerequisites]; seats are the only thing that changes
+        courses: Dict[str, list] = {}
+        demand: Dict[str, int] = {}
+        for ranked in preferences.values():
+            for course_id in ranked:
+                if course_id not in courses:
+                    course = self.courses.get(course_id)
+                    if course is None:
+                        continue
+                    courses[course_id] = [course.capacity - len(course.registered_students), course.meetings,
+                                          course.credits, bool(course.prerequisites)]
+                demand[course_id] = demand.get(course_id, 0) + 1
+        seats_at_start = {course_id: info[0] for course_id, info in courses.items()}
+        limit = self.max_credits
+        graph = self.prerequisites
+        students = self.students
+        # Meetings and credits of the courses students are already registered for
+        held: Dict[str, tuple] = {}
+
+        # Drop each student's choices that can't be given no matter what, and set up what the rounds track
+        choices: List[List[str]] = []
+        wanted_counts: List[int] = []
+        loads: List[int] = []
+        timetables: List[Optional[MeetingIndex]] = []
+        for student_id in order:
+            student = students.get(student_id)
+            registered = student.registered_courses if student is not None else ()
+            credit = None
+            kept = []
+            wanted = 0
+            for course_id in preferences[student_id]:
+                info = courses.get(course_id)
+                if info is None:
+                    continue
+                wanted += 1
+                if student is None or course_id in registered:
+                    continue
+                if info[3]:
+                    if credit is None:
+                        credit = graph.credit_bits(student.completed_courses)
+                    if not graph.eligible(course_id, credit):
+                        continue
+                kept.append(course_id)
+            timetable = None
+            load = 0
+            if kept:
+                for course_id in registered:
+                    info = held.get(course_id)
+                    if info is None:
+                        course = self.courses.get(course_id)
+                        info = held[course_id] = (course.meetings, course.credits) if course is not None else ((), 0)
+                    load += info[1]
+                    if info[0]:
+                        if timetable is None:
+                            timetable = MeetingIndex()
+                        timetable.add(course_id, info[0])
+            choices.append(kept)
+            wanted_counts.append(wanted)
+            loads.append(load)
+            timetables.append(timetable)
+
+        # The draft rounds
+        count = len(order)
+        picked: List[List[str]] = [[] for _ in range(count)]
+        next_choice = [0] * count
+        cap = max_courses if max_courses is not None else max(wanted_counts, default=0)
+        active = [p for p in range(count) if choices[p] and cap > 0]
+        forward = True
+        while active:
+            for p in (active if forward else reversed(active)):
+                wanted = choices[p]
+                i = next_choice[p]
+                while i < len(wanted):
+                    course_id = wanted[i]
+                    i += 1
+                    course = courses[course_id]
+                    seats = course[0]
+                    if seats <= 0:
+                        continue
+                    credits = course[2]
+                    if limit is not None and loads[p] + credits > limit:
+                        continue
+                    meetings = course[1]
+                    if meetings:
+                        timetable = timetables[p]
+                        if timetable is None:
+                            timetable = timetables[p] = MeetingIndex()
+                        elif timetable.conflict(meetings) is not None:
+                            continue
+                        timetable.add(course_id, meetings)
+                    course[0] = seats - 1
+                    loads[p] += credits
+                    picked[p].append(course_id)
+                    break
+                next_choice[p] = i
+            active = [p for p in active if next_choice[p] < len(choices[p]) and len(picked[p]) < cap]
+            forward = not forward
+
+        assignments = {order[p]: picked[p] for p in range(count) if picked[p]}
+        stats = self._lottery_stats(order, preferences, picked, wanted_counts, cap, demand, seats_at_start)
+        result = LotteryResult(seed, order, assignments, stats)
+        if apply:
+            result.statuses = self.register_batch(result.pairs())
+            self.clear_preferences()
+        return result
+
+    @staticmethod
+    def _lottery_stats(order: List[str], preferences: Dict[str, Tuple[str, ...]], picked: List[List[str]],
+                       wanted_counts: List[int], cap: int, demand: Dict[str, int],
+                       seats: Dict[str, int]) -> Dict[str, float]:
+        """
+        Works out the fairness numbers of a lottery (see run_lottery).
+        """
+        count = len(order)
+        if not count:
+            return {"students": 0, "requested": 0, "assigned": 0, "students_placed": 0.0, "first_choice": 0.0,
+                    "mean_rank": 0.0, "fill_rate": 0.0, "position_gap": 0.0, "oversubscribed": 0}
+        fills = []
+        rank_total = assigned = placed = first = 0
+        for p, student_id in enumerate(order):
+            got = picked[p]
+            wanted = min(wanted_counts[p], cap)
+            fills.append(len(got) / wanted if wanted else 0.0)
+            if got:
+                placed += 1
+                ranked = preferences[student_id]
+                # The first pick is always the best course a student could get, so this is their first choice
+                # exactly when it heads their list (courses that no longer exist don't count)
+                if ranked.index(got[0]) == next(i for i, cid in enumerate(ranked) if cid in seats):
+                    first += 1
+                assigned += len(got)
+                rank_total += sum(ranked.index(cid) + 1 for cid in got)
+        fifth = max(1, count // 5)
+        return {
+            "students": count,
+            "requested": sum(wanted_counts),
+            "assigned": assigned,
+            "students_placed": round(placed / count, 4),
+            "first_choice": round(first / count, 4),
+            "mean_rank": round(rank_total / assigned, 3) if assigned else 0.0,
+            "fill_rate": round(sum(fills) / count, 4),
+            "position_gap": round((sum(fills[:fifth]) - sum(fills[-fifth:])) / fifth, 4),
+            "oversubscribed": sum(1 for cid, asked in demand.items() if asked > seats[cid]),
+        }
 
     def student_registered_course(self, student_id: str) -> str:
         """
@@ -458,10 +3044,155 @@ class RegistrationSystem:
         for cid in student.registered_courses:
             course = self.courses.get(cid)
             if course:
-                report_lines.append(f"{course.course_id}: {course.title} ({course.credits} credits)")
+                report_lines.append(Course.SCHEDULE_FORMAT.format(course.course_id, course.title, course.credits))
         return "\n".join(report_lines)
 
 
+class SnapshotTable(Mapping):
+
+    # Marks a record the snapshot has no copy of (None means "didn't exist when the snapshot was taken")
+    _LIVE = object()
+
+    def __init__(self, snapshot: "Snapshot", live: Dict[str, object], kind: str, keep_reads: bool = False):
+        """
+        A read-only dictionary-like view of a system's courses or students as they were when a snapshot was taken.
+
+        Records changed since then are read from the copies the system saved before changing them.
+        The others haven't changed, so they are copied from the live records when they are read
+        (holding the record's lock, so a change can't be half done).
+
+        Arguments:
+            snapshot (Snapshot): The snapshot this view belongs to.
+            live (Dict[str, object]): The system's own courses or students dictionary.
+            kind (str): "course" or "student" (also the kind of lock key held while copying).
+            keep_reads (bool, optional): Keep the copies made when reading, so a record read again
+                isn't copied again. Used for courses, which reports look up once per student.
+
+        Attributes:
+            saved (Dict[str, Optional[object]]): The copies kept so far, with None for records
+                that were added after the snapshot was taken.
+        """
+        self._snapshot = snapshot
+        self._live = live
+        self._kind = kind
+        self._keep_reads = keep_reads
+        self.saved: Dict[str, Optional[object]] = {}
+
+    def save(self, keys: Iterable[str]):
+        """
+        Keeps a copy of each record that the view doesn't have one of yet (called by the system before a change).
+
+        Argument:
+            keys (Iterable[str]): The IDs of the records about to change.
+        """
+        saved = self.saved
+        live = self._live
+        for key in keys:
+            if key not in saved:
+                record = live.get(key)
+                saved[key] = None if record is None else record.snapshot_copy()
+
+    def __getitem__(self, key: str):
+        self._snapshot.check_open()
+        record = self.saved.get(key, self._LIVE)
+        if record is self._LIVE:
+            with self._snapshot.system._locked((self._kind, key)):
+                # Check again: a change may have saved a copy while we waited for the lock
+                record = self.saved.get(key, self._LIVE)
+                if record is self._LIVE:
+                    record = self._live.get(key)
+                    if record is not None:
+                        record = record.snapshot_copy()
+                        if self._keep_reads:
+                            self.saved[key] = record
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key) -> bool:
+        self._snapshot.check_open()
+        # A record is saved as missing before it is added, and saved as a copy before it is removed
+        if key in self._live:
+            return self.saved.get(key, True) is not None
+        return self.saved.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Goes through the IDs in the order they were added; records removed since the snapshot come last.
+        """
+        self._snapshot.check_open()
+        # Read the live IDs before the saved ones: a record added after the snapshot is saved as missing first
+        live = list(self._live)
+        saved = list(self.saved.items())
+        added = {key for key, record in saved if record is None}
+        present = set(live)
+        keys = [key for key in live if key not in added]
+        keys.extend(key for key, record in saved if record is not None and key not in present)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class Snapshot:
+
+    def __init__(self, system: RegistrationSystem, version: int):
+        """
+        A read-only view of a system's courses, students and enrollments at one moment (see RegistrationSystem.snapshot).
+
+        It can be passed to the report exports (export.py) in place of the system, and has the
+        system's read methods for rosters and schedules. Waitlists, lottery preferences and
+        credit totals are not part of it.
+
+        Arguments:
+            system (RegistrationSystem): The system the snapshot was taken of.
+            version (int): The snapshot's number.
+
+        Attributes:
+            system (RegistrationSystem): The system the snapshot was taken of.
+            version (int): Goes up by one with each snapshot the system takes, so a later
+                snapshot always has a higher version.
+            courses (SnapshotTable): Course ID -> Course, as of the snapshot.
+            students (SnapshotTable): Student ID -> Student, as of the snapshot.
+            closed (bool): True once the snapshot was closed.
+        """
+        self.system = system
+        self.version = version
+        self.courses = SnapshotTable(self, system.courses, "course", keep_reads=True)
+        self.students = SnapshotTable(self, system.students, "student")
+        self.closed = False
+
+    def check_open(self):
+        """
+        Raises:
+            Exception: If the snapshot was closed (its copies are gone, so it can't be read any more).
+        """
+        if self.closed:
+            raise Exception("Snapshot is closed.")
+
+    # Same answers and error messages as the system's methods, read from the snapshot's records
+    list_students_for_course = RegistrationSystem.list_students_for_course
+    list_students_after = RegistrationSystem.list_students_after
+    list_courses_for_student = RegistrationSystem.list_courses_for_student
+    student_registered_course = RegistrationSystem.student_registered_course
+
+    def close(self):
+        """
+        Lets go of the saved copies and stops the system from saving more for this snapshot.
+        """
+        if not self.closed:
+            self.closed = True
+            self.system._release_snapshot(self)
+            self.courses.saved.clear()
+            self.students.saved.clear()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 def valid_input_int(prompt: str, min_val=None, max_val=None) -> int:
     """
     Ask the user to enter a whole number.
@@ -519,7 +3250,13 @@ def admin_menu(system: RegistrationSystem, admin: Admin):
     4. Search courses by ID or title
     5. List students registered in a course
     6. List courses registered by a student
-    7. Logout
+    7. Find students with clashing course times
+    8. Record a completed course for a student
+    9. List overloaded and underloaded students
+    10. Show operation metrics (and save them to a file)
+    11. Run the seat lottery for submitted preferences
+    12. Show enrollment reports (fill rates, credit loads, shared students)
+    13. Logout
 
     Args:
         system (RegistrationSystem): The registration system instance.
@@ -535,7 +3272,13 @@ def admin_menu(system: RegistrationSystem, admin: Admin):
         print("4. Search courses")
         print("5. List students in a course")
         print("6. List courses of a student")
-        print("7. Logout")
+        print("7. Find time conflicts")
+        print("8. Record completed course")
+        print("9. Credit load report")
+        print("10. Metrics")
+        print("11. Run seat lottery")
+        print("12. Enrollment reports")
+        print("13. Logout")
         choice = valid_input_nonempty("Enter choice: ")
 
         try:
@@ -545,7 +3288,10 @@ def admin_menu(system: RegistrationSystem, admin: Admin):
                 description = valid_input_nonempty("Description: ")
                 credits = valid_input_int("Credits: ", 1)
                 capacity = valid_input_int("Capacity: ", 1)
-                system.add_course(course_id, title, description, credits, capacity)
+                meetings = input("Meeting times (like Mon 09:00-10:15, Wed 09:00-10:15; blank for none): ").strip()
+                prerequisites = input("Prerequisite course IDs (separated by commas; blank for none): ")
+                prerequisites = [cid.strip() for cid in prerequisites.split(",") if cid.strip()]
+                system.add_course(course_id, title, description, credits, capacity, meetings, prerequisites)
                 print(f"Course {course_id} added successfully.")
             elif choice == '2':
                 course_id = valid_input_nonempty("Course ID to remove: ").upper()
@@ -565,8 +3311,19 @@ def admin_menu(system: RegistrationSystem, admin: Admin):
                     capacity_input = input("New Capacity: ").strip()
                     capacity = int(capacity_input) if capacity_input.isdigit() else None
 
+                    current = Course.format_meetings(system.courses[course_id].meetings) or "none"
+                    meetings = input(f"New Meeting Times (now {current}; '-' for none): ").strip() or None
+                    if meetings == '-':
+                        meetings = ""
+
+                    current = ", ".join(system.courses[course_id].prerequisites) or "none"
+                    prerequisites = input(f"New Prerequisites (now {current}; '-' for none): ").strip() or None
+                    if prerequisites is not None:
+                        prerequisites = [cid.strip() for cid in prerequisites.split(",") if cid.strip() not in ("", "-")]
+
                     try:
-                        system.update_course(course_id, title, description, credits, capacity)
+                        system.update_course(course_id, title, description, credits, capacity, meetings,
+                                             prerequisites)
                         print(f"Course {course_id} updated successfully.")
                     except Exception as e:
                         print(f"Error updating course: {e}")
@@ -599,6 +3356,76 @@ def admin_menu(system: RegistrationSystem, admin: Admin):
                     for cid in courses:
                         print(f"- {cid}")
             elif choice == '7':
+                conflicts = system.find_conflicts()
+                if not conflicts:
+                    print("No time conflicts found.")
+                for student_id, first, second in conflicts:
+                    print(f"- {student_id}: {first} and {second} meet at the same time")
+            elif choice == '8':
+                student_id = valid_input_nonempty("Student ID: ").lower()
+                course_id = valid_input_nonempty("Completed course ID: ").upper()
+                system.complete_course(student_id, course_id)
+                print(f"Recorded {course_id} as completed by {student_id}.")
+            elif choice == '9':
+                if system.max_credits is None:
+                    print("No credit limit is set.")
+                else:
+                    overloaded = system.overloaded_students()
+                    print(f"Students over {system.max_credits} credits: {len(overloaded)}")
+                    for student_id, load in overloaded:
+                        print(f"- {student_id}: {load} credits")
+                underloaded = system.underloaded_students()
+                print(f"Students under {system.min_credits} credits: {len(underloaded)}")
+                for student_id, load in underloaded:
+                    print(f"- {student_id}: {load} credits")
+            elif choice == '10':
+                if system.metrics is None:
+                    print("Metrics are off (start the program with --metrics).")
+                    continue
+                report = system.metrics.report(system)
+                print(f"Uptime: {report['uptime_seconds']:.0f} seconds")
+                print(", ".join(f"{name}: {value}" for name, value in report["gauges"].items()))
+                print("{:<26} {:>8} {:>7} {:>10} {:>10} {:>10}".format(
+                    "Operation", "Calls", "Errors", "p50 (us)", "p95 (us)", "p99 (us)"))
+                for name, op in report["operations"].items():
+                    print("{:<26} {:>8} {:>7} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                        name, op["calls"], op["errors"], op["p50_us"], op["p95_us"], op["p99_us"]))
+                    for reason, count in op["errors_by_reason"].items():
+                        print(f"    {reason}: {count}")
+                for stack in report.get("slow_stacks", [])[:5]:
+                    print(f"Slow stack: {stack}")
+                path = input("Save to file (.json for JSON, otherwise Prometheus text; blank to skip): ").strip()
+                if path:
+                    system.metrics.dump(path, system)
+                    print(f"Saved metrics to {path}.")
+            elif choice == '11':
+                seed_text = input("Lottery seed (blank for a random one): ").strip()
+                result = system.run_lottery(int(seed_text) if seed_text else None)
+                stats = result.stats
+                print(f"Lottery seed {result.seed}: {stats['assigned']} seats given to "
+                      f"{len(result.assignments)} of {stats['students']} students.")
+                print(f"First choice: {stats['first_choice']:.0%}, average rank: {stats['mean_rank']}, "
+                      f"fill rate: {stats['fill_rate']:.0%}, first-to-last fifth gap: {stats['position_gap']:+.0%}, "
+                      f"oversubscribed courses: {stats['oversubscribed']}")
+            elif choice == '12':
+                analytics = system.analytics
+                if analytics is None:
+                    from analytics import EnrollmentMatrix
+                    analytics = EnrollmentMatrix(system)
+                rates = analytics.fill_rates()
+                print("Fullest courses:")
+                for course_id, enrolled, capacity, rate in rates[:5]:
+                    print(f"- {course_id}: {enrolled}/{capacity} ({rate:.0%})")
+                under = analytics.under_enrolled()
+                print(f"Courses under half full: {len(under)}")
+                for course_id, enrolled, capacity in under[:10]:
+                    print(f"- {course_id}: {enrolled}/{capacity}")
+                print("Credit loads: " + ", ".join(f"{credits} credits: {count}"
+                                                   for credits, count in analytics.credit_distribution()))
+                print("Courses sharing the most students:")
+                for first, second, shared in analytics.co_enrollment(limit=5):
+                    print(f"- {first} and {second}: {shared}")
+            elif choice == '13':
                 print("Logging out...")
                 break
             else:
@@ -616,7 +3443,10 @@ def student_menu(system: RegistrationSystem, student: Student):
         2. Register for a course
         3. Drop a course
         4. View currently registered courses
-        5. Logout
+        5. View waitlists
+        6. View courses I'm eligible for
+        7. Enter ranked choices for the seat lottery
+        8. Logout
 
     Loops until the student chooses to logout.
 
@@ -632,23 +3462,34 @@ def student_menu(system: RegistrationSystem, student: Student):
         print("2. Register for a course")
         print("3. Drop a course")
         print("4. View registered courses")
-        print("5. Logout")
+        print("5. View waitlists")
+        print("6. View eligible courses")
+        print("7. Lottery choices")
+        print("8. Logout")
         choice = valid_input_nonempty("Enter choice: ")
 
         try:
             if choice == '1':
-                courses = system.view_available_courses()
-                if not courses:
+                rows = system.catalog_rows()
+                if not rows:
                     print("No courses available.")
                 else:
                     print(Course.get_table_header())
-                    for c in courses:
-                        status = "Full" if c.is_full() else "Available"
-                        print(f"{c} - Status: {status}")
+                    for row in rows:
+                        print(row)
             elif choice == '2':
                 course_id = valid_input_nonempty("Enter course ID to register: ").upper()
-                system.student_course_register(student.user_id, course_id)
-                print(f"Registered for course {course_id}.")
+                try:
+                    system.student_course_register(student.user_id, course_id)
+                    print(f"Registered for course {course_id}.")
+                except Exception as e:
+                    if str(e) != "Course is full.":
+                        raise
+                    answer = input("Course is full. Join the waitlist? (y/n): ").strip().lower()
+                    if answer == 'y':
+                        system.join_waitlist(student.user_id, course_id)
+                        position = system.waitlist_position(student.user_id, course_id)
+                        print(f"Joined the waitlist for {course_id} at position {position}.")
             elif choice == '3':
                 course_id = valid_input_nonempty("Enter course ID to drop: ").upper()
                 system.student_course_remove(student.user_id, course_id)
@@ -657,7 +3498,32 @@ def student_menu(system: RegistrationSystem, student: Student):
                 report = system.student_registered_course(student.user_id)
                 print("Registered courses:")
                 print(report)
+                load = system.credit_load(student.user_id)
+                limit = f" (limit {system.max_credits})" if system.max_credits is not None else ""
+                print(f"Total: {load} credits{limit}")
             elif choice == '5':
+                waiting = system.student_waitlists(student.user_id)
+                if not waiting:
+                    print("You are not on any waitlists.")
+                for course_id, position in waiting:
+                    print(f"{course_id}: position {position}")
+            elif choice == '6':
+                eligible = system.eligible_courses(student.user_id)
+                if not eligible:
+                    print("No courses available to you right now.")
+                else:
+                    print("Courses whose prerequisites you have completed:")
+                    for course_id in eligible:
+                        print(f"- {course_id}")
+            elif choice == '7':
+                current = system.lottery_preferences(student.user_id)
+                if current:
+                    print(f"Your current choices: {', '.join(current)}")
+                text = input("Course IDs, most wanted first, separated by commas (blank to keep): ").strip()
+                if text:
+                    system.submit_preferences(student.user_id, [cid.strip() for cid in text.split(",") if cid.strip()])
+                    print("Your choices are in for the next lottery.")
+            elif choice == '8':
                 print("Logging out...")
                 break
             else:
@@ -666,36 +3532,112 @@ def student_menu(system: RegistrationSystem, student: Student):
             print(f"Error: {e}")
 
 
-def main():
-    system = RegistrationSystem()
-
-    print("Welcome to Student Course Registration System")
-
-    while True:
-        print("\nPlease use pre-registered accounts to log-in")
-        print("{:<15} {:<15} {:<25}".format("Role", "User ID", "Password"))
-        print("{:<15} {:<15} {:<25}".format("Admin", "admin", "<password>"))
-        print("{:<15} {:<15} {:<25}".format("Students", "student1", "<pass123>"))
-        print("{:<15} {:<15} {:<25}".format("Students", "student2", "<pass123>"))
-        print("\n--- Login ---")
-        user_id = valid_input_nonempty("User ID: ").lower()
-        password = valid_input_nonempty("Password: ")
-
-        try:
-            user = system.authenticate_user(user_id, password)
-            print(f"Welcome, {user.user_id}!")
-            if isinstance(user, Admin):
-                admin_menu(system, user)
-            elif isinstance(user, Student):
-                student_menu(system, user)
-        except Exception as e:
-            print(f"Login failed: {e}")
+def main(data_dir: Optional[str] = None, database: Optional[str] = None, max_credits: Optional[int] = None,
+         min_credits: int = 0, metrics: bool = False, profile_slow_ms: Optional[float] = None,
+         trace_path: Optional[str] = None, serve: Optional[str] = None):
+    """
+    Runs the login loop, or serves the system over the network.
 
-        cont = input("Do you want to login again? (y/n): ").strip().lower()
-        if cont != 'y':
-            print("Exiting system. Goodbye!")
-            break
+    Args:
+        data_dir (str, optional): A folder to keep the system's data in between runs.
+            If given, saved data is loaded at startup and every change is logged there.
+        database (str, optional): A SQLite database file to store the system's data in instead
+            of memory. Can't be used together with data_dir.
+            If neither is given, everything is kept in memory only.
+        max_credits (int, optional): The most credits a student may register for. Default is no limit.
+        min_credits (int, optional): Students under this many credits are listed as underloaded.
+        metrics (bool, optional): If True, every operation is counted and timed (see the admin menu).
+        profile_slow_ms (float, optional): If given, the call stacks of operations running longer than
+            this many milliseconds are sampled. Turns metrics on.
+        trace_path (str, optional): If given, every call into the system is recorded to this trace
+            file (see tracing.py), so the session can be replayed later.
+        serve (str, optional): If given as "HOST:PORT", the system is served to network clients
+            (see server.py) instead of running the login loop, until Ctrl+C is pressed.
+    """
+    store = None
+    if database:
+        from sqlite_storage import SQLiteRegistrationSystem
+        system = SQLiteRegistrationSystem(database, max_credits=max_credits, min_credits=min_credits)
+    else:
+        system = RegistrationSystem(max_credits=max_credits, min_credits=min_credits)
+    if data_dir:
+        from persistence import PersistentStore
+        store = PersistentStore(data_dir)
+        store.open(system)
+        print(f"Loaded saved data from {data_dir} in {store.recovery_seconds:.2f} seconds.")
+    sampler = None
+    if metrics or profile_slow_ms is not None:
+        from metrics import SlowOperationSampler, instrument
+        instrument(system)
+        if profile_slow_ms is not None:
+            sampler = SlowOperationSampler(system.metrics, profile_slow_ms)
+            sampler.start()
+    recorder = None
+    if trace_path:
+        from tracing import TraceRecorder
+        recorder = TraceRecorder(system, trace_path)
+
+    try:
+        if serve:
+            from server import serve as serve_system
+            host, _, port = serve.rpartition(":")
+            serve_system(system, host or "127.0.0.1", int(port))
+            return
+
+        print("Welcome to Student Course Registration System")
+        sessions = SessionManager(system, workers=1)
+
+        while True:
+            print("\nPlease use pre-registered accounts to log-in")
+            print("{:<15} {:<15} {:<25}".format("Role", "User ID", "Password"))
+            print("{:<15} {:<15} {:<25}".format("Admin", "admin", "<password>"))
+            print("{:<15} {:<15} {:<25}".format("Students", "student1", "<pass123>"))
+            print("{:<15} {:<15} {:<25}".format("Students", "student2", "<pass123>"))
+            print("\n--- Login ---")
+            user_id = valid_input_nonempty("User ID: ").lower()
+            password = valid_input_nonempty("Password: ")
+
+            try:
+                session = sessions.login(user_id, password)
+                user = session.user
+                print(f"Welcome, {user.user_id}!")
+                if isinstance(user, Admin):
+                    admin_menu(system, user)
+                elif isinstance(user, Student):
+                    student_menu(system, user)
+                sessions.logout(session.token)
+            except Exception as e:
+                print(f"Login failed: {e}")
+
+            cont = input("Do you want to login again? (y/n): ").strip().lower()
+            if cont != 'y':
+                print("Exiting system. Goodbye!")
+                sessions.close()
+                break
+    finally:
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.calls} calls to {trace_path}.")
+        if sampler is not None:
+            sampler.stop()
+        if store is not None:
+            store.close()
 
 
 if __name__ == "__main__":
-    main()
+    # Helper modules do "from App import ...", so let them share this module instead of loading a second copy
+    sys.modules.setdefault("App", sys.modules[__name__])
+    parser = argparse.ArgumentParser(description="Student Course Registration System")
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument("--data-dir", help="folder to save data in between runs")
+    storage.add_argument("--db", help="SQLite database file to store data in")
+    parser.add_argument("--max-credits", type=int, help="most credits a student may register for")
+    parser.add_argument("--min-credits", type=int, default=0, help="credits below which a student is underloaded")
+    parser.add_argument("--metrics", action="store_true", help="count and time every operation")
+    parser.add_argument("--profile-slow", type=float, metavar="MS",
+                        help="sample the stacks of operations slower than this many milliseconds")
+    parser.add_argument("--trace", metavar="FILE", help="record every call to a trace file (.gz to compress)")
+    parser.add_argument("--serve", metavar="HOST:PORT", help="serve the system to network clients instead of the menu")
+    args = parser.parse_args()
+    main(args.data_dir, args.db, args.max_credits, args.min_credits, args.metrics, args.profile_slow, args.trace,
+         args.serve)
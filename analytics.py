@@ -0,0 +1,366 @@
+"""
+Title:       Portfolio Project - Enrollment Analytics
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Reports over all enrollments at once: fill rates, the spread of students' credit loads,
+    how many students two courses share, and under-enrolled courses.
+    EnrollmentMatrix keeps the enrollments as a sparse student x course matrix in NumPy arrays
+    (one (course row, student column) pair per enrollment), so each report is a few vectorized
+    operations over the arrays instead of a Python loop over every roster.
+
+    The matrix is kept up to date as the system changes: the public methods that change courses
+    or enrollments are wrapped on the one system object (as metrics.instrument does), and every
+    course they touch is marked as changed. The next report re-reads only those courses' rosters.
+
+    Needs NumPy (pip install numpy).
+
+"""
+
+import threading
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+def _first(args: tuple, kwargs: dict, name: str):
+    return args[0] if args else kwargs[name]
+
+
+# Public RegistrationSystem methods that change courses or enrollments ->
+# function giving the IDs of the courses a call may have changed (None for every course)
+WATCHED: Dict[str, Callable[[tuple, dict], Optional[Iterable[str]]]] = {
+    "add_course": lambda args, kwargs: [_first(args, kwargs, "course_id")],
+    "add_courses_batch": lambda args, kwargs: [row[0] for row in _first(args, kwargs, "rows")],
+    "remove_course": lambda args, kwargs: [_first(args, kwargs, "course_id")],
+    "remove_courses": lambda args, kwargs: _first(args, kwargs, "course_ids"),
+    "update_course": lambda args, kwargs: [_first(args, kwargs, "course_id")],
+    "student_course_register": lambda args, kwargs: [args[1] if len(args) > 1 else kwargs["course_id"]],
+    "student_course_remove": lambda args, kwargs: [args[1] if len(args) > 1 else kwargs["course_id"]],
+    "complete_course": lambda args, kwargs: [args[1] if len(args) > 1 else kwargs["course_id"]],
+    "promote_waitlist": lambda args, kwargs: [_first(args, kwargs, "course_id")],
+    "register_batch": lambda args, kwargs: [pair[1] for pair in _first(args, kwargs, "pairs")],
+    "drop_batch": lambda args, kwargs: [pair[1] for pair in _first(args, kwargs, "pairs")],
+    "run_lottery": lambda args, kwargs: None,
+    "reindex": lambda args, kwargs: None,
+}
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """
+    Returns the array, or a copy at least twice as long if it is shorter than size.
+    """
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class EnrollmentMatrix:
+
+    def __init__(self, system, watch: bool = True):
+        """
+        Builds the enrollment matrix of a system.
+
+        Arguments:
+            system (RegistrationSystem): The system to report on (any single-process backend).
+            watch (bool, optional): If True, the system's changing methods are wrapped so the matrix
+                follows every change, and the matrix is stored as system.analytics.
+                If False, the matrix shows the system as it is now (call rebuild to catch up).
+
+        Attributes:
+            stats (Dict[str, int]): Counters: rebuilds (whole matrix read again) and
+                refreshed (courses read again because they changed).
+        """
+        self.system = system
+        self.stats: Dict[str, int] = {"rebuilds": 0, "refreshed": 0}
+        self._lock = threading.Lock()
+        self._originals = {}
+        # Courses changed since the last report, or None when everything must be read again
+        self._dirty: Optional[Set[str]] = set()
+        self.rebuild()
+        if watch:
+            for operation, changed in WATCHED.items():
+                method = getattr(system, operation, None)
+                if method is not None:
+                    self._originals[operation] = method
+                    setattr(system, operation, self._wrap(method, changed))
+            system.analytics = self
+
+    def _wrap(self, method, changed):
+        @wraps(method)
+        def watched(*args, **kwargs):
+            # Generators can only be read once, so read them here and hand the method a list
+            args = tuple(list(a) if isinstance(a, Iterator) else a for a in args)
+            kwargs = {k: list(v) if isinstance(v, Iterator) else v for k, v in kwargs.items()}
+            try:
+                return method(*args, **kwargs)
+            finally:
+                # Marked after the change, so a report made in between reads the course again next time
+                self._changed(changed(args, kwargs))
+        return watched
+
+    def _changed(self, course_ids: Optional[Iterable[str]]):
+        with self._lock:
+            if course_ids is None:
+                self._dirty = None
+            elif self._dirty is not None:
+                self._dirty.update(str(course_id).upper() for course_id in course_ids)
+
+    def close(self):
+        """
+        Stops following the system and puts its original methods back.
+        """
+        for operation, method in self._originals.items():
+            setattr(self.system, operation, method)
+        self._originals = {}
+        if getattr(self.system, "analytics", None) is self:
+            self.system.analytics = None
+
+    def rebuild(self):
+        """
+        Reads every course's roster again and builds the matrix from scratch.
+        """
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._dirty = set()
+        self.stats["rebuilds"] += 1
+        self._course_ids: List[str] = []
+        self._course_rows: Dict[str, int] = {}
+        # Each course row's place when the courses are sorted by ID, made again after courses are added
+        self._rank: Optional[np.ndarray] = None
+        self._student_ids: List[str] = []
+        self._student_columns: Dict[str, int] = {}
+        self._credits = np.zeros(1024, dtype=np.int64)
+        self._capacity = np.zeros(1024, dtype=np.int64)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._enrolled = np.zeros(1024, dtype=np.int64)
+        # The enrollments: course row and student column of each, and whether it still holds
+        self._rows = np.zeros(4096, dtype=np.int32)
+        self._columns = np.zeros(4096, dtype=np.int32)
+        self._live = np.zeros(4096, dtype=bool)
+        self._size = 0
+        self._dead = 0
+        for course_id in list(self.system.courses):
+            self._read_course(course_id)
+
+    def _read_courses(self, course_ids: Iterable[str]):
+        """
+        Replaces the rows of some courses with what the system holds now (called with the lock held).
+        """
+        course_ids = list(course_ids)
+        known = [self._course_rows[cid] for cid in course_ids if cid in self._course_rows]
+        if known and self._size:
+            # One pass over the enrollments drops the old entries of every one of these courses
+            changed = np.zeros(len(self._course_ids), dtype=bool)
+            changed[known] = True
+            kill = self._live[:self._size] & changed[self._rows[:self._size]]
+            self._live[:self._size][kill] = False
+            self._dead += int(kill.sum())
+            self._enrolled[known] = 0
+        for course_id in course_ids:
+            self._read_course(course_id)
+
+    def _read_course(self, course_id: str):
+        """
+        Adds a course's current roster to the matrix, after its old entries were dropped.
+        """
+        row = self._course_rows.get(course_id)
+        course = self.system.courses.get(course_id)
+        if course is None:
+            if row is not None:
+                self._alive[row] = False
+            return
+        if row is None:
+            row = len(self._course_ids)
+            self._course_ids.append(course_id)
+            self._course_rows[course_id] = row
+            self._rank = None
+            self._credits = _grow(self._credits, row + 1)
+            self._capacity = _grow(self._capacity, row + 1)
+            self._alive = _grow(self._alive, row + 1)
+            self._enrolled = _grow(self._enrolled, row + 1)
+        self._credits[row] = course.credits
+        self._capacity[row] = course.capacity
+        self._alive[row] = True
+        student_ids = course.registered_students.to_list()
+        roster = list(map(self._student_columns.get, student_ids))
+        if None in roster:
+            for i, student_id in enumerate(student_ids):
+                if roster[i] is None:
+                    roster[i] = self._student_columns[student_id] = len(self._student_ids)
+                    self._student_ids.append(student_id)
+        self._enrolled[row] = len(roster)
+        end = self._size + len(roster)
+        self._rows = _grow(self._rows, end)
+        self._columns = _grow(self._columns, end)
+        self._live = _grow(self._live, end)
+        self._rows[self._size:end] = row
+        self._columns[self._size:end] = roster
+        self._live[self._size:end] = True
+        self._size = end
+
+    def _refresh(self):
+        """
+        Brings the matrix up to date with the system (called with the lock held).
+        """
+        dirty = self._dirty
+        if dirty is None or len(dirty) > len(self._course_ids) // 2:
+            # Reading most courses one by one costs more than reading them all at once
+            self._rebuild()
+        elif dirty:
+            self._dirty = set()
+            self.stats["refreshed"] += len(dirty)
+            self._read_courses(sorted(dirty))
+        if self._dead > max(4096, self._size - self._dead):
+            live = self._live[:self._size]
+            count = int(live.sum())
+            self._rows[:count] = self._rows[:self._size][live]
+            self._columns[:count] = self._columns[:self._size][live]
+            self._live[:count] = True
+            self._live[count:self._size] = False
+            self._size = count
+            self._dead = 0
+        if self._rank is None:
+            count = len(self._course_ids)
+            self._rank = np.empty(count, dtype=np.int64)
+            self._rank[np.argsort(np.array(self._course_ids, dtype=object), kind="stable")] = np.arange(count)
+
+    def _entries(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the course rows and student columns of every enrollment (called with the lock held).
+        """
+        live = self._live[:self._size]
+        return self._rows[:self._size][live], self._columns[:self._size][live]
+
+    def _listed(self, rows: np.ndarray, *columns: np.ndarray) -> list:
+        """
+        Returns (course_id, value, ...) tuples for the given course rows, with the values taken from the arrays.
+        """
+        course_ids = self._course_ids
+        return list(zip([course_ids[row] for row in rows.tolist()], *(values[rows].tolist() for values in columns)))
+
+    def fill_rates(self) -> List[Tuple[str, int, int, float]]:
+        """
+        Gets how full every course is.
+
+        Returns:
+            List[Tuple[str, int, int, float]]: (course_id, enrolled, capacity, enrolled / capacity)
+            for every course, fullest first (ties by course ID). Courses with no seats count as full.
+        """
+        with self._lock:
+            self._refresh()
+            count = len(self._course_ids)
+            enrolled, capacity = self._enrolled[:count], self._capacity[:count]
+            rates = np.where(capacity > 0, enrolled / np.maximum(capacity, 1), 1.0)
+            order = np.lexsort((self._rank, -rates))
+            return self._listed(order[self._alive[order]], enrolled, capacity, rates)
+
+    def under_enrolled(self, min_fill: float = 0.5) -> List[Tuple[str, int, int]]:
+        """
+        Gets the courses that are less than a given share full.
+
+        Arguments:
+            min_fill (float, optional): The share of seats a course should fill. Default is half.
+
+        Returns:
+            List[Tuple[str, int, int]]: (course_id, enrolled, capacity), emptiest first (ties by course ID).
+        """
+        with self._lock:
+            self._refresh()
+            count = len(self._course_ids)
+            enrolled, capacity = self._enrolled[:count], self._capacity[:count]
+            under = np.flatnonzero(self._alive[:count] & (enrolled < min_fill * capacity))
+            order = under[np.lexsort((self._rank[under], enrolled[under] / capacity[under]))]
+            return self._listed(order, enrolled, capacity)
+
+    def credit_distribution(self) -> List[Tuple[int, int]]:
+        """
+        Gets how many students are registered for each number of credits.
+
+        Returns:
+            List[Tuple[int, int]]: (credits, students) for every credit load that at least one
+            student has, fewest credits first. Students with no courses are counted at 0.
+        """
+        with self._lock:
+            self._refresh()
+            rows, columns = self._entries()
+            loads = np.bincount(columns, weights=self._credits[rows], minlength=len(self._student_ids))
+        loads = loads[loads > 0].astype(np.int64)
+        values, counts = np.unique(loads, return_counts=True)
+        result = list(zip(values.tolist(), counts.tolist()))
+        idle = len(self.system.students) - len(loads)
+        if idle > 0:
+            result.insert(0, (0, idle))
+        return result
+
+    def co_enrollment(self, limit: Optional[int] = None, min_shared: int = 1) -> List[Tuple[str, str, int]]:
+        """
+        Gets the pairs of courses that share students.
+
+        Arguments:
+            limit (int, optional): Most pairs to return. Default is all of them.
+            min_shared (int, optional): Fewest shared students for a pair to be listed.
+
+        Returns:
+            List[Tuple[str, str, int]]: (course_id, other course_id, students in both), the pairs
+            sharing the most students first (ties by course IDs). The first course ID is the smaller.
+        """
+        with self._lock:
+            self._refresh()
+            rows, columns = self._entries()
+            rank = self._rank
+            course_ids = list(self._course_ids)
+        count = len(rank)
+        # Sort by student, then by course ID, so each student's courses sit side by side in order
+        ranks = rank[rows].astype(np.int64)
+        order = np.lexsort((ranks, columns))
+        ranks, columns = ranks[order], columns[order]
+        most = int(np.bincount(columns).max()) if len(columns) else 0
+        # Pairs k places apart within one student's courses, for every k
+        codes = []
+        for k in range(1, most):
+            same = columns[:-k] == columns[k:]
+            codes.append(ranks[:-k][same] * count + ranks[k:][same])
+        if not codes:
+            return []
+        pairs, shared = np.unique(np.concatenate(codes), return_counts=True)
+        keep = shared >= min_shared
+        pairs, shared = pairs[keep], shared[keep]
+        order = np.lexsort((pairs, -shared))[:limit]
+        by_rank = np.argsort(rank)
+        firsts = by_rank[pairs[order] // count].tolist()
+        seconds = by_rank[pairs[order] % count].tolist()
+        return [(course_ids[a], course_ids[b], n) for a, b, n in zip(firsts, seconds, shared[order].tolist())]
+
+    def co_enrolled_with(self, course_id: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Gets the other courses taken by a course's students.
+
+        Arguments:
+            course_id (str): The course code.
+            limit (int, optional): Most courses to return. Default is all of them.
+
+        Returns:
+            List[Tuple[str, int]]: (course_id, students in both), most shared first (ties by course ID).
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        with self._lock:
+            self._refresh()
+            row = self._course_rows.get(course_id)
+            if row is None or not self._alive[row]:
+                raise Exception("Course not found.")
+            rows, columns = self._entries()
+            members = np.zeros(len(self._student_ids), dtype=bool)
+            members[columns[rows == row]] = True
+            shared = np.bincount(rows[members[columns] & (rows != row)], minlength=len(self._course_ids))
+            others = np.flatnonzero(shared)
+            order = others[np.lexsort((self._rank[others], -shared[others]))][:limit]
+            return self._listed(order, shared)
@@ -0,0 +1,319 @@
+"""
+Title:       Portfolio Project - Authentication
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Password hashing and login sessions.
+    Passwords are kept as salted PBKDF2-SHA256 hashes ("pbkdf2_sha256$<iterations>$<salt>$<hash>")
+    instead of plain text. Checking a password is slow on purpose (a few tenths of a second), so
+    that stolen hashes are slow to guess. To keep that cost away from everything else,
+    SessionManager checks each password only once, at login, on a pool of worker threads
+    (hashlib lets other threads run while it hashes). The login returns a random session token,
+    and later requests are checked by looking the token up in a dictionary. Accounts with
+    repeated failed logins are locked for a while, so a flood of guesses costs only a few hashes.
+
+"""
+
+import base64
+import hashlib
+import hmac
+import math
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+HASH_SCHEME = "pbkdf2_sha256"
+# PBKDF2-SHA256 rounds (OWASP's 2023 recommendation). Stored with each hash, so it can be raised later.
+ITERATIONS = 600_000
+SALT_BYTES = 16
+# Longest time an account is locked after failed logins, and how long failures are remembered
+MAX_LOCKOUT = 3600.0
+
+
+def hash_password(password: str, iterations: int = ITERATIONS, salt: Optional[bytes] = None) -> str:
+    """
+    Hashes a password with a new random salt.
+
+    Arguments:
+        password (str): The plain password.
+        iterations (int, optional): The PBKDF2 rounds. Default is ITERATIONS.
+        salt (bytes, optional): The salt. Default is SALT_BYTES random bytes.
+
+    Returns:
+        str: "pbkdf2_sha256$<iterations>$<salt>$<hash>", with the salt and hash in base64.
+    """
+    if salt is None:
+        salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return "$".join((HASH_SCHEME, str(iterations), base64.b64encode(salt).decode("ascii"),
+                     base64.b64encode(digest).decode("ascii")))
+
+
+def is_password_hash(value: str) -> bool:
+    """
+    Checks if a stored password is a hash made by hash_password (rather than plain text).
+    """
+    return value.startswith(HASH_SCHEME + "$") and value.count("$") == 3
+
+
+def stored_password(password: str) -> str:
+    """
+    Gets the value to store for a new account's password.
+
+    Arguments:
+        password (str): A plain password, or one already hashed by hash_password
+            (like the ones in saved data and journals), which is kept as it is.
+
+    Returns:
+        str: The hashed password.
+    """
+    return password if is_password_hash(password) else hash_password(password)
+
+
+def stored_passwords(passwords: Iterable[str], workers: Optional[int] = None) -> List[str]:
+    """
+    Gets the values to store for many new accounts' passwords, hashing them side by side.
+
+    Arguments:
+        passwords (Iterable[str]): Plain or already hashed passwords.
+        workers (int, optional): How many threads hash at once. Default is the number of CPU cores.
+
+    Returns:
+        List[str]: The hashed passwords, in the same order.
+    """
+    passwords = list(passwords)
+    plain = [i for i, password in enumerate(passwords) if not is_password_hash(password)]
+    if len(plain) > 1:
+        with ThreadPoolExecutor(workers or os.cpu_count() or 1) as pool:
+            hashed = list(pool.map(hash_password, [passwords[i] for i in plain]))
+    else:
+        hashed = [hash_password(passwords[i]) for i in plain]
+    for i, value in zip(plain, hashed):
+        passwords[i] = value
+    return passwords
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Checks a password against a stored one.
+
+    Stored passwords from before hashing (plain text in old saved data) are still accepted,
+    compared in constant time.
+
+    Arguments:
+        password (str): The password given at login.
+        stored (str): The account's stored password.
+
+    Returns:
+        bool: True if the password is right.
+    """
+    if not is_password_hash(stored):
+        return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+    _, iterations, salt, expected = stored.split("$")
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), base64.b64decode(salt), int(iterations))
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+
+@lru_cache(maxsize=None)
+def preset_hash(password: str) -> str:
+    """
+    Gets the hash of a built-in account's password, made once per process and shared by every system.
+    """
+    return hash_password(password)
+
+
+def spend_verification(password: str):
+    """
+    Does the work of checking a password for an account that doesn't exist,
+    so a failed login takes as long either way and doesn't reveal which accounts exist.
+    """
+    verify_password(password, preset_hash(""))
+
+
+class Session:
+
+    __slots__ = ("token", "user", "expires")
+
+    def __init__(self, token: str, user, expires: float):
+        """
+        A logged-in user.
+
+        Arguments:
+            token (str): The random token that stands for the session in later requests.
+            user (User): The Admin or Student who logged in.
+            expires (float): When the session ends, in SessionManager clock seconds.
+                Moved later every time the session is used.
+        """
+        self.token = token
+        self.user = user
+        self.expires = expires
+
+
+class SessionManager:
+
+    def __init__(self, system, ttl: float = 1800.0, workers: Optional[int] = None, max_failures: int = 5,
+                 lockout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Logs users in to a system and keeps track of their sessions.
+
+        Arguments:
+            system (RegistrationSystem): The system whose authenticate_user checks passwords (any backend).
+            ttl (float, optional): Seconds a session stays valid after it was last used. Default is 30 minutes.
+            workers (int, optional): How many password checks run at once. Default is the number of CPU cores.
+            max_failures (int, optional): Failed logins in a row before the account is locked.
+                It is also the most password checks that can wait for one account at a time.
+            lockout (float, optional): Seconds the account is locked after max_failures failures.
+                Every further failure doubles it, up to MAX_LOCKOUT.
+            clock (Callable[[], float], optional): Gives the current time in seconds. Default is time.monotonic.
+
+        Attributes:
+            stats (Dict[str, int]): Counters: logins, failed (wrong user ID or password),
+                throttled (turned away without a password check) and expired (sessions found expired).
+        """
+        self.system = system
+        self.ttl = ttl
+        self.max_failures = max_failures
+        self.lockout = lockout
+        self.clock = clock
+        self.stats: Dict[str, int] = dict.fromkeys(("logins", "failed", "throttled", "expired"), 0)
+        self._sessions: Dict[str, Session] = {}
+        # User ID -> (failed logins in a row, locked until, time of the last failure)
+        self._failures: Dict[str, Tuple[int, float, float]] = {}
+        # User ID -> password checks waiting or running
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers or os.cpu_count() or 1, thread_name_prefix="login")
+        self._sweep_at = 1024
+
+    def submit_login(self, user_id: str, password: str) -> "Future[Session]":
+        """
+        Starts a login: the password is checked on a worker thread.
+
+        A locked account, or one that already has as many checks waiting as it has failures left
+        before the lockout, is turned away at once.
+
+        Arguments:
+            user_id (str): The user ID.
+            password (str): The password.
+
+        Returns:
+            Future[Session]: Gives the new session, or raises an Exception with the reason
+            ("Invalid username or password." or "Too many failed logins. Try again in N seconds.").
+        """
+        user_id = user_id.lower()
+        now = self.clock()
+        with self._lock:
+            failures, locked_until, _ = self._failures.get(user_id, (0, 0.0, 0.0))
+            pending = self._pending.get(user_id, 0)
+            # Before the lockout, no more checks than the failures still allowed; after it, one at a time
+            if now < locked_until or pending >= max(1, self.max_failures - failures):
+                self.stats["throttled"] += 1
+                wait = max(1, math.ceil(locked_until - now))
+                future: "Future[Session]" = Future()
+                future.set_exception(Exception(f"Too many failed logins. Try again in {wait} seconds."))
+                return future
+            self._pending[user_id] = pending + 1
+        return self._pool.submit(self._check, user_id, password)
+
+    def login(self, user_id: str, password: str) -> Session:
+        """
+        Logs a user in and waits for the password check.
+
+        Returns:
+            Session: The new session.
+
+        Raises:
+            Exception: If the login failed or was turned away (see submit_login).
+        """
+        return self.submit_login(user_id, password).result()
+
+    def _check(self, user_id: str, password: str) -> Session:
+        """
+        Checks the password and starts the session (runs on a worker thread).
+        """
+        try:
+            user = self.system.authenticate_user(user_id, password)
+        except Exception:
+            now = self.clock()
+            with self._lock:
+                self._done(user_id)
+                failures = self._failures.get(user_id, (0, 0.0, 0.0))[0] + 1
+                locked_until = 0.0
+                if failures >= self.max_failures:
+                    locked_until = now + min(self.lockout * 2 ** (failures - self.max_failures), MAX_LOCKOUT)
+                self._failures[user_id] = (failures, locked_until, now)
+                self.stats["failed"] += 1
+            raise
+        session = Session(secrets.token_urlsafe(32), user, self.clock() + self.ttl)
+        with self._lock:
+            self._done(user_id)
+            self._failures.pop(user_id, None)
+            self._sessions[session.token] = session
+            self.stats["logins"] += 1
+            if len(self._sessions) + len(self._failures) >= self._sweep_at:
+                self._sweep()
+        return session
+
+    def _done(self, user_id: str):
+        pending = self._pending[user_id] - 1
+        if pending:
+            self._pending[user_id] = pending
+        else:
+            del self._pending[user_id]
+
+    def _sweep(self):
+        """
+        Drops expired sessions and failures older than MAX_LOCKOUT (called with the lock held).
+
+        Runs when the tables have doubled in size since the last sweep, so the work per login stays constant.
+        """
+        now = self.clock()
+        for token in [token for token, session in self._sessions.items() if session.expires <= now]:
+            del self._sessions[token]
+        for user_id in [uid for uid, (_, until, last) in self._failures.items()
+                        if until <= now and now - last > MAX_LOCKOUT]:
+            del self._failures[user_id]
+        self._sweep_at = max(1024, 2 * (len(self._sessions) + len(self._failures)))
+
+    def validate(self, token: str) -> Session:
+        """
+        Checks a session token, and keeps the session alive for another ttl seconds.
+
+        Arguments:
+            token (str): The token from login.
+
+        Returns:
+            Session: The session.
+
+        Raises:
+            Exception: If the token is unknown (or was logged out), or the session expired.
+        """
+        session = self._sessions.get(token)
+        if session is None:
+            raise Exception("Invalid session. Please log in.")
+        now = self.clock()
+        if now >= session.expires:
+            if self._sessions.pop(token, None) is not None:
+                self.stats["expired"] += 1
+            raise Exception("Session expired. Please log in again.")
+        session.expires = now + self.ttl
+        return session
+
+    def logout(self, token: str):
+        """
+        Ends a session. Unknown tokens are ignored.
+        """
+        self._sessions.pop(token, None)
+
+    def close(self):
+        """
+        Stops the password-check threads (after the checks already started).
+        """
+        self._pool.shutdown()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
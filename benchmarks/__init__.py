@@ -0,0 +1,6 @@
+"""
+Benchmark scripts for the Student Course Registration System.
+
+Run each script from the project folder, for example:
+    python -m benchmarks.bench_enrollment
+"""
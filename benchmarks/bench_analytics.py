@@ -0,0 +1,116 @@
+"""
+Benchmark for the vectorized enrollment reports.
+
+Builds synthetic schools (see benchmarks/workload.py) and times each report two ways:
+  - loops:  plain Python over every Course.registered_students and Student.registered_courses,
+  - matrix: analytics.EnrollmentMatrix, with NumPy operations over the enrollment arrays.
+Also times building the matrix, and bringing it up to date after a burst of registrations and
+drops (only the changed courses are read again).
+
+Usage:
+    python -m benchmarks.bench_analytics
+"""
+
+import random
+import time
+from collections import Counter
+from itertools import combinations
+
+from analytics import EnrollmentMatrix
+from App import RegistrationSystem
+from benchmarks.workload import generate, populate
+
+SIZES = ((500, 5_000), (2_000, 20_000), (10_000, 100_000))
+CHANGES = 1_000
+
+
+def loop_fill_rates(system) -> list:
+    rates = [(course.course_id, len(course.registered_students), course.capacity,
+              len(course.registered_students) / course.capacity if course.capacity else 1.0)
+             for course in system.courses.values()]
+    rates.sort(key=lambda r: (-r[3], r[0]))
+    return rates
+
+
+def loop_under_enrolled(system) -> list:
+    under = [(course.course_id, len(course.registered_students), course.capacity)
+             for course in system.courses.values() if len(course.registered_students) < 0.5 * course.capacity]
+    under.sort(key=lambda r: (r[1] / r[2], r[0]))
+    return under
+
+
+def loop_credit_distribution(system) -> list:
+    courses = system.courses
+    loads = Counter(sum(courses[course_id].credits for course_id in student.registered_courses)
+                    for student in system.students.values())
+    return sorted(loads.items())
+
+
+def loop_co_enrollment(system, limit: int = 20) -> list:
+    shared = Counter()
+    for student in system.students.values():
+        shared.update(combinations(sorted(student.registered_courses), 2))
+    pairs = sorted(((a, b, n) for (a, b), n in shared.items()), key=lambda r: (-r[2], r[0], r[1]))
+    return pairs[:limit]
+
+
+def seconds(function, *args) -> tuple:
+    """
+    Returns the result of one call and the seconds it took (the best of three).
+    """
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        result = function(*args)
+        took = time.perf_counter() - start
+        best = took if best is None else min(best, took)
+    return result, best
+
+
+def main():
+    for courses, students in SIZES:
+        workload = generate(courses, students)
+        system = RegistrationSystem()
+        populate(system, workload)
+        start = time.perf_counter()
+        matrix = EnrollmentMatrix(system)
+        build = time.perf_counter() - start
+        print(f"\n{courses:,} courses, {students:,} students, {len(workload.enrollments):,} requests; "
+              f"matrix built in {build * 1e3:,.0f} ms")
+        print("{:<22} {:>12} {:>12} {:>10}".format("Report", "loops ms", "matrix ms", "speedup"))
+        for name, loop, vectorized in (
+                ("fill_rates", loop_fill_rates, matrix.fill_rates),
+                ("under_enrolled", loop_under_enrolled, matrix.under_enrolled),
+                ("credit_distribution", loop_credit_distribution, matrix.credit_distribution),
+                ("co_enrollment top 20", loop_co_enrollment, lambda: matrix.co_enrollment(limit=20))):
+            expected, loop_seconds = seconds(loop, system)
+            result, matrix_seconds = seconds(vectorized)
+            assert result == expected, name
+            print("{:<22} {:>12.2f} {:>12.2f} {:>9.1f}x".format(
+                name, loop_seconds * 1e3, matrix_seconds * 1e3, loop_seconds / matrix_seconds))
+
+        rng = random.Random(5)
+        course_ids = [row[0] for row in workload.courses]
+        student_ids = [row[0] for row in workload.students]
+        for _ in range(CHANGES):
+            student_id = rng.choice(student_ids)
+            registered = system.list_courses_for_student(student_id)
+            try:
+                if registered and rng.random() < 0.5:
+                    system.student_course_remove(student_id, rng.choice(registered))
+                else:
+                    system.student_course_register(student_id, rng.choice(course_ids))
+            except Exception:
+                pass
+        refreshed = matrix.stats["refreshed"]
+        start = time.perf_counter()
+        result = matrix.fill_rates()
+        catch_up = time.perf_counter() - start
+        assert result == loop_fill_rates(system)
+        print(f"After {CHANGES:,} registrations and drops: {matrix.stats['refreshed'] - refreshed:,} courses "
+              f"read again, fill_rates in {catch_up * 1e3:.1f} ms (a new matrix takes {build * 1e3:,.0f} ms)")
+        matrix.close()
+
+
+if __name__ == "__main__":
+    main()
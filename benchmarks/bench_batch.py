@@ -0,0 +1,121 @@
+"""
+Compares register_batch / drop_batch with calling the single-pair methods in a loop.
+
+The documented target is that the batch path handles at least 1.2 times as many
+pairs per second as the single-call path, and at least 1.5 times in thread-safe mode,
+where the batch path locks each course once instead of once per pair. Some pairs
+are set up to fail (full courses, duplicates and unknown IDs), since the single-call
+path pays extra for building an exception on every failure.
+
+Usage:
+    python -m benchmarks.bench_batch
+"""
+
+import random
+import time
+
+from App import RegistrationSystem, Student
+
+STUDENTS = 20_000
+COURSES = 500
+PAIRS = 50_000
+TARGET_SPEEDUP = {False: 1.2, True: 1.5}
+
+
+def build_system(thread_safe: bool) -> RegistrationSystem:
+    """
+    Creates a system with STUDENTS students and COURSES courses of random capacity.
+
+    Argument:
+        thread_safe (bool): Whether the system takes per-course and per-student locks.
+
+    Returns:
+        RegistrationSystem: The filled system.
+    """
+    rng = random.Random(7)
+    system = RegistrationSystem(thread_safe=thread_safe)
+    for c in range(COURSES):
+        system.add_course(f"C{c}", f"Course {c}", "Batch benchmark", 3, rng.randint(50, 150))
+    for s in range(STUDENTS):
+        system.students[f"s{s}"] = Student(f"s{s}", "pass123")
+    return system
+
+
+def build_pairs() -> list:
+    """
+    Makes PAIRS random (student_id, course_id) pairs with some unknown IDs mixed in.
+
+    Returns:
+        list: The pairs.
+    """
+    rng = random.Random(11)
+    pairs = []
+    for _ in range(PAIRS):
+        sid = f"s{rng.randrange(STUDENTS + 100)}"
+        cid = f"c{rng.randrange(COURSES + 5)}"
+        pairs.append((sid, cid))
+    return pairs
+
+
+def single_calls(system: RegistrationSystem, pairs: list, method) -> float:
+    """
+    Calls a single-pair method once per pair, ignoring errors, and returns the seconds taken.
+    """
+    start = time.perf_counter()
+    for sid, cid in pairs:
+        try:
+            method(sid, cid)
+        except Exception:
+            pass
+    return time.perf_counter() - start
+
+
+def batch_call(pairs: list, method) -> float:
+    """
+    Calls a batch method once with all pairs and returns the seconds taken.
+    """
+    start = time.perf_counter()
+    method(pairs)
+    return time.perf_counter() - start
+
+
+def compare(thread_safe: bool, pairs: list):
+    """
+    Runs the same pairs through both paths on two identical systems and prints the speedup.
+
+    Arguments:
+        thread_safe (bool): Whether the systems take locks.
+        pairs (list): The (student_id, course_id) pairs to register and then drop.
+    """
+    single = build_system(thread_safe)
+    batch = build_system(thread_safe)
+    reg_single = single_calls(single, pairs, single.student_course_register)
+    reg_batch = batch_call(pairs, batch.register_batch)
+    assert single.check_consistency() == [] and batch.check_consistency() == []
+    for cid in single.courses:
+        assert single.list_students_for_course(cid) == batch.list_students_for_course(cid)
+
+    drop_single = single_calls(single, pairs, single.student_course_remove)
+    drop_batch = batch_call(pairs, batch.drop_batch)
+
+    target = TARGET_SPEEDUP[thread_safe]
+    mode = "locked" if thread_safe else "plain"
+    for name, one, many in (("register", reg_single, reg_batch), ("drop", drop_single, drop_batch)):
+        speedup = one / many
+        status = "OK" if speedup >= target else f"below {target}x target"
+        print("{:<8} {:<10} {:>16,.0f} {:>16,.0f} {:>9.1f}x  {}".format(
+            mode, name, len(pairs) / one, len(pairs) / many, speedup, status
+        ))
+
+
+def main():
+    pairs = build_pairs()
+    print("{:<8} {:<10} {:>16} {:>16} {:>10}".format(
+        "Mode", "Operation", "single (pairs/s)", "batch (pairs/s)", "speedup"
+    ))
+    compare(False, pairs)
+    compare(True, pairs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Startup benchmark for binary snapshots.
+
+Builds a synthetic school with about a million enrollments (see benchmarks/workload.py), saves it
+as a JSON snapshot (what persistence.PersistentStore writes) and as a binary snapshot, and compares:
+  - the time to write each file and its size,
+  - startup in a fresh process, until the first roster, schedule and credit load are answered:
+    loading the JSON snapshot into a RegistrationSystem, next to opening the binary one with
+    MappedSnapshot,
+  - lookups per second on the mapped file, with and without building Course and Student objects,
+  - restoring the whole binary snapshot into a RegistrationSystem (for when it must be changed).
+
+Usage:
+    python -m benchmarks.bench_binary_snapshot [--courses 20000] [--students 230000]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import generate, populate
+from binary_snapshot import MappedSnapshot, save_snapshot
+from persistence import snapshot_state
+
+LOOKUPS = 20_000
+
+# Each one runs in a new Python process and prints the seconds from its start to the first answers
+JSON_STARTUP = """
+import json, time
+start = time.perf_counter()
+from App import RegistrationSystem
+from persistence import restore_state
+system = RegistrationSystem()
+with open({path!r}, encoding="utf-8") as f:
+    restore_state(system, json.load(f))
+system.list_students_for_course({course_id!r}), system.list_courses_for_student({student_id!r})
+system.credit_load({student_id!r})
+print(time.perf_counter() - start)
+"""
+BINARY_STARTUP = """
+import time
+start = time.perf_counter()
+from binary_snapshot import MappedSnapshot
+snapshot = MappedSnapshot({path!r})
+snapshot.list_students_for_course({course_id!r}), snapshot.list_courses_for_student({student_id!r})
+snapshot.credit_load({student_id!r})
+print(time.perf_counter() - start)
+"""
+
+
+def fresh_process_seconds(code: str) -> float:
+    """
+    Runs code in a new Python process started in the project folder and returns the seconds it printed.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare startup from JSON and binary snapshots.")
+    parser.add_argument("--courses", type=int, default=20_000, help="courses in the school")
+    parser.add_argument("--students", type=int, default=230_000, help="students in the school")
+    args = parser.parse_args()
+
+    workload = generate(args.courses, args.students)
+    system = RegistrationSystem()
+    populate(system, workload)
+    enrollments = sum(len(course.registered_students) for course in system.courses.values())
+    print(f"{args.courses:,} courses, {args.students:,} students, {enrollments:,} enrollments")
+    rng = random.Random(9)
+    course_ids = [row[0] for row in workload.courses]
+    student_ids = [row[0] for row in workload.students]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "snapshot.json")
+        binary_path = os.path.join(directory, "snapshot.bin")
+        start = time.perf_counter()
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot_state(system), f, separators=(",", ":"))
+        json_write = time.perf_counter() - start
+        start = time.perf_counter()
+        save_snapshot(system, binary_path)
+        binary_write = time.perf_counter() - start
+        print("\n{:<8} {:>10} {:>10}".format("Format", "write s", "size MB"))
+        print("{:<8} {:>10.2f} {:>10.1f}".format("JSON", json_write, os.path.getsize(json_path) / 1e6))
+        print("{:<8} {:>10.2f} {:>10.1f}".format("binary", binary_write, os.path.getsize(binary_path) / 1e6))
+
+        names = {"course_id": rng.choice(course_ids), "student_id": rng.choice(student_ids)}
+        json_start = fresh_process_seconds(JSON_STARTUP.format(path=json_path, **names))
+        binary_start = fresh_process_seconds(BINARY_STARTUP.format(path=binary_path, **names))
+        print(f"\nFresh process to first answers: JSON {json_start:.2f} s, binary {binary_start * 1e3:.1f} ms "
+              f"({json_start / binary_start:,.0f}x faster)")
+
+        with MappedSnapshot(binary_path) as snapshot:
+            pairs = [(rng.choice(course_ids), rng.choice(student_ids)) for _ in range(LOOKUPS)]
+            start = time.perf_counter()
+            for course_id, student_id in pairs:
+                snapshot.list_students_for_course(course_id)
+                snapshot.list_courses_for_student(student_id)
+            read = time.perf_counter() - start
+            start = time.perf_counter()
+            for course_id, student_id in pairs:
+                snapshot.courses[course_id], snapshot.students[student_id]
+            built = time.perf_counter() - start
+            print(f"Mapped lookups: {2 * LOOKUPS / read:,.0f}/s for rosters and schedules, "
+                  f"{2 * LOOKUPS / built:,.0f}/s for Course and Student objects "
+                  f"({len(snapshot.courses.built):,} courses and {len(snapshot.students.built):,} students built)")
+
+            start = time.perf_counter()
+            restored = RegistrationSystem()
+            snapshot.restore(restored)
+            print(f"Restoring everything into a RegistrationSystem: {time.perf_counter() - start:.2f} s")
+        assert restored.check_consistency() == []
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the cached catalog view.
+
+Simulates students refreshing the course list during peak registration: every refresh
+is followed by one registration, which changes a single course. Compares rebuilding
+every row from view_available_courses (the old student menu code) with catalog_rows,
+and times paging through available courses only.
+
+Usage:
+    python -m benchmarks.bench_catalog
+"""
+
+import random
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+
+COURSES = 3_000
+STUDENTS = 20_000
+REFRESHES = 300
+PAGE_SIZE = 25
+
+
+def build() -> RegistrationSystem:
+    """
+    Creates a system where about half of the courses are already full.
+    """
+    rng = random.Random(21)
+    system = RegistrationSystem()
+    system.add_courses_batch([(f"C{c}", f"Course {c}", "Catalog benchmark", 3, rng.randint(5, 20))
+                              for c in range(COURSES)])
+    system.add_students_batch([(f"s{s}", PASSWORD_HASH) for s in range(STUDENTS)])
+    system.register_batch([(f"s{rng.randrange(STUDENTS)}", f"C{c}") for c in range(COURSES) for _ in range(12)])
+    return system
+
+
+def old_refresh(system: RegistrationSystem) -> list:
+    """
+    Builds the catalog rows the way the student menu used to, from every course.
+    """
+    rows = []
+    for c in system.view_available_courses():
+        status = "Full" if c.is_full() else "Available"
+        rows.append(f"{c} - Status: {status}")
+    return rows
+
+
+def run(system: RegistrationSystem, refresh) -> float:
+    """
+    Runs REFRESHES refreshes, each followed by one registration, and returns refreshes per second.
+    """
+    rng = random.Random(23)
+    start = time.perf_counter()
+    for _ in range(REFRESHES):
+        refresh(system)
+        try:
+            system.student_course_register(f"s{rng.randrange(STUDENTS)}", f"C{rng.randrange(COURSES)}")
+        except Exception:
+            pass
+    return REFRESHES / (time.perf_counter() - start)
+
+
+def main():
+    old_system = build()
+    new_system = build()
+    assert old_refresh(new_system) == new_system.catalog_rows()
+    old_rate = run(old_system, old_refresh)
+    new_rate = run(new_system, lambda system: system.catalog_rows())
+    page_rate = run(new_system, lambda system: system.catalog_rows(available_only=True, page=3, page_size=PAGE_SIZE))
+    assert old_refresh(new_system) == new_system.catalog_rows()
+
+    print(f"{COURSES:,} courses, {new_system.catalog_size(available_only=True):,} with free seats")
+    print("{:<36} {:>14}".format("Refresh", "refreshes/s"))
+    print("{:<36} {:>14,.0f}".format("rebuild every row (old menu code)", old_rate))
+    print("{:<36} {:>14,.0f}".format("catalog_rows, full catalog", new_rate))
+    print("{:<36} {:>14,.0f}".format(f"catalog_rows, available page of {PAGE_SIZE}", page_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for time-conflict checks.
+
+Builds a term where every course meets two or three times a week and every student
+tries to register for many courses, then compares:
+  - checking a registration by comparing the new course's meetings with every meeting
+    of every course the student already has (the simple pairwise way),
+    against the student's MeetingIndex (binary search per day),
+  - auditing the whole population pairwise against find_conflicts (one sweep per timetable).
+
+With about six courses per student the two registration checks cost about the same; the
+index keeps the check's cost flat as a timetable grows, while the pairwise check grows with it.
+
+Usage:
+    python -m benchmarks.bench_conflicts
+"""
+
+import random
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+
+COURSES = 3_000
+STUDENTS = 20_000
+ATTEMPTS_PER_STUDENT = 12
+CHECKS = 200_000
+MOVED_COURSES = 150
+
+
+def random_meetings(rng: random.Random) -> list:
+    """
+    Makes two or three weekday meetings of 50 to 80 minutes between 08:00 and 20:00.
+    """
+    length = rng.choice((50, 75, 80))
+    start = rng.randrange(8 * 60, 20 * 60 - length, 15)
+    days = rng.sample(range(5), rng.choice((2, 3)))
+    return [(day, start, start + length) for day in days]
+
+
+def build() -> RegistrationSystem:
+    """
+    Creates the courses and students and registers everyone through register_batch.
+    """
+    rng = random.Random(5)
+    system = RegistrationSystem()
+    system.add_courses_batch([(f"C{c}", f"Course {c}", "Conflict benchmark", 3, 400, random_meetings(rng))
+                              for c in range(COURSES)])
+    system.add_students_batch([(f"s{s}", PASSWORD_HASH) for s in range(STUDENTS)])
+    system.register_batch([(f"s{s}", f"C{rng.randrange(COURSES)}")
+                           for s in range(STUDENTS) for _ in range(ATTEMPTS_PER_STUDENT)])
+    return system
+
+
+def pairwise_conflict(system: RegistrationSystem, student_id: str, meetings) -> bool:
+    """
+    Checks new meetings against every meeting of every registered course.
+    """
+    for cid in system.students[student_id].registered_courses:
+        for day, start, end in system.courses[cid].meetings:
+            for new_day, new_start, new_end in meetings:
+                if day == new_day and start < new_end and new_start < end:
+                    return True
+    return False
+
+
+def pairwise_audit(system: RegistrationSystem) -> list:
+    """
+    Finds clashes by comparing every pair of courses of every student.
+    """
+    conflicts = []
+    for student_id, student in system.students.items():
+        course_ids = sorted(student.registered_courses)
+        for i, first in enumerate(course_ids):
+            for second in course_ids[i + 1:]:
+                if any(day == other_day and start < other_end and other_start < end
+                       for day, start, end in system.courses[first].meetings
+                       for other_day, other_start, other_end in system.courses[second].meetings):
+                    conflicts.append((student_id, first, second))
+    conflicts.sort()
+    return conflicts
+
+
+def main():
+    start = time.perf_counter()
+    system = build()
+    build_seconds = time.perf_counter() - start
+    enrollments = sum(len(c.registered_students) for c in system.courses.values())
+    print(f"{COURSES:,} courses, {STUDENTS:,} students, {enrollments:,} enrollments "
+          f"(built in {build_seconds:.2f} seconds)")
+
+    rng = random.Random(9)
+    checks = [(f"s{rng.randrange(STUDENTS)}", system.courses[f"C{rng.randrange(COURSES)}"]) for _ in range(CHECKS)]
+    start = time.perf_counter()
+    simple = [pairwise_conflict(system, sid, course.meetings) for sid, course in checks]
+    simple_rate = CHECKS / (time.perf_counter() - start)
+    start = time.perf_counter()
+    indexed = [system._timetable_conflict(sid, course) is not None for sid, course in checks]
+    indexed_rate = CHECKS / (time.perf_counter() - start)
+    assert simple == indexed
+
+    # Move some courses so existing schedules clash, then audit
+    for c in rng.sample(range(COURSES), MOVED_COURSES):
+        system.update_course(f"C{c}", meetings=random_meetings(rng))
+    start = time.perf_counter()
+    expected = pairwise_audit(system)
+    pairwise_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    found = system.find_conflicts()
+    sweep_seconds = time.perf_counter() - start
+    assert found == expected
+
+    print("{:<40} {:>14}".format("Registration check", "checks/s"))
+    print("{:<40} {:>14,.0f}".format("pairwise over the student's courses", simple_rate))
+    print("{:<40} {:>14,.0f}".format("MeetingIndex", indexed_rate))
+    print("{:<40} {:>14}".format(f"Audit ({len(found):,} conflicts)", "seconds"))
+    print("{:<40} {:>14.3f}".format("pairwise per student", pairwise_seconds))
+    print("{:<40} {:>14.3f}".format("find_conflicts (sweep)", sweep_seconds))
+
+
+if __name__ == "__main__":
+    main()
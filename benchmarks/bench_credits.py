@@ -0,0 +1,104 @@
+"""
+Benchmark for credit totals and the credit limit.
+
+Registers many students for random courses and compares:
+  - finding a student's credit load by adding up the credits of their courses
+    on every registration, against the running totals kept by CreditLedger,
+  - listing overloaded and underloaded students by adding up every student's courses,
+    against reading the ledger's groups of students by total,
+  - changing one course's credits, which only updates that course's students.
+
+Usage:
+    python -m benchmarks.bench_credits
+"""
+
+import random
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+
+COURSES = 2_000
+STUDENTS = 20_000
+COURSES_PER_STUDENT = 5
+MAX_CREDITS = 18
+MIN_CREDITS = 12
+CHECKS = 50_000
+REPORTS = 20
+CREDIT_CHANGES = 500
+
+
+def build() -> RegistrationSystem:
+    """
+    Creates COURSES courses of 1-5 credits and STUDENTS students with up to COURSES_PER_STUDENT courses each.
+    """
+    rng = random.Random(5)
+    system = RegistrationSystem(max_credits=MAX_CREDITS, min_credits=MIN_CREDITS)
+    for c in range(COURSES):
+        system.add_course(f"C{c}", f"Course {c}", "Credit benchmark", rng.randint(1, 5), 1_000)
+    course_ids = list(system.courses)
+    for s in range(STUDENTS):
+        system.add_student(f"s{s}", PASSWORD_HASH)
+        # Courses that would go over the limit come back as "credit_limit" and are left out
+        system.register_batch([(f"s{s}", cid) for cid in rng.sample(course_ids, COURSES_PER_STUDENT)])
+    return system
+
+
+def summed_load(system: RegistrationSystem, student_id: str) -> int:
+    return sum(system.courses[cid].credits for cid in system.students[student_id].registered_courses)
+
+
+def summed_report(system: RegistrationSystem) -> tuple:
+    loads = [(sid, summed_load(system, sid)) for sid in system.students]
+    over = sorted(((sid, load) for sid, load in loads if load > MAX_CREDITS), key=lambda p: (-p[1], p[0]))
+    under = sorted(((sid, load) for sid, load in loads if load < MIN_CREDITS), key=lambda p: (p[1], p[0]))
+    return over, under
+
+
+def main():
+    start = time.perf_counter()
+    system = build()
+    build_seconds = time.perf_counter() - start
+    print(f"{COURSES:,} courses, {STUDENTS:,} students with up to {COURSES_PER_STUDENT} courses each "
+          f"(built in {build_seconds:.2f} seconds)")
+
+    rng = random.Random(6)
+    course_ids = list(system.courses)
+    checks = [(f"s{rng.randrange(STUDENTS)}", system.courses[rng.choice(course_ids)]) for _ in range(CHECKS)]
+    start = time.perf_counter()
+    summed = [summed_load(system, sid) + course.credits > MAX_CREDITS for sid, course in checks]
+    summed_rate = CHECKS / (time.perf_counter() - start)
+    start = time.perf_counter()
+    ledger = [system._credit_overload(sid, course) is not None for sid, course in checks]
+    ledger_rate = CHECKS / (time.perf_counter() - start)
+    assert summed == ledger
+
+    # Raise some credits so the overload report has something to list
+    start = time.perf_counter()
+    for cid in rng.sample(course_ids, CREDIT_CHANGES):
+        system.update_course(cid, credits=system.courses[cid].credits + 2)
+    change_rate = CREDIT_CHANGES / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(REPORTS):
+        expected = summed_report(system)
+    summed_report_rate = REPORTS / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(REPORTS):
+        found = system.overloaded_students(), system.underloaded_students()
+    ledger_report_rate = REPORTS / (time.perf_counter() - start)
+    assert found == expected
+    assert system.check_consistency() == []
+
+    print(f"{len(found[0]):,} overloaded and {len(found[1]):,} underloaded students")
+    print("{:<44} {:>14}".format("Credit limit check", "checks/s"))
+    print("{:<44} {:>14,.0f}".format("add up the student's courses", summed_rate))
+    print("{:<44} {:>14,.0f}".format("running totals", ledger_rate))
+    print("{:<44} {:>14}".format("Overload and underload report", "reports/s"))
+    print("{:<44} {:>14,.1f}".format("add up every student's courses", summed_report_rate))
+    print("{:<44} {:>14,.1f}".format("totals grouped by load", ledger_report_rate))
+    print("{:<44} {:>14,.0f}".format("update_course(credits=...) per second", change_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for the enrollment collections used by Course and Student.
+
+Measures the average time of one membership check, one add and one drop
+when a course already holds 10 up to 100,000 students. With EnrollmentSet
+the cost per operation should stay about the same at every size.
+
+Usage:
+    python -m benchmarks.bench_enrollment
+"""
+
+import time
+
+from App import Course
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+OPERATIONS = 10_000
+
+
+def time_per_op(size: int) -> dict:
+    """
+    Times membership, add and drop on a course that already has `size` students.
+
+    Arguments:
+        size (int): How many students are registered before timing starts.
+
+    Returns:
+        dict: Nanoseconds per operation for "contains", "add" and "drop".
+    """
+    course = Course("BENCH1", "Benchmark", "Benchmark course", 3, size + OPERATIONS)
+    for i in range(size):
+        course.add_student(f"s{i}")
+    probe = f"s{size - 1}"
+    extra = [f"x{i}" for i in range(OPERATIONS)]
+
+    start = time.perf_counter_ns()
+    for _ in range(OPERATIONS):
+        probe in course.registered_students
+    contains = (time.perf_counter_ns() - start) / OPERATIONS
+
+    start = time.perf_counter_ns()
+    for sid in extra:
+        course.add_student(sid)
+    add = (time.perf_counter_ns() - start) / OPERATIONS
+
+    start = time.perf_counter_ns()
+    for sid in extra:
+        course.remove_student(sid)
+    drop = (time.perf_counter_ns() - start) / OPERATIONS
+
+    return {"contains": contains, "add": add, "drop": drop}
+
+
+def main():
+    print("{:>10} {:>14} {:>14} {:>14}".format("Enrolled", "contains (ns)", "add (ns)", "drop (ns)"))
+    for size in SIZES:
+        result = time_per_op(size)
+        print("{:>10} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+            size, result["contains"], result["add"], result["drop"]
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the report export.
+
+Compares building every student's schedule with student_registered_course (one call and
+one joined string per student) against streaming the same report with export.py, and
+times CSV/JSONL/text exports of every roster plus paging through one huge roster.
+
+Usage:
+    python -m benchmarks.bench_export
+"""
+
+import io
+import os
+import random
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from export import export_report, roster_page
+
+COURSES = 2_000
+STUDENTS = 100_000
+COURSES_PER_STUDENT = 5
+
+
+def build() -> RegistrationSystem:
+    """
+    Creates a system with random enrollments plus one course that holds every student.
+    """
+    rng = random.Random(17)
+    system = RegistrationSystem()
+    system.add_courses_batch([(f"C{c}", f"Course {c}", "Export benchmark", 3, STUDENTS) for c in range(COURSES)])
+    system.add_courses_batch([("HUGE1", "Everyone", "One huge roster", 1, STUDENTS)])
+    system.add_students_batch([(f"s{s}", PASSWORD_HASH) for s in range(STUDENTS)])
+    pairs = [(f"s{s}", f"C{rng.randrange(COURSES)}") for s in range(STUDENTS) for _ in range(COURSES_PER_STUDENT)]
+    pairs += [(f"s{s}", "HUGE1") for s in range(STUDENTS)]
+    system.register_batch(pairs)
+    return system
+
+
+def timed(action) -> float:
+    """
+    Runs an action and returns how many seconds it took.
+    """
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main():
+    system = build()
+    sink = open(os.devnull, "w")
+
+    def per_student_calls():
+        for sid in system.students:
+            sink.write(system.student_registered_course(sid))
+
+    print("{:<32} {:>10}".format("Report", "seconds"))
+    print("{:<32} {:>10.2f}".format("schedules, one call per student", timed(per_student_calls)))
+    for fmt in ("text", "csv", "jsonl"):
+        print("{:<32} {:>10.2f}".format(f"schedules, export {fmt}",
+                                        timed(lambda: export_report(system, "schedules", fmt, sink))))
+        print("{:<32} {:>10.2f}".format(f"rosters, export {fmt}",
+                                        timed(lambda: export_report(system, "rosters", fmt, sink))))
+
+    def page_through():
+        _, cursor = roster_page(system, "HUGE1", None, 1_000)
+        while cursor is not None:
+            _, cursor = roster_page(system, "HUGE1", cursor, 1_000)
+
+    print("{:<32} {:>10.2f}".format("HUGE1 roster in pages of 1000", timed(page_through)))
+    sink.close()
+
+    # The text export of one student must match student_registered_course
+    out = io.StringIO()
+    export_report(system, "schedules", "text", out, ["s1"])
+    assert out.getvalue().splitlines()[1:-1] == ["  " + line for line in system.student_registered_course("s1").splitlines()]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark for the streaming importer.
+
+Writes CSV files with 5,000 courses, 200,000 students and 1,000,000 enrollment rows
+(a few of them bad on purpose), imports them, and reports rows per second and the peak
+memory used by the import itself, which should not grow with the file size.
+
+Usage:
+    python -m benchmarks.bench_import [--enrollments N]
+"""
+
+import argparse
+import csv
+import os
+import random
+import shutil
+import tempfile
+import tracemalloc
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from importer import import_file
+
+COURSES = 5_000
+STUDENTS = 200_000
+
+
+def write_files(directory: str, enrollments: int) -> dict:
+    """
+    Writes the courses, students and enrollments CSV files.
+
+    Arguments:
+        directory (str): Where to write the files.
+        enrollments (int): How many enrollment rows to write.
+
+    Returns:
+        dict: The path of each file by kind.
+    """
+    rng = random.Random(13)
+    paths = {kind: os.path.join(directory, f"{kind}.csv") for kind in ("courses", "students", "enrollments")}
+    with open(paths["courses"], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["course_id", "title", "description", "credits", "capacity"])
+        for c in range(COURSES):
+            writer.writerow([f"C{c}", f"Course {c}", "Imported course", rng.randint(1, 4), 400])
+        writer.writerow(["BAD1", "Bad course", "No capacity", 3, ""])
+    with open(paths["students"], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["student_id", "password"])
+        for s in range(STUDENTS):
+            writer.writerow([f"s{s}", PASSWORD_HASH])
+    with open(paths["enrollments"], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["student_id", "course_id"])
+        for _ in range(enrollments):
+            writer.writerow([f"s{rng.randrange(STUDENTS)}", f"C{rng.randrange(COURSES)}"])
+        writer.writerow(["nobody", "C1"])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--enrollments", type=int, default=1_000_000)
+    enrollments = parser.parse_args().enrollments
+
+    directory = tempfile.mkdtemp(prefix="reg_import_")
+    try:
+        paths = write_files(directory, enrollments)
+        system = RegistrationSystem()
+        for kind in ("courses", "students", "enrollments"):
+            report = import_file(system, kind, paths[kind], max_errors=3)
+            print(report)
+        # Import the enrollments file again while tracing memory: every row is now a duplicate,
+        # so the system doesn't grow and the peak shows only what the import pipeline itself holds.
+        tracemalloc.start()
+        report = import_file(system, "enrollments", paths["enrollments"], max_errors=0)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"Re-import of {report.rejected:,} duplicate rows: peak import memory {peak / 1024 / 1024:.1f} MiB")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark for password hashing and login sessions.
+
+First times one password check (PBKDF2 at the real number of rounds) next to one session
+token check, which is what every request after the login costs instead.
+
+Then starts a login storm: every account logs in at the same moment, through a SessionManager
+with 1, 2 and 4 worker threads, and each session then makes many requests. Prints logins per
+second and how long the requests would have taken if each one checked the password again.
+hashlib lets other threads run while it hashes, so more workers help when there are more CPU cores.
+
+Last, floods one account with wrong passwords, as someone guessing would, and prints how many
+passwords were really checked before the account was locked.
+
+Usage:
+    python -m benchmarks.bench_logins [--accounts 32]
+"""
+
+import argparse
+import time
+from concurrent.futures import wait
+
+from App import RegistrationSystem
+from auth import SessionManager, stored_passwords, verify_password
+from benchmarks.workload import PASSWORD
+
+REQUESTS_PER_SESSION = 1_000
+GUESSES = 10_000
+
+
+def per_second(function, args: tuple, seconds: float = 1.0) -> float:
+    """
+    Returns how many times per second a function can be called with the same arguments.
+    """
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        function(*args)
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login throughput and the cost of session checks.")
+    parser.add_argument("--accounts", type=int, default=32, help="accounts that log in at once")
+    args = parser.parse_args()
+
+    system = RegistrationSystem(thread_safe=True)
+    print(f"Hashing {args.accounts} passwords...")
+    hashes = stored_passwords([PASSWORD] * args.accounts)
+    system.add_students_batch((f"s{s}", hashes[s]) for s in range(args.accounts))
+    student_ids = [f"s{s}" for s in range(args.accounts)]
+
+    sessions = SessionManager(system)
+    token = sessions.login(student_ids[0], PASSWORD).token
+    hash_rate = per_second(verify_password, (PASSWORD, hashes[0]))
+    token_rate = per_second(sessions.validate, (token,))
+    sessions.close()
+    print(f"\nPassword check: {1e3 / hash_rate:,.1f} ms ({hash_rate:,.1f}/s); "
+          f"session check: {1e6 / token_rate:,.2f} us ({token_rate:,.0f}/s), {token_rate / hash_rate:,.0f}x faster")
+
+    print(f"\nLogin storm: {args.accounts} accounts at once, then {REQUESTS_PER_SESSION:,} requests each")
+    print("{:<8} {:>10} {:>12} {:>14} {:>22}".format("Workers", "login s", "logins/s", "requests s",
+                                                     "password each time s"))
+    for workers in (1, 2, 4):
+        sessions = SessionManager(system, workers=workers)
+        start = time.perf_counter()
+        futures = [sessions.submit_login(student_id, PASSWORD) for student_id in student_ids]
+        wait(futures)
+        login_seconds = time.perf_counter() - start
+        tokens = [future.result().token for future in futures]
+        start = time.perf_counter()
+        for token in tokens:
+            for _ in range(REQUESTS_PER_SESSION):
+                sessions.validate(token)
+        request_seconds = time.perf_counter() - start
+        sessions.close()
+        print("{:<8} {:>10.2f} {:>12.1f} {:>14.3f} {:>22,.0f}".format(
+            workers, login_seconds, args.accounts / login_seconds, request_seconds,
+            args.accounts * REQUESTS_PER_SESSION / hash_rate))
+
+    print(f"\nGuessing storm: {GUESSES:,} wrong passwords for one account at once")
+    sessions = SessionManager(system, workers=4)
+    start = time.perf_counter()
+    futures = [sessions.submit_login(student_ids[0], f"guess{n}") for n in range(GUESSES)]
+    wait(futures)
+    seconds = time.perf_counter() - start
+    sessions.close()
+    print(f"{sessions.stats['failed']} passwords checked, {sessions.stats['throttled']:,} turned away "
+          f"in {seconds:.2f} s (checking all would take {GUESSES / hash_rate:,.0f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark for the seat lottery.
+
+Builds 5,000 courses and 100,000 students who each rank 10 courses (popular courses are
+asked for far more often, so many are oversubscribed), then times:
+  - submitting every student's preferences,
+  - working out the allocation (a dry run),
+  - the full run, which also applies the seats with register_batch,
+and prints the fairness stats. A second dry run with the same seed checks that the result
+is reproducible.
+
+Usage:
+    python -m benchmarks.bench_lottery
+"""
+
+import random
+import time
+from itertools import accumulate
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH, ZIPF_EXPONENT
+
+COURSES = 5_000
+STUDENTS = 100_000
+PREFERENCES = 10
+MAX_COURSES = 5
+SEED = 2025
+
+
+def build() -> RegistrationSystem:
+    """
+    Creates the courses (some with meeting times) and students with no courses yet.
+    """
+    rng = random.Random(8)
+    system = RegistrationSystem(max_credits=18)
+    rows = []
+    for c in range(COURSES):
+        day = rng.randrange(5)
+        start = rng.randrange(8, 18) * 60
+        meetings = [(day, start, start + 75)] if rng.random() < 0.5 else ()
+        rows.append((f"C{c}", f"Course {c}", "Lottery benchmark", rng.choice((3, 3, 3, 4)), rng.randint(20, 120)))
+        system.add_course(*rows[-1], meetings)
+    system.add_students_batch((f"s{s}", PASSWORD_HASH) for s in range(STUDENTS))
+    return system
+
+
+def ranked_choices(rng: random.Random) -> list:
+    """
+    Makes every student's ranked list, with course popularity following a Zipf curve.
+    """
+    cumulative = list(accumulate(1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(COURSES)))
+    choices = []
+    for _ in range(STUDENTS):
+        picked = []
+        while len(picked) < PREFERENCES:
+            for i in rng.choices(range(COURSES), cum_weights=cumulative, k=PREFERENCES):
+                if f"C{i}" not in picked and len(picked) < PREFERENCES:
+                    picked.append(f"C{i}")
+        choices.append(picked)
+    return choices
+
+
+def main():
+    system = build()
+    choices = ranked_choices(random.Random(9))
+    seats = sum(course.capacity for course in system.courses.values())
+    print(f"{COURSES:,} courses ({seats:,} seats), {STUDENTS:,} students x {PREFERENCES} ranked choices, "
+          f"up to {MAX_COURSES} courses each")
+
+    start = time.perf_counter()
+    for s, ranked in enumerate(choices):
+        system.submit_preferences(f"s{s}", ranked)
+    submit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dry = system.run_lottery(SEED, MAX_COURSES, apply=False)
+    allocate_seconds = time.perf_counter() - start
+    again = system.run_lottery(SEED, MAX_COURSES, apply=False)
+    assert again.assignments == dry.assignments and again.order == dry.order
+
+    start = time.perf_counter()
+    result = system.run_lottery(SEED, MAX_COURSES)
+    run_seconds = time.perf_counter() - start
+    assert result.assignments == dry.assignments
+    assert all(status == "ok" for _, _, status in result.statuses)
+    assert system.check_consistency() == []
+
+    print("{:<44} {:>10.2f} s".format("submit_preferences (all students)", submit_seconds))
+    print("{:<44} {:>10.2f} s".format("run_lottery, allocation only", allocate_seconds))
+    print("{:<44} {:>10.2f} s".format("run_lottery, allocation + register_batch", run_seconds))
+    for name, value in result.stats.items():
+        print(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Memory report: bytes per enrollment for the regular and the compact registration systems.
+
+Builds the same students, courses and enrollments in both systems while tracemalloc
+counts the memory used, and prints the bytes per student, per course and per enrollment.
+
+Usage:
+    python -m benchmarks.bench_memory [--students N]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from compact import CompactRegistrationSystem
+
+COURSES = 5_000
+COURSES_PER_STUDENT = 5
+
+
+def measure(system_class, students: int) -> dict:
+    """
+    Fills a new system and measures the memory each stage adds.
+
+    Arguments:
+        system_class (type): RegistrationSystem or CompactRegistrationSystem.
+        students (int): How many students to add.
+
+    Returns:
+        dict: Bytes per student, per course and per enrollment, and the enrollment count.
+    """
+    rng = random.Random(9)
+    plan = [[f"C{rng.randrange(COURSES)}" for _ in range(COURSES_PER_STUDENT)] for _ in range(students)]
+    gc.collect()
+    tracemalloc.start()
+    system = system_class()
+    base = tracemalloc.get_traced_memory()[0]
+    for c in range(COURSES):
+        system.add_course(f"C{c}", f"Course {c}", "Memory benchmark", 3, students)
+    after_courses = tracemalloc.get_traced_memory()[0]
+    for s in range(students):
+        system.add_student(f"s{s}", PASSWORD_HASH)
+    after_students = tracemalloc.get_traced_memory()[0]
+    enrollments = 0
+    for s, course_ids in enumerate(plan):
+        for cid in course_ids:
+            try:
+                system.student_course_register(f"s{s}", cid)
+                enrollments += 1
+            except Exception:
+                pass
+    after_enrollments = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "course": (after_courses - base) / COURSES,
+        "student": (after_students - after_courses) / students,
+        "enrollment": (after_enrollments - after_students) / enrollments,
+        "enrollments": enrollments,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=100_000)
+    students = parser.parse_args().students
+
+    regular = measure(RegistrationSystem, students)
+    compact = measure(CompactRegistrationSystem, students)
+    print(f"{students:,} students, {COURSES:,} courses, {regular['enrollments']:,} enrollments")
+    print("{:<12} {:>14} {:>14} {:>10}".format("Bytes per", "regular", "compact", "saved"))
+    for key in ("course", "student", "enrollment"):
+        print("{:<12} {:>14,.1f} {:>14,.1f} {:>9.0%}".format(
+            key, regular[key], compact[key], 1 - compact[key] / regular[key]
+        ))
+
+
+if __name__ == "__main__":
+    main()
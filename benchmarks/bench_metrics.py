@@ -0,0 +1,95 @@
+"""
+Benchmark for the cost of metrics.
+
+Times registering and dropping with and without instrument(), from one thread and from
+several threads at once, to show how much each call pays for being counted and timed.
+Then runs a deliberately slow report with the SlowOperationSampler on and prints the
+stacks it caught.
+
+Usage:
+    python -m benchmarks.bench_metrics
+"""
+
+import threading
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from metrics import SlowOperationSampler, instrument
+
+COURSES = 200
+STUDENTS = 10_000
+THREADS = 4
+
+
+def build() -> RegistrationSystem:
+    system = RegistrationSystem(thread_safe=True)
+    for c in range(COURSES):
+        system.add_course(f"C{c}", f"Course {c}", "Metrics benchmark", 3, STUDENTS)
+    system.add_students_batch((f"s{s}", PASSWORD_HASH) for s in range(STUDENTS))
+    return system
+
+
+def churn(system: RegistrationSystem, students: range):
+    """
+    Registers each student for one course and drops them again.
+    """
+    register = system.student_course_register
+    drop = system.student_course_remove
+    for s in students:
+        register(f"s{s}", f"C{s % COURSES}")
+    for s in students:
+        drop(f"s{s}", f"C{s % COURSES}")
+
+
+def run(system: RegistrationSystem, threads: int) -> float:
+    """
+    Runs churn split over some threads.
+
+    Returns:
+        float: Calls per second.
+    """
+    size = STUDENTS // threads
+    workers = [threading.Thread(target=churn, args=(system, range(t * size, (t + 1) * size)))
+               for t in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return 2 * size * threads / (time.perf_counter() - start)
+
+
+def main():
+    print("{:<36} {:>14} {:>14} {:>9}".format("Register + drop", "plain calls/s", "timed calls/s", "us added"))
+    for threads in (1, THREADS):
+        plain = run(build(), threads)
+        system = build()
+        metrics = instrument(system)
+        timed = run(system, threads)
+        calls = metrics.operations()["student_course_register"].calls
+        assert calls == STUDENTS // threads * threads
+        print("{:<36} {:>14,.0f} {:>14,.0f} {:>9.2f}".format(f"{threads} thread(s)", plain, timed,
+                                                              (1 / timed - 1 / plain) * 1e6))
+
+    report = metrics.report(system)["operations"]["student_course_register"]
+    print(f"student_course_register: p50 {report['p50_us']} us, p95 {report['p95_us']} us, "
+          f"p99 {report['p99_us']} us, max {report['max_us']} us")
+
+    # The whole-system reports take long enough on a big system for the sampler to see them
+    sampler = SlowOperationSampler(metrics, slow_ms=1, interval_ms=1)
+    sampler.start()
+    for s in range(STUDENTS):
+        system.student_course_register(f"s{s}", f"C{s % COURSES}")
+    for _ in range(5):
+        system.find_conflicts()
+        system.view_available_courses()
+        system.check_consistency()
+    sampler.stop()
+    print("Hottest slow stacks:")
+    for stack in sampler.folded(5):
+        print(f"  {stack}")
+
+
+if __name__ == "__main__":
+    main()
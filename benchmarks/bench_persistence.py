@@ -0,0 +1,90 @@
+"""
+Benchmark for the write-ahead log and snapshot persistence.
+
+For each sync mode it measures registrations per second, bytes written to disk per
+registration (write amplification, including snapshots) and fsyncs per registration.
+Then it measures how long a fresh process takes to recover (snapshot load + log replay).
+
+Usage:
+    python -m benchmarks.bench_persistence
+"""
+
+import shutil
+import tempfile
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from persistence import PersistentStore, SYNC_ALWAYS, SYNC_GROUP, SYNC_NONE
+
+COURSES = 200
+STUDENTS = 5_000
+COURSES_PER_STUDENT = 4
+
+
+def fill(system: RegistrationSystem) -> int:
+    """
+    Adds courses and students and registers every student for a few courses.
+
+    Argument:
+        system (RegistrationSystem): The system to fill.
+
+    Returns:
+        int: How many registrations were made.
+    """
+    for c in range(COURSES):
+        system.add_course(f"C{c}", f"Course {c}", "Persistence benchmark", 3, STUDENTS)
+    for s in range(STUDENTS):
+        system.add_student(f"s{s}", PASSWORD_HASH)
+    count = 0
+    for s in range(STUDENTS):
+        for k in range(COURSES_PER_STUDENT):
+            system.student_course_register(f"s{s}", f"C{(s * 7 + k * 13) % COURSES}")
+            count += 1
+    return count
+
+
+def run_mode(sync: str, snapshot_every) -> None:
+    """
+    Fills a persistent system with one sync mode, recovers it into a new system and prints the results.
+    """
+    directory = tempfile.mkdtemp(prefix="reg_bench_")
+    try:
+        store = PersistentStore(directory, sync=sync, snapshot_every=snapshot_every)
+        system = RegistrationSystem()
+        store.open(system)
+        start = time.perf_counter()
+        registrations = fill(system)
+        elapsed = time.perf_counter() - start
+        amplification = store.write_amplification(registrations)
+        syncs = store.log.syncs / registrations
+        store.close()
+
+        recovered = RegistrationSystem()
+        recovery_store = PersistentStore(directory, sync=sync, snapshot_every=None)
+        recovery_store.open(recovered)
+        assert recovered.check_consistency() == []
+        for cid, course in system.courses.items():
+            assert recovered.list_students_for_course(cid) == course.registered_students.to_list()
+        recovery_store.close()
+
+        print("{:<8} {:>10} {:>12,.0f} {:>12.1f} {:>10.3f} {:>12.3f}".format(
+            sync, str(snapshot_every), registrations / elapsed, amplification, syncs,
+            recovery_store.recovery_seconds
+        ))
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    print("{:<8} {:>10} {:>12} {:>12} {:>10} {:>12}".format(
+        "Sync", "Snapshot", "Regs/s", "Bytes/reg", "Syncs/reg", "Recovery (s)"
+    ))
+    run_mode(SYNC_NONE, None)
+    run_mode(SYNC_NONE, 5_000)
+    run_mode(SYNC_GROUP, 5_000)
+    run_mode(SYNC_ALWAYS, 5_000)
+
+
+if __name__ == "__main__":
+    main()
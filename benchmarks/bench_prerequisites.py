@@ -0,0 +1,116 @@
+"""
+Benchmark for prerequisite checks.
+
+Builds a catalog of deep prerequisite chains (each course needs the previous one in its
+track, plus sometimes a course from another track), gives every student some completed
+courses, and compares:
+  - checking eligibility by walking the prerequisite chains of the student's completed
+    courses on every registration (depth-first search),
+    against the precomputed transitive closure (one bit operation per check),
+  - the bulk "which courses can this student take" query, done both ways.
+
+Usage:
+    python -m benchmarks.bench_prerequisites
+"""
+
+import random
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+
+TRACKS = 40
+DEPTH = 50
+STUDENTS = 2_000
+COMPLETED_PER_STUDENT = 8
+CHECKS = 30_000
+BULK_STUDENTS = 200
+
+
+def build() -> RegistrationSystem:
+    """
+    Creates TRACKS chains of DEPTH courses and students with random completed courses.
+    """
+    rng = random.Random(3)
+    system = RegistrationSystem()
+    for depth in range(DEPTH):
+        for track in range(TRACKS):
+            prerequisites = []
+            if depth:
+                prerequisites.append(f"T{track}L{depth - 1}")
+                if rng.random() < 0.3:
+                    prerequisites.append(f"T{rng.randrange(TRACKS)}L{rng.randrange(depth)}")
+            system.add_course(f"T{track}L{depth}", f"Track {track} level {depth}", "Prerequisite benchmark",
+                              3, 1_000, (), prerequisites)
+    course_ids = list(system.courses)
+    for s in range(STUDENTS):
+        system.add_student(f"s{s}", PASSWORD_HASH)
+        for cid in rng.sample(course_ids, COMPLETED_PER_STUDENT):
+            system.complete_course(f"s{s}", cid)
+    return system
+
+
+def walked_credit(system: RegistrationSystem, student_id: str) -> set:
+    """
+    Finds every course a student has credit for by walking back from each completed course.
+    """
+    credit = set()
+    stack = list(system.students[student_id].completed_courses)
+    while stack:
+        cid = stack.pop()
+        if cid not in credit:
+            credit.add(cid)
+            stack.extend(system.courses[cid].prerequisites)
+    return credit
+
+
+def walked_eligible(system: RegistrationSystem, student_id: str, course_id: str) -> bool:
+    credit = walked_credit(system, student_id)
+    return all(cid in credit for cid in system.courses[course_id].prerequisites)
+
+
+def walked_bulk(system: RegistrationSystem, student_id: str) -> list:
+    student = system.students[student_id]
+    credit = walked_credit(system, student_id)
+    return [cid for cid, course in system.courses.items()
+            if all(p in credit for p in course.prerequisites)
+            and cid not in student.completed_courses and cid not in student.registered_courses]
+
+
+def main():
+    start = time.perf_counter()
+    system = build()
+    build_seconds = time.perf_counter() - start
+    print(f"{len(system.courses):,} courses in {TRACKS} chains of depth {DEPTH}, {STUDENTS:,} students "
+          f"(graph and closure built in {build_seconds:.2f} seconds)")
+
+    rng = random.Random(4)
+    course_ids = list(system.courses)
+    checks = [(f"s{rng.randrange(STUDENTS)}", rng.choice(course_ids)) for _ in range(CHECKS)]
+    start = time.perf_counter()
+    walked = [walked_eligible(system, sid, cid) for sid, cid in checks]
+    walked_rate = CHECKS / (time.perf_counter() - start)
+    start = time.perf_counter()
+    closure = [not system._missing_prerequisites(system.students[sid], system.courses[cid]) for sid, cid in checks]
+    closure_rate = CHECKS / (time.perf_counter() - start)
+    assert walked == closure
+
+    students = [f"s{s}" for s in range(BULK_STUDENTS)]
+    start = time.perf_counter()
+    expected = [walked_bulk(system, sid) for sid in students]
+    walked_bulk_rate = BULK_STUDENTS / (time.perf_counter() - start)
+    start = time.perf_counter()
+    found = [system.eligible_courses(sid) for sid in students]
+    closure_bulk_rate = BULK_STUDENTS / (time.perf_counter() - start)
+    assert found == expected
+
+    print("{:<44} {:>14}".format("Eligibility check", "checks/s"))
+    print("{:<44} {:>14,.0f}".format("walk prerequisite chains", walked_rate))
+    print("{:<44} {:>14,.0f}".format("transitive closure bitsets", closure_rate))
+    print("{:<44} {:>14}".format("eligible_courses (whole catalog)", "students/s"))
+    print("{:<44} {:>14,.0f}".format("walk prerequisite chains", walked_bulk_rate))
+    print("{:<44} {:>14,.0f}".format("transitive closure bitsets", closure_bulk_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Load generator for the network server.
+
+Starts a server in a separate process for a synthetic school (see benchmarks/workload.py),
+then opens many client connections at once, each logged in as a different student.
+Every client sends requests one after another: mostly catalog pages and searches (which
+many students ask for at the same moment, so the server can coalesce them), some looks at
+their own schedule, and registrations and drops (writes). Prints the latency percentiles of
+each kind of request, the overall requests per second and the server's own counters.
+The run is repeated with read coalescing turned off, for comparison.
+
+Usage:
+    python -m benchmarks.bench_server [--clients 1000] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD, generate, populate
+from server import RegistrationClient, RegistrationServer
+
+COURSES = 2_000
+STUDENTS = 20_000
+PAGE_SIZE = 20
+# Request kind -> share of the requests
+MIX = (("catalog", 0.45), ("search", 0.2), ("schedule", 0.15), ("register", 0.1), ("drop", 0.1))
+
+
+def run_server(coalesce: bool, ports):
+    """
+    Builds the school and serves it (runs in the server process). Sends the port back once listening.
+    """
+    workload = generate(COURSES, STUDENTS)
+    system = RegistrationSystem()
+    populate(system, workload)
+
+    async def serve():
+        server = RegistrationServer(system, port=0, coalesce=coalesce)
+        await server.start()
+        ports.send(server.port)
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def percentile(values: list, share: float) -> float:
+    return values[min(len(values) - 1, int(share * len(values)))] if values else 0.0
+
+
+async def client(port: int, number: int, requests: int, courses: list, words: list, latencies: dict,
+                 started: asyncio.Event):
+    """
+    One simulated student: logs in, waits for every other client, then sends its requests one at a time.
+    """
+    rng = random.Random(number)
+    student_id = f"s{number}"
+    connection = await RegistrationClient.connect(port=port)
+    await connection.login(student_id, PASSWORD)
+    await started.wait()
+    kinds = [kind for kind, _ in MIX]
+    weights = [share for _, share in MIX]
+    registered = []
+    try:
+        for _ in range(requests):
+            kind = rng.choices(kinds, weights)[0]
+            if kind == "drop" and not registered:
+                kind = "register"
+            start = time.perf_counter()
+            try:
+                if kind == "catalog":
+                    await connection.call("catalog_rows", True, rng.randrange(3), PAGE_SIZE)
+                elif kind == "search":
+                    await connection.call("search_courses", rng.choice(words[:10]), True, 10)
+                elif kind == "schedule":
+                    await connection.call("list_courses_for_student", student_id)
+                elif kind == "register":
+                    course_id = rng.choice(courses)
+                    await connection.call("student_course_register", student_id, course_id)
+                    registered.append(course_id)
+                else:
+                    await connection.call("student_course_remove", student_id, registered.pop())
+            except Exception:
+                # Full courses, duplicates and time conflicts are normal answers here
+                pass
+            latencies[kind].append(time.perf_counter() - start)
+    finally:
+        await connection.close()
+
+
+async def load(port: int, clients: int, requests: int) -> tuple:
+    """
+    Runs every client against the server.
+
+    Returns:
+        tuple: The latencies of each request kind, the seconds the requests took, and the server's counters.
+    """
+    workload = generate(COURSES, STUDENTS)
+    courses = [row[0] for row in workload.courses]
+    latencies = {kind: [] for kind, _ in MIX}
+    started = asyncio.Event()
+    tasks = []
+    # Connect a few hundred at a time so the listen backlog doesn't overflow
+    for first in range(0, clients, 250):
+        batch = [asyncio.create_task(client(port, n, requests, courses, workload.words, latencies, started))
+                 for n in range(first, min(first + 250, clients))]
+        tasks.extend(batch)
+        await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    started.set()
+    await asyncio.gather(*tasks)
+    seconds = time.perf_counter() - start
+
+    admin = await RegistrationClient.connect(port=port)
+    await admin.login("admin", "password")
+    stats = await admin.call("server_stats")
+    assert await admin.call("check_consistency") == []
+    await admin.close()
+    return latencies, seconds, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the network server's latency under many clients.")
+    parser.add_argument("--clients", type=int, default=1_000, help="concurrent client connections")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    print(f"{COURSES:,} courses, {STUDENTS:,} students; {args.clients:,} clients x {args.requests} requests")
+    for coalesce in (True, False):
+        ports, child_ports = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_server, args=(coalesce, child_ports), daemon=True)
+        process.start()
+        port = ports.recv()
+        try:
+            latencies, seconds, stats = asyncio.run(load(port, args.clients, args.requests))
+        finally:
+            process.terminate()
+            process.join()
+
+        total = sum(len(values) for values in latencies.values())
+        print(f"\nCoalescing {'on' if coalesce else 'off'}: {total:,} requests in {seconds:.2f} s "
+              f"({total / seconds:,.0f} requests/s)")
+        print("{:<10} {:>8} {:>10} {:>10} {:>10}".format("Request", "count", "p50 ms", "p95 ms", "p99 ms"))
+        for kind, values in latencies.items():
+            values.sort()
+            print("{:<10} {:>8,} {:>10.2f} {:>10.2f} {:>10.2f}".format(
+                kind, len(values), percentile(values, 0.5) * 1e3, percentile(values, 0.95) * 1e3,
+                percentile(values, 0.99) * 1e3))
+        reads = stats["reads"] + stats["coalesced"]
+        print(f"Server: {stats['reads']:,} reads computed for {reads:,} read requests "
+              f"({stats['coalesced'] / max(reads, 1):.0%} coalesced); {stats['writes']:,} writes in "
+              f"{stats['write_batches']:,} batches (largest {stats['largest_write_batch']})")
+
+
+if __name__ == "__main__":
+    main()
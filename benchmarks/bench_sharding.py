@@ -0,0 +1,119 @@
+"""
+Benchmark for the sharded (multi-process) registration system.
+
+Registers the same pairs with one in-process RegistrationSystem, then with
+ShardedRegistrationSystem as the number of worker processes goes from 1 up to the
+number of CPU cores (and at least 4), and prints the pairs per second of each:
+  - register_batch in chunks, where the shards work on their parts side by side,
+  - student_course_register called from one client thread per worker.
+Every run must pass check_consistency and give the in-process statuses, apart from the few pairs
+turned away because an earlier pair of the same student was still being counted when its course
+turned out to be full (see ShardedRegistrationSystem.register_batch). Workers only add
+throughput when there are free cores for them; on a single core the numbers show
+the cost of sending calls to other processes.
+
+Usage:
+    python -m benchmarks.bench_sharding
+"""
+
+import os
+import random
+import threading
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from sharding import ShardedRegistrationSystem
+
+COURSES = 2_000
+STUDENTS = 40_000
+PAIRS = 200_000
+CHUNK = 20_000
+SINGLE_CALLS = 20_000
+WORKERS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def build(system):
+    """
+    Adds the courses (some with meeting times, some nearly full) and students.
+    """
+    rng = random.Random(5)
+    rows = []
+    for c in range(COURSES):
+        day = rng.randrange(5)
+        start = rng.randrange(8, 18) * 60
+        meetings = [(day, start, start + 50)] if rng.random() < 0.3 else ()
+        rows.append((f"C{c}", f"Course {c}", "Sharding benchmark", 3, rng.randint(40, 200), meetings))
+    system.add_courses_batch(rows)
+    system.add_students_batch((f"s{s}", PASSWORD_HASH) for s in range(STUDENTS))
+    return system
+
+
+def build_pairs() -> list:
+    rng = random.Random(6)
+    return [(f"s{rng.randrange(STUDENTS)}", f"C{rng.randrange(COURSES)}") for _ in range(PAIRS)]
+
+
+def batch_rate(system, pairs: list) -> tuple:
+    """
+    Registers the pairs with register_batch, CHUNK pairs per call.
+
+    Returns:
+        tuple: Pairs per second, and the statuses.
+    """
+    statuses = []
+    start = time.perf_counter()
+    for i in range(0, len(pairs), CHUNK):
+        statuses.extend(status for _, _, status in system.register_batch(pairs[i:i + CHUNK]))
+    return len(pairs) / (time.perf_counter() - start), statuses
+
+
+def single_rate(system, pairs: list, threads: int) -> float:
+    """
+    Calls student_course_register for each pair from several client threads (failures are expected).
+
+    Returns:
+        float: Calls per second.
+    """
+    def work(part):
+        for student_id, course_id in part:
+            try:
+                system.student_course_register(student_id, course_id)
+            except Exception:
+                pass
+
+    workers = [threading.Thread(target=work, args=(pairs[t::threads],)) for t in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def main():
+    pairs = build_pairs()
+    extra = [(f"s{s}", f"C{(s * 7) % COURSES}") for s in range(SINGLE_CALLS)]
+    print(f"{COURSES:,} courses, {STUDENTS:,} students, {PAIRS:,} pairs in chunks of {CHUNK:,}; "
+          f"{os.cpu_count()} CPU core(s)")
+    print("{:<26} {:>16} {:>16} {:>8}".format("System", "batch pairs/s", "single calls/s", "differ"))
+
+    baseline = build(RegistrationSystem())
+    rate, expected = batch_rate(baseline, pairs)
+    single = single_rate(baseline, extra, 1)
+    print("{:<26} {:>16,.0f} {:>16,.0f} {:>8}".format("in-process", rate, single, "-"))
+
+    for workers in WORKERS:
+        with ShardedRegistrationSystem(shards=workers) as system:
+            build(system)
+            rate, statuses = batch_rate(system, pairs)
+            differ = [(want, got) for want, got in zip(expected, statuses) if want != got]
+            assert all(want == "ok" and got in ("conflict", "credit_limit") for want, got in differ), differ[:5]
+            single = single_rate(system, extra, workers)
+            assert system.check_consistency() == []
+            print("{:<26} {:>16,.0f} {:>16,.0f} {:>8}".format(f"sharded, {workers} worker(s)", rate, single,
+                                                               len(differ)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark for copy-on-write snapshots.
+
+First times taking a snapshot of systems of growing size, next to copying the whole state
+(persistence.snapshot_state), which is what a report would otherwise need while writers wait.
+The in-memory snapshot and the SQLite (database file) snapshot should take the same time at every size.
+
+Then runs registrations and drops in one thread while another thread writes the roster and
+schedule reports over and over, three ways:
+  - live:     reading the live records with no locking (reports can come out torn, or fail
+              when a roster changes while it is being read),
+  - locked:   holding one lock for the whole report, which writers also take (reports are right,
+              but every registration waits for the report),
+  - snapshot: reading a snapshot taken at the start of each report.
+Prints the writer's operations per second, its longest wait, and how many reports were torn
+(a student listed in a roster without the course in their schedule, or the other way round).
+
+Usage:
+    python -m benchmarks.bench_snapshots
+"""
+
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+
+from App import RegistrationSystem
+from benchmarks.workload import generate, populate
+from export import export_report
+from persistence import snapshot_state
+from sqlite_storage import SQLiteRegistrationSystem
+
+SIZES = ((500, 5_000), (2_000, 20_000), (8_000, 80_000))
+SNAPSHOTS = 2_000
+RUN_SECONDS = 3.0
+
+
+def snapshot_seconds(system, count: int) -> float:
+    """
+    Returns the average seconds to take (and close) one snapshot.
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        system.snapshot().close()
+    return (time.perf_counter() - start) / count
+
+
+def creation_costs():
+    print("{:<26} {:>14} {:>18} {:>16}".format("Size", "snapshot us", "sqlite file us", "full copy ms"))
+    for courses, students in SIZES:
+        workload = generate(courses, students)
+        system = RegistrationSystem()
+        populate(system, workload)
+        start = time.perf_counter()
+        snapshot_state(system)
+        copy_ms = (time.perf_counter() - start) * 1e3
+        with tempfile.TemporaryDirectory() as directory:
+            database = SQLiteRegistrationSystem(os.path.join(directory, "bench.db"))
+            populate(database, workload)
+            sqlite_us = snapshot_seconds(database, SNAPSHOTS // 10) * 1e6
+            database.close()
+        print("{:<26} {:>14.2f} {:>18.1f} {:>16.1f}".format(
+            f"{courses:,} courses, {students:,}", snapshot_seconds(system, SNAPSHOTS) * 1e6, sqlite_us, copy_ms))
+
+
+def torn(system) -> bool:
+    """
+    Writes both reports and checks that rosters and schedules list the same enrollments.
+    """
+    rosters, schedules = io.StringIO(), io.StringIO()
+    export_report(system, "rosters", "csv", rosters)
+    export_report(system, "schedules", "csv", schedules)
+    by_course = {tuple(line.split(",")[::2]) for line in rosters.getvalue().splitlines()[1:]}
+    by_student = {tuple(line.split(",")[1::-1]) for line in schedules.getvalue().splitlines()[1:]}
+    return by_course != by_student
+
+
+def run(mode: str, workload) -> tuple:
+    """
+    Runs the writer and the report thread for RUN_SECONDS.
+
+    Returns:
+        tuple: Writer operations per second, the longest single operation in ms,
+        the number of reports written, and how many of them were torn or failed.
+    """
+    system = RegistrationSystem(thread_safe=True)
+    populate(system, workload)
+    courses = [row[0] for row in workload.courses]
+    students = [row[0] for row in workload.students]
+    report_lock = threading.Lock()
+    stop = threading.Event()
+    counts = {"ops": 0, "longest": 0.0, "reports": 0, "torn": 0}
+
+    def writer():
+        rng = random.Random(3)
+        held = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            with report_lock if mode == "locked" else nullcontext():
+                try:
+                    if held and rng.random() < 0.5:
+                        system.student_course_remove(*held.pop(rng.randrange(len(held))))
+                    else:
+                        pair = (rng.choice(students), rng.choice(courses))
+                        system.student_course_register(*pair)
+                        held.append(pair)
+                except Exception:
+                    pass
+            counts["longest"] = max(counts["longest"], time.perf_counter() - start)
+            counts["ops"] += 1
+
+    def reporter():
+        while not stop.is_set():
+            try:
+                if mode == "snapshot":
+                    with system.snapshot() as snapshot:
+                        bad = torn(snapshot)
+                elif mode == "locked":
+                    with report_lock:
+                        bad = torn(system)
+                else:
+                    bad = torn(system)
+            except RuntimeError:
+                bad = True
+            counts["reports"] += 1
+            counts["torn"] += bad
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reporter)]
+    for thread in threads:
+        thread.start()
+    time.sleep(RUN_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert system.check_consistency() == []
+    return counts["ops"] / RUN_SECONDS, counts["longest"] * 1e3, counts["reports"], counts["torn"]
+
+
+def main():
+    creation_costs()
+    courses, students = SIZES[0]
+    workload = generate(courses, students)
+    print(f"\nWriter and report thread side by side, {courses:,} courses and {students:,} students, "
+          f"{RUN_SECONDS:.0f} s each")
+    print("{:<10} {:>14} {:>16} {:>10} {:>8}".format("Reports", "writer ops/s", "longest op ms", "reports", "torn"))
+    for mode in ("live", "locked", "snapshot"):
+        rate, longest, reports, bad = run(mode, workload)
+        print("{:<10} {:>14,.0f} {:>16.1f} {:>10} {:>8}".format(mode, rate, longest, reports, bad))
+
+
+if __name__ == "__main__":
+    main()
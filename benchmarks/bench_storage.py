@@ -0,0 +1,131 @@
+"""
+Compares the in-memory and SQLite storage backends.
+
+Both systems are loaded with the same 100,000 students and 2,000 courses, then
+register, drop and search are timed on each.
+
+Usage:
+    python -m benchmarks.bench_storage [--students N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+from sqlite_storage import SQLiteRegistrationSystem
+
+COURSES = 2_000
+OPERATIONS = 20_000
+SEARCHES = 500
+WORDS = ["intro", "advanced", "data", "systems", "theory", "design", "history", "physics", "calculus", "art"]
+
+
+def load(system: RegistrationSystem, students: int):
+    """
+    Adds the benchmark courses and students to a system.
+
+    SQLite rows are inserted with one executemany per table so setup time isn't measured as part of the test.
+
+    Arguments:
+        system (RegistrationSystem): The system to fill (either backend).
+        students (int): How many students to add.
+    """
+    rng = random.Random(3)
+    courses = [(f"C{c}", " ".join(rng.choice(WORDS) for _ in range(3)), "Storage benchmark", 3, 200)
+               for c in range(COURSES)]
+    accounts = [(f"s{s}", PASSWORD_HASH) for s in range(students)]
+    if isinstance(system, SQLiteRegistrationSystem):
+        with system.pool.connection() as conn:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT INTO courses (course_id, title, description, credits, capacity) "
+                             "VALUES (?, ?, ?, ?, ?)", courses)
+            conn.executemany("INSERT INTO students (student_id, password) VALUES (?, ?)", accounts)
+            conn.execute("COMMIT")
+    else:
+        for course in courses:
+            system.add_course(*course)
+        for sid, password in accounts:
+            system.add_student(sid, password)
+
+
+def timed(operations: int, action) -> float:
+    """
+    Runs an action and returns how many operations per second it managed.
+    """
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    return operations / elapsed
+
+
+def run(system: RegistrationSystem, students: int) -> dict:
+    """
+    Times register, drop and search on a loaded system.
+
+    Arguments:
+        system (RegistrationSystem): A system filled by load().
+        students (int): How many students were loaded.
+
+    Returns:
+        dict: Operations per second for each operation.
+    """
+    rng = random.Random(5)
+    pairs = list({(f"s{rng.randrange(students)}", f"C{rng.randrange(COURSES)}") for _ in range(OPERATIONS)})
+    terms = [rng.choice(WORDS)[:rng.randint(2, 6)] for _ in range(SEARCHES)]
+
+    def register():
+        for sid, cid in pairs:
+            try:
+                system.student_course_register(sid, cid)
+            except Exception:
+                pass
+
+    def drop():
+        for sid, cid in pairs:
+            try:
+                system.student_course_remove(sid, cid)
+            except Exception:
+                pass
+
+    def search():
+        for term in terms:
+            system.search_courses(term, limit=20)
+
+    return {
+        "register": timed(len(pairs), register),
+        "drop": timed(len(pairs), drop),
+        "search": timed(len(terms), search),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=100_000)
+    students = parser.parse_args().students
+
+    memory = RegistrationSystem()
+    load(memory, students)
+    memory_results = run(memory, students)
+
+    directory = tempfile.mkdtemp(prefix="reg_sqlite_")
+    try:
+        sqlite = SQLiteRegistrationSystem(os.path.join(directory, "registration.db"))
+        load(sqlite, students)
+        sqlite_results = run(sqlite, students)
+        sqlite.close()
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"{students:,} students, {COURSES:,} courses")
+    print("{:<10} {:>16} {:>16}".format("Operation", "memory (ops/s)", "sqlite (ops/s)"))
+    for op in memory_results:
+        print("{:<10} {:>16,.0f} {:>16,.0f}".format(op, memory_results[op], sqlite_results[op]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for course waitlists and automatic promotion.
+
+For each waitlist size, one full course gets that many waiting students. Then it times:
+  - joining the waitlist,
+  - drop cascades: a registered student drops, the next waiting student is promoted,
+    and then that student drops too, and so on (one promotion per drop),
+  - one big cascade: the capacity is raised so every waiting student is promoted at once,
+  - position queries, which count the students ahead and so grow with the waitlist.
+
+Usage:
+    python -m benchmarks.bench_waitlist
+"""
+
+import time
+
+from App import RegistrationSystem
+from benchmarks.workload import PASSWORD_HASH
+
+SIZES = (1_000, 10_000, 100_000)
+DROPS = 1_000
+POSITION_QUERIES = 100
+
+
+def build(size: int, by_standing: bool) -> RegistrationSystem:
+    """
+    Creates a system with one full course (capacity 1) and `size` other students.
+    """
+    system = RegistrationSystem(waitlist_by_standing=by_standing)
+    system.add_course("WL101", "Waitlisted Course", "Waitlist benchmark", 3, 1)
+    for s in range(size):
+        system.add_student(f"s{s}", PASSWORD_HASH, s % 4 + 1)
+    system.student_course_register("student1", "WL101")
+    return system
+
+
+def run(size: int, by_standing: bool) -> dict:
+    """
+    Times each waitlist operation at one waitlist size and returns operations per second.
+    """
+    system = build(size, by_standing)
+    start = time.perf_counter()
+    for s in range(size):
+        system.join_waitlist(f"s{s}", "WL101")
+    join_rate = size / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    queries = [f"s{s}" for s in range(0, size, max(1, size // POSITION_QUERIES))]
+    for student_id in queries:
+        system.waitlist_position(student_id, "WL101")
+    position_rate = len(queries) / (time.perf_counter() - start)
+
+    drops = min(DROPS, size // 2)
+    start = time.perf_counter()
+    for _ in range(drops):
+        student_id = system.list_students_for_course("WL101")[0]
+        system.student_course_remove(student_id, "WL101")
+    drop_rate = drops / (time.perf_counter() - start)
+
+    waiting = len(system.waitlists["WL101"])
+    start = time.perf_counter()
+    system.update_course("WL101", capacity=waiting + 1)
+    cascade_rate = waiting / (time.perf_counter() - start)
+    assert "WL101" not in system.waitlists and system.check_consistency() == []
+    return {"join": join_rate, "position": position_rate, "drop": drop_rate, "cascade": cascade_rate}
+
+
+def main():
+    print("{:<10} {:<12} {:>12} {:>14} {:>16} {:>14}".format(
+        "Waitlist", "Order", "joins/s", "positions/s", "drop+promote/s", "cascade/s"))
+    for size in SIZES:
+        for by_standing in (False, True):
+            rates = run(size, by_standing)
+            print("{:<10,} {:<12} {:>12,.0f} {:>14,.0f} {:>16,.0f} {:>14,.0f}".format(
+                size, "standing" if by_standing else "fifo", rates["join"], rates["position"],
+                rates["drop"], rates["cascade"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Stress check for thread-safe registration.
+
+Starts thousands of threads that all try to take the only seat of a 1-seat course
+at the same moment, then checks that the course never went over capacity and that
+course and student lists still agree. It repeats this for several rounds, then
+times registrations spread over many courses to show they run without blocking each other.
+
+Usage:
+    python -m benchmarks.stress_concurrency
+"""
+
+import sys
+import threading
+import time
+
+from App import RegistrationSystem, Student
+
+THREADS = 2_000
+ROUNDS = 5
+
+
+def add_students(system: RegistrationSystem, count: int):
+    """
+    Adds `count` students named s0, s1, ... to the system.
+
+    Arguments:
+        system (RegistrationSystem): The system to fill.
+        count (int): How many students to add.
+    """
+    for i in range(count):
+        system.students[f"s{i}"] = Student(f"s{i}", "pass123")
+
+
+def race_for_one_seat(threads: int) -> int:
+    """
+    Lets `threads` students try to register for the same 1-seat course at once.
+
+    Argument:
+        threads (int): How many students (one thread each) compete for the seat.
+
+    Returns:
+        int: How many registrations succeeded. Must be exactly 1.
+
+    Raises:
+        AssertionError: If the course went over capacity or the records disagree.
+    """
+    system = RegistrationSystem(thread_safe=True)
+    system.add_course("HOT1", "Popular Course", "Only one seat", 3, 1)
+    add_students(system, threads)
+    barrier = threading.Barrier(threads)
+    successes = []
+
+    def worker(sid: str):
+        barrier.wait()
+        try:
+            system.student_course_register(sid, "HOT1")
+            successes.append(sid)
+        except Exception:
+            pass
+
+    workers = [threading.Thread(target=worker, args=(f"s{i}",)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    roster = system.list_students_for_course("HOT1")
+    assert len(roster) <= 1, f"Capacity exceeded: {len(roster)} students in a 1-seat course"
+    assert roster == successes, "Roster does not match successful registrations"
+    assert not system.check_consistency(), system.check_consistency()
+    return len(successes)
+
+
+def spread_registrations(threads: int, courses: int) -> float:
+    """
+    Times `threads` threads registering their own student across many courses.
+
+    Arguments:
+        threads (int): How many threads (and students) to run.
+        courses (int): How many courses the registrations are spread over.
+
+    Returns:
+        float: Registrations per second.
+    """
+    system = RegistrationSystem(thread_safe=True)
+    for c in range(courses):
+        system.add_course(f"C{c}", f"Course {c}", "Spread test", 3, threads)
+    add_students(system, threads)
+
+    def worker(index: int):
+        sid = f"s{index}"
+        for c in range(index % courses, courses, 7):
+            system.student_course_register(sid, f"C{c}")
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert not system.check_consistency(), system.check_consistency()
+    total = sum(len(c.registered_students) for c in system.courses.values())
+    return total / elapsed
+
+
+def main():
+    # Switch threads very often so the check-then-add window is exercised as much as possible
+    sys.setswitchinterval(1e-6)
+    for r in range(ROUNDS):
+        winners = race_for_one_seat(THREADS)
+        assert winners == 1, f"Expected exactly one registration, got {winners}"
+        print(f"Round {r + 1}: {THREADS} threads, 1 seat, {winners} registered - OK")
+    sys.setswitchinterval(0.005)
+    rate = spread_registrations(200, 50)
+    print(f"Spread over 50 courses: {rate:,.0f} registrations/second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Benchmark suite for RegistrationSystem.
+
+Builds a synthetic school (see benchmarks/workload.py) at several sizes and times every
+public operation on it: logging in, adding, searching, registering, dropping and removing,
+and the reports students and admins use. Results are printed as a table and can be saved
+as JSON, so two runs (say, before and after a change) can be compared later.
+
+Each timed operation runs on the same data in every run with the same seed. With --repeat,
+the whole scale is rebuilt and timed again and the median time of each operation is kept.
+
+Usage:
+    python -m benchmarks.suite run --scales small medium --output before.json
+    python -m benchmarks.suite run --backend sqlite --output sqlite.json
+    python -m benchmarks.suite compare before.json after.json --threshold 0.15
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from App import RegistrationSystem
+from auth import SessionManager
+from benchmarks.workload import PASSWORD, Workload, generate, populate
+
+# Scale name -> (courses, students)
+SCALES = {
+    "small": (200, 2_000),
+    "medium": (2_000, 20_000),
+    "large": (10_000, 100_000),
+}
+# How many times each operation is called at every scale
+CALLS = 2_000
+# Reports that walk the whole catalog are called fewer times
+CATALOG_CALLS = 20
+PAGE_SIZE = 20
+NEW_COURSE_CAPACITY = 1_000
+# Change in time per call above which compare reports a regression (0.2 = 20% slower)
+DEFAULT_THRESHOLD = 0.2
+
+
+def make_system(backend: str) -> RegistrationSystem:
+    """
+    Creates an empty system of the given backend ("memory", "compact" or "sqlite").
+    """
+    if backend == "compact":
+        from compact import CompactRegistrationSystem
+        return CompactRegistrationSystem()
+    if backend == "sqlite":
+        from sqlite_storage import SQLiteRegistrationSystem
+        return SQLiteRegistrationSystem()
+    return RegistrationSystem()
+
+
+def time_calls(method: Callable, calls: Iterable[tuple]) -> Tuple[int, int]:
+    """
+    Calls a method once with each argument tuple.
+
+    Returns:
+        Tuple[int, int]: The number of calls and the total time in nanoseconds.
+    """
+    calls = list(calls)
+    start = time.perf_counter_ns()
+    for args in calls:
+        method(*args)
+    return len(calls), time.perf_counter_ns() - start
+
+
+def run_scale(backend: str, workload: Workload, seed: int) -> Dict[str, Tuple[int, int]]:
+    """
+    Loads one workload into a new system and times every operation on it.
+
+    The operations run in an order where each one's arguments are valid: new courses are added,
+    students register for them, some drop again, and finally the new courses are removed.
+
+    Arguments:
+        backend (str): Which system to build.
+        workload (Workload): The data to load.
+        seed (int): Seed for picking the arguments of each call.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Operation name -> (calls, total nanoseconds).
+    """
+    rng = random.Random(seed)
+    system = make_system(backend)
+    timings = {}
+
+    start = time.perf_counter_ns()
+    populate(system, workload)
+    timings["populate"] = (len(workload.enrollments), time.perf_counter_ns() - start)
+
+    student_ids = [sid for sid, _ in workload.students]
+    course_ids = [row[0] for row in workload.courses]
+    timings["authenticate_user"] = time_calls(
+        system.authenticate_user, [(rng.choice(student_ids), PASSWORD) for _ in range(CALLS)])
+    # What every request after the login costs instead
+    sessions = SessionManager(system)
+    tokens = [sessions.login(sid, PASSWORD).token for sid in rng.sample(student_ids, 20)]
+    timings["validate_session"] = time_calls(sessions.validate, [(rng.choice(tokens),) for _ in range(CALLS)])
+    sessions.close()
+    timings["search_courses"] = time_calls(
+        system.search_courses, [(rng.choice(workload.words),) for _ in range(CALLS)])
+    timings["search_courses_ranked"] = time_calls(
+        system.search_courses, [(rng.choice(workload.words), True, 10) for _ in range(CALLS)])
+
+    new_ids = [f"BX{i}" for i in range(CALLS)]
+    timings["add_course"] = time_calls(
+        system.add_course, [(cid, f"Benchmark {cid}", "Added by the suite", 3, NEW_COURSE_CAPACITY)
+                            for cid in new_ids])
+    # Every student gets at most one new course, so no call is turned away
+    pairs = [(sid, rng.choice(new_ids)) for sid in rng.sample(student_ids, min(CALLS, len(student_ids)))]
+    timings["student_course_register"] = time_calls(system.student_course_register, pairs)
+
+    timings["list_students_for_course"] = time_calls(
+        system.list_students_for_course, [(rng.choice(course_ids),) for _ in range(CALLS)])
+    timings["list_courses_for_student"] = time_calls(
+        system.list_courses_for_student, [(rng.choice(student_ids),) for _ in range(CALLS)])
+    timings["student_registered_course"] = time_calls(
+        system.student_registered_course, [(rng.choice(student_ids),) for _ in range(CALLS)])
+    pages = max(1, len(course_ids) // PAGE_SIZE)
+    timings["catalog_rows_page"] = time_calls(
+        system.catalog_rows, [(True, rng.randrange(pages), PAGE_SIZE) for _ in range(CALLS)])
+    timings["view_available_courses"] = time_calls(system.view_available_courses, [()] * CATALOG_CALLS)
+    timings["catalog_rows_all"] = time_calls(system.catalog_rows, [()] * CATALOG_CALLS)
+
+    # Half of the new registrations are dropped, so remove_course still has rosters to clear
+    timings["student_course_remove"] = time_calls(system.student_course_remove, pairs[::2])
+    timings["remove_course"] = time_calls(system.remove_course, [(cid,) for cid in new_ids])
+    close = getattr(system, "close", None)
+    if close:
+        close()
+    return timings
+
+
+def run(backend: str, scales: List[str], seed: int, repeat: int) -> dict:
+    """
+    Runs the suite and collects the results.
+
+    Arguments:
+        backend (str): Which system to build.
+        scales (List[str]): Names from SCALES, in the order to run them.
+        seed (int): Seed for the workload and the call arguments.
+        repeat (int): How many times to time each scale. The median is kept.
+
+    Returns:
+        dict: The results, ready to be saved as JSON.
+    """
+    results = []
+    for scale in scales:
+        courses, students = SCALES[scale]
+        workload = generate(courses, students, seed)
+        rounds = [run_scale(backend, workload, seed) for _ in range(repeat)]
+        for operation in rounds[0]:
+            calls = rounds[0][operation][0]
+            ns_per_call = statistics.median(r[operation][1] / max(calls, 1) for r in rounds)
+            results.append({
+                "scale": scale,
+                "courses": courses,
+                "students": students,
+                "operation": operation,
+                "calls": calls,
+                "ns_per_call": round(ns_per_call, 1),
+                "calls_per_second": round(1e9 / ns_per_call, 1) if ns_per_call else None,
+            })
+    return {
+        "backend": backend,
+        "seed": seed,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def print_results(report: dict):
+    print(f"backend: {report['backend']}, seed {report['seed']}, python {report['python']}")
+    print("{:<8} {:<28} {:>8} {:>14} {:>14}".format("scale", "operation", "calls", "us/call", "calls/s"))
+    for r in report["results"]:
+        print("{:<8} {:<28} {:>8,} {:>14,.2f} {:>14,.0f}".format(
+            r["scale"], r["operation"], r["calls"], r["ns_per_call"] / 1000, r["calls_per_second"] or 0))
+
+
+def compare(old: dict, new: dict, threshold: float) -> List[Tuple[str, str, float, float]]:
+    """
+    Finds the operations that got slower between two result files.
+
+    Arguments:
+        old (dict): The earlier results (made by run).
+        new (dict): The later results.
+        threshold (float): How much slower a call must be to count, as a fraction (0.2 = 20%).
+
+    Returns:
+        List[Tuple[str, str, float, float]]: (scale, operation, old ns/call, new ns/call) for each regression.
+    """
+    for setting in ("backend", "seed"):
+        if old.get(setting) != new.get(setting):
+            print(f"Note: the runs used different {setting}s ({old.get(setting)} and {new.get(setting)}).")
+    before = {(r["scale"], r["operation"]): r["ns_per_call"] for r in old["results"]}
+    regressions = []
+    print("{:<8} {:<28} {:>14} {:>14} {:>9}".format("scale", "operation", "old us/call", "new us/call", "change"))
+    for r in new["results"]:
+        key = (r["scale"], r["operation"])
+        if key not in before:
+            print("{:<8} {:<28} {:>14} {:>14,.2f} {:>9}".format(*key, "-", r["ns_per_call"] / 1000, "new"))
+            continue
+        old_ns, new_ns = before.pop(key), r["ns_per_call"]
+        change = new_ns / old_ns - 1 if old_ns else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append((*key, old_ns, new_ns))
+        print("{:<8} {:<28} {:>14,.2f} {:>14,.2f} {:>+8.0%}{}".format(*key, old_ns / 1000, new_ns / 1000, change,
+                                                                      flag))
+    for (scale, operation), old_ns in before.items():
+        print("{:<8} {:<28} {:>14,.2f} {:>14} {:>9}".format(scale, operation, old_ns / 1000, "-", "missing"))
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time RegistrationSystem operations on synthetic data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--backend", choices=("memory", "compact", "sqlite"), default="memory")
+    run_parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--repeat", type=int, default=1, help="times to run each scale (median is kept)")
+    run_parser.add_argument("--output", help="JSON file to save the results in")
+    compare_parser = commands.add_parser("compare", help="flag operations that got slower between two runs")
+    compare_parser.add_argument("old", help="results of the earlier run")
+    compare_parser.add_argument("new", help="results of the later run")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="slowdown that counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.backend, args.scales, args.seed, max(1, args.repeat))
+        print_results(report)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved results to {args.output}")
+        return 0
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    regressions = compare(old, new, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} operation(s) more than {args.threshold:.0%} slower.")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
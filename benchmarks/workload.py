@@ -0,0 +1,135 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Makes a catalog of courses and a population of students that look like a real school:
+  - course codes are grouped by subject (CS101, MA240, ...) and titles are built from
+    subject topics ("Introduction to Databases", "Advanced Linear Algebra"),
+  - most courses are worth 3 credits, with some 1, 2 and 4 credit courses,
+  - a few courses are much more popular than the rest (course popularity follows a Zipf curve),
+    and their capacities are sized to match,
+  - each student asks for 3 to 6 courses, usually 4 or 5.
+
+The same seed always gives the same workload, so results from different runs can be compared.
+
+Usage:
+    from benchmarks.workload import generate, populate
+    workload = generate(courses=2_000, students=20_000, seed=1)
+    populate(system, workload)
+"""
+
+import random
+from bisect import bisect
+from itertools import accumulate
+from typing import List, NamedTuple, Tuple
+
+from App import RegistrationSystem
+from auth import hash_password
+
+SUBJECTS = (
+    ("CS", "Computer Science", ("Programming", "Data Structures", "Algorithms", "Databases", "Operating Systems",
+                                "Networks", "Compilers", "Machine Learning", "Computer Graphics", "Security")),
+    ("MA", "Mathematics", ("Calculus", "Linear Algebra", "Statistics", "Discrete Mathematics", "Number Theory",
+                           "Probability", "Differential Equations", "Topology")),
+    ("PH", "Physics", ("Mechanics", "Electricity and Magnetism", "Optics", "Thermodynamics", "Quantum Physics",
+                       "Astrophysics")),
+    ("CH", "Chemistry", ("General Chemistry", "Organic Chemistry", "Biochemistry", "Physical Chemistry",
+                         "Analytical Chemistry")),
+    ("BI", "Biology", ("Cell Biology", "Genetics", "Ecology", "Microbiology", "Evolution", "Neuroscience")),
+    ("EN", "English", ("Composition", "American Literature", "Poetry", "Shakespeare", "Creative Writing",
+                       "Rhetoric")),
+    ("HI", "History", ("World History", "Ancient Rome", "Medieval Europe", "Modern Asia", "The Cold War")),
+    ("EC", "Economics", ("Microeconomics", "Macroeconomics", "Econometrics", "Game Theory", "Public Finance")),
+    ("PS", "Psychology", ("Cognitive Psychology", "Social Psychology", "Development", "Research Methods")),
+    ("AR", "Art", ("Drawing", "Painting", "Sculpture", "Art History", "Photography", "Design")),
+)
+LEVELS = ("Introduction to", "Foundations of", "", "Topics in", "Advanced", "Seminar in")
+CREDITS = (1, 2, 3, 3, 3, 3, 4, 4)
+COURSES_PER_STUDENT = (3, 4, 4, 5, 5, 5, 6)
+# Bigger values make the most popular courses take a bigger share of the requests
+ZIPF_EXPONENT = 0.9
+PASSWORD = "pass123"
+# Students' stored password: a real salted hash, but with few rounds, so that building big schools
+# and logging thousands of clients in doesn't take hours (bench_logins times the real cost)
+PASSWORD_HASH = hash_password(PASSWORD, iterations=1_000)
+
+
+class Workload(NamedTuple):
+    """
+    The data of one synthetic school.
+
+    Attributes:
+        courses (List[Tuple[str, str, str, int, int]]): (course_id, title, description, credits, capacity) rows.
+        students (List[Tuple[str, str]]): (student_id, stored password) rows.
+        enrollments (List[Tuple[str, str]]): (student_id, course_id) registration requests,
+            in the order students make them. Some may be turned away when a course fills up.
+        words (List[str]): Words that appear in course titles, for search queries.
+    """
+    courses: List[Tuple[str, str, str, int, int]]
+    students: List[Tuple[str, str]]
+    enrollments: List[Tuple[str, str]]
+    words: List[str]
+
+
+def generate(courses: int, students: int, seed: int = 1) -> Workload:
+    """
+    Makes a synthetic catalog, student population and registration requests.
+
+    Arguments:
+        courses (int): How many courses to make.
+        students (int): How many students to make.
+        seed (int, optional): Seed for the random choices. The same seed gives the same workload.
+
+    Returns:
+        Workload: The generated data.
+    """
+    rng = random.Random(seed)
+    rows = []
+    words = set()
+    for i in range(courses):
+        code, subject, topics = SUBJECTS[i % len(SUBJECTS)]
+        # Course numbers go 100, 101, ... within each subject, so codes stay unique at any size
+        number = 100 + i // len(SUBJECTS)
+        topic = rng.choice(topics)
+        level = rng.choice(LEVELS)
+        title = f"{level} {topic}".strip()
+        words.update(word.lower() for word in title.split() if len(word) > 3)
+        rows.append([f"{code}{number}", title, f"{subject}: {topic.lower()}", rng.choice(CREDITS), 0])
+
+    # Popularity by rank, with ranks given to courses in random order
+    ranks = list(range(courses))
+    rng.shuffle(ranks)
+    weights = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in ranks]
+    cumulative = list(accumulate(weights))
+    total = cumulative[-1]
+
+    student_rows = [(f"s{i}", PASSWORD_HASH) for i in range(students)]
+    enrollments = []
+    demand = [0] * courses
+    for student_id, _ in student_rows:
+        wanted = min(rng.choice(COURSES_PER_STUDENT), courses)
+        chosen = set()
+        while len(chosen) < wanted:
+            chosen.add(bisect(cumulative, rng.random() * total))
+        for i in chosen:
+            demand[i] += 1
+            enrollments.append((student_id, rows[i][0]))
+
+    # Most courses have room for everyone who asks; popular ones are often a little short
+    for row, asked in zip(rows, demand):
+        row[4] = max(10, int(asked * rng.uniform(0.8, 1.3)))
+    return Workload([tuple(row) for row in rows], student_rows, enrollments, sorted(words))
+
+
+def populate(system: RegistrationSystem, workload: Workload, batch_size: int = 10_000):
+    """
+    Loads a workload into a system through its batch methods.
+
+    Arguments:
+        system (RegistrationSystem): An empty system of any backend.
+        workload (Workload): Data made by generate.
+        batch_size (int, optional): How many registration requests go in one register_batch call.
+    """
+    system.add_courses_batch(workload.courses)
+    system.add_students_batch(workload.students)
+    for start in range(0, len(workload.enrollments), batch_size):
+        system.register_batch(workload.enrollments[start:start + batch_size])
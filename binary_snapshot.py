@@ -0,0 +1,484 @@
+"""
+Title:       Portfolio Project - Binary Snapshots
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Saves the whole state of a registration system to one binary file that can be read through mmap.
+    Loading a JSON snapshot means parsing every value and building every Course and Student before
+    the first question can be answered. A binary snapshot is laid out so it can be used as it is:
+      - a string table: every ID, title, description and password once, found by number,
+      - fixed-width course and student records (numbers pointing into the string table),
+        with the record numbers also sorted by ID so a record is found by binary search,
+      - enrollments as CSR arrays (an offsets array and a values array), one for the course
+        rosters and one for the student schedules, in both cases in the order they were made,
+      - the same kind of arrays for meeting times, prerequisites, completed courses,
+        waitlists and lottery preferences.
+    MappedSnapshot maps the file into memory, so opening it takes the same short time at any size.
+    Rosters, schedules and credit loads are read straight from the arrays, and Course and Student
+    objects are only built when one is asked for (and then kept).
+
+    File layout: an 8-byte magic string, a byte-order mark, a version, the number of sections,
+    then (offset, length) of each section in SECTIONS order. Sections start on 8-byte boundaries.
+    Numbers are in the byte order of the machine that wrote the file.
+
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List, Optional
+
+from App import Course, EnrollmentSet, RegistrationSystem, Student
+from persistence import restore_state, snapshot_state
+
+MAGIC = b"REGSNAP\0"
+VERSION = 1
+# Written as a 32-bit number, so a file from a machine with the other byte order is recognized
+BYTE_ORDER_MARK = 0x01020304
+# Magic, byte-order mark, version, number of sections (in the writing machine's byte order, like the arrays)
+HEADER = struct.Struct("=8sIII")
+SECTION = struct.Struct("=QQ")
+
+# Section name -> array type code ("Q" string offsets, "B" bytes, "i" everything else)
+SECTIONS = (
+    ("string_offsets", "Q"), ("strings", "B"),
+    # Course records: id, title, description (string numbers), credits, capacity
+    ("courses", "i"), ("course_order", "i"),
+    # Student records: id, password (string numbers), standing
+    ("students", "i"), ("student_order", "i"),
+    # Roster of each course: student record numbers
+    ("roster_offsets", "i"), ("rosters", "i"),
+    # Schedule of each student: course record numbers
+    ("schedule_offsets", "i"), ("schedules", "i"),
+    # Meetings of each course: day, start minute, end minute
+    ("meeting_offsets", "i"), ("meetings", "i"),
+    # Prerequisites of each course and completed courses of each student: course ID string numbers
+    ("prerequisite_offsets", "i"), ("prerequisites", "i"),
+    ("completed_offsets", "i"), ("completed", "i"),
+    # Waitlisted courses and their student IDs, and students with lottery preferences and their course IDs
+    ("waitlist_keys", "i"), ("waitlist_offsets", "i"), ("waitlists", "i"),
+    ("preference_keys", "i"), ("preference_offsets", "i"), ("preferences", "i"),
+)
+COURSE_FIELDS = 5
+STUDENT_FIELDS = 3
+
+
+class _StringTable:
+
+    def __init__(self):
+        self.numbers: Dict[str, int] = {}
+        self.data: List[bytes] = []
+
+    def add(self, text: str) -> int:
+        number = self.numbers.get(text)
+        if number is None:
+            number = self.numbers[text] = len(self.data)
+            self.data.append(text.encode("utf-8"))
+        return number
+
+
+def _csr(groups) -> tuple:
+    """
+    Returns the offsets and values arrays of a list of lists.
+    """
+    offsets = array("i", [0])
+    values = array("i")
+    for group in groups:
+        values.extend(group)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def save_snapshot(system, path: str) -> int:
+    """
+    Writes the state of a system to a binary snapshot file.
+
+    The file is written under a temporary name and then renamed, so a crash never leaves
+    a half-written snapshot behind.
+
+    Arguments:
+        system (RegistrationSystem): The system to save (any backend, or a snapshot of one).
+        path (str): The file to write (replaced if it exists).
+
+    Returns:
+        int: The size of the file in bytes.
+    """
+    state = snapshot_state(system)
+    strings = _StringTable()
+    text = strings.add
+    course_numbers = {row[0]: i for i, row in enumerate(state["courses"])}
+    student_numbers = {row[0]: i for i, row in enumerate(state["students"])}
+
+    courses = array("i")
+    for cid, title, description, credits, capacity, *_ in state["courses"]:
+        courses.extend((text(cid), text(title), text(description), credits, capacity))
+    students = array("i")
+    for sid, password, _, standing, _ in state["students"]:
+        students.extend((text(sid), text(password), standing))
+    sections = {
+        "courses": courses,
+        "course_order": array("i", sorted(range(len(course_numbers)), key=lambda i: state["courses"][i][0])),
+        "students": students,
+        "student_order": array("i", sorted(range(len(student_numbers)), key=lambda i: state["students"][i][0])),
+    }
+    sections["roster_offsets"], sections["rosters"] = _csr(
+        [student_numbers[sid] for sid in row[5]] for row in state["courses"])
+    sections["schedule_offsets"], sections["schedules"] = _csr(
+        [course_numbers[cid] for cid in row[2]] for row in state["students"])
+    sections["meeting_offsets"], sections["meetings"] = _csr(
+        [value for meeting in row[6] for value in meeting] for row in state["courses"])
+    sections["prerequisite_offsets"], sections["prerequisites"] = _csr(
+        [text(cid) for cid in row[7]] for row in state["courses"])
+    sections["completed_offsets"], sections["completed"] = _csr(
+        [text(cid) for cid in row[4]] for row in state["students"])
+    sections["waitlist_keys"] = array("i", [text(cid) for cid, _ in state["waitlists"]])
+    sections["waitlist_offsets"], sections["waitlists"] = _csr(
+        [text(sid) for sid in student_ids] for _, student_ids in state["waitlists"])
+    sections["preference_keys"] = array("i", [text(sid) for sid, _ in state["preferences"]])
+    sections["preference_offsets"], sections["preferences"] = _csr(
+        [text(cid) for cid in ranked] for _, ranked in state["preferences"])
+    offsets = array("Q", [0])
+    position = 0
+    for data in strings.data:
+        position += len(data)
+        offsets.append(position)
+    sections["string_offsets"] = offsets
+    sections["strings"] = b"".join(strings.data)
+
+    # Header, then the section table, then every section padded to 8 bytes
+    position = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    blobs = []
+    for name, _ in SECTIONS:
+        data = sections[name]
+        data = data if isinstance(data, bytes) else data.tobytes()
+        padding = -position % 8
+        blobs.append(b"\0" * padding)
+        position += padding
+        table.append(SECTION.pack(position, len(data)))
+        blobs.append(data)
+        position += len(data)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, BYTE_ORDER_MARK, VERSION, len(SECTIONS)))
+        f.write(b"".join(table))
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return position
+
+
+class _SortedIDs(Sequence):
+
+    def __init__(self, snapshot: "MappedSnapshot", records, fields: int, order):
+        """
+        The IDs of the course or student records in sorted order, read when indexed (for bisect).
+        """
+        self._string = snapshot.string
+        self._records = records
+        self._fields = fields
+        self._order = order
+
+    def __getitem__(self, i: int) -> str:
+        return self._string(self._records[self._order[i] * self._fields])
+
+    def number(self, i: int) -> int:
+        return self._order[i]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class MappedTable(Mapping):
+
+    def __init__(self, snapshot: "MappedSnapshot", kind: str):
+        """
+        A read-only dictionary-like view of the courses or students in a binary snapshot.
+
+        A Course or Student object is built the first time its ID is looked up, and kept.
+        Checking if an ID is there, and going through the IDs, builds no objects.
+
+        Arguments:
+            snapshot (MappedSnapshot): The snapshot the records are in.
+            kind (str): "course" or "student".
+
+        Attributes:
+            built (Dict[str, object]): The objects built so far.
+        """
+        self._snapshot = snapshot
+        self._kind = kind
+        self._fields = COURSE_FIELDS if kind == "course" else STUDENT_FIELDS
+        self.built: Dict[str, object] = {}
+
+    def __getitem__(self, key: str):
+        record = self.built.get(key)
+        if record is None:
+            number = self._snapshot.find(self._kind, key)
+            if number is None:
+                raise KeyError(key)
+            build = self._snapshot.build_course if self._kind == "course" else self._snapshot.build_student
+            record = self.built[key] = build(number)
+        return record
+
+    def __contains__(self, key) -> bool:
+        return key in self.built or self._snapshot.find(self._kind, key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Goes through the IDs in the order the system had them.
+        """
+        self._snapshot.check_open()
+        string = self._snapshot.string
+        records = self._snapshot.section(self._kind + "s")
+        return (string(records[i]) for i in range(0, len(records), self._fields))
+
+    def __len__(self) -> int:
+        self._snapshot.check_open()
+        return len(self._snapshot.section(self._kind + "s")) // self._fields
+
+
+class MappedSnapshot:
+
+    def __init__(self, path: str):
+        """
+        Opens a binary snapshot file (see save_snapshot) for reading, without loading it.
+
+        It can be passed to the report exports (export.py) in place of a system, and has the
+        system's read methods for rosters, schedules and credit loads. restore copies it into
+        a system that can be changed.
+
+        Argument:
+            path (str): The snapshot file.
+
+        Attributes:
+            courses (MappedTable): Course ID -> Course, built when looked up.
+            students (MappedTable): Student ID -> Student, built when looked up.
+            closed (bool): True once the snapshot was closed.
+
+        Raises:
+            ValueError: If the file is not a binary snapshot, or was written with another
+                version or byte order.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: Dict[str, memoryview] = {}
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+        self._sorted = {
+            "course": _SortedIDs(self, self._views["courses"], COURSE_FIELDS, self._views["course_order"]),
+            "student": _SortedIDs(self, self._views["students"], STUDENT_FIELDS, self._views["student_order"]),
+        }
+        # ID -> record number, for IDs looked up before
+        self._numbers: Dict[str, Dict[str, Optional[int]]] = {"course": {}, "student": {}}
+        self.courses = MappedTable(self, "course")
+        self.students = MappedTable(self, "student")
+        self.closed = False
+
+    def _open(self):
+        if len(self._map) < HEADER.size:
+            raise ValueError("Not a binary snapshot file.")
+        magic, byte_order, version, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a binary snapshot file.")
+        if byte_order != BYTE_ORDER_MARK:
+            raise ValueError(f"The snapshot was written on a machine with another byte order (not {sys.byteorder}).")
+        if version != VERSION or count != len(SECTIONS):
+            raise ValueError(f"Unsupported binary snapshot version: {version}.")
+        whole = memoryview(self._map)
+        self._views["file"] = whole
+        for i, (name, code) in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(self._map, HEADER.size + i * SECTION.size)
+            if offset + length > len(self._map):
+                raise ValueError("The binary snapshot file is cut short.")
+            self._views[name] = whole[offset:offset + length].cast(code)
+
+    def check_open(self):
+        """
+        Raises:
+            Exception: If the snapshot was closed (its file is no longer mapped).
+        """
+        if self.closed:
+            raise Exception("Snapshot is closed.")
+
+    def section(self, name: str) -> memoryview:
+        """
+        Returns one section of the file as an array of numbers (or bytes, for "strings"), without copying it.
+        """
+        return self._views[name]
+
+    def string(self, number: int) -> str:
+        """
+        Returns one string from the string table.
+        """
+        offsets = self._views["string_offsets"]
+        return str(self._views["strings"][offsets[number]:offsets[number + 1]], "utf-8")
+
+    def _strings(self, section: str, offsets_section: str, i: int) -> List[str]:
+        offsets = self._views[offsets_section]
+        string = self.string
+        return [string(n) for n in self._views[section][offsets[i]:offsets[i + 1]]]
+
+    def find(self, kind: str, key: str) -> Optional[int]:
+        """
+        Finds a course or student record by ID with a binary search.
+
+        Arguments:
+            kind (str): "course" or "student".
+            key (str): The ID (already in upper or lower case).
+
+        Returns:
+            Optional[int]: The record number, or None if there is no such record.
+        """
+        self.check_open()
+        numbers = self._numbers[kind]
+        if key in numbers:
+            return numbers[key]
+        ids = self._sorted[kind]
+        i = bisect.bisect_left(ids, key)
+        number = numbers[key] = ids.number(i) if i < len(ids) and ids[i] == key else None
+        return number
+
+    def build_course(self, number: int) -> Course:
+        """
+        Builds the Course object of a course record.
+        """
+        record = self._views["courses"][number * COURSE_FIELDS:(number + 1) * COURSE_FIELDS]
+        meeting_offsets = self._views["meeting_offsets"]
+        values = self._views["meetings"][meeting_offsets[number]:meeting_offsets[number + 1]].tolist()
+        course = Course(self.string(record[0]), self.string(record[1]), self.string(record[2]), record[3],
+                        record[4], list(zip(values[::3], values[1::3], values[2::3])),
+                        self._strings("prerequisites", "prerequisite_offsets", number))
+        course.registered_students = EnrollmentSet(self._roster(number))
+        return course
+
+    def build_student(self, number: int) -> Student:
+        """
+        Builds the Student object of a student record.
+        """
+        record = self._views["students"][number * STUDENT_FIELDS:(number + 1) * STUDENT_FIELDS]
+        student = Student(self.string(record[0]), self.string(record[1]), record[2])
+        student.registered_courses = EnrollmentSet(self._schedule(number))
+        student.completed_courses = EnrollmentSet(self._strings("completed", "completed_offsets", number))
+        return student
+
+    def _roster(self, number: int) -> List[str]:
+        offsets = self._views["roster_offsets"]
+        students = self._views["students"]
+        string = self.string
+        return [string(students[s * STUDENT_FIELDS]) for s in self._views["rosters"][offsets[number]:offsets[number + 1]]]
+
+    def _schedule(self, number: int) -> List[str]:
+        offsets = self._views["schedule_offsets"]
+        courses = self._views["courses"]
+        string = self.string
+        return [string(courses[c * COURSE_FIELDS]) for c in self._views["schedules"][offsets[number]:offsets[number + 1]]]
+
+    def list_students_for_course(self, course_id: str) -> List[str]:
+        """
+        Gets the student IDs registered in a course, read from the file (no objects are built).
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        number = self.find("course", course_id.upper())
+        if number is None:
+            raise Exception("Course not found.")
+        return self._roster(number)
+
+    def list_courses_for_student(self, student_id: str) -> List[str]:
+        """
+        Gets the course IDs a student is registered in, read from the file (no objects are built).
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        number = self.find("student", student_id.lower())
+        if number is None:
+            raise Exception("Student not found.")
+        return self._schedule(number)
+
+    def credit_load(self, student_id: str) -> int:
+        """
+        Gets the total credits a student is registered for, read from the file.
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        number = self.find("student", student_id.lower())
+        if number is None:
+            raise Exception("Student not found.")
+        offsets = self._views["schedule_offsets"]
+        courses = self._views["courses"]
+        return sum(courses[c * COURSE_FIELDS + 3] for c in self._views["schedules"][offsets[number]:offsets[number + 1]])
+
+    # Same answer and error message as the system's method, read from the built records
+    student_registered_course = RegistrationSystem.student_registered_course
+
+    def state(self) -> dict:
+        """
+        Reads the whole snapshot into plain data, in the form made by persistence.snapshot_state.
+        """
+        self.check_open()
+        string = self.string
+        courses = self._views["courses"]
+        students = self._views["students"]
+        meeting_offsets = self._views["meeting_offsets"]
+        state = {"courses": [], "students": [], "waitlists": [], "preferences": []}
+        for number in range(len(courses) // COURSE_FIELDS):
+            record = courses[number * COURSE_FIELDS:(number + 1) * COURSE_FIELDS]
+            values = self._views["meetings"][meeting_offsets[number]:meeting_offsets[number + 1]].tolist()
+            state["courses"].append([
+                string(record[0]), string(record[1]), string(record[2]), record[3], record[4], self._roster(number),
+                [list(meeting) for meeting in zip(values[::3], values[1::3], values[2::3])],
+                self._strings("prerequisites", "prerequisite_offsets", number)])
+        for number in range(len(students) // STUDENT_FIELDS):
+            record = students[number * STUDENT_FIELDS:(number + 1) * STUDENT_FIELDS]
+            state["students"].append([string(record[0]), string(record[1]), self._schedule(number), record[2],
+                                      self._strings("completed", "completed_offsets", number)])
+        for i, key in enumerate(self._views["waitlist_keys"]):
+            state["waitlists"].append([string(key), self._strings("waitlists", "waitlist_offsets", i)])
+        for i, key in enumerate(self._views["preference_keys"]):
+            state["preferences"].append([string(key), self._strings("preferences", "preference_offsets", i)])
+        return state
+
+    def restore(self, system):
+        """
+        Loads the snapshot into a system, with its waitlists and lottery preferences.
+
+        Argument:
+            system (RegistrationSystem): A freshly created in-memory system (restore_state fills in
+                rosters directly, which only works for the in-memory backends).
+
+        Raises:
+            ValueError: If the system keeps its data outside memory.
+        """
+        if not isinstance(system.courses, dict):
+            raise ValueError("A binary snapshot can only be restored into an in-memory system.")
+        restore_state(system, self.state())
+
+    def close(self):
+        """
+        Unmaps the file. Objects already built stay usable.
+        """
+        self.closed = True
+        for view in reversed(list(self._views.values())):
+            view.release()
+        self._views.clear()
+        self._map.close()
+
+    def __enter__(self) -> "MappedSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,209 @@
+"""
+Title:       Portfolio Project - Compact Storage
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    A RegistrationSystem that uses much less memory per enrollment, for very large schools.
+    Every student ID and course ID is stored once in an ID table and given a small number (a handle).
+    Course rosters and student schedules then keep only these numbers in packed arrays
+    (array('I'), 4 bytes each) instead of dictionaries of strings. Small groups are searched by
+    scanning the array; groups that grow past INDEX_SIZE entries also get a handle -> position
+    index, so checking, adding and removing stay O(1) on the largest rosters too.
+    The public methods and their results are exactly the same as RegistrationSystem.
+
+"""
+
+import heapq
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from App import Course, RegistrationSystem, Student
+
+# Groups with more entries than this also keep a handle -> position index
+INDEX_SIZE = 128
+# Marks a removed entry in an indexed group's array until the array is tidied up
+REMOVED = 0xFFFFFFFF
+
+
+class IdTable:
+
+    __slots__ = ("_handles", "_names", "_lock")
+
+    def __init__(self):
+        """
+        Creates an empty table that gives every ID string a small whole number (a handle).
+
+        The same ID always gets the same handle, and handles are given out as 0, 1, 2, ...
+        so they fit in a 4-byte array slot. Handles are never reused, even if the record is removed.
+        New handles are given out under a lock, so threads adding the same new ID get the same handle.
+        """
+        self._handles: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def handle(self, name: str) -> int:
+        """
+        Gets the handle for an ID, giving it a new one the first time it's seen.
+
+        Argument:
+            name (str): The student or course ID.
+
+        Returns:
+            int: The handle.
+        """
+        h = self._handles.get(name)
+        if h is None:
+            with self._lock:
+                h = self._handles.get(name)
+                if h is None:
+                    h = len(self._names)
+                    self._names.append(name)
+                    self._handles[name] = h
+        return h
+
+    def find(self, name: str) -> int:
+        """
+        Gets the handle for an ID without adding it.
+
+        Argument:
+            name (str): The student or course ID.
+
+        Returns:
+            int: The handle, or -1 if the ID has never been seen.
+        """
+        return self._handles.get(name, -1)
+
+    def name(self, h: int) -> str:
+        """
+        Gets the ID string for a handle.
+
+        Argument:
+            h (int): The handle.
+
+        Returns:
+            str: The shared ID string.
+        """
+        return self._names[h]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class CompactEnrollmentSet:
+
+    __slots__ = ("_table", "_handles", "_index", "_removed")
+
+    def __init__(self, table: IdTable, items: Iterable[str] = ()):
+        """
+        An ordered group of IDs stored as 4-byte handles in an array.
+
+        It has the same methods as EnrollmentSet, so Course and Student can use either one.
+        Up to INDEX_SIZE entries (a schedule, or a typical roster), checking and removing scan
+        the packed array in C and each entry takes 4 bytes. A larger group also keeps a dictionary
+        from handle to position in the array; a removed entry is then marked REMOVED instead of
+        being cut out of the middle, and the array is tidied up once more than half of it is marked.
+
+        Arguments:
+            table (IdTable): The table the IDs belong to.
+            items (Iterable[str], optional): IDs to start with. Duplicates are ignored.
+        """
+        self._table = table
+        self._handles = array("I")
+        self._index: Optional[Dict[int, int]] = None
+        self._removed = 0
+        for item in items:
+            self.add(item)
+
+    def _has(self, h: int) -> bool:
+        if self._index is not None:
+            return h in self._index
+        return h in self._handles
+
+    def add(self, item: str) -> bool:
+        h = self._table.handle(item)
+        if self._has(h):
+            return False
+        self._handles.append(h)
+        if self._index is not None:
+            self._index[h] = len(self._handles) - 1
+        elif len(self._handles) > INDEX_SIZE:
+            self._index = {h: i for i, h in enumerate(self._handles)}
+        return True
+
+    def discard(self, item: str) -> bool:
+        h = self._table.find(item)
+        if h < 0 or not self._has(h):
+            return False
+        if self._index is None:
+            self._handles.remove(h)
+        else:
+            self._handles[self._index.pop(h)] = REMOVED
+            self._removed += 1
+            if 2 * self._removed > len(self._handles):
+                self._handles = array("I", (h for h in self._handles if h != REMOVED))
+                self._index = {h: i for i, h in enumerate(self._handles)}
+                self._removed = 0
+        return True
+
+    def to_list(self) -> List[str]:
+        name = self._table.name
+        if self._removed:
+            return [name(h) for h in self._handles if h != REMOVED]
+        return [name(h) for h in self._handles]
+
+    def page_after(self, after: Optional[str], count: int) -> List[str]:
+        # Same as EnrollmentSet.page_after
+        if after is None:
+            return heapq.nsmallest(count, self.to_list())
+        return heapq.nsmallest(count, (item for item in self.to_list() if item > after))
+
+    def __contains__(self, item) -> bool:
+        h = self._table.find(item)
+        return h >= 0 and self._has(h)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_list())
+
+    def __len__(self) -> int:
+        return len(self._handles) - self._removed
+
+    def __repr__(self) -> str:
+        return f"CompactEnrollmentSet({self.to_list()!r})"
+
+
+class CompactRegistrationSystem(RegistrationSystem):
+
+    def __init__(self, thread_safe: bool = False, waitlist_by_standing: bool = False,
+                 max_credits: Optional[int] = None, min_credits: int = 0):
+        """
+        Starts a registration system that stores enrollments as packed integer handles.
+
+        Arguments:
+            thread_safe (bool, optional): Same as RegistrationSystem.
+            waitlist_by_standing (bool, optional): Same as RegistrationSystem.
+            max_credits (int, optional): Same as RegistrationSystem.
+            min_credits (int, optional): Same as RegistrationSystem.
+
+        Attributes:
+            student_ids (IdTable): Handles for student IDs (used in course rosters).
+            course_ids (IdTable): Handles for course IDs (used in student schedules).
+        """
+        self.student_ids = IdTable()
+        self.course_ids = IdTable()
+        super().__init__(thread_safe, waitlist_by_standing, max_credits, min_credits)
+
+    def _new_student(self, student_id: str, password: str, standing: int = 0) -> Student:
+        # Reuse the table's string so every copy of this ID in the system is the same object
+        student_id = self.student_ids.name(self.student_ids.handle(student_id))
+        student = Student(student_id, password, standing)
+        student.registered_courses = CompactEnrollmentSet(self.course_ids)
+        student.completed_courses = CompactEnrollmentSet(self.course_ids)
+        return student
+
+    def _new_course(self, course_id: str, title: str, description: str, credits: int, capacity: int,
+                    meetings=(), prerequisites: Iterable[str] = ()) -> Course:
+        course_id = self.course_ids.name(self.course_ids.handle(course_id))
+        course = Course(course_id, title, description, credits, capacity, meetings, prerequisites)
+        course.registered_students = CompactEnrollmentSet(self.student_ids)
+        return course
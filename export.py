@@ -0,0 +1,267 @@
+"""
+Title:       Portfolio Project - Report Export
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Writes term-end reports for every student (their schedule) or every course (its roster)
+    as CSV, JSONL or plain text.
+    Reports are produced one row at a time by generators and written straight to the file,
+    so no large list or string is built in memory. Very large rosters can also be read
+    page by page with a cursor.
+    The text format uses the same fixed-width columns as the course table in the menus
+    (Course.TABLE_FORMAT), with the format method looked up once per report instead of per row.
+
+    Usage:
+        python export.py schedules --format csv --out schedules.csv --data-dir data
+        python export.py rosters --format text --out rosters.txt --data-dir data
+
+"""
+
+import argparse
+import csv
+import json
+import sys
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from App import Course
+
+REPORT_SCHEDULES = "schedules"
+REPORT_ROSTERS = "rosters"
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_TEXT = "text"
+
+SCHEDULE_COLUMNS = ("student_id", "course_id", "title", "credits")
+ROSTER_COLUMNS = ("course_id", "title", "student_id")
+
+
+def schedule_rows(system, student_ids: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """
+    Yields one row per (student, registered course).
+
+    Arguments:
+        system (RegistrationSystem): The system to report on.
+        student_ids (Iterable[str], optional): The students to include. Default is every student.
+
+    Yields:
+        dict: student_id, course_id, title and credits.
+    """
+    courses = system.courses
+    for sid in (system.students if student_ids is None else student_ids):
+        student = system.students[sid]
+        for cid in student.registered_courses:
+            course = courses.get(cid)
+            if course is not None:
+                yield {"student_id": student.user_id, "course_id": cid, "title": course.title,
+                       "credits": course.credits}
+
+
+def roster_rows(system, course_ids: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """
+    Yields one row per (course, registered student).
+
+    Arguments:
+        system (RegistrationSystem): The system to report on.
+        course_ids (Iterable[str], optional): The courses to include. Default is every course.
+
+    Yields:
+        dict: course_id, title and student_id.
+    """
+    for cid in (system.courses if course_ids is None else course_ids):
+        course = system.courses[cid]
+        for sid in course.registered_students:
+            yield {"course_id": course.course_id, "title": course.title, "student_id": sid}
+
+
+def roster_page(system, course_id: str, cursor: Optional[str] = None,
+                page_size: int = 500) -> Tuple[List[str], Optional[str]]:
+    """
+    Gets one page of a course's roster, in student ID order.
+
+    The cursor is the last student ID of the previous page, so each page starts right after it
+    instead of counting from the start of the roster, and students who register or drop between
+    pages don't make anyone else repeat or go missing. The backend finds the page itself
+    (list_students_after), so SQLite and sharded systems read one page, not the whole roster.
+
+    Arguments:
+        system (RegistrationSystem): The system to read from.
+        course_id (str): The course code.
+        cursor (str, optional): None for the first page, then the cursor returned with the previous page.
+        page_size (int, optional): The most student IDs per page.
+
+    Returns:
+        Tuple[List[str], Optional[str]]: The student IDs on this page, and the cursor for the
+        next page (None when this was the last page).
+
+    Raises:
+        Exception: If the course does not exist.
+    """
+    # One ID more than the page, to know whether another page follows
+    page = system.list_students_after(course_id, cursor, page_size + 1)
+    if len(page) > page_size:
+        return page[:page_size], page[page_size - 1]
+    return page, None
+
+
+def schedule_text(system, student_ids: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """
+    Yields the lines of a text report of every student's schedule.
+
+    Each student gets a heading line, then one line per course in the same format as
+    student_registered_course, then a blank line.
+
+    Arguments:
+        system (RegistrationSystem): The system to report on.
+        student_ids (Iterable[str], optional): The students to include. Default is every student.
+    """
+    line = Course.SCHEDULE_FORMAT.format
+    courses = system.courses
+    for sid in (system.students if student_ids is None else student_ids):
+        student = system.students[sid]
+        yield f"{student.user_id}:"
+        registered = [courses[cid] for cid in student.registered_courses if cid in courses]
+        if not registered:
+            yield "  No registered courses."
+        for course in registered:
+            yield "  " + line(course.course_id, course.title, course.credits)
+        yield ""
+
+
+def roster_text(system, course_ids: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """
+    Yields the lines of a text report of every course's roster.
+
+    Each course gets a row in the fixed-width course table layout, then one line per student,
+    then a blank line. The table header is printed once at the top.
+
+    Arguments:
+        system (RegistrationSystem): The system to report on.
+        course_ids (Iterable[str], optional): The courses to include. Default is every course.
+    """
+    row = Course.TABLE_FORMAT.format
+    yield Course.get_table_header()
+    for cid in (system.courses if course_ids is None else course_ids):
+        course = system.courses[cid]
+        roster = course.registered_students
+        yield row(course.course_id, course.title, course.credits, course.capacity, len(roster), course.description)
+        if not roster:
+            yield "  No students registered."
+        for sid in roster:
+            yield f"  - {sid}"
+        yield ""
+
+
+def write_csv(rows: Iterable[dict], columns: Tuple[str, ...], out: TextIO) -> int:
+    """
+    Writes rows as CSV with a header line.
+
+    Returns:
+        int: How many rows were written.
+    """
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([row[c] for c in columns])
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[dict], out: TextIO) -> int:
+    """
+    Writes rows as one JSON object per line.
+
+    Returns:
+        int: How many rows were written.
+    """
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    count = 0
+    for row in rows:
+        out.write(dumps(row))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_text(lines: Iterable[str], out: TextIO) -> int:
+    """
+    Writes lines of text.
+
+    Returns:
+        int: How many lines were written.
+    """
+    count = 0
+    for line in lines:
+        out.write(line)
+        out.write("\n")
+        count += 1
+    return count
+
+
+def export_report(system, report: str, fmt: str, out: TextIO, ids: Optional[Iterable[str]] = None,
+                  consistent: bool = False) -> int:
+    """
+    Streams a full report to an open file.
+
+    Arguments:
+        system (RegistrationSystem): The system to report on (or a snapshot of one).
+        report (str): "schedules" (one per student) or "rosters" (one per course).
+        fmt (str): "csv", "jsonl" or "text".
+        out (TextIO): The file to write to.
+        ids (Iterable[str], optional): Only these students or courses. Default is all of them.
+        consistent (bool, optional): Read from a snapshot of the system (see RegistrationSystem.snapshot),
+            so registrations made while the report is written don't show up in half of it.
+            Default is False (read the live records).
+
+    Returns:
+        int: How many rows (or text lines) were written.
+
+    Raises:
+        Exception: If the report or format is unknown.
+    """
+    if report == REPORT_SCHEDULES:
+        rows, columns, text = schedule_rows, SCHEDULE_COLUMNS, schedule_text
+    elif report == REPORT_ROSTERS:
+        rows, columns, text = roster_rows, ROSTER_COLUMNS, roster_text
+    else:
+        raise Exception(f"Unknown report: {report}")
+    if fmt not in (FORMAT_CSV, FORMAT_JSONL, FORMAT_TEXT):
+        raise Exception(f"Unknown format: {fmt}")
+    if consistent:
+        with system.snapshot() as snapshot:
+            return export_report(snapshot, report, fmt, out, ids)
+    if fmt == FORMAT_CSV:
+        return write_csv(rows(system, ids), columns, out)
+    if fmt == FORMAT_JSONL:
+        return write_jsonl(rows(system, ids), out)
+    return write_text(text(system, ids), out)
+
+
+def main():
+    from App import RegistrationSystem
+    from persistence import PersistentStore
+
+    parser = argparse.ArgumentParser(description="Export schedules or rosters from a saved system.")
+    parser.add_argument("report", choices=[REPORT_SCHEDULES, REPORT_ROSTERS])
+    parser.add_argument("--format", choices=[FORMAT_CSV, FORMAT_JSONL, FORMAT_TEXT], default=FORMAT_TEXT)
+    parser.add_argument("--out", help="file to write (default is the screen)")
+    parser.add_argument("--data-dir", required=True, help="folder of a saved system (see App.py --data-dir)")
+    args = parser.parse_args()
+
+    system = RegistrationSystem()
+    store = PersistentStore(args.data_dir, snapshot_every=None)
+    store.open(system)
+    try:
+        if args.out:
+            with open(args.out, "w", encoding="utf-8", newline="") as out:
+                count = export_report(system, args.report, args.format, out)
+            print(f"Wrote {count} rows to {args.out}.")
+        else:
+            export_report(system, args.report, args.format, sys.stdout)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
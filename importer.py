@@ -0,0 +1,276 @@
+"""
+Title:       Portfolio Project - Bulk Import
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Loads courses, students and enrollments into a RegistrationSystem from CSV or JSONL files.
+    Files are read one line at a time through a chain of generators (read -> check -> group into batches),
+    so memory use stays the same no matter how big the file is.
+    Each batch is applied with one add_courses_batch, add_students_batch or register_batch call,
+    and every rejected row is reported with its line number and the reason.
+
+    Expected columns (CSV header row, or JSON keys):
+        courses:     course_id, title, description, credits, capacity, and optionally meetings
+                     (like "Mon 09:00-10:15, Wed 09:00-10:15")
+        students:    student_id, password
+        enrollments: student_id, course_id
+
+    Usage:
+        python importer.py courses courses.csv
+        python importer.py enrollments enrollments.jsonl --batch-size 20000
+
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from App import Course
+
+KIND_COURSES = "courses"
+KIND_STUDENTS = "students"
+KIND_ENROLLMENTS = "enrollments"
+
+COLUMNS = {
+    KIND_COURSES: ("course_id", "title", "description", "credits", "capacity"),
+    KIND_STUDENTS: ("student_id", "password"),
+    KIND_ENROLLMENTS: ("student_id", "course_id"),
+}
+
+
+class ImportReport:
+
+    def __init__(self, kind: str, max_errors: int = 1000, on_reject: Optional[Callable[[int, str], None]] = None):
+        """
+        Keeps the results of one import.
+
+        Arguments:
+            kind (str): "courses", "students" or "enrollments".
+            max_errors (int, optional): How many rejected rows to keep details for.
+                All rejected rows are still counted, so a huge bad file can't use up memory.
+            on_reject (callable, optional): Called with (line number, reason) for every rejected row.
+
+        Attributes:
+            accepted (int): Rows that were applied.
+            rejected (int): Rows that were not applied.
+            errors (List[Tuple[int, str]]): (line number, reason) for the first rejected rows.
+            seconds (float): How long the import took.
+        """
+        self.kind = kind
+        self.max_errors = max_errors
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.seconds = 0.0
+        self.on_reject = on_reject
+
+    def reject(self, line: int, reason: str):
+        """
+        Counts a rejected row and keeps its details if there is room.
+
+        Arguments:
+            line (int): The line number in the file (the header is line 1 in CSV files).
+            reason (str): Why the row was rejected.
+        """
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, reason))
+        if self.on_reject is not None:
+            self.on_reject(line, reason)
+
+    def __str__(self) -> str:
+        rate = self.accepted / self.seconds if self.seconds else 0
+        lines = [f"{self.kind}: {self.accepted} accepted, {self.rejected} rejected "
+                 f"in {self.seconds:.2f} seconds ({rate:,.0f} rows/second)"]
+        for line, reason in self.errors:
+            lines.append(f"  line {line}: {reason}")
+        if self.rejected > len(self.errors):
+            lines.append(f"  ... and {self.rejected - len(self.errors)} more")
+        return "\n".join(lines)
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, object]]:
+    """
+    Reads a CSV or JSONL file one row at a time.
+
+    Argument:
+        path (str): The file. ".jsonl" (or ".json") files hold one JSON object per line;
+            any other file is read as CSV with a header row.
+
+    Yields:
+        Tuple[int, object]: The line number and the row (a dict), or the line number and
+        an error message (a str) if the line could not be read.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if extension in (".jsonl", ".json"):
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, f"Invalid JSON: {e}"
+                    continue
+                yield number, row if isinstance(row, dict) else "Row is not a JSON object."
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _whole_number(value, name: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"{name} must be at least 1.")
+    return number
+
+
+def check_rows(kind: str, rows: Iterable[Tuple[int, object]], report: ImportReport) -> Iterator[Tuple[int, tuple]]:
+    """
+    Checks each row has the columns the kind needs and turns it into the tuple the system expects.
+
+    Bad rows are added to the report and skipped.
+
+    Arguments:
+        kind (str): "courses", "students" or "enrollments".
+        rows (Iterable[Tuple[int, object]]): Rows from read_rows.
+        report (ImportReport): Where rejected rows are recorded.
+
+    Yields:
+        Tuple[int, tuple]: The line number and the cleaned-up row.
+    """
+    columns = COLUMNS[kind]
+    for line, row in rows:
+        if isinstance(row, str):
+            report.reject(line, row)
+            continue
+        values = []
+        for column in columns:
+            value = row.get(column)
+            value = value.strip() if isinstance(value, str) else value
+            if value is None or value == "":
+                report.reject(line, f"Missing {column}.")
+                break
+            values.append(value)
+        else:
+            if kind == KIND_COURSES:
+                try:
+                    values[3] = _whole_number(values[3], "credits")
+                    values[4] = _whole_number(values[4], "capacity")
+                except ValueError as e:
+                    report.reject(line, f"Invalid number: {e}")
+                    continue
+                meetings = row.get("meetings")
+                if meetings:
+                    try:
+                        values.append(Course.parse_meetings(meetings))
+                    except Exception as e:
+                        report.reject(line, str(e))
+                        continue
+            else:
+                values = [str(v) for v in values]
+            yield line, tuple(values)
+
+
+def batches(rows: Iterable, size: int) -> Iterator[list]:
+    """
+    Groups rows into lists of at most `size` rows.
+
+    Arguments:
+        rows (Iterable): Any rows.
+        size (int): The largest batch.
+
+    Yields:
+        list: The next batch.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+REASONS = {
+    "duplicate": "Already exists.",
+    "full": "Course is full.",
+    "unknown": "Student or course not found.",
+    "conflict": "Time conflict with another registered course.",
+    "prerequisite": "Missing prerequisites.",
+    "credit_limit": "Credit limit exceeded.",
+    "invalid": "Invalid meeting time.",
+}
+
+
+def import_file(system, kind: str, path: str, batch_size: int = 10_000, max_errors: int = 1000,
+                on_reject: Optional[Callable[[int, str], None]] = None) -> ImportReport:
+    """
+    Streams one file into the registration system.
+
+    Arguments:
+        system (RegistrationSystem): The system to load into.
+        kind (str): "courses", "students" or "enrollments".
+        path (str): A CSV or JSONL file.
+        batch_size (int, optional): How many rows are applied per batch call.
+        max_errors (int, optional): How many rejected rows to keep in the report.
+        on_reject (callable, optional): Called with (line number, reason) for every rejected row,
+            for example to write them all to a file.
+
+    Returns:
+        ImportReport: Counts and rejected rows.
+
+    Raises:
+        Exception: If the kind is not one of the three supported kinds.
+    """
+    if kind not in COLUMNS:
+        raise Exception(f"Unknown import kind: {kind}")
+    apply = {
+        KIND_COURSES: system.add_courses_batch,
+        KIND_STUDENTS: system.add_students_batch,
+        KIND_ENROLLMENTS: system.register_batch,
+    }[kind]
+    report = ImportReport(kind, max_errors, on_reject)
+    start = time.perf_counter()
+    for batch in batches(check_rows(kind, read_rows(path), report), batch_size):
+        results = apply([row for _, row in batch])
+        for (line, _), result in zip(batch, results):
+            status = result[-1]
+            if status == "ok":
+                report.accepted += 1
+            else:
+                report.reject(line, REASONS.get(status, status))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    from App import RegistrationSystem
+
+    parser = argparse.ArgumentParser(description="Import courses, students or enrollments into a saved system.\n"
+                                                 "Without --data-dir the file is only checked.")
+    parser.add_argument("kind", choices=list(COLUMNS))
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--data-dir", help="folder of a saved system to load into (see App.py --data-dir)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    system = RegistrationSystem()
+    store = None
+    if args.data_dir:
+        from persistence import PersistentStore
+        store = PersistentStore(args.data_dir)
+        store.open(system)
+    try:
+        print(import_file(system, args.kind, args.path, args.batch_size))
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+"""
+Title:       Portfolio Project - Metrics
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Measures what the registration system is doing while it runs.
+    instrument() wraps the public methods of a RegistrationSystem so every call is counted and timed,
+    and every failed call is counted by its reason ("Course is full", "Time conflict", ...).
+    Times go into latency histograms, so p50/p95/p99 can be read at any moment.
+    Enrollment and seat gauges are read from the system when the metrics are shown.
+
+    Each thread records into its own set of counters, so the recording path takes no locks
+    and (after a thread's first call of each operation) creates no new objects.
+    Counters are only added together when someone reads them.
+
+    The metrics can be shown in the admin menu, or written to a file as JSON or in the
+    Prometheus text format. An optional sampler (SlowOperationSampler) records the call stacks
+    of operations that run longer than a threshold, to find out where slow calls spend their time.
+
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+# Public RegistrationSystem methods that are counted and timed
+INSTRUMENTED = (
+    "authenticate_user", "add_student", "add_students_batch", "add_course", "add_courses_batch",
+    "remove_course", "remove_courses", "update_course", "search_courses", "list_students_for_course",
+    "list_courses_for_student", "view_available_courses", "catalog_rows", "student_course_register",
+    "student_course_remove", "register_batch", "drop_batch", "student_registered_course", "join_waitlist",
+    "leave_waitlist", "promote_waitlist", "complete_course", "eligible_courses", "find_conflicts",
+    "credit_load", "overloaded_students", "underloaded_students", "check_consistency", "submit_preferences",
+    "withdraw_preferences", "run_lottery", "snapshot",
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Each power of two is split into this many histogram buckets (so a bucket is at most 25% wide)
+_SUB_BUCKETS = 4
+_SUB_BITS = 2
+# Enough buckets for anything up to 2**63 nanoseconds
+_BUCKETS = 64 * _SUB_BUCKETS
+
+
+def _bucket(ns: int) -> int:
+    """
+    Finds the histogram bucket of a time in nanoseconds.
+    """
+    bits = ns.bit_length()
+    if bits <= _SUB_BITS + 1:
+        return ns
+    return bits * _SUB_BUCKETS + ((ns >> (bits - _SUB_BITS - 1)) & (_SUB_BUCKETS - 1))
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """
+    Gets the smallest and largest time (in nanoseconds) that fall into a bucket.
+    """
+    bits, sub = divmod(index, _SUB_BUCKETS)
+    if bits <= _SUB_BITS + 1:
+        return index, index
+    shift = bits - _SUB_BITS - 1
+    return (_SUB_BUCKETS + sub) << shift, ((_SUB_BUCKETS + sub + 1) << shift) - 1
+
+
+def error_reason(message: str) -> str:
+    """
+    Turns an error message into a reason that doesn't depend on IDs or numbers.
+
+    For example "Time conflict with AR101." becomes "Time conflict" and
+    "Credit limit exceeded: 11 of 10 credits." becomes "Credit limit exceeded".
+    """
+    return re.split(r":| with ", message, maxsplit=1)[0].strip().rstrip(".")
+
+
+class OperationStats:
+
+    __slots__ = ("calls", "errors", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        """
+        The counters of one operation in one thread.
+
+        Attributes:
+            calls (int): How many times the operation ran (including failed calls).
+            errors (Dict[str, int]): How many calls failed, by reason.
+            total_ns (int): Total time of all calls, in nanoseconds.
+            max_ns (int): The longest call, in nanoseconds.
+            histogram (List[int]): How many calls took a time in each bucket.
+        """
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * _BUCKETS
+
+
+class _Shard:
+
+    __slots__ = ("thread_id", "stats", "operation", "started")
+
+    def __init__(self, thread_id: int):
+        # The operation the thread is running right now (None between calls), for the sampler
+        self.thread_id = thread_id
+        self.stats: Dict[str, OperationStats] = {}
+        self.operation: Optional[str] = None
+        self.started = 0
+
+
+class Metrics:
+
+    def __init__(self):
+        """
+        Creates an empty set of counters.
+
+        Attributes:
+            started (float): When counting began (seconds since the epoch).
+            sampler (SlowOperationSampler, optional): Set by SlowOperationSampler.start, so its
+                stacks are included when the metrics are shown or saved.
+        """
+        self.started = time.time()
+        self.sampler: Optional["SlowOperationSampler"] = None
+        self._local = threading.local()
+        # Only taken when a thread records for the first time
+        self._lock = threading.Lock()
+        self._shards: List[_Shard] = []
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(threading.get_ident())
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def record(self, operation: str, ns: int, error: Optional[str] = None):
+        """
+        Counts one call of an operation.
+
+        Arguments:
+            operation (str): The operation's name.
+            ns (int): How long the call took, in nanoseconds.
+            error (str, optional): The reason the call failed (see error_reason), or None if it worked.
+        """
+        self._record(self._shard(), operation, ns, error)
+
+    @staticmethod
+    def _record(shard: _Shard, operation: str, ns: int, error: Optional[str] = None):
+        stats = shard.stats.get(operation)
+        if stats is None:
+            stats = shard.stats[operation] = OperationStats()
+        stats.calls += 1
+        stats.total_ns += ns
+        if ns > stats.max_ns:
+            stats.max_ns = ns
+        # Same as _bucket(ns), written out to save a call
+        bits = ns.bit_length()
+        if bits > _SUB_BITS + 1:
+            stats.histogram[bits * _SUB_BUCKETS + ((ns >> (bits - _SUB_BITS - 1)) & (_SUB_BUCKETS - 1))] += 1
+        else:
+            stats.histogram[ns] += 1
+        if error is not None:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def wrap(self, operation: str, method):
+        """
+        Makes a version of a method that records every call.
+
+        Arguments:
+            operation (str): The name to record the calls under.
+            method (callable): The method to time.
+
+        Returns:
+            callable: The timed method. Exceptions are counted and then raised as before.
+        """
+        clock = time.perf_counter_ns
+        shard_of = self._shard
+        record = self._record
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            shard = shard_of()
+            if shard.operation is not None:
+                # Called from inside another timed operation: count it, but leave the outer one as
+                # the operation the sampler sees
+                start = clock()
+                try:
+                    result = method(*args, **kwargs)
+                except Exception as e:
+                    record(shard, operation, clock() - start, error_reason(str(e)))
+                    raise
+                record(shard, operation, clock() - start)
+                return result
+            shard.operation = operation
+            shard.started = start = clock()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                shard.operation = None
+                record(shard, operation, clock() - start, error_reason(str(e)))
+                raise
+            shard.operation = None
+            record(shard, operation, clock() - start)
+            return result
+
+        return timed
+
+    def operations(self) -> Dict[str, OperationStats]:
+        """
+        Adds up the counters of every thread.
+
+        Returns:
+            Dict[str, OperationStats]: The totals of each operation, by name in alphabetical order.
+        """
+        with self._lock:
+            shards = list(self._shards)
+        totals: Dict[str, OperationStats] = {}
+        for shard in shards:
+            for operation, stats in list(shard.stats.items()):
+                total = totals.get(operation)
+                if total is None:
+                    total = totals[operation] = OperationStats()
+                total.calls += stats.calls
+                total.total_ns += stats.total_ns
+                total.max_ns = max(total.max_ns, stats.max_ns)
+                for reason, count in list(stats.errors.items()):
+                    total.errors[reason] = total.errors.get(reason, 0) + count
+                histogram = total.histogram
+                for i, count in enumerate(stats.histogram):
+                    if count:
+                        histogram[i] += count
+        return dict(sorted(totals.items()))
+
+    @staticmethod
+    def quantile(stats: OperationStats, q: float) -> float:
+        """
+        Estimates a latency quantile of an operation from its histogram.
+
+        Arguments:
+            stats (OperationStats): The operation's counters.
+            q (float): The quantile, like 0.95 for p95.
+
+        Returns:
+            float: The time in nanoseconds (the middle of the bucket it falls in), or 0 with no calls.
+        """
+        calls = sum(stats.histogram)
+        if not calls:
+            return 0.0
+        rank = q * calls
+        seen = 0
+        for i, count in enumerate(stats.histogram):
+            seen += count
+            if count and seen >= rank:
+                low, high = _bucket_bounds(i)
+                # The estimate can't be longer than the longest call
+                return min((low + high) / 2, stats.max_ns)
+        return float(stats.max_ns)
+
+    def report(self, system=None) -> dict:
+        """
+        Collects everything into plain data.
+
+        Argument:
+            system (RegistrationSystem, optional): The system to read the enrollment and seat gauges from.
+
+        Returns:
+            dict: Uptime, gauges, each operation's calls, errors and latency quantiles (in
+            microseconds), and the sampled slow-operation stacks if a sampler is running.
+        """
+        uptime = time.time() - self.started
+        operations = {}
+        for operation, stats in self.operations().items():
+            operations[operation] = {
+                "calls": stats.calls,
+                "calls_per_second": round(stats.calls / uptime, 3) if uptime > 0 else 0.0,
+                "errors": sum(stats.errors.values()),
+                "errors_by_reason": dict(sorted(stats.errors.items())),
+                "mean_us": round(stats.total_ns / stats.calls / 1000, 3) if stats.calls else 0.0,
+                "max_us": round(stats.max_ns / 1000, 3),
+                **{f"p{round(q * 100)}_us": round(self.quantile(stats, q) / 1000, 3) for q in QUANTILES},
+            }
+        report = {"uptime_seconds": round(uptime, 3), "operations": operations}
+        if system is not None:
+            report["gauges"] = gauges(system)
+        if self.sampler is not None:
+            report["slow_stacks"] = self.sampler.folded()
+        return report
+
+    def prometheus(self, system=None) -> str:
+        """
+        Writes the metrics in the Prometheus text exposition format.
+
+        Argument:
+            system (RegistrationSystem, optional): The system to read the gauges from.
+
+        Returns:
+            str: The metrics text.
+        """
+        lines = [
+            "# HELP registration_operation_calls_total Calls of each RegistrationSystem operation.",
+            "# TYPE registration_operation_calls_total counter",
+        ]
+        operations = self.operations()
+        for operation, stats in operations.items():
+            lines.append(f'registration_operation_calls_total{{operation="{operation}"}} {stats.calls}')
+        lines += [
+            "# HELP registration_operation_errors_total Failed calls of each operation, by reason.",
+            "# TYPE registration_operation_errors_total counter",
+        ]
+        for operation, stats in operations.items():
+            for reason, count in sorted(stats.errors.items()):
+                reason = reason.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'registration_operation_errors_total{{operation="{operation}",reason="{reason}"}} '
+                             f'{count}')
+        lines += [
+            "# HELP registration_operation_latency_seconds How long each operation takes.",
+            "# TYPE registration_operation_latency_seconds summary",
+        ]
+        for operation, stats in operations.items():
+            for q in QUANTILES:
+                lines.append(f'registration_operation_latency_seconds{{operation="{operation}",quantile="{q}"}} '
+                             f'{self.quantile(stats, q) / 1e9:.9f}')
+            lines.append(f'registration_operation_latency_seconds_sum{{operation="{operation}"}} '
+                         f'{stats.total_ns / 1e9:.9f}')
+            lines.append(f'registration_operation_latency_seconds_count{{operation="{operation}"}} {stats.calls}')
+        if system is not None:
+            for name, value in gauges(system).items():
+                lines.append(f"# TYPE registration_{name} gauge")
+                lines.append(f"registration_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, system=None):
+        """
+        Saves the metrics to a file: JSON if the name ends in ".json", otherwise Prometheus text.
+
+        Arguments:
+            path (str): The file to write.
+            system (RegistrationSystem, optional): The system to read the gauges from.
+        """
+        if path.lower().endswith(".json"):
+            text = json.dumps(self.report(system), indent=2)
+        else:
+            text = self.prometheus(system)
+        # Written next to the target first, so a scraper never reads half a file
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+def gauges(system) -> Dict[str, int]:
+    """
+    Reads the current enrollment and seat numbers of a system.
+
+    Argument:
+        system (RegistrationSystem): The system to read.
+
+    Returns:
+        Dict[str, int]: courses, students, enrollments, seats (total capacity), free_seats and full_courses.
+    """
+    courses, enrolled, capacity, free, full = system.seat_totals()
+    return {"courses": courses, "students": len(system.students), "enrollments": enrolled,
+            "seats": capacity, "free_seats": free, "full_courses": full}
+
+
+def instrument(system, metrics: Optional[Metrics] = None) -> Metrics:
+    """
+    Starts counting and timing the public methods of a system.
+
+    The methods are replaced on this one object only, so other systems are not affected.
+    The Metrics object is also stored as system.metrics, where the admin menu finds it.
+
+    Arguments:
+        system (RegistrationSystem): The system to watch (any backend).
+        metrics (Metrics, optional): Where to record. Default is a new Metrics object.
+
+    Returns:
+        Metrics: The object the calls are recorded in.
+    """
+    if metrics is None:
+        metrics = Metrics()
+    for operation in INSTRUMENTED:
+        method = getattr(system, operation, None)
+        if method is not None:
+            setattr(system, operation, metrics.wrap(operation, method))
+    system.metrics = metrics
+    return metrics
+
+
+class SlowOperationSampler:
+
+    def __init__(self, metrics: Metrics, slow_ms: float = 50.0, interval_ms: float = 5.0, max_depth: int = 40):
+        """
+        Samples the call stacks of operations that have been running for too long.
+
+        A background thread wakes up every interval and looks at every thread that is inside an
+        instrumented operation. If that operation started more than slow_ms ago, the thread's
+        current stack is counted. Stacks are kept in the "folded" form used by flame graph tools:
+        "operation;file:function;file:function ... count".
+
+        Nothing is added to the recording path: the sampler only reads what each thread's
+        counters already keep (the operation it is in and when it started).
+
+        Arguments:
+            metrics (Metrics): The metrics of the instrumented system.
+            slow_ms (float, optional): How long an operation must run before its stack is sampled.
+            interval_ms (float, optional): Time between samples.
+            max_depth (int, optional): Most frames kept from each stack (innermost first).
+        """
+        self.metrics = metrics
+        self.slow_ns = int(slow_ms * 1e6)
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.stacks: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Starts sampling in a background thread and attaches the sampler to its Metrics.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="slow-operation-sampler", daemon=True)
+            self._thread.start()
+        self.metrics.sampler = self
+
+    def stop(self):
+        """
+        Stops sampling. The stacks collected so far are kept.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """
+        Takes one sample of every thread that is in a slow operation.
+        """
+        now = time.perf_counter_ns()
+        with self.metrics._lock:
+            shards = list(self.metrics._shards)
+        frames = None
+        for shard in shards:
+            operation = shard.operation
+            if operation is None or now - shard.started < self.slow_ns:
+                continue
+            if frames is None:
+                frames = sys._current_frames()
+            frame = frames.get(shard.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                code = frame.f_code
+                names.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join([operation] + names[::-1])
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def folded(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Lists the sampled stacks, most often seen first.
+
+        Argument:
+            limit (int, optional): Most stacks to list. Default is all.
+
+        Returns:
+            List[str]: "operation;frame;frame ... count" lines.
+        """
+        stacks = sorted(list(self.stacks.items()), key=lambda item: (-item[1], item[0]))
+        return [f"{stack} {count}" for stack, count in stacks[:limit]]
@@ -0,0 +1,402 @@
+"""
+Title:       Portfolio Project - Persistence
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Keeps the registration system's data safe across restarts.
+    Every change made through RegistrationSystem is appended to an operation log (a write-ahead log),
+    and from time to time the whole state is written to a compact snapshot file so the log can start over.
+    On startup the latest snapshot is loaded and only the log records written after it are replayed.
+
+"""
+
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+from App import Waitlist
+from auth import stored_password
+
+SNAPSHOT_FILE = "snapshot.json"
+LOG_FILE = "operations.log"
+
+# How often the operation log is forced to disk
+SYNC_ALWAYS = "always"  # fsync after every record (safest, slowest)
+SYNC_GROUP = "group"    # fsync once per group of records or per time interval (group commit)
+SYNC_NONE = "none"      # only hand records to the operating system, never fsync
+
+
+class OperationLog:
+
+    def __init__(self, path: str, sync: str = SYNC_ALWAYS, group_size: int = 64,
+                 group_interval: float = 0.05, next_seq: int = 1):
+        """
+        Opens an append-only operation log file.
+
+        Each record is one JSON line: [sequence number, operation name, arguments...].
+
+        Arguments:
+            path (str): The log file to append to (created if missing).
+            sync (str, optional): "always", "group" or "none" (see the SYNC_* values).
+            group_size (int, optional): In "group" mode, fsync after this many records.
+            group_interval (float, optional): In "group" mode, also fsync when this many seconds
+                have passed since the last fsync.
+            next_seq (int, optional): The sequence number for the next record.
+
+        Attributes:
+            records (int): How many records were appended since the log was opened.
+            bytes_written (int): How many bytes were appended since the log was opened.
+            syncs (int): How many times the file was fsynced.
+        """
+        if sync not in (SYNC_ALWAYS, SYNC_GROUP, SYNC_NONE):
+            raise Exception(f"Unknown sync mode: {sync}")
+        self.path = path
+        self.sync_mode = sync
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.next_seq = next_seq
+        self.records = 0
+        self.bytes_written = 0
+        self.syncs = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    def append(self, operation: str, args: tuple) -> int:
+        """
+        Adds one record to the end of the log and syncs it according to the sync mode.
+
+        Arguments:
+            operation (str): The RegistrationSystem method name.
+            args (tuple): The arguments to replay the change with.
+
+        Returns:
+            int: The sequence number given to the record.
+        """
+        with self._lock:
+            seq = self.next_seq
+            line = json.dumps([seq, operation, *args], separators=(",", ":")).encode("utf-8") + b"\n"
+            self._file.write(line)
+            self.next_seq += 1
+            self.records += 1
+            self.bytes_written += len(line)
+            self._pending += 1
+            if self.sync_mode == SYNC_ALWAYS:
+                self._sync()
+            elif self.sync_mode == SYNC_GROUP:
+                if self._pending >= self.group_size or time.monotonic() - self._last_sync >= self.group_interval:
+                    self._sync()
+            else:
+                self._file.flush()
+            return seq
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.syncs += 1
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """
+        Forces every record written so far onto the disk.
+        """
+        with self._lock:
+            if self._pending:
+                self._sync()
+
+    def reset(self):
+        """
+        Empties the log file. Used after a snapshot has saved everything the log contained.
+        """
+        with self._lock:
+            self._file.close()
+            self._file = open(self.path, "wb")
+            self._sync()
+
+    def close(self):
+        """
+        Syncs any pending records and closes the file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+def read_log(path: str) -> List[list]:
+    """
+    Reads every complete record from an operation log file.
+
+    If the program stopped in the middle of writing the last line, that broken line
+    is cut off the file so new records start on a clean line.
+
+    Argument:
+        path (str): The log file.
+
+    Returns:
+        List[list]: The records, each [sequence number, operation name, arguments...].
+    """
+    if not os.path.exists(path):
+        return []
+    records = []
+    good_size = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            good_size += len(line)
+    if good_size != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good_size)
+    return records
+
+
+def snapshot_state(system) -> dict:
+    """
+    Copies the courses, students, enrollments, waitlists and lottery preferences of a system into plain data.
+
+    Argument:
+        system (RegistrationSystem): The system to copy.
+
+    Returns:
+        dict: The state, ready to be saved as JSON.
+    """
+    return {
+        "courses": [
+            [c.course_id, c.title, c.description, c.credits, c.capacity, c.registered_students.to_list(),
+             c.meetings, c.prerequisites]
+            for c in system.courses.values()
+        ],
+        "students": [
+            [s.user_id, s.password, s.registered_courses.to_list(), s.standing, s.completed_courses.to_list()]
+            for s in system.students.values()
+        ],
+        "waitlists": [[cid, waitlist.to_list()] for cid, waitlist in system.waitlists.items()],
+        "preferences": [[sid, list(ranked)] for sid, ranked in system.preferences.items()],
+    }
+
+
+def restore_state(system, state: dict):
+    """
+    Loads courses, students, enrollments, waitlists and lottery preferences from snapshot data into a system.
+
+    Students that already exist (like the pre-registered accounts) are reused.
+    Enrollment and waitlist order is kept exactly as it was saved.
+
+    Arguments:
+        system (RegistrationSystem): A system with no courses yet.
+        state (dict): Data made by snapshot_state.
+    """
+    for sid, password, _, *rest in state["students"]:
+        standing = rest[0] if rest else 0
+        if sid in system.students:
+            system.students[sid].password = stored_password(password)
+            system.students[sid].standing = standing
+        else:
+            system.add_student(sid, password, standing)
+    for cid, title, description, credits, capacity, roster, *rest in state["courses"]:
+        system.add_course(cid, title, description, credits, capacity, rest[0] if rest else ())
+        course = system.courses[cid]
+        # A prerequisite may have been added after this course, so the graph is built by reindex below
+        course.update_details(prerequisites=rest[1] if len(rest) > 1 else ())
+        for sid in roster:
+            course.registered_students.add(sid)
+    for sid, _, course_ids, *rest in state["students"]:
+        student = system.students[sid]
+        for cid in course_ids:
+            student.registered_courses.add(cid)
+        for cid in (rest[1] if len(rest) > 1 else ()):
+            student.completed_courses.add(cid)
+    for cid, student_ids in state.get("waitlists", []):
+        # Adding in saved order gives each student the same place in line as before
+        waitlist = system.waitlists[cid] = Waitlist(system.waitlist_by_standing)
+        for sid in student_ids:
+            waitlist.add(sid, system.students[sid].standing)
+    for sid, ranked in state.get("preferences", []):
+        system.preferences[sid] = tuple(ranked)
+    # Rosters and prerequisites were filled in directly, so bring the catalog's seat counts,
+    # the timetables, the prerequisite graph and the credit totals up to date
+    system.reindex()
+
+
+def replay(system, records: List[list]):
+    """
+    Applies logged operations to a system in order.
+
+    Automatic waitlist promotion is turned off while replaying, because every promotion
+    that happened was logged as its own promote_waitlist record.
+
+    Argument:
+        system (RegistrationSystem): The system to change.
+        records (List[list]): Records from read_log.
+    """
+    auto_promote = system.auto_promote
+    system.auto_promote = False
+    try:
+        for record in records:
+            getattr(system, record[1])(*record[2:])
+    finally:
+        system.auto_promote = auto_promote
+
+
+class PersistentStore:
+
+    def __init__(self, directory: str, sync: str = SYNC_GROUP, group_size: int = 64,
+                 group_interval: float = 0.05, snapshot_every: Optional[int] = 10_000):
+        """
+        Sets up durable storage for a RegistrationSystem in a folder.
+
+        The folder holds snapshot.json (the state at some point) and operations.log
+        (every change made after that snapshot).
+
+        Arguments:
+            directory (str): The folder to keep the files in (created if missing).
+            sync (str, optional): The operation log's sync mode. Default is group commit.
+            group_size (int, optional): Records per fsync in group mode.
+            group_interval (float, optional): Longest time in seconds between fsyncs in group mode.
+            snapshot_every (int, optional): Take a new snapshot after this many log records.
+                None turns automatic snapshots off.
+
+        Attributes:
+            log (OperationLog): The open operation log, after open() is called.
+            recovery_seconds (float): How long the last open() took to load and replay.
+            snapshot_bytes (int): Total bytes written to snapshots by this store.
+        """
+        self.directory = directory
+        self.sync = sync
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.snapshot_every = snapshot_every
+        self.log: Optional[OperationLog] = None
+        self.recovery_seconds = 0.0
+        self.snapshot_bytes = 0
+        self._system = None
+        self._since_snapshot = 0
+        self._snapshot_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        # Automatic snapshot of a thread-safe system, taken on its own thread
+        self._snapshotter: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.directory, LOG_FILE)
+
+    def open(self, system):
+        """
+        Recovers the saved state into a new system and starts logging its changes.
+
+        Loads the snapshot (if there is one), replays the log records written after it,
+        then attaches the log as the system's journal.
+
+        Argument:
+            system (RegistrationSystem): A freshly created system.
+        """
+        start = time.perf_counter()
+        last_seq = 0
+        system.journal = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            restore_state(system, data)
+            last_seq = data["seq"]
+        records = [r for r in read_log(self.log_path) if r[0] > last_seq]
+        replay(system, records)
+        if records:
+            last_seq = records[-1][0]
+        self.recovery_seconds = time.perf_counter() - start
+
+        self._system = system
+        self._since_snapshot = len(records)
+        self.log = OperationLog(self.log_path, self.sync, self.group_size, self.group_interval, last_seq + 1)
+        system.journal = self
+
+    def append(self, operation: str, args: tuple):
+        """
+        Logs one change (called by RegistrationSystem) and takes a snapshot when one is due.
+
+        The change is still under way when it is logged. In a thread-safe system the snapshot
+        must wait for it (and every other change under way) to finish, so it is taken on a
+        separate thread; otherwise it is taken right here.
+
+        Arguments:
+            operation (str): The RegistrationSystem method name.
+            args (tuple): The arguments to replay the change with.
+        """
+        self.log.append(operation, args)
+        if self.snapshot_every is None:
+            return
+        with self._count_lock:
+            self._since_snapshot += 1
+            if self._since_snapshot < self.snapshot_every:
+                return
+            if self._system.thread_safe:
+                if self._snapshotter is None or not self._snapshotter.is_alive():
+                    self._since_snapshot = 0
+                    self._snapshotter = threading.Thread(target=self.snapshot, name="snapshot", daemon=True)
+                    self._snapshotter.start()
+                return
+            self._since_snapshot = 0
+        self.snapshot()
+
+    def snapshot(self):
+        """
+        Writes the whole current state to the snapshot file and empties the log.
+
+        The snapshot is written to a temporary file first and then renamed, so a crash
+        never leaves a half-written snapshot behind. Log records already in the snapshot
+        are skipped on recovery, so a crash between the rename and the log reset is safe.
+
+        In a thread-safe system, changes are paused while the state is read and the log emptied
+        (see RegistrationSystem.changes_paused), so no change is left out of both. Don't call this
+        from inside a change.
+        """
+        with self._system.changes_paused(), self._snapshot_lock:
+            self.log.sync()
+            data = snapshot_state(self._system)
+            data["seq"] = self.log.next_seq - 1
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+                self.snapshot_bytes += f.tell()
+            os.replace(tmp_path, self.snapshot_path)
+            self.log.reset()
+
+    def write_amplification(self, changes: int) -> float:
+        """
+        Works out how many bytes were written to disk per change.
+
+        Argument:
+            changes (int): How many changes (for example registrations) were made.
+
+        Returns:
+            float: (log bytes + snapshot bytes) / changes.
+        """
+        if changes <= 0:
+            return 0.0
+        return (self.log.bytes_written + self.snapshot_bytes) / changes
+
+    def close(self):
+        """
+        Syncs and closes the log and detaches it from the system.
+        """
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        if self.log is not None:
+            self.log.close()
+        if self._system is not None:
+            self._system.journal = None
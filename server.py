@@ -0,0 +1,523 @@
+"""
+Title:       Portfolio Project - Network Server
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Lets many users reach one RegistrationSystem at the same time over the network, instead of one
+    user at a terminal. Uses only the standard library: an asyncio TCP server that speaks JSON lines.
+
+    Each request is one line of JSON, {"id": 1, "op": "search_courses", "args": ["cs"], "kwargs": {}},
+    and each reply is one line, {"id": 1, "ok": true, "result": [...]} or {"id": 1, "ok": false,
+    "error": "Course is full."}. A connection starts with a "login" request and may then send many
+    requests without waiting; replies carry the request's id and can come back in any order.
+    The password is checked once, at login, on the session manager's worker threads (see auth.py),
+    and the login answers with a session token. Every later request checks the session with a
+    dictionary lookup, and a new connection can "resume" a session with its token instead of
+    sending the password again.
+    Admins can call every operation. Students can call the read operations and the operations about
+    themselves (their student ID must be the first argument).
+
+    Reads run in a small thread pool, and identical reads that arrive while one is already running
+    (like many students opening the catalog at once) share that one computation and its JSON.
+    Writes go through a queue to a single writer thread, which applies them in order and in batches.
+    Reads and writes never run at the same time, so the system needs no locks of its own.
+
+    RegistrationClient is a matching asyncio client (see benchmarks/bench_server.py for a load generator).
+
+    Usage:
+        python server.py [--host 127.0.0.1] [--port 8642]
+    or start App.py with --serve HOST:PORT.
+
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from App import Admin, Course, LotteryResult, RegistrationSystem, User
+from auth import SessionManager
+
+DEFAULT_PORT = 8642
+# Longest request line accepted (batches can be large)
+MAX_LINE = 16 * 1024 * 1024
+
+# Operation name -> (read or write, who may call it). "self" operations take the student's own ID first.
+OPERATIONS = {
+    "search_courses": ("read", "any"),
+    "view_available_courses": ("read", "any"),
+    "catalog_rows": ("read", "any"),
+    "catalog_size": ("read", "any"),
+    "list_courses_for_student": ("read", "self"),
+    "student_registered_course": ("read", "self"),
+    "waitlist_position": ("read", "self"),
+    "student_waitlists": ("read", "self"),
+    "completed_courses": ("read", "self"),
+    "eligible_courses": ("read", "self"),
+    "credit_load": ("read", "self"),
+    "lottery_preferences": ("read", "self"),
+    "list_students_for_course": ("read", "admin"),
+    "overloaded_students": ("read", "admin"),
+    "underloaded_students": ("read", "admin"),
+    "find_conflicts": ("read", "admin"),
+    "seat_totals": ("read", "admin"),
+    "check_consistency": ("read", "admin"),
+    "student_course_register": ("write", "self"),
+    "student_course_remove": ("write", "self"),
+    "join_waitlist": ("write", "self"),
+    "leave_waitlist": ("write", "self"),
+    "submit_preferences": ("write", "self"),
+    "withdraw_preferences": ("write", "self"),
+    "add_student": ("write", "admin"),
+    "add_students_batch": ("write", "admin"),
+    "add_course": ("write", "admin"),
+    "add_courses_batch": ("write", "admin"),
+    "remove_course": ("write", "admin"),
+    "remove_courses": ("write", "admin"),
+    "update_course": ("write", "admin"),
+    "register_batch": ("write", "admin"),
+    "drop_batch": ("write", "admin"),
+    "promote_waitlist": ("write", "admin"),
+    "complete_course": ("write", "admin"),
+    "run_lottery": ("write", "admin"),
+}
+
+
+def to_json(value):
+    """
+    Turns a result into JSON-friendly data.
+
+    Courses become dictionaries of their details, users their ID and role, lottery results
+    their seed, assignments and stats; tuples, sets and other collections become lists.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Course):
+        return {"course_id": value.course_id, "title": value.title, "description": value.description,
+                "credits": value.credits, "capacity": value.capacity,
+                "enrolled": len(value.registered_students), "meetings": Course.format_meetings(value.meetings),
+                "prerequisites": list(value.prerequisites)}
+    if isinstance(value, User):
+        return {"user_id": value.user_id, "role": "admin" if isinstance(value, Admin) else "student"}
+    if isinstance(value, LotteryResult):
+        return {"seed": value.seed, "assignments": value.assignments, "stats": value.stats}
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    return [to_json(v) for v in value]
+
+
+def _encode(value) -> str:
+    return json.dumps(to_json(value), separators=(",", ":"))
+
+
+class ReadWriteGate:
+
+    def __init__(self):
+        """
+        Lets any number of reads run together, or one write batch alone.
+
+        A waiting writer goes before reads that arrive after it, so a steady stream
+        of reads can't hold writes back forever.
+        """
+        self._changed = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @asynccontextmanager
+    async def reading(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: not self._writing and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._readers -= 1
+                if not self._readers:
+                    self._changed.notify_all()
+
+    @asynccontextmanager
+    async def writing(self):
+        async with self._changed:
+            self._writers_waiting += 1
+            await self._changed.wait_for(lambda: not self._writing and not self._readers)
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._writing = False
+                self._changed.notify_all()
+
+
+class RegistrationServer:
+
+    def __init__(self, system: RegistrationSystem, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 read_threads: int = 4, max_write_batch: int = 256, coalesce: bool = True,
+                 sessions: Optional[SessionManager] = None):
+        """
+        Creates a server for a registration system. Call start() (or serve_forever()) inside an asyncio loop.
+
+        Arguments:
+            system (RegistrationSystem): The system to serve (any backend).
+            host (str, optional): The address to listen on. Default is this machine only.
+            port (int, optional): The TCP port. 0 picks a free one (see the port attribute after start()).
+            read_threads (int, optional): How many reads may run at once.
+            max_write_batch (int, optional): The most queued writes applied in one turn of the writer.
+            coalesce (bool, optional): If False, every read is computed on its own (for comparison).
+            sessions (SessionManager, optional): Checks logins and sessions. Default is a new
+                SessionManager for the system, closed with the server.
+
+        Attributes:
+            stats (Dict[str, int]): Counters: connections (open now), requests, reads (computed),
+                coalesced (reads answered by another identical read), writes, write_batches
+                and largest_write_batch.
+            sessions (SessionManager): The logins and sessions.
+        """
+        self.system = system
+        self.host = host
+        self.port = port
+        self.max_write_batch = max_write_batch
+        self.coalesce = coalesce
+        self.sessions = sessions if sessions is not None else SessionManager(system)
+        self._own_sessions = sessions is None
+        self.stats: Dict[str, int] = dict.fromkeys(
+            ("connections", "requests", "reads", "coalesced", "writes", "write_batches", "largest_write_batch"), 0)
+        self._read_pool = ThreadPoolExecutor(read_threads, thread_name_prefix="read")
+        self._write_pool = ThreadPoolExecutor(1, thread_name_prefix="write")
+        # (operation, arguments as JSON) -> future of the running read's (ok, JSON) answer
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._gate: Optional[ReadWriteGate] = None
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """
+        Starts listening and starts the writer.
+        """
+        self._gate = ReadWriteGate()
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE,
+                                                  backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Starts the server and runs until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stops accepting connections, lets queued writes finish and stops the threads.
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._writer_task is not None:
+            await self._writes.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._read_pool.shutdown()
+        self._write_pool.shutdown()
+        if self._own_sessions:
+            self.sessions.close()
+
+    # Connections
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves one connection: every request line gets its own task, so slow requests
+        don't hold up the ones behind them.
+        """
+        self.stats["connections"] += 1
+        connection = {"token": None}
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self._answer(connection, line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.stats["connections"] -= 1
+            writer.close()
+
+    async def _answer(self, connection: dict, line: bytes, writer: asyncio.StreamWriter):
+        """
+        Answers one request line.
+        """
+        self.stats["requests"] += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = request["op"]
+            args = request.get("args", [])
+            kwargs = request.get("kwargs", {})
+            if not isinstance(args, list) or not isinstance(kwargs, dict):
+                raise ValueError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            ok, result = False, json.dumps("Bad request.")
+        else:
+            ok, result = await self._dispatch(connection, op, args, kwargs)
+        field = "result" if ok else "error"
+        reply = f'{{"id":{json.dumps(request_id)},"ok":{"true" if ok else "false"},"{field}":{result}}}\n'
+        try:
+            writer.write(reply.encode("utf-8"))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _dispatch(self, connection: dict, op: str, args: list, kwargs: dict) -> Tuple[bool, str]:
+        """
+        Checks the connection's session and who may call an operation, and sends it to the read or write path.
+
+        Returns:
+            Tuple[bool, str]: Whether it worked, and the result (or error message) as JSON.
+        """
+        if op in ("login", "resume"):
+            try:
+                if op == "login":
+                    session = await asyncio.wrap_future(self.sessions.submit_login(*args, **kwargs))
+                else:
+                    session = self.sessions.validate(*args, **kwargs)
+            except Exception as e:
+                return False, json.dumps(str(e))
+            connection["token"] = session.token
+            return True, json.dumps(dict(to_json(session.user), token=session.token))
+        if op == "logout":
+            if connection["token"] is not None:
+                self.sessions.logout(connection["token"])
+                connection["token"] = None
+            return True, "null"
+        if op == "server_stats":
+            return True, json.dumps(dict(self.stats, sessions=len(self.sessions), **self.sessions.stats))
+        if connection["token"] is None:
+            return False, json.dumps("Please log in first.")
+        try:
+            user = self.sessions.validate(connection["token"]).user
+        except Exception as e:
+            connection["token"] = None
+            return False, json.dumps(str(e))
+        kind, role = OPERATIONS.get(op, (None, None))
+        if kind is None:
+            return False, json.dumps(f"Unknown operation: {op}.")
+        if not isinstance(user, Admin):
+            if role == "admin" or (role == "self" and (not args or str(args[0]).lower() != user.user_id)):
+                return False, json.dumps("Not allowed.")
+        method = getattr(self.system, op)
+        if kind == "read":
+            return await self._read(method, args, kwargs)
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((method, args, kwargs, future))
+        return await future
+
+    # Reads
+
+    @staticmethod
+    def _call(method, args: list, kwargs: dict) -> Tuple[bool, str]:
+        """
+        Calls a system method and encodes its result (runs in a pool thread).
+        """
+        try:
+            return True, _encode(method(*args, **kwargs))
+        except Exception as e:
+            return False, json.dumps(str(e))
+
+    async def _read(self, method, args: list, kwargs: dict, coalesce: bool = True) -> Tuple[bool, str]:
+        """
+        Runs a read in the read pool, or waits for an identical read that is already running.
+
+        Joining a running read is safe: writes wait for running reads to finish, so a read
+        that is running now can't have missed a write that was already answered.
+        """
+        coalesce = coalesce and self.coalesce
+        key = (method.__name__, json.dumps([args, kwargs], sort_keys=True)) if coalesce else None
+        future = self._inflight.get(key) if coalesce else None
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await future
+        future = asyncio.get_running_loop().create_future()
+        if coalesce:
+            self._inflight[key] = future
+        try:
+            async with self._gate.reading():
+                self.stats["reads"] += 1
+                answer = await asyncio.get_running_loop().run_in_executor(self._read_pool, self._call, method,
+                                                                         args, kwargs)
+            future.set_result(answer)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if coalesce:
+                del self._inflight[key]
+        return answer
+
+    # Writes
+
+    def _apply(self, batch: list) -> list:
+        """
+        Applies a batch of writes one after another (runs in the writer thread).
+        """
+        return [self._call(method, args, kwargs) for method, args, kwargs, _ in batch]
+
+    async def _write_loop(self):
+        """
+        The single writer: takes every write waiting in the queue (up to max_write_batch),
+        waits for running reads to finish and applies the batch in the writer thread.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._writes.get()]
+            while len(batch) < self.max_write_batch and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                async with self._gate.writing():
+                    answers = await loop.run_in_executor(self._write_pool, self._apply, batch)
+            except BaseException as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                    self._writes.task_done()
+                raise
+            self.stats["writes"] += len(batch)
+            self.stats["write_batches"] += 1
+            self.stats["largest_write_batch"] = max(self.stats["largest_write_batch"], len(batch))
+            for (*_, future), answer in zip(batch, answers):
+                if not future.done():
+                    future.set_result(answer)
+                self._writes.task_done()
+
+
+class RegistrationClient:
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        An asyncio client for RegistrationServer. Use RegistrationClient.connect() to make one.
+
+        Many calls can be in flight on one connection at once; replies are matched to calls by id.
+        """
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> "RegistrationClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self._waiting.pop(reply["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection closed."))
+            self._waiting.clear()
+
+    async def call(self, op: str, *args, **kwargs):
+        """
+        Calls an operation on the server and waits for its result.
+
+        Raises:
+            Exception: With the server's error message, if the operation failed.
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        request = {"id": request_id, "op": op, "args": list(args)}
+        if kwargs:
+            request["kwargs"] = kwargs
+        self._writer.write(json.dumps(request, separators=(",", ":")).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        reply = await future
+        if not reply["ok"]:
+            raise Exception(reply["error"])
+        return reply["result"]
+
+    async def login(self, user_id: str, password: str) -> dict:
+        """
+        Logs the connection in.
+
+        Returns:
+            dict: {"user_id": ..., "role": "admin" or "student", "token": ...}. The token can be
+            given to resume on another connection.
+        """
+        return await self.call("login", user_id, password)
+
+    async def resume(self, token: str) -> dict:
+        """
+        Logs the connection in with the token of a session that is still valid, without a password.
+
+        Returns:
+            dict: The same as login.
+        """
+        return await self.call("resume", token)
+
+    async def logout(self):
+        """
+        Ends the connection's session (on every connection that resumed it).
+        """
+        await self.call("logout")
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._receiver.cancel()
+
+
+def serve(system: RegistrationSystem, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+    """
+    Serves a system until Ctrl+C is pressed.
+    """
+    async def run():
+        server = RegistrationServer(system, host, port)
+        await server.start()
+        print(f"Serving on {host}:{server.port} (Ctrl+C to stop)")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Student Course Registration System over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(RegistrationSystem(), args.host, args.port)
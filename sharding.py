@@ -0,0 +1,1241 @@
+"""
+Title:       Portfolio Project - Sharded Registration
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Runs the registration system in several worker processes, so registrations can use more than one core
+    (a single RegistrationSystem only ever runs on one core because of the GIL).
+    Courses are split between the workers (shards) by a hash of the course ID. Every shard keeps its own
+    courses with their rosters, waitlists and catalog rows, plus a copy of every student account.
+
+    ShardedRegistrationSystem is the router: it has the same methods as RegistrationSystem and sends
+    each call to the shard that owns the course, or to every shard for calls that need all courses
+    (a student's course list, searches, the catalog). Lists gathered from several shards come back
+    in catalog order (the order the courses were added).
+    The rules that involve more than one course of a student - prerequisites, time conflicts and the
+    credit limit - are checked by the router, which keeps every student's completed courses, timetable
+    and credit total, so they hold no matter which shards the courses are on.
+
+    Everything runs locally with multiprocessing; see benchmarks/bench_sharding.py for how throughput
+    changes with the number of workers.
+
+"""
+
+import os
+import threading
+import zlib
+from collections.abc import Mapping
+from multiprocessing import Pipe, Process
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from App import (Admin, BATCH_CONFLICT, BATCH_CREDIT_LIMIT, BATCH_DUPLICATE, BATCH_FULL, BATCH_INVALID, BATCH_OK,
+                 BATCH_PREREQUISITE, BATCH_UNKNOWN, Course, CreditLedger, MeetingIndex, PrerequisiteGraph,
+                 RegistrationSystem, Student, User)
+from auth import preset_hash, spend_verification, stored_password, stored_passwords
+
+
+class ShardSystem(RegistrationSystem):
+
+    def __init__(self, waitlist_by_standing: bool = False):
+        """
+        Creates the RegistrationSystem that one worker process runs for its share of the courses.
+
+        The router has already checked prerequisites, time conflicts and credit limits against all of
+        a student's courses before a call gets here, so the shard skips those checks (it can only see its
+        own courses) and promotes waitlists only when the router asks.
+
+        Argument:
+            waitlist_by_standing (bool, optional): Same as for RegistrationSystem.
+        """
+        super().__init__(waitlist_by_standing=waitlist_by_standing)
+        self.auto_promote = False
+
+    def _check_prerequisites(self, course_id: str, prerequisites: Iterable[str]) -> List[str]:
+        # Prerequisites can be on other shards; the router checked that they exist
+        return list(dict.fromkeys(cid.upper() for cid in prerequisites))
+
+    def _missing_prerequisites(self, student: Student, course: Course) -> List[str]:
+        return []
+
+    def _seat(self, student: Student, course: Course):
+        """
+        Registers a student in a course that has a free seat (all checks already done).
+        """
+        course.add_student(student.user_id)
+        student.register_course(course.course_id)
+        self._timetable_add(student.user_id, course)
+        self.credit_loads.change(student.user_id, course.credits)
+        waitlist = self.waitlists.get(course.course_id)
+        if waitlist is not None:
+            waitlist.remove(student.user_id)
+
+    def register_checked(self, student_id: str, course_id: str, problem: Optional[str]):
+        """
+        Registers a student for a course, like student_course_register.
+
+        Arguments:
+            student_id (str): The student's ID (already lowercase).
+            course_id (str): The course code (already uppercase).
+            problem (str): The router's error message for the student (missing prerequisites,
+                a time conflict or the credit limit), or None. It is raised after the seat and
+                duplicate checks, so errors come in the same order as in RegistrationSystem.
+
+        Raises:
+            Exception: The same errors as student_course_register.
+        """
+        student = self.students.get(student_id)
+        course = self.courses.get(course_id)
+        if student is None:
+            raise Exception("Student not found.")
+        if course is None:
+            raise Exception("Course not found.")
+        if course.is_full():
+            raise Exception("Course is full.")
+        if course_id in student.registered_courses:
+            raise Exception("Student already registered for this course.")
+        if problem is not None:
+            raise Exception(problem)
+        self._seat(student, course)
+        self.catalog.update(course_id)
+
+    def register_pairs(self, student_ids: List[str], course_ids: List[str],
+                       problems: List[Optional[str]]) -> List[str]:
+        """
+        Registers many students for courses, like register_batch.
+
+        Arguments:
+            student_ids (List[str]): Student IDs (already lowercase).
+            course_ids (List[str]): The course code for each student (already uppercase).
+            problems (List[Optional[str]]): The router's status for each pair ("prerequisite",
+                "conflict" or "credit_limit"), or None. Used only if the pair isn't a duplicate.
+
+        Returns:
+            List[str]: The status of each pair, in input order.
+        """
+        students = self.students
+        courses = self.courses
+        statuses = []
+        changed = set()
+        for student_id, course_id, problem in zip(student_ids, course_ids, problems):
+            student = students.get(student_id)
+            course = courses.get(course_id)
+            if student is None or course is None:
+                statuses.append(BATCH_UNKNOWN)
+            elif student_id in course.registered_students:
+                statuses.append(BATCH_DUPLICATE)
+            elif problem is not None:
+                statuses.append(problem)
+            elif course.is_full():
+                statuses.append(BATCH_FULL)
+            else:
+                self._seat(student, course)
+                changed.add(course_id)
+                statuses.append(BATCH_OK)
+        for course_id in changed:
+            self.catalog.update(course_id)
+        return statuses
+
+    def drop_pairs(self, student_ids: List[str], course_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Removes many students from courses with drop_batch.
+
+        Returns:
+            Tuple[List[str], List[str]]: The status of each pair, and the courses that lost a student
+            and have a waitlist (for the router to promote).
+        """
+        statuses = [status for _, _, status in self.drop_batch(zip(student_ids, course_ids))]
+        dropped = dict.fromkeys(cid for cid, status in zip(course_ids, statuses) if status == BATCH_OK)
+        return statuses, [cid for cid in dropped if cid in self.waitlists]
+
+    def next_waiting(self, course_id: str) -> Optional[str]:
+        """
+        Finds the next student on a course's waitlist, if the course has a free seat.
+
+        The student stays on the waitlist until seat_waiting, so they keep their place if
+        another thread takes the seat in between. Students who were removed or are already
+        registered for the course are taken off.
+
+        Returns:
+            str: The student ID, or None if the course is full or nobody is waiting.
+        """
+        course = self.courses.get(course_id)
+        waitlist = self.waitlists.get(course_id)
+        if course is None or waitlist is None:
+            return None
+        while not course.is_full():
+            student_id = waitlist.peek()
+            if student_id is None:
+                break
+            student = self.students.get(student_id)
+            if student is not None and course_id not in student.registered_courses:
+                return student_id
+            waitlist.remove(student_id)
+        if not waitlist:
+            del self.waitlists[course_id]
+        return None
+
+    def seat_waiting(self, student_id: str, course_id: str, problem: Optional[str]) -> str:
+        """
+        Takes a student found by next_waiting off the waitlist and registers them for the course.
+
+        Arguments:
+            student_id (str): The student's ID (already lowercase).
+            course_id (str): The course code (already uppercase).
+            problem (str): The router's batch status for the student ("prerequisite", "conflict",
+                "credit_limit" or "unknown"), or None. A student with a problem is only taken off.
+
+        Returns:
+            str: "ok" if the student was registered, "full" if the seat was taken first (the student
+            keeps their place), the problem, or "unknown" if the student is no longer waiting.
+        """
+        student = self.students.get(student_id)
+        course = self.courses.get(course_id)
+        waitlist = self.waitlists.get(course_id)
+        if course is None or waitlist is None or student_id not in waitlist:
+            return BATCH_UNKNOWN
+        if problem is None and (student is None or course_id in student.registered_courses):
+            problem = BATCH_UNKNOWN
+        if problem is None:
+            if course.is_full():
+                return BATCH_FULL
+            self._seat(student, course)
+            self.catalog.update(course_id)
+        else:
+            waitlist.remove(student_id)
+        if not waitlist:
+            del self.waitlists[course_id]
+        return problem or BATCH_OK
+
+    def join_checked(self, student_id: str, course_id: str, problem: Optional[str]):
+        """
+        Puts a student on a course's waitlist, like join_waitlist.
+
+        Arguments:
+            student_id (str): The student's ID (already lowercase).
+            course_id (str): The course code (already uppercase).
+            problem (str): The router's error message for the student, or None (see register_checked).
+
+        Raises:
+            Exception: The same errors as join_waitlist.
+        """
+        student = self.students.get(student_id)
+        course = self.courses.get(course_id)
+        if student is None:
+            raise Exception("Student not found.")
+        if course is None:
+            raise Exception("Course not found.")
+        if course_id in student.registered_courses:
+            raise Exception("Student already registered for this course.")
+        if not course.is_full():
+            raise Exception("Course is not full. Register for it instead.")
+        if problem is not None:
+            raise Exception(problem)
+        self.join_waitlist(student_id, course_id)
+
+    def update_course_roster(self, course_id: str, *changes) -> List[str]:
+        """
+        Changes a course with update_course and returns its roster, so the router can
+        update the credit totals and timetables of its students.
+        """
+        self.update_course(course_id, *changes)
+        return self.courses[course_id].registered_students.to_list()
+
+    def drop_courses(self, course_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Removes courses with remove_courses and returns their rosters from before the removal.
+        """
+        rosters = {cid: self.courses[cid].registered_students.to_list() for cid in course_ids}
+        self.remove_courses(course_ids)
+        return rosters
+
+    def course(self, course_id: str) -> Course:
+        return self.courses[course_id]
+
+    def catalog_entries(self, available_only: bool) -> List[Tuple[str, str]]:
+        """
+        Gets the shard's catalog rows paired with their course IDs (the catalog keeps the order the
+        courses were added, which is also the order of the courses dictionary).
+        """
+        rows = self.catalog.rows(available_only)
+        ids = [cid for cid, course in self.courses.items() if not (available_only and course.is_full())]
+        return list(zip(ids, rows))
+
+    def schedule(self, student_id: str) -> List[Tuple[str, str]]:
+        """
+        Gets a student's schedule lines for the shard's courses, as (course ID, line) pairs.
+        """
+        courses = self.courses
+        return [(cid, Course.SCHEDULE_FORMAT.format(cid, courses[cid].title, courses[cid].credits))
+                for cid in self.students[student_id].registered_courses]
+
+    def registrations(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        Gets the shard's course IDs and every student's registered courses (for check_consistency).
+        """
+        return list(self.courses), {sid: student.registered_courses.to_list()
+                                    for sid, student in self.students.items() if student.registered_courses}
+
+
+def _serve(connection, waitlist_by_standing: bool):
+    """
+    Runs in each worker process: answers calls from the router until it sends None or goes away.
+
+    Each request is (method name, arguments) and each reply is (True, result) or (False, error message).
+    """
+    system = ShardSystem(waitlist_by_standing)
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, args = request
+        try:
+            reply = (True, getattr(system, method)(*args))
+        except Exception as e:
+            reply = (False, str(e))
+        connection.send(reply)
+    connection.close()
+
+
+class CourseEntry(NamedTuple):
+    """
+    What the router keeps about a course to check registrations without asking its shard.
+    """
+    position: int
+    credits: int
+    meetings: Tuple[Tuple[int, int, int], ...]
+    gated: bool
+
+
+class ShardedCourses(Mapping):
+
+    def __init__(self, system: "ShardedRegistrationSystem"):
+        """
+        A read-only view of every course, used as ShardedRegistrationSystem.courses.
+
+        Checking for a course ID and listing IDs use the router's own records; getting a course
+        fetches a copy of it from its shard, so changing that copy changes nothing.
+        """
+        self._system = system
+
+    def __getitem__(self, course_id: str) -> Course:
+        if course_id not in self._system._courses:
+            raise KeyError(course_id)
+        return self._system._call(self._system.shard_of(course_id), "course", course_id)
+
+    def __contains__(self, course_id) -> bool:
+        return course_id in self._system._courses
+
+    def __iter__(self):
+        return iter(list(self._system._courses))
+
+    def __len__(self) -> int:
+        return len(self._system._courses)
+
+
+class ShardedRegistrationSystem:
+
+    def __init__(self, shards: Optional[int] = None, waitlist_by_standing: bool = False,
+                 max_credits: Optional[int] = None, min_credits: int = 0):
+        """
+        Starts the worker processes and the router in front of them.
+
+        The router can be used from several threads at once: calls for different shards run at the same time.
+        Call close() (or use a with-statement) to stop the workers.
+
+        Arguments:
+            shards (int, optional): How many worker processes to start. Default is one per CPU core.
+            waitlist_by_standing (bool, optional): Same as for RegistrationSystem.
+            max_credits (int, optional): Same as for RegistrationSystem. Checked by the router.
+            min_credits (int, optional): Same as for RegistrationSystem.
+
+        Attributes:
+            shard_count (int): The number of worker processes.
+            courses (ShardedCourses): Every course, fetched from its shard when looked up.
+            students (Dict[str, Student]): The router's copy of every student account, with their
+                completed courses. Registered courses are kept only on the shards.
+            admins (Dict[str, Admin]): A dictionary mapping admin IDs to Admin objects.
+            timetables (Dict[str, MeetingIndex]): The meeting times of each student's registered
+                courses across all shards, used to stop time conflicts.
+            prerequisites (PrerequisiteGraph): Which courses require which, across all shards.
+            credit_loads (CreditLedger): How many credits each student is registered for, across all shards.
+            auto_promote (bool): If True, a freed seat is given to the next waitlisted student right away.
+        """
+        self.shard_count = shards or os.cpu_count() or 1
+        self._connections = []
+        self._processes = []
+        for _ in range(self.shard_count):
+            parent, child = Pipe()
+            process = Process(target=_serve, args=(child, waitlist_by_standing), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self._shard_locks = [threading.Lock() for _ in range(self.shard_count)]
+        # Guards the router's own records (students, course entries, timetables, credit totals)
+        self._lock = threading.RLock()
+
+        self._courses: Dict[str, CourseEntry] = {}
+        self._next_position = 0
+        self.courses = ShardedCourses(self)
+        self.students: Dict[str, Student] = {}
+        self.admins: Dict[str, Admin] = {}
+        self.timetables: Dict[str, MeetingIndex] = {}
+        self.prerequisites = PrerequisiteGraph()
+        self._credit: Dict[str, Tuple[int, int]] = {}
+        self.credit_loads = CreditLedger()
+        self.waitlist_by_standing = waitlist_by_standing
+        self.max_credits = max_credits
+        self.min_credits = min_credits
+        self.auto_promote = True
+
+        # The same pre-registered accounts as RegistrationSystem (every shard makes its own copies)
+        self.admins['admin'] = Admin('admin', preset_hash('password'))
+        for student_id in ('student1', 'student2'):
+            self.students[student_id] = Student(student_id, preset_hash('pass123'))
+            self.credit_loads.add(student_id)
+
+    def close(self):
+        """
+        Stops the worker processes. The system can't be used afterwards.
+        """
+        for connection, lock in zip(self._connections, self._shard_locks):
+            with lock:
+                try:
+                    connection.send(None)
+                except (OSError, ValueError):
+                    pass
+                connection.close()
+        for process in self._processes:
+            process.join(5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Talking to the shards
+
+    def shard_of(self, course_id: str) -> int:
+        """
+        Finds which shard owns a course. The hash is the same in every process and every run
+        (unlike hash(), which changes between runs for strings).
+
+        Argument:
+            course_id (str): The course code (already uppercase).
+
+        Returns:
+            int: The shard's number, from 0 to shard_count - 1.
+        """
+        return zlib.crc32(course_id.encode()) % self.shard_count
+
+    def _call(self, shard: int, method: str, *args):
+        """
+        Calls a ShardSystem method in one shard and waits for the result.
+
+        Raises:
+            Exception: With the shard's error message, if the method raised one.
+        """
+        connection = self._connections[shard]
+        with self._shard_locks[shard]:
+            connection.send((method, args))
+            ok, value = connection.recv()
+        if not ok:
+            raise Exception(value)
+        return value
+
+    def _scatter(self, calls: Dict[int, Tuple]) -> Dict[int, object]:
+        """
+        Calls methods in several shards at once: every request is sent before any reply is read,
+        so the shards work side by side.
+
+        Argument:
+            calls (Dict[int, Tuple]): Shard number -> (method name, arguments...).
+
+        Returns:
+            Dict[int, object]: Shard number -> result.
+
+        Raises:
+            Exception: With the first shard's error message, once every shard has replied.
+        """
+        shards = sorted(calls)
+        # Always lock in shard order, so two scatters can't wait for each other
+        for shard in shards:
+            self._shard_locks[shard].acquire()
+        try:
+            for shard in shards:
+                method, *args = calls[shard]
+                self._connections[shard].send((method, tuple(args)))
+            replies = {shard: self._connections[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self._shard_locks[shard].release()
+        for ok, value in replies.values():
+            if not ok:
+                raise Exception(value)
+        return {shard: value for shard, (_, value) in replies.items()}
+
+    def _call_all(self, method: str, *args) -> List:
+        """
+        Calls the same method in every shard at once.
+
+        Returns:
+            List: The results, in shard order.
+        """
+        results = self._scatter({shard: (method,) + args for shard in range(self.shard_count)})
+        return [results[shard] for shard in range(self.shard_count)]
+
+    def _catalog_order(self, course_ids: Iterable[str]) -> List[str]:
+        """
+        Sorts course IDs gathered from several shards into catalog order.
+        """
+        courses = self._courses
+        return sorted((cid for cid in course_ids if cid in courses), key=lambda cid: courses[cid].position)
+
+    # Checks that span shards
+
+    def _missing_prerequisites(self, student: Student, course_id: str) -> List[str]:
+        """
+        Finds the prerequisites of a course that a student has no credit for yet
+        (see RegistrationSystem._missing_prerequisites).
+        """
+        graph = self.prerequisites
+        cached = self._credit.get(student.user_id)
+        if cached is None or cached[0] != graph.version:
+            cached = (graph.version, graph.credit_bits(student.completed_courses))
+            self._credit[student.user_id] = cached
+        if graph.eligible(course_id, cached[1]):
+            return []
+        return graph.missing(course_id, cached[1])
+
+    def _problem(self, student: Student, course_id: str, entry: CourseEntry) -> Optional[Tuple[str, str]]:
+        """
+        Checks the rules that depend on all of a student's courses: prerequisites, time conflicts
+        and the credit limit, in that order (the same order as RegistrationSystem).
+
+        Returns:
+            Tuple[str, str]: The batch status and the error message of the first rule broken, or None.
+        """
+        if entry.gated:
+            missing = self._missing_prerequisites(student, course_id)
+            if missing:
+                return BATCH_PREREQUISITE, f"Missing prerequisites: {', '.join(missing)}."
+        if entry.meetings:
+            timetable = self.timetables.get(student.user_id)
+            clash = timetable.conflict(entry.meetings) if timetable else None
+            if clash is not None:
+                return BATCH_CONFLICT, f"Time conflict with {clash}."
+        if self.max_credits is not None:
+            load = self.credit_loads.total(student.user_id) + entry.credits
+            if load > self.max_credits:
+                return BATCH_CREDIT_LIMIT, f"Credit limit exceeded: {load} of {self.max_credits} credits."
+        return None
+
+    def _hold(self, student_id: str, course_id: str, entry: CourseEntry):
+        """
+        Counts a course's credits and meeting times for a student. Done before the shard is asked,
+        so two registrations of the same student on different shards can't both slip under the limit.
+        """
+        self.credit_loads.change(student_id, entry.credits)
+        if entry.meetings:
+            timetable = self.timetables.get(student_id)
+            if timetable is None:
+                timetable = self.timetables[student_id] = MeetingIndex()
+            timetable.add(course_id, entry.meetings)
+
+    def _release(self, student_id: str, course_id: str, entry: CourseEntry):
+        """
+        Takes back what _hold counted (after a drop, or when the shard turned the registration down).
+        """
+        self.credit_loads.change(student_id, -entry.credits)
+        if entry.meetings:
+            timetable = self.timetables.get(student_id)
+            if timetable is not None:
+                timetable.remove(course_id, entry.meetings)
+                if not timetable:
+                    del self.timetables[student_id]
+
+    def _check_prerequisites(self, course_id: str, prerequisites: Iterable[str]) -> List[str]:
+        """
+        Makes prerequisite codes uppercase and checks that the courses exist on any shard.
+
+        Raises:
+            Exception: If any of the prerequisite courses does not exist.
+        """
+        prerequisites = list(dict.fromkeys(cid.upper() for cid in prerequisites))
+        missing = [cid for cid in prerequisites if cid not in self._courses and cid != course_id]
+        if missing:
+            raise Exception(f"Prerequisite not found: {', '.join(missing)}.")
+        return prerequisites
+
+    # Accounts
+
+    def authenticate_user(self, user_id: str, password: str) -> User:
+        """
+        Checks if a user as admin or student can log in with the given ID and password.
+
+        Returns:
+            User: The user object if login is successful. A student's registered courses are on
+            the shards; use list_courses_for_student to get them.
+
+        Raises:
+            Exception: If the username or password is wrong.
+        """
+        user_id = user_id.lower()
+        if user_id == 'admin' and user_id in self.admins:
+            admin = self.admins[user_id]
+            if admin.authenticate(password):
+                return admin
+        elif user_id in self.students:
+            student = self.students[user_id]
+            if student.authenticate(password):
+                return student
+        else:
+            spend_verification(password)
+        raise Exception("Invalid username or password.")
+
+    def add_student(self, student_id: str, password: str, standing: int = 0):
+        """
+        Adds a new student account to the router and every shard.
+
+        Raises:
+            Exception: If the student ID already exists.
+        """
+        student_id = student_id.lower()
+        # Hashed once here; the shards keep the hash as it is
+        password = stored_password(password)
+        with self._lock:
+            if student_id in self.students:
+                raise Exception("Student with this ID already exists.")
+            self.students[student_id] = Student(student_id, password, standing)
+            self.credit_loads.add(student_id)
+        self._call_all("add_student", student_id, password, standing)
+
+    def add_students_batch(self, rows: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Adds many student accounts in one call (see RegistrationSystem.add_students_batch).
+        """
+        rows = list(rows)
+        passwords = stored_passwords(row[1] for row in rows)
+        results = []
+        added = []
+        with self._lock:
+            for (student_id, _), password in zip(rows, passwords):
+                student_id = student_id.lower()
+                if student_id in self.students:
+                    results.append((student_id, BATCH_DUPLICATE))
+                else:
+                    self.students[student_id] = Student(student_id, password)
+                    self.credit_loads.add(student_id)
+                    results.append((student_id, BATCH_OK))
+                    added.append((student_id, password))
+        if added:
+            self._call_all("add_students_batch", added)
+        return results
+
+    # Courses
+
+    def add_course(self, course_id: str, title: str, description: str, credits: int, capacity: int,
+                   meetings=(), prerequisites: Iterable[str] = ()):
+        """
+        Adds a new course to the shard that owns its ID (see RegistrationSystem.add_course).
+
+        Raises:
+            Exception: If the course ID already exists, a meeting time can't be read,
+                a prerequisite doesn't exist, or the prerequisites would form a cycle.
+        """
+        course_id = course_id.upper()
+        meetings = Course.parse_meetings(meetings)
+        with self._lock:
+            if course_id in self._courses:
+                raise Exception("Course with this ID already exists.")
+            prerequisites = self._check_prerequisites(course_id, prerequisites)
+            self.prerequisites.set_prerequisites(course_id, prerequisites)
+            self._call(self.shard_of(course_id), "add_course", course_id, title, description, credits, capacity,
+                       meetings, prerequisites)
+            self._courses[course_id] = CourseEntry(self._next_position, credits, meetings, bool(prerequisites))
+            self._next_position += 1
+
+    def add_courses_batch(self, rows: Iterable[Tuple[str, str, str, int, int]]) -> List[Tuple[str, str]]:
+        """
+        Adds many courses in one call (see RegistrationSystem.add_courses_batch).
+        Prerequisites are checked here, against the courses of every shard.
+        Each shard adds its own rows at the same time as the others.
+        """
+        results = []
+        groups: Dict[int, list] = {}
+        with self._lock:
+            for row in rows:
+                course_id = row[0].upper()
+                row = (course_id,) + tuple(row[1:])
+                try:
+                    meetings = Course.parse_meetings(row[5]) if len(row) > 5 else ()
+                except Exception:
+                    results.append((course_id, BATCH_INVALID))
+                    continue
+                if course_id in self._courses:
+                    results.append((course_id, BATCH_DUPLICATE))
+                    continue
+                if len(row) > 5:
+                    row = row[:5] + (meetings,) + row[6:]
+                prerequisites = []
+                if len(row) > 6:
+                    try:
+                        prerequisites = self._check_prerequisites(course_id, row[6])
+                        self.prerequisites.set_prerequisites(course_id, prerequisites)
+                    except Exception:
+                        results.append((course_id, BATCH_PREREQUISITE))
+                        continue
+                    row = row[:6] + (prerequisites,)
+                self._courses[course_id] = CourseEntry(self._next_position, row[3], meetings, bool(prerequisites))
+                self._next_position += 1
+                groups.setdefault(self.shard_of(course_id), []).append(row)
+                results.append((course_id, BATCH_OK))
+            if groups:
+                self._scatter({shard: ("add_courses_batch", group) for shard, group in groups.items()})
+        return results
+
+    def remove_course(self, course_id: str):
+        """
+        Removes a course and takes it off the lists, credit totals and timetables of its students.
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        with self._lock:
+            if course_id not in self._courses:
+                raise Exception("Course not found.")
+            self._remove([course_id])
+
+    def remove_courses(self, course_ids: Iterable[str]):
+        """
+        Removes several courses at once. All course IDs are checked first, so if one is missing nothing is removed.
+
+        Raises:
+            Exception: If any of the courses does not exist.
+        """
+        course_ids = list(dict.fromkeys(cid.upper() for cid in course_ids))
+        with self._lock:
+            missing = [cid for cid in course_ids if cid not in self._courses]
+            if missing:
+                raise Exception(f"Course not found: {', '.join(missing)}.")
+            self._remove(course_ids)
+
+    def _remove(self, course_ids: List[str]):
+        """
+        Removes existing courses from their shards, then fixes up the router's records and the
+        prerequisite lists of courses (on any shard) that required them.
+        """
+        groups: Dict[int, List[str]] = {}
+        for cid in course_ids:
+            groups.setdefault(self.shard_of(cid), []).append(cid)
+        rosters = {}
+        for result in self._scatter({shard: ("drop_courses", group) for shard, group in groups.items()}).values():
+            rosters.update(result)
+        dependents = []
+        for cid in course_ids:
+            entry = self._courses.pop(cid)
+            for sid in rosters[cid]:
+                self._release(sid, cid, entry)
+            dependents.extend(self.prerequisites.remove(cid))
+        for dependent in dict.fromkeys(dependents):
+            if dependent in self._courses:
+                remaining = self.prerequisites.prerequisites(dependent)
+                self._courses[dependent] = self._courses[dependent]._replace(gated=bool(remaining))
+                self._call(self.shard_of(dependent), "update_course", dependent, None, None, None, None, None,
+                           remaining)
+
+    def update_course(self, course_id: str, title=None, description=None, credits=None, capacity=None,
+                      meetings=None, prerequisites=None):
+        """
+        Changes details of an existing course (see RegistrationSystem.update_course).
+
+        Raises:
+            Exception: If the course does not exist, a meeting time can't be read,
+                a prerequisite doesn't exist, or the prerequisites would form a cycle.
+        """
+        course_id = course_id.upper()
+        if meetings is not None:
+            meetings = Course.parse_meetings(meetings)
+        with self._lock:
+            entry = self._courses.get(course_id)
+            if entry is None:
+                raise Exception("Course not found.")
+            if prerequisites is not None:
+                prerequisites = self._check_prerequisites(course_id, prerequisites)
+                self.prerequisites.set_prerequisites(course_id, prerequisites)
+            roster = self._call(self.shard_of(course_id), "update_course_roster", course_id, title, description,
+                                credits, capacity, meetings, prerequisites)
+            new = entry._replace(credits=entry.credits if credits is None else credits,
+                                 meetings=entry.meetings if meetings is None else meetings,
+                                 gated=entry.gated if prerequisites is None else bool(prerequisites))
+            if new.meetings != entry.meetings or new.credits != entry.credits:
+                for sid in roster:
+                    self._release(sid, course_id, entry)
+                    self._hold(sid, course_id, new)
+            self._courses[course_id] = new
+        if capacity is not None and self.auto_promote:
+            self.promote_waitlist(course_id)
+
+    def search_courses(self, search_term: str, ranked: bool = False, limit: Optional[int] = None) -> List[Course]:
+        """
+        Finds courses by ID or title on every shard (see RegistrationSystem.search_courses).
+        """
+        found = [course for result in self._call_all("search_courses", search_term, ranked, limit)
+                 for course in result]
+        courses = self._courses
+        term = search_term.lower()
+        if ranked:
+            def sort_key(course):
+                key_id = course.course_id.lower()
+                if key_id == term:
+                    rank = 0
+                elif key_id.startswith(term) or course.title.lower().startswith(term):
+                    rank = 1
+                else:
+                    rank = 2
+                return rank, courses[course.course_id].position
+        else:
+            def sort_key(course):
+                return courses[course.course_id].position
+        found = [course for course in found if course.course_id in courses]
+        found.sort(key=sort_key)
+        return found if limit is None else found[:limit]
+
+    def list_students_for_course(self, course_id: str) -> List[str]:
+        """
+        Gets the list of students signed up for a given course.
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        return self._call(self.shard_of(course_id), "list_students_for_course", course_id)
+
+    def list_students_after(self, course_id: str, after: Optional[str], count: int) -> List[str]:
+        """
+        Gets the next page of a course's roster in student ID order from the shard that owns the course.
+
+        Raises:
+            Exception: If the course does not exist.
+        """
+        course_id = course_id.upper()
+        return self._call(self.shard_of(course_id), "list_students_after", course_id, after, count)
+
+    def list_courses_for_student(self, student_id: str) -> List[str]:
+        """
+        Gets the courses a student is signed up for on every shard, in catalog order.
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        return self._catalog_order(cid for result in self._call_all("list_courses_for_student", student_id)
+                                   for cid in result)
+
+    def view_available_courses(self) -> List[Course]:
+        """
+        Gets a copy of every course from every shard, in catalog order.
+        """
+        courses = {course.course_id: course for result in self._call_all("view_available_courses")
+                   for course in result}
+        return [courses[cid] for cid in self._catalog_order(courses)]
+
+    def catalog_rows(self, available_only: bool = False, page: int = 0, page_size: Optional[int] = None) -> List[str]:
+        """
+        Gets the catalog as ready-to-print rows (see RegistrationSystem.catalog_rows).
+        Every shard sends all its rows, so paging saves formatting but not the gathering.
+        """
+        rows = dict(entry for result in self._call_all("catalog_entries", available_only) for entry in result)
+        ordered = [rows[cid] for cid in self._catalog_order(rows)]
+        if page_size is None:
+            return ordered
+        return ordered[page * page_size:(page + 1) * page_size]
+
+    def catalog_size(self, available_only: bool = False) -> int:
+        """
+        Counts the courses on every shard.
+        """
+        return sum(self._call_all("catalog_size", available_only))
+
+    def seat_totals(self) -> Tuple[int, int, int, int, int]:
+        """
+        Adds up the seats of every course on every shard (see RegistrationSystem.seat_totals).
+        """
+        return tuple(sum(column) for column in zip(*self._call_all("seat_totals")))
+
+    # Registration
+
+    def student_course_register(self, student_id: str, course_id: str):
+        """
+        Signs a student up for a course.
+
+        The router checks prerequisites, time conflicts and the credit limit against all of the
+        student's courses; the course's shard checks the seat and registers the student.
+
+        Raises:
+            Exception: The same errors as RegistrationSystem.student_course_register.
+        """
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._lock:
+            student = self.students.get(student_id)
+            if student is None:
+                raise Exception("Student not found.")
+            entry = self._courses.get(course_id)
+            if entry is None:
+                raise Exception("Course not found.")
+            problem = self._problem(student, course_id, entry)
+            if problem is None:
+                self._hold(student_id, course_id, entry)
+        try:
+            self._call(self.shard_of(course_id), "register_checked", student_id, course_id,
+                       problem and problem[1])
+        except Exception:
+            if problem is None:
+                with self._lock:
+                    self._release(student_id, course_id, entry)
+            raise
+
+    def student_course_remove(self, student_id: str, course_id: str):
+        """
+        Removes a course from a student's registered courses. If the course has a waitlist,
+        the freed seat goes to the next student on it.
+
+        Raises:
+            Exception: If student or course is not found,
+                       or if the student is not registered for the course.
+        """
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        entry = self._courses.get(course_id)
+        if entry is None:
+            raise Exception("Course not found.")
+        self._call(self.shard_of(course_id), "student_course_remove", student_id, course_id)
+        with self._lock:
+            self._release(student_id, course_id, self._courses.get(course_id, entry))
+        if self.auto_promote:
+            self.promote_waitlist(course_id)
+
+    def register_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """
+        Signs up many students for courses in one call, with the same statuses as
+        RegistrationSystem.register_batch.
+
+        The router checks every pair and splits the batch by shard; the shards then register
+        their parts at the same time. A pair's credits and meeting times are held from when the
+        router checks it, so if its course turns out to be full, later pairs of the same student
+        in this batch were still checked with them counted.
+
+        Returns:
+            List[Tuple[str, str, str]]: (student_id, course_id, status) for each pair, in input order.
+        """
+        # Group by course like RegistrationSystem._group_pairs, so pairs are checked in the same order
+        student_ids = []
+        course_ids = []
+        by_course: Dict[str, List[int]] = {}
+        for i, (student_id, course_id) in enumerate(pairs):
+            student_ids.append(student_id.lower())
+            course_ids.append(course_id.upper())
+            by_course.setdefault(course_ids[-1], []).append(i)
+        # Shard -> (positions, student IDs, course IDs, router statuses)
+        groups: Dict[int, Tuple[list, list, list, list]] = {}
+        held = []
+        students = self.students
+        with self._lock:
+            for course_id, positions in by_course.items():
+                entry = self._courses.get(course_id)
+                if entry is None:
+                    continue
+                group = groups.setdefault(self.shard_of(course_id), ([], [], [], []))
+                # Student ID -> the router's answer for their first pair with this course
+                seen: Dict[str, Optional[Tuple[str, str]]] = {}
+                for i in positions:
+                    student_id = student_ids[i]
+                    student = students.get(student_id)
+                    if student is None:
+                        continue
+                    if student_id in seen:
+                        # Listed twice: same answer again, or (if held) the shard reports a duplicate
+                        problem = seen[student_id]
+                    else:
+                        problem = seen[student_id] = self._problem(student, course_id, entry)
+                        if problem is None:
+                            self._hold(student_id, course_id, entry)
+                            held.append(i)
+                    group[0].append(i)
+                    group[1].append(student_id)
+                    group[2].append(course_id)
+                    group[3].append(problem and problem[0])
+        statuses = [BATCH_UNKNOWN] * len(student_ids)
+        results = self._scatter({shard: ("register_pairs",) + group[1:] for shard, group in groups.items()})
+        for shard, shard_statuses in results.items():
+            for i, status in zip(groups[shard][0], shard_statuses):
+                statuses[i] = status
+        with self._lock:
+            for i in held:
+                if statuses[i] != BATCH_OK:
+                    self._release(student_ids[i], course_ids[i], self._courses[course_ids[i]])
+        return list(zip(student_ids, course_ids, statuses))
+
+    def drop_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """
+        Removes many students from courses in one call, with the same statuses as
+        RegistrationSystem.drop_batch. The shards drop their parts at the same time.
+
+        Returns:
+            List[Tuple[str, str, str]]: (student_id, course_id, status) for each pair, in input order.
+        """
+        student_ids = []
+        course_ids = []
+        groups: Dict[int, Tuple[list, list, list]] = {}
+        for i, (student_id, course_id) in enumerate(pairs):
+            student_id = student_id.lower()
+            course_id = course_id.upper()
+            student_ids.append(student_id)
+            course_ids.append(course_id)
+            if student_id in self.students and course_id in self._courses:
+                group = groups.setdefault(self.shard_of(course_id), ([], [], []))
+                group[0].append(i)
+                group[1].append(student_id)
+                group[2].append(course_id)
+        statuses = [BATCH_UNKNOWN] * len(student_ids)
+        waiting = []
+        results = self._scatter({shard: ("drop_pairs",) + group[1:] for shard, group in groups.items()})
+        with self._lock:
+            for shard, (shard_statuses, shard_waiting) in results.items():
+                waiting.extend(shard_waiting)
+                for i, status in zip(groups[shard][0], shard_statuses):
+                    statuses[i] = status
+                    if status == BATCH_OK and course_ids[i] in self._courses:
+                        self._release(student_ids[i], course_ids[i], self._courses[course_ids[i]])
+        if self.auto_promote:
+            for course_id in waiting:
+                self.promote_waitlist(course_id)
+        return list(zip(student_ids, course_ids, statuses))
+
+    def student_registered_course(self, student_id: str) -> str:
+        """
+        Shows all courses a student is signed up for, across every shard, in catalog order.
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        lines = dict(line for result in self._call_all("schedule", student_id) for line in result)
+        if not lines:
+            return "No registered courses."
+        return "\n".join(lines[cid] for cid in self._catalog_order(lines))
+
+    # Waitlists
+
+    def join_waitlist(self, student_id: str, course_id: str):
+        """
+        Puts a student on the waitlist of a full course (see RegistrationSystem.join_waitlist).
+
+        Raises:
+            Exception: The same errors as RegistrationSystem.join_waitlist.
+        """
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._lock:
+            student = self.students.get(student_id)
+            if student is None:
+                raise Exception("Student not found.")
+            entry = self._courses.get(course_id)
+            if entry is None:
+                raise Exception("Course not found.")
+            problem = self._problem(student, course_id, entry)
+        self._call(self.shard_of(course_id), "join_checked", student_id, course_id, problem and problem[1])
+
+    def leave_waitlist(self, student_id: str, course_id: str):
+        """
+        Takes a student off a course's waitlist.
+
+        Raises:
+            Exception: If the student is not on the course's waitlist.
+        """
+        course_id = course_id.upper()
+        self._call(self.shard_of(course_id), "leave_waitlist", student_id, course_id)
+
+    def waitlist_position(self, student_id: str, course_id: str) -> int:
+        """
+        Finds a student's place on a course's waitlist (0 if the student is not waiting).
+        """
+        course_id = course_id.upper()
+        return self._call(self.shard_of(course_id), "waitlist_position", student_id, course_id)
+
+    def student_waitlists(self, student_id: str) -> List[Tuple[str, int]]:
+        """
+        Lists every waitlist a student is on, across every shard, in catalog order.
+        """
+        positions = dict(entry for result in self._call_all("student_waitlists", student_id) for entry in result)
+        return [(cid, positions[cid]) for cid in self._catalog_order(positions)]
+
+    def promote_waitlist(self, course_id: str) -> List[str]:
+        """
+        Gives every free seat in a course to the next students on its waitlist.
+
+        The shard hands over waiting students one at a time; students who now have a time conflict,
+        miss a prerequisite or would go over the credit limit are skipped and taken off the waitlist,
+        like in RegistrationSystem.promote_waitlist.
+
+        Returns:
+            List[str]: The students who were registered, in order.
+        """
+        course_id = course_id.upper()
+        shard = self.shard_of(course_id)
+        promoted = []
+        while course_id in self._courses:
+            student_id = self._call(shard, "next_waiting", course_id)
+            if student_id is None:
+                break
+            with self._lock:
+                student = self.students.get(student_id)
+                entry = self._courses.get(course_id)
+                if student is None or entry is None:
+                    problem = BATCH_UNKNOWN
+                else:
+                    found = self._problem(student, course_id, entry)
+                    problem = found[0] if found is not None else None
+                if problem is None:
+                    self._hold(student_id, course_id, entry)
+            # One shard call takes the student off the waitlist and seats them, or leaves them waiting
+            status = self._call(shard, "seat_waiting", student_id, course_id, problem)
+            if status == BATCH_OK:
+                promoted.append(student_id)
+                continue
+            if problem is None:
+                with self._lock:
+                    self._release(student_id, course_id, entry)
+            if status == BATCH_FULL:
+                # Another thread took the seat first
+                break
+        return promoted
+
+    # Prerequisites and credits (kept by the router)
+
+    def complete_course(self, student_id: str, course_id: str):
+        """
+        Records that a student has passed a course, so it counts toward prerequisites.
+
+        Raises:
+            Exception: If student or course is not found,
+                       or if the course is already on the student's completed list.
+        """
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._lock:
+            student = self.students.get(student_id)
+            if student is None:
+                raise Exception("Student not found.")
+            if course_id not in self._courses:
+                raise Exception("Course not found.")
+            if not student.completed_courses.add(course_id):
+                raise Exception("Student has already completed this course.")
+            self._credit.pop(student_id, None)
+
+    def completed_courses(self, student_id: str) -> List[str]:
+        """
+        Lists the courses a student has completed, in the order they were recorded.
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        return self.students[student_id].completed_courses.to_list()
+
+    def eligible_courses(self, student_id: str) -> List[str]:
+        """
+        Lists every course a student meets the prerequisites for and hasn't completed or
+        registered for yet, in catalog order (see RegistrationSystem.eligible_courses).
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        registered = set(self.list_courses_for_student(student_id))
+        student = self.students[student_id.lower()]
+        graph = self.prerequisites
+        credit = graph.credit_bits(student.completed_courses)
+        done = student.completed_courses
+        return [cid for cid, entry in list(self._courses.items())
+                if (not entry.gated or graph.eligible(cid, credit)) and cid not in done and cid not in registered]
+
+    def credit_load(self, student_id: str) -> int:
+        """
+        Gets how many credits a student is registered for, across every shard.
+
+        Raises:
+            Exception: If the student does not exist.
+        """
+        student_id = student_id.lower()
+        if student_id not in self.students:
+            raise Exception("Student not found.")
+        return self.credit_loads.total(student_id)
+
+    def overloaded_students(self, max_credits: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Lists the students registered for more credits than allowed, most credits first.
+        """
+        limit = self.max_credits if max_credits is None else max_credits
+        return [] if limit is None else self.credit_loads.above(limit)
+
+    def underloaded_students(self, min_credits: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Lists the students registered for fewer credits than the minimum, fewest credits first.
+        """
+        return self.credit_loads.below(self.min_credits if min_credits is None else min_credits)
+
+    def find_conflicts(self) -> List[Tuple[str, str, str]]:
+        """
+        Finds every student who is registered for two courses that meet at the same time,
+        using the router's timetables (see RegistrationSystem.find_conflicts).
+        """
+        conflicts = []
+        for student_id, timetable in list(self.timetables.items()):
+            conflicts.extend((student_id, first, second) for first, second in timetable.overlaps())
+        conflicts.sort()
+        return conflicts
+
+    def check_consistency(self) -> List[str]:
+        """
+        Checks every shard with RegistrationSystem.check_consistency, then checks that the
+        router and the shards agree: every course is on the shard its ID hashes to, and every
+        student's credit total matches their courses on all shards.
+
+        Returns:
+            List[str]: A message for each problem found. Empty if everything matches.
+        """
+        problems = [f"Shard {shard}: {problem}" for shard, result in enumerate(self._call_all("check_consistency"))
+                    for problem in result]
+        registered: Dict[str, List[str]] = {}
+        found = set()
+        for shard, (course_ids, registrations) in enumerate(self._call_all("registrations")):
+            for cid in course_ids:
+                found.add(cid)
+                if cid not in self._courses:
+                    problems.append(f"Shard {shard} has unknown course {cid}.")
+                elif self.shard_of(cid) != shard:
+                    problems.append(f"Shard {shard} has {cid}, which belongs on shard {self.shard_of(cid)}.")
+            for sid, cids in registrations.items():
+                registered.setdefault(sid, []).extend(cids)
+        problems.extend(f"{cid} is missing from shard {self.shard_of(cid)}." for cid in self._courses
+                        if cid not in found)
+        for sid in self.students:
+            load = self.credit_loads.total(sid)
+            actual = sum(self._courses[cid].credits for cid in registered.get(sid, ()) if cid in self._courses)
+            if load != actual:
+                problems.append(f"{sid} counts {load} credits, but is registered for {actual}.")
+        return problems
@@ -0,0 +1,1097 @@
+"""
+Title:       Portfolio Project - SQLite Storage
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    A RegistrationSystem that keeps its courses, students and enrollments in a SQLite database
+    instead of Python dictionaries. It has the same methods and error messages as the in-memory
+    system, so the menus (and any other caller) work with either one.
+    Tables are indexed for the lookups the system makes, SQL statements are fixed strings so
+    sqlite3 can reuse its prepared statements, and a small connection pool lets several threads
+    work at once. Seat limits are enforced inside a single transaction.
+
+"""
+
+import queue
+import sqlite3
+import uuid
+from collections.abc import Mapping
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from App import (BATCH_CONFLICT, BATCH_CREDIT_LIMIT, BATCH_DUPLICATE, BATCH_FULL, BATCH_INVALID,
+                 BATCH_NOT_REGISTERED, BATCH_OK, BATCH_PREREQUISITE, Course, MeetingIndex, RegistrationSystem,
+                 Student, User)
+from auth import spend_verification, stored_password, stored_passwords
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id          INTEGER PRIMARY KEY,
+    course_id   TEXT NOT NULL UNIQUE,
+    title       TEXT NOT NULL,
+    description TEXT NOT NULL,
+    credits     INTEGER NOT NULL,
+    capacity    INTEGER NOT NULL,
+    enrolled    INTEGER NOT NULL DEFAULT 0,
+    meetings    TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS students (
+    student_id  TEXT PRIMARY KEY,
+    password    TEXT NOT NULL,
+    standing    INTEGER NOT NULL DEFAULT 0,
+    credit_load INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS enrollments (
+    id          INTEGER PRIMARY KEY,
+    course_id   TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    student_id  TEXT NOT NULL REFERENCES students(student_id),
+    UNIQUE (course_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS enrollments_by_course ON enrollments(course_id, id);
+CREATE INDEX IF NOT EXISTS enrollments_by_student ON enrollments(student_id, id);
+CREATE TABLE IF NOT EXISTS waitlist (
+    id          INTEGER PRIMARY KEY,
+    course_id   TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    student_id  TEXT NOT NULL REFERENCES students(student_id),
+    priority    INTEGER NOT NULL,
+    UNIQUE (course_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS waitlist_order ON waitlist(course_id, priority, id);
+CREATE INDEX IF NOT EXISTS waitlist_by_student ON waitlist(student_id, id);
+CREATE TABLE IF NOT EXISTS prerequisites (
+    id              INTEGER PRIMARY KEY,
+    course_id       TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    prerequisite_id TEXT NOT NULL REFERENCES courses(course_id) ON DELETE CASCADE,
+    UNIQUE (course_id, prerequisite_id)
+);
+CREATE TABLE IF NOT EXISTS preferences (
+    id          INTEGER PRIMARY KEY,
+    student_id  TEXT NOT NULL REFERENCES students(student_id),
+    rank        INTEGER NOT NULL,
+    course_id   TEXT NOT NULL,
+    UNIQUE (student_id, rank)
+);
+CREATE TABLE IF NOT EXISTS completions (
+    id          INTEGER PRIMARY KEY,
+    student_id  TEXT NOT NULL REFERENCES students(student_id),
+    course_id   TEXT NOT NULL,
+    UNIQUE (student_id, course_id)
+);
+"""
+
+# Columns added after the first version of the schema: (table, column, definition)
+ADDED_COLUMNS = (
+    ("students", "standing", "INTEGER NOT NULL DEFAULT 0"),
+    ("courses", "meetings", "TEXT NOT NULL DEFAULT ''"),
+    ("students", "credit_load", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+# Fills in students.credit_load from the enrollments (used once, when the column is added)
+RECOUNT_CREDIT_LOADS = """
+UPDATE students SET credit_load = (
+    SELECT COALESCE(SUM(c.credits), 0) FROM enrollments e JOIN courses c ON c.course_id = e.course_id
+    WHERE e.student_id = students.student_id)
+"""
+
+# Largest number of "?" placeholders put in one IN (...) list
+_MAX_PARAMS = 500
+
+
+class ConnectionPool:
+
+    def __init__(self, database: str, size: int = 4):
+        """
+        Opens a fixed number of SQLite connections that threads can borrow.
+
+        Arguments:
+            database (str): A database file path, or ":memory:" for a private in-memory database
+                (shared by all connections in this pool).
+            size (int, optional): How many connections to open.
+        """
+        uri = False
+        if database == ":memory:":
+            # Each plain ":memory:" connection would get its own empty database, so use a named shared one
+            database = f"file:registration-{uuid.uuid4().hex}?mode=memory&cache=shared"
+            uri = True
+        self.database = database
+        self.in_memory = uri
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all: List[sqlite3.Connection] = []
+        for _ in range(size):
+            conn = sqlite3.connect(database, uri=uri, timeout=30, isolation_level=None,
+                                   check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA foreign_keys = ON")
+            if not uri:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+            self._all.append(conn)
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a connection until the with-block ends, waiting if all are in use.
+        """
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """
+        Closes every connection in the pool.
+        """
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+
+
+class CourseTable(Mapping):
+
+    def __init__(self, system: "SQLiteRegistrationSystem"):
+        """
+        A read-only dictionary-like view of the courses table (course ID -> Course).
+
+        Argument:
+            system (SQLiteRegistrationSystem): The system whose database is read.
+        """
+        self._system = system
+
+    def __getitem__(self, course_id: str) -> Course:
+        course = self._system._load_course(course_id)
+        if course is None:
+            raise KeyError(course_id)
+        return course
+
+    def __contains__(self, course_id) -> bool:
+        with self._system.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (course_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._system.pool.connection() as conn:
+            rows = conn.execute("SELECT course_id FROM courses ORDER BY id").fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        with self._system.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+
+
+class StudentTable(Mapping):
+
+    def __init__(self, system: "SQLiteRegistrationSystem"):
+        """
+        A read-only dictionary-like view of the students table (student ID -> Student).
+
+        Argument:
+            system (SQLiteRegistrationSystem): The system whose database is read.
+        """
+        self._system = system
+
+    def __getitem__(self, student_id: str) -> Student:
+        student = self._system._load_student(student_id)
+        if student is None:
+            raise KeyError(student_id)
+        return student
+
+    def __contains__(self, student_id) -> bool:
+        with self._system.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._system.pool.connection() as conn:
+            rows = conn.execute("SELECT student_id FROM students ORDER BY rowid").fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        with self._system.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+
+class SQLiteRegistrationSystem(RegistrationSystem):
+
+    def __init__(self, database: str = ":memory:", pool_size: int = 4, waitlist_by_standing: bool = False,
+                 max_credits: Optional[int] = None, min_credits: int = 0):
+        """
+        Starts a registration system stored in a SQLite database.
+
+        The tables are created if they don't exist yet, and the pre-registered student accounts
+        are added if they are missing. Admin accounts stay in memory like in RegistrationSystem.
+
+        Arguments:
+            database (str, optional): The database file, or ":memory:" (the default) for a
+                database that is thrown away when the system is closed. Use a file when
+                several threads write at once; in-memory databases lock whole tables.
+            pool_size (int, optional): How many connections threads can use at once.
+            waitlist_by_standing (bool, optional): Same as RegistrationSystem.
+            max_credits (int, optional): Same as RegistrationSystem.
+            min_credits (int, optional): Same as RegistrationSystem.
+
+        Attributes:
+            pool (ConnectionPool): The database connections.
+            prerequisites (PrerequisiteGraph): An in-memory copy of the prerequisites table,
+                loaded at startup and kept up to date by this system, for fast eligibility checks.
+            courses (CourseTable): Read-only view of the courses table.
+            students (StudentTable): Read-only view of the students table.
+        """
+        super().__init__(waitlist_by_standing=waitlist_by_standing, max_credits=max_credits, min_credits=min_credits)
+        preset_students = [(s.user_id, s.password) for s in self.students.values()]
+        self.pool = ConnectionPool(database, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            # Databases made by older versions get the newer columns added
+            for table, column, definition in ADDED_COLUMNS:
+                if column not in [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                    if column == "credit_load":
+                        conn.execute(RECOUNT_CREDIT_LOADS)
+            # Made here rather than in SCHEMA, since older databases only get the column above
+            conn.execute("CREATE INDEX IF NOT EXISTS students_by_load ON students(credit_load)")
+            conn.executemany("INSERT OR IGNORE INTO students (student_id, password) VALUES (?, ?)",
+                             preset_students)
+            edges: Dict[str, List[str]] = {}
+            for cid, prerequisite_id in conn.execute("SELECT course_id, prerequisite_id FROM prerequisites ORDER BY id"):
+                edges.setdefault(cid, []).append(prerequisite_id)
+            for cid, prerequisite_ids in edges.items():
+                self.prerequisites.set_prerequisites(cid, prerequisite_ids)
+        self.courses = CourseTable(self)
+        self.students = StudentTable(self)
+
+    def close(self):
+        """
+        Closes the database connections, and those of any snapshots still open.
+        """
+        for snapshot in list(self.snapshots):
+            snapshot.close()
+        self.pool.close()
+
+    def snapshot(self) -> "SQLiteSnapshot":
+        """
+        Takes a read-only, point-in-time view of the courses, students and enrollments.
+
+        With a database file, the snapshot is a read transaction on a connection of its own.
+        The write-ahead log keeps the pages that transaction sees while other connections
+        write, so taking a snapshot costs the same however big the database is and doesn't
+        hold up registrations. The connections of an in-memory database share table locks
+        instead, so a reader would block writers; there the snapshot is a copy of the
+        database made with SQLite's backup API, which takes time in proportion to its size.
+
+        Returns:
+            SQLiteSnapshot: The snapshot.
+        """
+        with self._snapshot_lock:
+            self._snapshot_version += 1
+            version = self._snapshot_version
+        snapshot = SQLiteSnapshot(self, version)
+        with self._snapshot_lock:
+            self.snapshots.append(snapshot)
+        return snapshot
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs the with-block in one write transaction, rolled back if an exception is raised.
+
+        BEGIN IMMEDIATE takes the write lock up front, so checks made inside the block
+        (like "is there a free seat?") can't be invalidated by another connection.
+        """
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _load_roster(self, conn: sqlite3.Connection, course_id: str) -> List[str]:
+        rows = conn.execute("SELECT student_id FROM enrollments WHERE course_id = ? ORDER BY id",
+                            (course_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def _load_schedule(self, conn: sqlite3.Connection, student_id: str) -> List[str]:
+        rows = conn.execute("SELECT course_id FROM enrollments WHERE student_id = ? ORDER BY id",
+                            (student_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def _make_course(self, row: tuple, roster: Iterable[str]) -> Course:
+        course = Course(row[0], row[1], row[2], row[3], row[4], row[5], self.prerequisites.prerequisites(row[0]))
+        for sid in roster:
+            course.registered_students.add(sid)
+        return course
+
+    def _load_course(self, course_id: str) -> Optional[Course]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT course_id, title, description, credits, capacity, meetings FROM courses "
+                               "WHERE course_id = ?", (course_id,)).fetchone()
+            if row is None:
+                return None
+            return self._make_course(row, self._load_roster(conn, course_id))
+
+    def _load_student(self, student_id: str) -> Optional[Student]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT password, standing FROM students WHERE student_id = ?",
+                               (student_id,)).fetchone()
+            if row is None:
+                return None
+            student = Student(student_id, row[0], row[1])
+            for cid in self._load_schedule(conn, student_id):
+                student.register_course(cid)
+            for (cid,) in conn.execute("SELECT course_id FROM completions WHERE student_id = ? ORDER BY id",
+                                       (student_id,)):
+                student.completed_courses.add(cid)
+            return student
+
+    def _load_courses(self, conn: sqlite3.Connection, course_ids: List[str]) -> List[Course]:
+        """
+        Builds Course objects (with their rosters) for the given IDs, keeping the given order.
+        """
+        courses: Dict[str, Course] = {}
+        for start in range(0, len(course_ids), _MAX_PARAMS):
+            chunk = course_ids[start:start + _MAX_PARAMS]
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute("SELECT course_id, title, description, credits, capacity, meetings FROM courses "
+                                    f"WHERE course_id IN ({marks})", chunk):
+                courses[row[0]] = self._make_course(row, ())
+            for cid, sid in conn.execute("SELECT course_id, student_id FROM enrollments "
+                                         f"WHERE course_id IN ({marks}) ORDER BY id", chunk):
+                courses[cid].registered_students.add(sid)
+        return [courses[cid] for cid in course_ids if cid in courses]
+
+    def authenticate_user(self, user_id: str, password: str) -> User:
+        user_id = user_id.lower()
+        if user_id == 'admin' and user_id in self.admins:
+            admin = self.admins[user_id]
+            if admin.authenticate(password):
+                return admin
+        else:
+            student = self._load_student(user_id)
+            if student is None:
+                spend_verification(password)
+            elif student.authenticate(password):
+                return student
+        raise Exception("Invalid username or password.")
+
+    def add_student(self, student_id: str, password: str, standing: int = 0):
+        student_id = student_id.lower()
+        password = stored_password(password)
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone():
+                raise Exception("Student with this ID already exists.")
+            conn.execute("INSERT INTO students (student_id, password, standing) VALUES (?, ?, ?)",
+                         (student_id, password, standing))
+
+    def add_course(self, course_id: str, title: str, description: str, credits: int, capacity: int,
+                   meetings=(), prerequisites: Iterable[str] = ()):
+        course_id = course_id.upper()
+        meetings = Course.format_meetings(Course.parse_meetings(meetings))
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (course_id,)).fetchone():
+                raise Exception("Course with this ID already exists.")
+            conn.execute("INSERT INTO courses (course_id, title, description, credits, capacity, meetings) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (course_id, title, description, credits, capacity, meetings))
+            self._set_prerequisites(conn, course_id, prerequisites)
+
+    def add_students_batch(self, rows: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        rows = list(rows)
+        passwords = stored_passwords(row[1] for row in rows)
+        results = []
+        with self._transaction() as conn:
+            for (student_id, _), password in zip(rows, passwords):
+                student_id = student_id.lower()
+                cursor = conn.execute("INSERT OR IGNORE INTO students (student_id, password) VALUES (?, ?)",
+                                      (student_id, password))
+                results.append((student_id, BATCH_OK if cursor.rowcount else BATCH_DUPLICATE))
+        return results
+
+    def add_courses_batch(self, rows: Iterable[Tuple[str, str, str, int, int]]) -> List[Tuple[str, str]]:
+        # Meeting times are read before the transaction; a row whose times can't be read gets None
+        parsed = []
+        for course_id, title, description, credits, capacity, *rest in rows:
+            try:
+                meetings = Course.format_meetings(Course.parse_meetings(rest[0] if rest else ()))
+            except Exception:
+                meetings = None
+            parsed.append((course_id.upper(), title, description, credits, capacity, meetings, rest[1:2]))
+        results = []
+        with self._transaction() as conn:
+            for course_id, title, description, credits, capacity, meetings, prerequisites in parsed:
+                if meetings is None:
+                    results.append((course_id, BATCH_INVALID))
+                    continue
+                # A row with prerequisites is undone on its own if they don't exist or form a cycle
+                if prerequisites:
+                    conn.execute("SAVEPOINT course_row")
+                cursor = conn.execute("INSERT OR IGNORE INTO courses "
+                                      "(course_id, title, description, credits, capacity, meetings) "
+                                      "VALUES (?, ?, ?, ?, ?, ?)",
+                                      (course_id, title, description, credits, capacity, meetings))
+                status = BATCH_OK if cursor.rowcount else BATCH_DUPLICATE
+                if prerequisites:
+                    if status == BATCH_OK:
+                        try:
+                            self._set_prerequisites(conn, course_id, prerequisites[0])
+                        except Exception:
+                            conn.execute("ROLLBACK TO course_row")
+                            status = BATCH_PREREQUISITE
+                    conn.execute("RELEASE course_row")
+                results.append((course_id, status))
+        return results
+
+    def _set_prerequisites(self, conn: sqlite3.Connection, course_id: str, prerequisites: Iterable[str]):
+        """
+        Replaces a course's prerequisite rows and updates the in-memory graph, inside the caller's transaction.
+
+        The graph is changed last, so if it finds a cycle the exception rolls the rows back too.
+        """
+        prerequisites = list(dict.fromkeys(cid.upper() for cid in prerequisites))
+        missing = [cid for cid in prerequisites if cid != course_id and
+                   conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (cid,)).fetchone() is None]
+        if missing:
+            raise Exception(f"Prerequisite not found: {', '.join(missing)}.")
+        conn.execute("DELETE FROM prerequisites WHERE course_id = ?", (course_id,))
+        conn.executemany("INSERT INTO prerequisites (course_id, prerequisite_id) VALUES (?, ?)",
+                         [(course_id, cid) for cid in prerequisites])
+        self.prerequisites.set_prerequisites(course_id, prerequisites)
+
+    def _missing_prerequisites(self, conn: sqlite3.Connection, student_id: str, course_id: str) -> List[str]:
+        if not self.prerequisites.prerequisites(course_id):
+            return []
+        completed = [row[0] for row in conn.execute("SELECT course_id FROM completions WHERE student_id = ?",
+                                                    (student_id,))]
+        return self.prerequisites.missing(course_id, self.prerequisites.credit_bits(completed))
+
+    def _credit_overload(self, conn: sqlite3.Connection, student_id: str, credits: int) -> Optional[int]:
+        if self.max_credits is None:
+            return None
+        load = conn.execute("SELECT credit_load FROM students WHERE student_id = ?",
+                            (student_id,)).fetchone()[0] + credits
+        return load if load > self.max_credits else None
+
+    def _change_load(self, conn: sqlite3.Connection, student_id: str, amount: int):
+        conn.execute("UPDATE students SET credit_load = credit_load + ? WHERE student_id = ?", (amount, student_id))
+
+    def _release_loads(self, conn: sqlite3.Connection, course_id: str):
+        """
+        Takes a course's credits off the totals of its students, before its enrollments are deleted.
+        """
+        conn.execute("UPDATE students SET credit_load = credit_load - (SELECT credits FROM courses WHERE course_id = ?) "
+                     "WHERE student_id IN (SELECT student_id FROM enrollments WHERE course_id = ?)",
+                     (course_id, course_id))
+
+    def remove_course(self, course_id: str):
+        course_id = course_id.upper()
+        with self._transaction() as conn:
+            self._release_loads(conn, course_id)
+            # Enrollments and prerequisite rows are removed by ON DELETE CASCADE
+            if conn.execute("DELETE FROM courses WHERE course_id = ?", (course_id,)).rowcount == 0:
+                raise Exception("Course not found.")
+            self.prerequisites.remove(course_id)
+
+    def remove_courses(self, course_ids: Iterable[str]):
+        course_ids = list(dict.fromkeys(cid.upper() for cid in course_ids))
+        with self._transaction() as conn:
+            missing = [cid for cid in course_ids
+                       if conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (cid,)).fetchone() is None]
+            if missing:
+                raise Exception(f"Course not found: {', '.join(missing)}.")
+            for cid in course_ids:
+                self._release_loads(conn, cid)
+            # Enrollments and prerequisite rows are removed by ON DELETE CASCADE
+            conn.executemany("DELETE FROM courses WHERE course_id = ?", [(cid,) for cid in course_ids])
+            for cid in course_ids:
+                self.prerequisites.remove(cid)
+
+    def check_consistency(self) -> List[str]:
+        problems = []
+        with self.pool.connection() as conn:
+            for cid, enrolled, actual in conn.execute(
+                    "SELECT c.course_id, c.enrolled, COUNT(e.id) FROM courses c "
+                    "LEFT JOIN enrollments e ON e.course_id = c.course_id GROUP BY c.id ORDER BY c.id"):
+                if enrolled != actual:
+                    problems.append(f"{cid} counts {enrolled} students, but {actual} are enrolled.")
+            for cid, sid in conn.execute(
+                    "SELECT e.course_id, e.student_id FROM enrollments e "
+                    "LEFT JOIN students s ON s.student_id = e.student_id WHERE s.student_id IS NULL"):
+                problems.append(f"{cid} lists unknown student {sid}.")
+            for sid, cid in conn.execute(
+                    "SELECT e.student_id, e.course_id FROM enrollments e "
+                    "LEFT JOIN courses c ON c.course_id = e.course_id WHERE c.course_id IS NULL"):
+                problems.append(f"{sid} lists unknown course {cid}.")
+            for sid, load, actual in conn.execute(
+                    "SELECT s.student_id, s.credit_load, COALESCE(SUM(c.credits), 0) FROM students s "
+                    "LEFT JOIN enrollments e ON e.student_id = s.student_id "
+                    "LEFT JOIN courses c ON c.course_id = e.course_id GROUP BY s.student_id ORDER BY s.rowid"):
+                if load != actual:
+                    problems.append(f"{sid} counts {load} credits, but is registered for {actual}.")
+        return problems
+
+    def update_course(self, course_id: str, title=None, description=None, credits=None, capacity=None,
+                      meetings=None, prerequisites=None):
+        course_id = course_id.upper()
+        if meetings is not None:
+            meetings = Course.format_meetings(Course.parse_meetings(meetings))
+        with self._transaction() as conn:
+            if credits is not None:
+                # Only this course's students have totals that change
+                conn.execute("UPDATE students SET credit_load = credit_load + ? - "
+                             "(SELECT credits FROM courses WHERE course_id = ?) "
+                             "WHERE student_id IN (SELECT student_id FROM enrollments WHERE course_id = ?)",
+                             (credits, course_id, course_id))
+            cursor = conn.execute(
+                "UPDATE courses SET title = COALESCE(?, title), description = COALESCE(?, description), "
+                "credits = COALESCE(?, credits), capacity = COALESCE(?, capacity), "
+                "meetings = COALESCE(?, meetings) WHERE course_id = ?",
+                (title, description, credits, capacity, meetings, course_id))
+            if cursor.rowcount == 0:
+                raise Exception("Course not found.")
+            if prerequisites is not None:
+                self._set_prerequisites(conn, course_id, prerequisites)
+            if capacity is not None and self.auto_promote:
+                self._promote(conn, course_id)
+
+    def search_courses(self, search_term: str, ranked: bool = False, limit: Optional[int] = None) -> List[Course]:
+        """
+        Finds courses by its ID or title, ignoring uppercase or lowercase letters.
+
+        Uses SQL LIKE over the courses table. Ranking and the limit are done by SQLite.
+        See RegistrationSystem.search_courses for the arguments.
+        """
+        term = search_term.lower()
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        order = "id"
+        params: list = [f"%{escaped}%", f"%{escaped}%"]
+        if ranked:
+            order = ("CASE WHEN lower(course_id) = ? THEN 0 "
+                     "WHEN lower(course_id) LIKE ? ESCAPE '\\' OR lower(title) LIKE ? ESCAPE '\\' THEN 1 "
+                     "ELSE 2 END, id")
+            params += [term, f"{escaped}%", f"{escaped}%"]
+        params.append(-1 if limit is None else limit)
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT course_id FROM courses "
+                                "WHERE lower(course_id) LIKE ? ESCAPE '\\' OR lower(title) LIKE ? ESCAPE '\\' "
+                                f"ORDER BY {order} LIMIT ?", params).fetchall()
+            return self._load_courses(conn, [row[0] for row in rows])
+
+    def list_students_for_course(self, course_id: str) -> List[str]:
+        course_id = course_id.upper()
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (course_id,)).fetchone() is None:
+                raise Exception("Course not found.")
+            return self._load_roster(conn, course_id)
+
+    def list_students_after(self, course_id: str, after: Optional[str], count: int) -> List[str]:
+        # Walks the UNIQUE (course_id, student_id) index from the cursor, so a page never reads the whole roster
+        course_id = course_id.upper()
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (course_id,)).fetchone() is None:
+                raise Exception("Course not found.")
+            return [row[0] for row in conn.execute(
+                "SELECT student_id FROM enrollments WHERE course_id = ? AND student_id > ? "
+                "ORDER BY student_id LIMIT ?", (course_id, "" if after is None else after, count))]
+
+    def list_courses_for_student(self, student_id: str) -> List[str]:
+        student_id = student_id.lower()
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            return self._load_schedule(conn, student_id)
+
+    def view_available_courses(self) -> List[Course]:
+        with self.pool.connection() as conn:
+            courses: Dict[str, Course] = {}
+            for row in conn.execute("SELECT course_id, title, description, credits, capacity, meetings "
+                                    "FROM courses ORDER BY id"):
+                courses[row[0]] = self._make_course(row, ())
+            for cid, sid in conn.execute("SELECT course_id, student_id FROM enrollments ORDER BY id"):
+                courses[cid].registered_students.add(sid)
+        return list(courses.values())
+
+    def catalog_rows(self, available_only: bool = False, page: int = 0, page_size: Optional[int] = None) -> List[str]:
+        """
+        Gets the catalog as ready-to-print rows, built by one query using the stored seat counts.
+
+        See RegistrationSystem.catalog_rows for the arguments.
+        """
+        where = "WHERE enrolled < capacity " if available_only else ""
+        limit, offset = (-1, 0) if page_size is None else (page_size, page * page_size)
+        row = Course.TABLE_FORMAT.format
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT course_id, title, credits, capacity, enrolled, description FROM courses "
+                                f"{where}ORDER BY id LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+        return [f"{row(*r)} - Status: {'Full' if r[4] >= r[3] else 'Available'}" for r in rows]
+
+    def catalog_size(self, available_only: bool = False) -> int:
+        where = " WHERE enrolled < capacity" if available_only else ""
+        with self.pool.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM courses{where}").fetchone()[0]
+
+    def seat_totals(self) -> Tuple[int, int, int, int, int]:
+        with self.pool.connection() as conn:
+            return tuple(conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(enrolled), 0), COALESCE(SUM(capacity), 0), "
+                "COALESCE(SUM(MAX(capacity - enrolled, 0)), 0), COALESCE(SUM(enrolled >= capacity), 0) "
+                "FROM courses").fetchone())
+
+    def student_course_register(self, student_id: str, course_id: str):
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            course = conn.execute("SELECT meetings, credits FROM courses WHERE course_id = ?", (course_id,)).fetchone()
+            if course is None:
+                raise Exception("Course not found.")
+            clash = self._timetable(conn, student_id).conflict(Course.parse_meetings(course[0]))
+            # Taking the seat and checking the limit is one statement, inside the same transaction as the insert
+            seat = conn.execute("UPDATE courses SET enrolled = enrolled + 1 "
+                                "WHERE course_id = ? AND enrolled < capacity", (course_id,))
+            if seat.rowcount == 0:
+                raise Exception("Course is full.")
+            try:
+                conn.execute("INSERT INTO enrollments (course_id, student_id) VALUES (?, ?)",
+                             (course_id, student_id))
+            except sqlite3.IntegrityError:
+                raise Exception("Student already registered for this course.")
+            # Checked last so the errors come in the same order as RegistrationSystem (the rollback frees the seat)
+            missing = self._missing_prerequisites(conn, student_id, course_id)
+            if missing:
+                raise Exception(f"Missing prerequisites: {', '.join(missing)}.")
+            if clash is not None:
+                raise Exception(f"Time conflict with {clash}.")
+            load = self._credit_overload(conn, student_id, course[1])
+            if load is not None:
+                raise Exception(f"Credit limit exceeded: {load} of {self.max_credits} credits.")
+            self._change_load(conn, student_id, course[1])
+            conn.execute("DELETE FROM waitlist WHERE course_id = ? AND student_id = ?", (course_id, student_id))
+
+    def student_course_remove(self, student_id: str, course_id: str):
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            if conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (course_id,)).fetchone() is None:
+                raise Exception("Course not found.")
+            removed = conn.execute("DELETE FROM enrollments WHERE course_id = ? AND student_id = ?",
+                                   (course_id, student_id))
+            if removed.rowcount == 0:
+                raise Exception("Student is not registered for this course.")
+            conn.execute("UPDATE courses SET enrolled = enrolled - 1 WHERE course_id = ?", (course_id,))
+            self._change_load(conn, student_id, -conn.execute("SELECT credits FROM courses WHERE course_id = ?",
+                                                              (course_id,)).fetchone()[0])
+            if self.auto_promote:
+                self._promote(conn, course_id)
+
+    def register_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        student_ids, course_ids, statuses, groups = self._group_pairs(pairs)
+        with self._transaction() as conn:
+            known = self._known_students(conn, student_ids)
+            timetables: Dict[str, MeetingIndex] = {}
+            for course_id, positions in groups.items():
+                row = conn.execute("SELECT capacity - enrolled, meetings, credits FROM courses WHERE course_id = ?",
+                                   (course_id,)).fetchone()
+                if row is None:
+                    continue
+                seats = row[0]
+                meetings = Course.parse_meetings(row[1])
+                credits = row[2]
+                gated = bool(self.prerequisites.prerequisites(course_id))
+                added = 0
+                for i in positions:
+                    student_id = student_ids[i]
+                    if student_id not in known:
+                        continue
+                    if conn.execute("SELECT 1 FROM enrollments WHERE course_id = ? AND student_id = ?",
+                                    (course_id, student_id)).fetchone():
+                        statuses[i] = BATCH_DUPLICATE
+                    elif gated and self._missing_prerequisites(conn, student_id, course_id):
+                        statuses[i] = BATCH_PREREQUISITE
+                    elif meetings and self._batch_timetable(conn, timetables, student_id).conflict(meetings):
+                        statuses[i] = BATCH_CONFLICT
+                    elif self._credit_overload(conn, student_id, credits) is not None:
+                        statuses[i] = BATCH_CREDIT_LIMIT
+                    elif added >= seats:
+                        statuses[i] = BATCH_FULL
+                    else:
+                        conn.execute("INSERT INTO enrollments (course_id, student_id) VALUES (?, ?)",
+                                     (course_id, student_id))
+                        self._change_load(conn, student_id, credits)
+                        conn.execute("DELETE FROM waitlist WHERE course_id = ? AND student_id = ?",
+                                     (course_id, student_id))
+                        if meetings:
+                            timetables[student_id].add(course_id, meetings)
+                        added += 1
+                        statuses[i] = BATCH_OK
+                if added:
+                    conn.execute("UPDATE courses SET enrolled = enrolled + ? WHERE course_id = ?", (added, course_id))
+        return list(zip(student_ids, course_ids, statuses))
+
+    def drop_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        student_ids, course_ids, statuses, groups = self._group_pairs(pairs)
+        with self._transaction() as conn:
+            known = self._known_students(conn, student_ids)
+            for course_id, positions in groups.items():
+                row = conn.execute("SELECT credits FROM courses WHERE course_id = ?", (course_id,)).fetchone()
+                if row is None:
+                    continue
+                removed = 0
+                for i in positions:
+                    if student_ids[i] not in known:
+                        continue
+                    cursor = conn.execute("DELETE FROM enrollments WHERE course_id = ? AND student_id = ?",
+                                          (course_id, student_ids[i]))
+                    if cursor.rowcount:
+                        self._change_load(conn, student_ids[i], -row[0])
+                        removed += 1
+                        statuses[i] = BATCH_OK
+                    else:
+                        statuses[i] = BATCH_NOT_REGISTERED
+                if removed:
+                    conn.execute("UPDATE courses SET enrolled = enrolled - ? WHERE course_id = ?",
+                                 (removed, course_id))
+                    if self.auto_promote:
+                        self._promote(conn, course_id)
+        return list(zip(student_ids, course_ids, statuses))
+
+    def join_waitlist(self, student_id: str, course_id: str):
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._transaction() as conn:
+            student = conn.execute("SELECT standing FROM students WHERE student_id = ?", (student_id,)).fetchone()
+            if student is None:
+                raise Exception("Student not found.")
+            course = conn.execute("SELECT enrolled < capacity, meetings, credits FROM courses WHERE course_id = ?",
+                                  (course_id,)).fetchone()
+            if course is None:
+                raise Exception("Course not found.")
+            if conn.execute("SELECT 1 FROM enrollments WHERE course_id = ? AND student_id = ?",
+                            (course_id, student_id)).fetchone():
+                raise Exception("Student already registered for this course.")
+            if course[0]:
+                raise Exception("Course is not full. Register for it instead.")
+            missing = self._missing_prerequisites(conn, student_id, course_id)
+            if missing:
+                raise Exception(f"Missing prerequisites: {', '.join(missing)}.")
+            clash = self._timetable(conn, student_id).conflict(Course.parse_meetings(course[1]))
+            if clash is not None:
+                raise Exception(f"Time conflict with {clash}.")
+            load = self._credit_overload(conn, student_id, course[2])
+            if load is not None:
+                raise Exception(f"Credit limit exceeded: {load} of {self.max_credits} credits.")
+            priority = -student[0] if self.waitlist_by_standing else 0
+            try:
+                conn.execute("INSERT INTO waitlist (course_id, student_id, priority) VALUES (?, ?, ?)",
+                             (course_id, student_id, priority))
+            except sqlite3.IntegrityError:
+                raise Exception("Student is already on the waitlist for this course.")
+
+    def leave_waitlist(self, student_id: str, course_id: str):
+        with self._transaction() as conn:
+            removed = conn.execute("DELETE FROM waitlist WHERE course_id = ? AND student_id = ?",
+                                   (course_id.upper(), student_id.lower()))
+            if removed.rowcount == 0:
+                raise Exception("Student is not on the waitlist for this course.")
+
+    def _store_preferences(self, student_id: str, course_ids: Tuple[str, ...]):
+        with self._transaction() as conn:
+            # New rows get higher ids, so a new submission moves the student to the end
+            conn.execute("DELETE FROM preferences WHERE student_id = ?", (student_id,))
+            conn.executemany("INSERT INTO preferences (student_id, rank, course_id) VALUES (?, ?, ?)",
+                             [(student_id, rank, cid) for rank, cid in enumerate(course_ids, 1)])
+
+    def withdraw_preferences(self, student_id: str):
+        with self._transaction() as conn:
+            if conn.execute("DELETE FROM preferences WHERE student_id = ?", (student_id.lower(),)).rowcount == 0:
+                raise Exception("Student has no lottery preferences.")
+
+    def lottery_preferences(self, student_id: str) -> List[str]:
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT course_id FROM preferences WHERE student_id = ? "
+                                                   "ORDER BY rank", (student_id.lower(),))]
+
+    def clear_preferences(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM preferences")
+
+    def _all_preferences(self) -> Dict[str, Tuple[str, ...]]:
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT student_id, course_id FROM preferences ORDER BY id").fetchall()
+        return {sid: tuple(row[1] for row in group) for sid, group in groupby(rows, key=itemgetter(0))}
+
+    def _position(self, conn: sqlite3.Connection, student_id: str, course_id: str) -> int:
+        mine = conn.execute("SELECT priority, id FROM waitlist WHERE course_id = ? AND student_id = ?",
+                            (course_id, student_id)).fetchone()
+        if mine is None:
+            return 0
+        # Counts the entries ahead using the (course_id, priority, id) index
+        ahead = conn.execute("SELECT COUNT(*) FROM waitlist WHERE course_id = ? AND "
+                             "(priority < ? OR (priority = ? AND id < ?))",
+                             (course_id, mine[0], mine[0], mine[1])).fetchone()[0]
+        return ahead + 1
+
+    def waitlist_position(self, student_id: str, course_id: str) -> int:
+        with self.pool.connection() as conn:
+            return self._position(conn, student_id.lower(), course_id.upper())
+
+    def student_waitlists(self, student_id: str) -> List[Tuple[str, int]]:
+        student_id = student_id.lower()
+        with self.pool.connection() as conn:
+            course_ids = [row[0] for row in conn.execute(
+                "SELECT course_id FROM waitlist WHERE student_id = ? ORDER BY id", (student_id,))]
+            return [(cid, self._position(conn, student_id, cid)) for cid in course_ids]
+
+    def promote_waitlist(self, course_id: str) -> List[str]:
+        with self._transaction() as conn:
+            return self._promote(conn, course_id.upper())
+
+    def _promote(self, conn: sqlite3.Connection, course_id: str) -> List[str]:
+        """
+        Moves students from the front of the waitlist into free seats, inside the caller's transaction.
+        """
+        row = conn.execute("SELECT capacity - enrolled, meetings, credits FROM courses WHERE course_id = ?",
+                           (course_id,)).fetchone()
+        if row is None:
+            return []
+        seats = row[0]
+        meetings = Course.parse_meetings(row[1])
+        promoted = []
+        while len(promoted) < seats:
+            entry = conn.execute("SELECT id, student_id FROM waitlist WHERE course_id = ? "
+                                 "ORDER BY priority, id LIMIT 1", (course_id,)).fetchone()
+            if entry is None:
+                break
+            conn.execute("DELETE FROM waitlist WHERE id = ?", (entry[0],))
+            if meetings and self._timetable(conn, entry[1]).conflict(meetings) is not None:
+                continue
+            if self._missing_prerequisites(conn, entry[1], course_id):
+                continue
+            if self._credit_overload(conn, entry[1], row[2]) is not None:
+                continue
+            added = conn.execute("INSERT OR IGNORE INTO enrollments (course_id, student_id) VALUES (?, ?)",
+                                 (course_id, entry[1]))
+            if added.rowcount:
+                self._change_load(conn, entry[1], row[2])
+                promoted.append(entry[1])
+        if promoted:
+            conn.execute("UPDATE courses SET enrolled = enrolled + ? WHERE course_id = ?", (len(promoted), course_id))
+        return promoted
+
+    def complete_course(self, student_id: str, course_id: str):
+        student_id = student_id.lower()
+        course_id = course_id.upper()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            if conn.execute("SELECT 1 FROM courses WHERE course_id = ?", (course_id,)).fetchone() is None:
+                raise Exception("Course not found.")
+            try:
+                conn.execute("INSERT INTO completions (student_id, course_id) VALUES (?, ?)", (student_id, course_id))
+            except sqlite3.IntegrityError:
+                raise Exception("Student has already completed this course.")
+
+    def completed_courses(self, student_id: str) -> List[str]:
+        student_id = student_id.lower()
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            return [row[0] for row in conn.execute(
+                "SELECT course_id FROM completions WHERE student_id = ? ORDER BY id", (student_id,))]
+
+    def eligible_courses(self, student_id: str) -> List[str]:
+        student_id = student_id.lower()
+        graph = self.prerequisites
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            completed = [row[0] for row in conn.execute(
+                "SELECT course_id FROM completions WHERE student_id = ?", (student_id,))]
+            rows = conn.execute("SELECT course_id FROM courses WHERE course_id NOT IN "
+                                "(SELECT course_id FROM completions WHERE student_id = ?) AND course_id NOT IN "
+                                "(SELECT course_id FROM enrollments WHERE student_id = ?) ORDER BY id",
+                                (student_id, student_id)).fetchall()
+        credit = graph.credit_bits(completed)
+        return [cid for (cid,) in rows if graph.eligible(cid, credit)]
+
+    def credit_load(self, student_id: str) -> int:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT credit_load FROM students WHERE student_id = ?",
+                               (student_id.lower(),)).fetchone()
+        if row is None:
+            raise Exception("Student not found.")
+        return row[0]
+
+    def overloaded_students(self, max_credits: Optional[int] = None) -> List[Tuple[str, int]]:
+        limit = self.max_credits if max_credits is None else max_credits
+        if limit is None:
+            return []
+        # Reads only the matching rows through the students_by_load index
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT student_id, credit_load FROM students WHERE credit_load > ? "
+                                "ORDER BY credit_load DESC, student_id", (limit,)).fetchall()
+
+    def underloaded_students(self, min_credits: Optional[int] = None) -> List[Tuple[str, int]]:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT student_id, credit_load FROM students WHERE credit_load < ? "
+                                "ORDER BY credit_load, student_id",
+                                (self.min_credits if min_credits is None else min_credits,)).fetchall()
+
+    def _timetable(self, conn: sqlite3.Connection, student_id: str) -> MeetingIndex:
+        """
+        Builds the meeting index of a student's registered courses that have meeting times.
+        """
+        timetable = MeetingIndex()
+        for cid, meetings in conn.execute("SELECT c.course_id, c.meetings FROM enrollments e "
+                                          "JOIN courses c ON c.course_id = e.course_id "
+                                          "WHERE e.student_id = ? AND c.meetings != ''", (student_id,)):
+            timetable.add(cid, Course.parse_meetings(meetings))
+        return timetable
+
+    def _batch_timetable(self, conn: sqlite3.Connection, timetables: Dict[str, MeetingIndex],
+                         student_id: str) -> MeetingIndex:
+        timetable = timetables.get(student_id)
+        if timetable is None:
+            timetable = timetables[student_id] = self._timetable(conn, student_id)
+        return timetable
+
+    def find_conflicts(self) -> List[Tuple[str, str, str]]:
+        conflicts = []
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT e.student_id, c.course_id, c.meetings FROM enrollments e "
+                                "JOIN courses c ON c.course_id = e.course_id "
+                                "WHERE c.meetings != '' ORDER BY e.student_id")
+            for student_id, group in groupby(rows, key=itemgetter(0)):
+                timetable = MeetingIndex()
+                for _, cid, meetings in group:
+                    timetable.add(cid, Course.parse_meetings(meetings))
+                conflicts.extend((student_id, first, second) for first, second in timetable.overlaps())
+        conflicts.sort()
+        return conflicts
+
+    def _known_students(self, conn: sqlite3.Connection, student_ids: List[str]) -> set:
+        """
+        Finds which of the given student IDs exist, using a few IN (...) queries instead of one per ID.
+        """
+        unique = list(set(student_ids))
+        known = set()
+        for start in range(0, len(unique), _MAX_PARAMS):
+            chunk = unique[start:start + _MAX_PARAMS]
+            marks = ",".join("?" * len(chunk))
+            known.update(row[0] for row in conn.execute(
+                f"SELECT student_id FROM students WHERE student_id IN ({marks})", chunk))
+        return known
+
+    def student_registered_course(self, student_id: str) -> str:
+        student_id = student_id.lower()
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM students WHERE student_id = ?", (student_id,)).fetchone() is None:
+                raise Exception("Student not found.")
+            rows = conn.execute("SELECT c.course_id, c.title, c.credits FROM enrollments e "
+                                "JOIN courses c ON c.course_id = e.course_id "
+                                "WHERE e.student_id = ? ORDER BY e.id", (student_id,)).fetchall()
+        if not rows:
+            return "No registered courses."
+        line = Course.SCHEDULE_FORMAT.format
+        return "\n".join(line(cid, title, credits) for cid, title, credits in rows)
+
+
+class SQLiteSnapshot:
+
+    def __init__(self, system: SQLiteRegistrationSystem, version: int):
+        """
+        A read-only view of a SQLite system's data at one moment (see SQLiteRegistrationSystem.snapshot).
+
+        It has the same attributes and read methods as App.Snapshot, so reports can use either one.
+
+        Arguments:
+            system (SQLiteRegistrationSystem): The system the snapshot was taken of.
+            version (int): The snapshot's number.
+
+        Attributes:
+            system (SQLiteRegistrationSystem): The system the snapshot was taken of.
+            version (int): Goes up by one with each snapshot the system takes.
+            pool (ConnectionPool): The snapshot's own connection.
+            courses (CourseTable): Course ID -> Course, as of the snapshot.
+            students (StudentTable): Student ID -> Student, as of the snapshot.
+            closed (bool): True once the snapshot was closed.
+        """
+        self.system = system
+        self.version = version
+        self.closed = False
+        if system.pool.in_memory:
+            self.pool = ConnectionPool(":memory:", 1)
+            with system.pool.connection() as source, self.pool.connection() as target:
+                source.backup(target)
+        else:
+            self.pool = ConnectionPool(system.pool.database, 1)
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN")
+                # A read transaction's view of the database is fixed by its first read
+                conn.execute("SELECT 1 FROM courses LIMIT 1").fetchone()
+        self.courses = CourseTable(self)
+        self.students = StudentTable(self)
+
+    def check_open(self):
+        """
+        Raises:
+            Exception: If the snapshot was closed.
+        """
+        if self.closed:
+            raise Exception("Snapshot is closed.")
+
+    def _load_course(self, course_id: str) -> Optional[Course]:
+        # Prerequisites come from the snapshot's table, not the system's in-memory graph (which may have changed)
+        self.check_open()
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT course_id, title, description, credits, capacity, meetings FROM courses "
+                               "WHERE course_id = ?", (course_id,)).fetchone()
+            if row is None:
+                return None
+            prerequisites = [cid for (cid,) in conn.execute(
+                "SELECT prerequisite_id FROM prerequisites WHERE course_id = ? ORDER BY id", (course_id,))]
+            course = Course(*row, prerequisites)
+            for sid in self._load_roster(conn, course_id):
+                course.registered_students.add(sid)
+            return course
+
+    def _load_student(self, student_id: str) -> Optional[Student]:
+        self.check_open()
+        return SQLiteRegistrationSystem._load_student(self, student_id)
+
+    # The system's reads, run on the snapshot's connection
+    _load_roster = SQLiteRegistrationSystem._load_roster
+    _load_schedule = SQLiteRegistrationSystem._load_schedule
+
+    def list_students_for_course(self, course_id: str) -> List[str]:
+        self.check_open()
+        return SQLiteRegistrationSystem.list_students_for_course(self, course_id)
+
+    def list_students_after(self, course_id: str, after: Optional[str], count: int) -> List[str]:
+        self.check_open()
+        return SQLiteRegistrationSystem.list_students_after(self, course_id, after, count)
+
+    def list_courses_for_student(self, student_id: str) -> List[str]:
+        self.check_open()
+        return SQLiteRegistrationSystem.list_courses_for_student(self, student_id)
+
+    def student_registered_course(self, student_id: str) -> str:
+        self.check_open()
+        return SQLiteRegistrationSystem.student_registered_course(self, student_id)
+
+    def close(self):
+        """
+        Ends the snapshot's read transaction and closes its connection.
+        """
+        if not self.closed:
+            self.closed = True
+            self.system._release_snapshot(self)
+            self.pool.close()
+
+    def __enter__(self) -> "SQLiteSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,10 @@
+"""
+Behavior tests for the Student Course Registration System.
+
+Every test calls the public RegistrationSystem methods and compares the results
+(including error messages) with what the in-memory system is expected to return,
+and runs once per storage backend, so every backend must behave the same way.
+
+Run them from the project folder:
+    python -m pytest tests
+"""
@@ -0,0 +1,31 @@
+"""
+The make_system fixture: tests parametrize it (indirectly) with backend names from tests.support.
+"""
+
+import pytest
+
+from sharding import ShardedRegistrationSystem
+from tests.support import BACKENDS
+
+
+@pytest.fixture
+def make_system(request):
+    """
+    Gives a function that makes fresh systems of the test's backend, and closes them after the test.
+
+    Sharded systems are also checked for records that disagree between shards before they close.
+    """
+    made = []
+
+    def make(**options):
+        system = BACKENDS[request.param](**options)
+        made.append(system)
+        return system
+
+    yield make
+    for system in made:
+        if isinstance(system, ShardedRegistrationSystem):
+            assert system.check_consistency() == []
+        close = getattr(system, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,62 @@
+"""
+Helpers shared by the tests: the backends they run against and checks for expected errors.
+"""
+
+import os
+import tempfile
+from functools import partial
+
+from App import RegistrationSystem
+from compact import CompactRegistrationSystem
+from importer import import_file
+from sharding import ShardedRegistrationSystem
+from sqlite_storage import SQLiteRegistrationSystem
+
+# Backend name -> class (or ready-made partial) that builds a fresh system from keyword options
+BACKENDS = {
+    "memory": RegistrationSystem,
+    "compact": CompactRegistrationSystem,
+    "sqlite": SQLiteRegistrationSystem,
+    "thread safe": partial(RegistrationSystem, thread_safe=True),
+    # Three shards, so the tests' courses end up spread over different worker processes
+    "sharded": partial(ShardedRegistrationSystem, shards=3),
+}
+
+# The backends most tests run against, and the same with the sharded system as well
+LOCAL = ("memory", "compact", "sqlite")
+ALL = LOCAL + ("sharded",)
+
+
+def expect_error(message: str, method, *args):
+    """
+    Calls a method and checks that it raises an exception with the given message.
+    """
+    try:
+        method(*args)
+    except Exception as e:
+        assert str(e) == message, f"{method.__name__}{args}: expected {message!r}, got {str(e)!r}"
+    else:
+        raise AssertionError(f"{method.__name__}{args} did not raise {message!r}")
+
+
+async def expect_async_error(message: str, call):
+    """
+    Awaits a call and checks that it raises an exception with the given message.
+    """
+    try:
+        await call
+    except Exception as e:
+        assert str(e) == message, f"expected {message!r}, got {str(e)!r}"
+    else:
+        raise AssertionError(f"call did not raise {message!r}")
+
+
+def import_enrollments(system: RegistrationSystem, pairs: list) -> list:
+    """
+    Imports (student_id, course_id) pairs from a CSV file and returns the rejected rows as (line, reason).
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "enrollments.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("student_id,course_id\n" + "".join(f"{sid},{cid}\n" for sid, cid in pairs))
+        return import_file(system, "enrollments", path).errors
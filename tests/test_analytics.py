@@ -0,0 +1,92 @@
+"""
+Tests of the enrollment analytics.
+"""
+
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from analytics import EnrollmentMatrix
+from App import RegistrationSystem
+from tests.support import LOCAL, expect_error
+
+
+def loop_analytics(system: RegistrationSystem) -> tuple:
+    """
+    Works out the enrollment reports with plain loops over the public methods, to compare with EnrollmentMatrix.
+    """
+    rates = []
+    for course_id in system.courses:
+        course = system.courses[course_id]
+        enrolled = len(system.list_students_for_course(course_id))
+        rates.append((course_id, enrolled, course.capacity, enrolled / course.capacity if course.capacity else 1.0))
+    rates.sort(key=lambda r: (-r[3], r[0]))
+    under = sorted(((c, n, cap) for c, n, cap, _ in rates if n < 0.5 * cap), key=lambda r: (r[1] / r[2], r[0]))
+    loads = Counter(system.credit_load(student_id) for student_id in system.students)
+    shared = Counter()
+    for student_id in system.students:
+        shared.update(combinations(sorted(system.list_courses_for_student(student_id)), 2))
+    pairs = sorted(((a, b, n) for (a, b), n in shared.items()), key=lambda r: (-r[2], r[0], r[1]))
+    return rates, under, sorted(loads.items()), pairs
+
+
+@pytest.mark.parametrize("make_system", LOCAL + ("thread safe",), indirect=True)
+def test_analytics(make_system):
+    """
+    Checks that the enrollment matrix gives the same reports as plain loops, and follows every kind of change.
+    """
+    system = make_system()
+    def same():
+        rates, under, loads, pairs = loop_analytics(system)
+        assert analytics.fill_rates() == rates, (analytics.fill_rates(), rates)
+        assert analytics.under_enrolled() == under
+        assert analytics.credit_distribution() == loads, (analytics.credit_distribution(), loads)
+        assert analytics.co_enrollment() == pairs, (analytics.co_enrollment(), pairs)
+        assert analytics.co_enrollment(limit=1, min_shared=2) == [p for p in pairs if p[2] >= 2][:1]
+
+    system.add_course("AN101", "Data", "Tables", 3, 4)
+    system.add_course("AN102", "Plots", "Charts", 4, 2)
+    system.add_course("AN103", "Models", "Fits", 2, 10)
+    for student_id in ("ava", "bo", "cy"):
+        system.add_student(student_id, "pw")
+    system.register_batch([("ava", "AN101"), ("bo", "AN101"), ("ava", "AN102"), ("bo", "AN102"), ("cy", "AN103")])
+    analytics = EnrollmentMatrix(system)
+    assert system.analytics is analytics
+    same()
+    assert analytics.co_enrollment() == [("AN101", "AN102", 2)]
+    assert analytics.co_enrolled_with("an101") == [("AN102", 2)]
+    expect_error("Course not found.", analytics.co_enrolled_with, "ZZ1")
+
+    system.join_waitlist("cy", "AN102")
+    system.student_course_register("cy", "AN101")
+    system.student_course_remove("bo", "AN102")
+    assert system.list_students_for_course("AN102") == ["ava", "cy"]
+    same()
+    system.update_course("AN103", credits=4, capacity=1)
+    system.add_courses_batch([("AN104", "Maps", "Places", 1, 3)])
+    system.register_batch(iter([("student1", "AN104"), ("ava", "AN104"), ("cy", "AN104")]))
+    same()
+    system.drop_batch([("ava", "AN101"), ("cy", "AN104")])
+    system.remove_course("AN102")
+    same()
+    system.add_course("AN102", "Plots again", "Charts", 3, 8)
+    system.student_course_register("student2", "an102")
+    system.complete_course("student1", "AN104")
+    system.remove_courses(["AN103"])
+    same()
+    system.submit_preferences("bo", ["AN102", "AN104"])
+    system.run_lottery(seed=3)
+    same()
+    assert analytics.co_enrolled_with("AN102", limit=1) == [("AN101", 1)]
+    # A change to one course re-reads only that course
+    stats = dict(analytics.stats)
+    system.student_course_remove("bo", "AN104")
+    same()
+    assert analytics.stats == {"rebuilds": stats["rebuilds"], "refreshed": stats["refreshed"] + 1}
+    analytics.close()
+    assert system.analytics is None
+    system.student_course_register("ava", "AN102")
+    assert analytics.fill_rates() != loop_analytics(system)[0]
+    analytics.rebuild()
+    assert analytics.fill_rates() == loop_analytics(system)[0]
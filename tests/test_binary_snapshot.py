@@ -0,0 +1,92 @@
+"""
+Tests of binary snapshot files.
+"""
+
+import io
+import json
+import os
+
+import pytest
+
+from App import RegistrationSystem
+from binary_snapshot import MappedSnapshot, save_snapshot
+from export import export_report
+from persistence import snapshot_state
+from sqlite_storage import SQLiteRegistrationSystem
+from tests.support import LOCAL, expect_error
+
+
+@pytest.mark.parametrize("make_system", LOCAL, indirect=True)
+def test_binary_snapshot(make_system, tmp_path):
+    """
+    Checks that a binary snapshot file gives back the same data, read in place and restored into a new system.
+    """
+    system = make_system()
+    directory = str(tmp_path)
+    system.add_course("BS101", "Bytes", "Layouts", 3, 2, "Mon 09:00-10:00, Wed 09:00-10:00")
+    system.add_course("BS102", "Pages", "Maps", 4, 1, prerequisites=["BS101"])
+    system.add_course("BS103", "Caf\u00e9 Data", "Unicode \u2713", 2, 5)
+    system.add_student("uma", "pw", 3)
+    system.add_student("vic", "pw")
+    system.complete_course("uma", "BS101")
+    system.register_batch([("uma", "BS103"), ("uma", "BS102"), ("vic", "BS101"), ("student1", "BS101")])
+    system.join_waitlist("student2", "BS101")
+    system.submit_preferences("student2", ["BS103", "BS101"])
+    path = os.path.join(directory, "state.bin")
+    assert save_snapshot(system, path) == os.path.getsize(path)
+
+    expected = json.loads(json.dumps(snapshot_state(system)))
+    with MappedSnapshot(path) as mapped:
+        assert list(mapped.courses) == ["BS101", "BS102", "BS103"] and len(mapped.students) == 4
+        assert "BS102" in mapped.courses and "BS999" not in mapped.courses and "vic" in mapped.students
+        assert mapped.courses.built == {}
+        assert mapped.list_students_for_course("bs101") == ["vic", "student1"]
+        assert mapped.list_courses_for_student("UMA") == ["BS103", "BS102"]
+        assert mapped.credit_load("uma") == 6 and mapped.credit_load("student2") == 0
+        expect_error("Course not found.", mapped.list_students_for_course, "BS999")
+        expect_error("Student not found.", mapped.credit_load, "nobody")
+        assert mapped.courses.built == {}
+        course = mapped.courses["BS101"]
+        assert course.meetings == ((0, 540, 600), (2, 540, 600))
+        assert course.registered_students.to_list() == ["vic", "student1"]
+        assert mapped.courses["BS102"].prerequisites == ("BS101",) and mapped.courses["BS101"] is course
+        assert mapped.courses["BS103"].title == "Caf\u00e9 Data"
+        student = mapped.students["uma"]
+        assert student.standing == 3 and student.completed_courses.to_list() == ["BS101"]
+        assert mapped.student_registered_course("uma") == "BS103: Caf\u00e9 Data (2 credits)\nBS102: Pages (4 credits)"
+        assert mapped.state() == expected
+        saved, live = io.StringIO(), io.StringIO()
+        export_report(mapped, "schedules", "csv", saved)
+        export_report(system, "schedules", "csv", live)
+        assert saved.getvalue() == live.getvalue()
+
+        restored = RegistrationSystem()
+        mapped.restore(restored)
+        assert json.loads(json.dumps(snapshot_state(restored))) == expected
+        assert restored.check_consistency() == []
+        # snapshot_state reads the in-memory waitlists (the SQLite backend keeps its own in the database)
+        if isinstance(system.courses, dict):
+            assert restored.waitlist_position("student2", "BS101") == 1
+        assert restored.authenticate_user("uma", "pw").user_id == "uma"
+        try:
+            mapped.restore(SQLiteRegistrationSystem())
+        except ValueError as e:
+            assert str(e) == "A binary snapshot can only be restored into an in-memory system."
+        else:
+            raise AssertionError("restore into SQLite did not raise")
+    expect_error("Snapshot is closed.", mapped.list_students_for_course, "BS101")
+    assert course.title == "Bytes"
+
+    # A copy of the restored system saves to the same bytes
+    again = os.path.join(directory, "again.bin")
+    save_snapshot(restored, again)
+    with open(path, "rb") as first, open(again, "rb") as second:
+        assert first.read() == second.read()
+    with open(again, "wb") as f:
+        f.write(b"not a snapshot at all")
+    try:
+        MappedSnapshot(again)
+    except ValueError as e:
+        assert str(e) == "Not a binary snapshot file."
+    else:
+        raise AssertionError("opening a bad file did not raise")
@@ -0,0 +1,35 @@
+"""
+Tests of rosters large enough to get a lookup index in the compact backend.
+"""
+
+import pytest
+
+from auth import hash_password
+
+
+@pytest.mark.parametrize("make_system", ("memory", "compact"), indirect=True)
+def test_large_roster(make_system):
+    """
+    Checks that a roster far past the size that gets a lookup index keeps registration order
+    """
+    system = make_system()
+    system.add_course("LG101", "Large", "Lecture hall", 1, 1000)
+    # One cheap hash for everyone; it is kept as it is, so the check does not spend its time in PBKDF2
+    password = hash_password("pw", iterations=1)
+    system.add_students_batch((f"l{n:03}", password) for n in range(600))
+    for n in range(600):
+        system.student_course_register(f"l{n:03}", "LG101")
+    for n in range(0, 600, 3):
+        system.student_course_remove(f"l{n:03}", "LG101")
+    roster = system.courses["LG101"].registered_students
+    assert len(roster) == 400 and "l001" in roster and "l000" not in roster
+    for n in range(2, 600, 6):
+        system.student_course_remove(f"l{n:03}", "LG101")
+    for n in range(4, 600, 6):
+        system.student_course_remove(f"l{n:03}", "LG101")
+    system.student_course_register("l000", "LG101")
+    expected = [f"l{n:03}" for n in range(600) if n % 2 and n % 3] + ["l000"]
+    assert list(roster) == expected and len(roster) == len(expected)
+    system.student_course_remove("l000", "LG101")
+    assert "l000" not in roster and len(roster) == len(expected) - 1
+    assert system.check_consistency() == []
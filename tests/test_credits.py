@@ -0,0 +1,48 @@
+"""
+Tests of credit totals and credit limits.
+"""
+
+import pytest
+
+from tests.support import ALL, expect_error, import_enrollments
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_credit_limits(make_system):
+    """
+    Checks credit totals, the credit limit at registration and the overload/underload reports.
+    """
+    system = make_system(max_credits=10, min_credits=6)
+    system.add_course("EN101", "English", "Essays", 4, 10)
+    system.add_course("EN102", "Literature", "Novels", 4, 10)
+    system.add_course("LA101", "Latin", "Grammar", 3, 1)
+    system.add_course("CH101", "Chemistry", "Atoms", 3, 10)
+    system.student_course_register("student1", "EN101")
+    system.student_course_register("student1", "EN102")
+    assert system.credit_load("Student1") == 8
+    expect_error("Credit limit exceeded: 11 of 10 credits.", system.student_course_register, "student1", "CH101")
+    expect_error("Student not found.", system.credit_load, "nobody")
+    system.student_course_register("student2", "LA101")
+    expect_error("Credit limit exceeded: 11 of 10 credits.", system.join_waitlist, "student1", "LA101")
+    result = system.register_batch([("student2", "CH101"), ("student2", "EN101"), ("student2", "EN102")])
+    assert [r[2] for r in result] == ["ok", "ok", "credit_limit"]
+    assert system.credit_load("student2") == 10
+    assert system.overloaded_students() == []
+    assert system.underloaded_students() == []
+
+    # Raising a course's credits changes only its students' totals and can leave some over the limit
+    system.update_course("EN101", credits=5)
+    assert system.credit_load("student1") == 9 and system.credit_load("student2") == 11
+    assert system.overloaded_students() == [("student2", 11)]
+    assert system.overloaded_students(8) == [("student2", 11), ("student1", 9)]
+    system.add_student("erin", "pw")
+    assert system.underloaded_students() == [("erin", 0)]
+    system.drop_batch([("student2", "CH101")])
+    system.student_course_remove("student1", "EN102")
+    assert system.underloaded_students() == [("erin", 0), ("student1", 5)]
+    system.remove_course("EN101")
+    assert system.credit_load("student1") == 0 and system.credit_load("student2") == 3
+    system.add_course("PH201", "Physics", "Waves", 4, 10)
+    assert import_enrollments(system, [("erin", "EN102"), ("erin", "CH101"), ("erin", "PH201")]) == \
+        [(4, "Credit limit exceeded.")]
+    assert system.check_consistency() == []
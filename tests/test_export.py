@@ -0,0 +1,33 @@
+"""
+Tests of roster paging.
+"""
+
+import pytest
+
+from export import roster_page
+from tests.support import ALL, expect_error
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_roster_pages(make_system):
+    """
+    Checks that paging through a roster while students register and drop never repeats or skips anyone.
+    """
+    system = make_system()
+    system.add_course("PG101", "Paging", "Cursors", 1, 100)
+    system.add_students_batch((f"p{n:02}", "pw") for n in range(10))
+    for n in (3, 7, 1, 9, 0, 5, 2, 8, 6, 4):
+        system.student_course_register(f"p{n:02}", "PG101")
+    page, cursor = roster_page(system, "pg101", None, 4)
+    assert page == ["p00", "p01", "p02", "p03"] and cursor == "p03"
+    # The last student of the page and one not read yet drop; a new student registers
+    system.student_course_remove("p03", "PG101")
+    system.student_course_remove("p05", "PG101")
+    system.add_student("p045", "pw")
+    system.student_course_register("p045", "PG101")
+    page, cursor = roster_page(system, "PG101", cursor, 4)
+    assert page == ["p04", "p045", "p06", "p07"] and cursor == "p07"
+    assert roster_page(system, "PG101", cursor, 4) == (["p08", "p09"], None)
+    assert roster_page(system, "PG101", None, 8) == (["p00", "p01", "p02", "p04", "p045", "p06", "p07", "p08"],
+                                                     "p08")
+    expect_error("Course not found.", roster_page, system, "ZZ1")
@@ -0,0 +1,47 @@
+"""
+Tests of lottery preferences and the seat lottery.
+"""
+
+import pytest
+
+from tests.support import LOCAL, expect_error
+
+
+@pytest.mark.parametrize("make_system", LOCAL, indirect=True)
+def test_lottery(make_system):
+    """
+    Checks preference submission and that the seat lottery is reproducible and respects every rule.
+    """
+    system = make_system(max_credits=9)
+    system.add_course("LO101", "Logic", "Proofs", 3, 1, "Mon 09:00-10:00")
+    system.add_course("LO102", "Sets", "Sets", 3, 2, "Mon 09:30-10:30")
+    system.add_course("LO103", "Lambda", "Functions", 3, 2)
+    system.add_course("LO104", "Types", "Types", 3, 5)
+    system.add_course("LO201", "Models", "Models", 3, 5, prerequisites=["LO101"])
+    for student_id in ("ann", "ben", "cat"):
+        system.add_student(student_id, "pw")
+    expect_error("Course not found: ZZ1.", system.submit_preferences, "ann", ["LO101", "ZZ1"])
+    expect_error("Course listed twice: LO101.", system.submit_preferences, "ann", ["LO101", "lo101"])
+    expect_error("Student not found.", system.submit_preferences, "nobody", ["LO101"])
+    expect_error("No courses given.", system.submit_preferences, "ann", [])
+    system.submit_preferences("ann", ["lo101", "LO102", "LO103", "LO104", "LO201"])
+    system.submit_preferences("ben", ["LO101", "LO103", "LO104"])
+    system.submit_preferences("cat", ["LO104"])
+    system.submit_preferences("cat", ["LO102", "LO101", "LO103", "LO104"])
+    system.withdraw_preferences("ben")
+    expect_error("Student has no lottery preferences.", system.withdraw_preferences, "ben")
+    system.submit_preferences("ben", ["LO101", "LO103", "LO104"])
+    assert system.lottery_preferences("cat") == ["LO102", "LO101", "LO103", "LO104"]
+
+    dry = system.run_lottery(seed=7, apply=False)
+    assert dry.order == ["cat", "ann", "ben"] and dry.statuses == []
+    assert dry.assignments == {"cat": ["LO102", "LO104"], "ann": ["LO101", "LO103", "LO104"],
+                               "ben": ["LO103", "LO104"]}
+    assert dry.stats["assigned"] == 7 and dry.stats["oversubscribed"] == 2
+    result = system.run_lottery(seed=7)
+    assert result.assignments == dry.assignments and result.stats == dry.stats
+    assert all(status == "ok" for _, _, status in result.statuses)
+    assert sorted(system.list_courses_for_student("ann")) == ["LO101", "LO103", "LO104"]
+    assert system.lottery_preferences("ann") == [] and system.run_lottery(seed=1).assignments == {}
+    assert system.credit_load("ann") == 9
+    assert system.check_consistency() == []
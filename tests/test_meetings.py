@@ -0,0 +1,48 @@
+"""
+Tests of meeting times and time conflicts.
+"""
+
+import pytest
+
+from App import Course
+from tests.support import ALL, expect_error
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_meeting_times(make_system):
+    """
+    Checks that registration stops time conflicts and that find_conflicts reports existing ones.
+    """
+    system = make_system()
+    system.add_course("AR101", "Art", "Drawing", 3, 10, "Mon 09:00-10:15, wed 09:00-10:15")
+    system.add_course("MU101", "Music", "Scales", 3, 10, "Wed 10:00-11:00")
+    system.add_course("HI101", "History", "Rome", 3, 10, [(2, 615, 690)])
+    system.add_course("PE101", "Gym", "Running", 1, 1)
+    expect_error("Invalid meeting time: Someday (use a form like Mon 09:00-10:15).",
+                 system.add_course, "BAD1", "x", "x", 1, 1, "Someday")
+    # A batch row with bad meeting times is turned down on its own, before anything changes
+    assert system.add_courses_batch([("BM101", "Batch", "Rows", 1, 5), ("BM102", "Batch", "Rows", 1, 5, "Xyz 9-10"),
+                                     ("BM103", "Batch", "Rows", 1, 5, "Fri 09:00-10:00")]) == \
+        [("BM101", "ok"), ("BM102", "invalid"), ("BM103", "ok")]
+    assert "BM102" not in system.courses and system.courses["BM103"].meetings == ((4, 540, 600),)
+    system.remove_courses(["BM101", "BM103"])
+    assert system.courses["AR101"].meetings == ((0, 540, 615), (2, 540, 615))
+    assert Course.format_meetings(system.courses["HI101"].meetings) == "Wed 10:15-11:30"
+
+    system.student_course_register("student1", "AR101")
+    expect_error("Time conflict with AR101.", system.student_course_register, "student1", "MU101")
+    system.student_course_register("student1", "HI101")
+    result = system.register_batch([("student2", "AR101"), ("student2", "MU101"), ("student2", "HI101"),
+                                    ("student2", "PE101")])
+    assert [r[2] for r in result] == ["ok", "conflict", "ok", "ok"]
+    assert system.find_conflicts() == []
+
+    system.update_course("HI101", meetings="Mon 10:00-11:00")
+    assert system.find_conflicts() == [("student1", "AR101", "HI101"), ("student2", "AR101", "HI101")]
+    system.student_course_remove("student1", "HI101")
+    expect_error("Time conflict with AR101.", system.student_course_register, "student1", "MU101")
+    system.student_course_remove("student1", "AR101")
+    system.student_course_register("student1", "MU101")
+    system.update_course("PE101", meetings="Wed 10:30-11:00")
+    expect_error("Time conflict with MU101.", system.join_waitlist, "student1", "PE101")
+    assert system.find_conflicts() == [("student2", "AR101", "HI101")]
@@ -0,0 +1,37 @@
+"""
+Tests of the operation metrics.
+"""
+
+import pytest
+
+from metrics import instrument
+from tests.support import LOCAL, expect_error
+
+
+@pytest.mark.parametrize("make_system", LOCAL, indirect=True)
+def test_metrics(make_system):
+    """
+    Checks that instrumented calls are counted, failures are grouped by reason and the gauges add up.
+    """
+    system = make_system()
+    metrics = instrument(system)
+    assert system.metrics is metrics
+    system.add_course("GE101", "Geology", "Rocks", 3, 1, "Tue 09:00-10:00")
+    system.add_course("GE102", "Mapping", "Maps", 3, 5, "Tue 09:30-10:30")
+    system.student_course_register("student1", "GE101")
+    expect_error("Course is full.", system.student_course_register, "student2", "GE101")
+    expect_error("Time conflict with GE101.", system.student_course_register, "student1", "GE102")
+    expect_error("Course not found.", system.student_course_register, "student1", "ZZ1")
+    report = metrics.report(system)
+    register = report["operations"]["student_course_register"]
+    assert register["calls"] == 4 and register["errors"] == 3
+    assert register["errors_by_reason"] == {"Course is full": 1, "Course not found": 1, "Time conflict": 1}
+    assert register["p50_us"] <= register["p99_us"] <= register["max_us"]
+    assert report["operations"]["add_course"]["calls"] == 2
+    assert report["gauges"] == {"courses": 2, "students": 2, "enrollments": 1, "seats": 6, "free_seats": 5,
+                                "full_courses": 1}
+    text = metrics.prometheus(system)
+    assert 'registration_operation_calls_total{operation="student_course_register"} 4' in text
+    assert 'registration_operation_errors_total{operation="student_course_register",reason="Time conflict"} 1' \
+        in text
+    assert "registration_free_seats 5" in text
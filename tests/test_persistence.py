@@ -0,0 +1,86 @@
+"""
+Tests of the saved data and the journal.
+"""
+
+import json
+import tempfile
+import threading
+
+from App import RegistrationSystem
+from auth import hash_password
+from persistence import PersistentStore, read_log, snapshot_state
+
+
+def test_hashed_journal():
+    """
+    Checks that the saved data and journal keep password hashes, not the passwords, and that logins work after loading.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        store = PersistentStore(directory)
+        system = RegistrationSystem()
+        store.open(system)
+        system.add_student("gil", "journal-pw")
+        system.add_students_batch([("hal", "batch-pw")])
+        # A bad row in a batch doesn't keep the good rows out of the journal
+        system.add_courses_batch([("JR101", "Journal", "Rows", 1, 5), ("JR102", "Journal", "Rows", 1, 5, "Xyz 9-10")])
+        store.close()
+        with open(store.log_path, "rb") as log:
+            data = log.read()
+        assert b"journal-pw" not in data and b"batch-pw" not in data and len(read_log(store.log_path)) == 3
+        store = PersistentStore(directory)
+        system = RegistrationSystem()
+        store.open(system)
+        assert system.authenticate_user("gil", "journal-pw").user_id == "gil"
+        assert system.authenticate_user("hal", "batch-pw").user_id == "hal"
+        assert "JR101" in system.courses and "JR102" not in system.courses
+        store.snapshot()
+        store.close()
+        with open(store.snapshot_path, "rb") as saved:
+            data = saved.read()
+        assert b"journal-pw" not in data and b"batch-pw" not in data
+
+
+def test_concurrent_journal():
+    """
+    Checks that automatic snapshots taken while many threads register lose no change.
+    """
+    threads, per_thread = 8, 500
+    gaps = []
+
+    class CheckedStore(PersistentStore):
+
+        def snapshot(self):
+            super().snapshot()
+            # The log must carry on right after the snapshot, or the changes in between are lost
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                seq = json.load(f)["seq"]
+            with open(self.log_path, "rb") as f:
+                line = f.readline()
+            if line.endswith(b"\n") and json.loads(line)[0] != seq + 1:
+                gaps.append((seq, json.loads(line)[0]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = CheckedStore(directory, snapshot_every=50)
+        system = RegistrationSystem(thread_safe=True)
+        store.open(system)
+        system.add_courses_batch((f"J{c}", "Journal", "", 1, threads * per_thread) for c in range(20))
+        password = hash_password("journal", iterations=1)
+        system.add_students_batch((f"j{s}", password) for s in range(threads * per_thread // 20))
+
+        def register(offset: int):
+            for n in range(offset, threads * per_thread, threads):
+                system.student_course_register(f"j{n // 20}", f"J{n % 20}")
+
+        workers = [threading.Thread(target=register, args=(t,)) for t in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        store.close()
+        assert gaps == [], gaps
+        expected = snapshot_state(system)
+        recovered = RegistrationSystem()
+        PersistentStore(directory).open(recovered)
+        assert sum(len(c.registered_students) for c in recovered.courses.values()) == threads * per_thread
+        assert json.loads(json.dumps(snapshot_state(recovered))) == json.loads(json.dumps(expected))
+        assert recovered.check_consistency() == []
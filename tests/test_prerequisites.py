@@ -0,0 +1,55 @@
+"""
+Tests of prerequisite chains and eligibility.
+"""
+
+import pytest
+
+from tests.support import ALL, expect_error, import_enrollments
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_prerequisites(make_system):
+    """
+    Checks prerequisite chains, cycle detection, eligibility and what happens when a prerequisite is removed.
+    """
+    system = make_system()
+    system.add_course("CS101", "Programming I", "Basics", 3, 10)
+    system.add_course("CS102", "Programming II", "More", 3, 10, prerequisites=["cs101"])
+    system.add_course("CS201", "Data Structures", "Trees", 3, 1, prerequisites=["CS102"])
+    system.add_course("MA101", "Calculus", "Limits", 3, 10)
+    expect_error("Prerequisite not found: ZZ1.", system.add_course, "CS301", "x", "x", 3, 10, (), ["CS201", "ZZ1"])
+    expect_error("Prerequisite cycle: CS201 already requires CS101.", system.update_course, "CS101", None, None,
+                 None, None, None, ["CS201"])
+    expect_error("A course can't be its own prerequisite: MA101.", system.update_course, "MA101", None, None,
+                 None, None, None, ["MA101"])
+    assert system.courses["CS201"].prerequisites == ("CS102",)
+    assert system.courses["CS101"].prerequisites == ()
+    # Batch rows with prerequisites are checked like add_course, one status per row
+    result = system.add_courses_batch([("CS301", "Algorithms", "Proofs", 3, 10, (), ["cs201"]),
+                                       ("CS302", "x", "x", 3, 10, (), ["NOPE"]),
+                                       ("CS303", "x", "x", 3, 10, (), ["CS303"]),
+                                       ("CS401", "Compilers", "Parsers", 3, 10, (), ["CS301"])])
+    assert result == [("CS301", "ok"), ("CS302", "prerequisite"), ("CS303", "prerequisite"), ("CS401", "ok")]
+    assert system.courses["CS401"].prerequisites == ("CS301",) and "CS302" not in system.courses
+    expect_error("Missing prerequisites: CS301.", system.student_course_register, "student1", "CS401")
+    assert system.check_consistency() == []
+
+    expect_error("Missing prerequisites: CS101.", system.student_course_register, "student1", "CS102")
+    assert system.eligible_courses("student1") == ["CS101", "MA101"]
+    system.complete_course("student1", "cs102")
+    expect_error("Student has already completed this course.", system.complete_course, "student1", "CS102")
+    expect_error("Course not found.", system.complete_course, "student1", "ZZ1")
+    assert system.completed_courses("student1") == ["CS102"]
+    # Completing CS102 also gives credit for CS101
+    assert system.eligible_courses("student1") == ["CS101", "CS201", "MA101"]
+    system.student_course_register("student1", "CS201")
+    expect_error("Missing prerequisites: CS102.", system.join_waitlist, "student2", "CS201")
+    result = system.register_batch([("student2", "CS102"), ("student2", "CS101"), ("student2", "MA101")])
+    assert [r[2] for r in result] == ["prerequisite", "ok", "ok"]
+
+    assert import_enrollments(system, [("student2", "CS201")]) == [(2, "Missing prerequisites.")]
+    system.update_course("MA101", prerequisites=["CS101"])
+    assert system.courses["MA101"].prerequisites == ("CS101",)
+    system.remove_course("CS101")
+    assert system.courses["CS102"].prerequisites == () and system.courses["MA101"].prerequisites == ()
+    system.student_course_register("student2", "CS102")
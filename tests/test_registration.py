@@ -0,0 +1,145 @@
+"""
+Tests of accounts, courses, search, registration, batches, waitlists and course removal.
+"""
+
+import pytest
+
+from tests.support import ALL, expect_error
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_accounts(make_system):
+    """
+    Checks logins and adding students.
+    """
+    system = make_system()
+    assert system.authenticate_user("Student1", "pass123").user_id == "student1"
+    assert system.authenticate_user("admin", "password").user_id == "admin"
+    expect_error("Invalid username or password.", system.authenticate_user, "student1", "wrong")
+    system.add_student("Carol", "pw")
+    expect_error("Student with this ID already exists.", system.add_student, "carol", "pw")
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_course_lifecycle(make_system):
+    """
+    Checks courses from adding to removal: search, registration, the catalog, batches and waitlists.
+    """
+    system = make_system()
+    system.add_student("Carol", "pw")
+
+    # Courses
+    system.add_course("cs101", "Intro to Programming", "Basics", 3, 2)
+    system.add_course("CS201", "Data Structures", "Lists and trees", 4, 1)
+    system.add_course("MA101", "Calculus I", "Limits", 4, 30)
+    expect_error("Course with this ID already exists.", system.add_course, "CS101", "x", "x", 1, 1)
+    assert "CS101" in system.courses and "XX1" not in system.courses
+    assert list(system.courses) == ["CS101", "CS201", "MA101"]
+    system.update_course("ma101", title="Calculus One", capacity=3)
+    expect_error("Course not found.", system.update_course, "zz1", "t")
+    assert system.courses["MA101"].title == "Calculus One" and system.courses["MA101"].capacity == 3
+
+    # Search
+    assert [c.course_id for c in system.search_courses("cs")] == ["CS101", "CS201"]
+    assert [c.course_id for c in system.search_courses("DATA")] == ["CS201"]
+    assert [c.course_id for c in system.search_courses("calculus one")] == ["MA101"]
+    assert [c.course_id for c in system.search_courses("cs201", ranked=True)] == ["CS201"]
+    assert [c.course_id for c in system.search_courses("c", ranked=True, limit=2)] == ["CS101", "CS201"]
+    assert system.search_courses("nothing here") == []
+
+    # Registration
+    system.student_course_register("student1", "cs101")
+    system.student_course_register("Student2", "CS101")
+    system.student_course_register("carol", "ma101")
+    system.student_course_register("student1", "ma101")
+    expect_error("Course is full.", system.student_course_register, "carol", "CS101")
+    expect_error("Student already registered for this course.", system.student_course_register, "carol", "MA101")
+    expect_error("Student not found.", system.student_course_register, "nobody", "CS101")
+    expect_error("Course not found.", system.student_course_register, "carol", "ZZ1")
+    assert system.list_students_for_course("cs101") == ["student1", "student2"]
+    assert system.list_courses_for_student("student1") == ["CS101", "MA101"]
+    assert system.courses["CS101"].is_full()
+    assert [len(c.registered_students) for c in system.view_available_courses()] == [2, 0, 2]
+    assert system.student_registered_course("student1") == \
+        "CS101: Intro to Programming (3 credits)\nMA101: Calculus One (4 credits)"
+    assert system.student_registered_course("carol") == "MA101: Calculus One (4 credits)"
+
+    # Catalog
+    rows = system.catalog_rows()
+    assert [r.split()[0] for r in rows] == ["CS101", "CS201", "MA101"]
+    assert rows[0] == f"{system.courses['CS101']} - Status: Full"
+    assert [r.split()[0] for r in system.catalog_rows(available_only=True)] == ["CS201", "MA101"]
+    assert [r.split()[0] for r in system.catalog_rows(page=1, page_size=2)] == ["MA101"]
+    assert system.catalog_size() == 3 and system.catalog_size(available_only=True) == 2
+
+    # Dropping
+    system.student_course_remove("student2", "CS101")
+    expect_error("Student is not registered for this course.", system.student_course_remove, "student2", "CS101")
+    expect_error("Student not found.", system.list_courses_for_student, "nobody")
+    expect_error("Course not found.", system.list_students_for_course, "ZZ1")
+    assert system.student_registered_course("student2") == "No registered courses."
+    assert [r.split()[0] for r in system.catalog_rows(available_only=True)] == ["CS101", "CS201", "MA101"]
+
+    # Batches
+    result = system.register_batch([("student2", "cs201"), ("carol", "CS201"), ("student1", "cs101"),
+                                    ("ghost", "CS201"), ("carol", "zz1")])
+    assert [r[2] for r in result] == ["ok", "full", "duplicate", "unknown", "unknown"]
+    result = system.drop_batch([("student2", "CS201"), ("student2", "CS201"), ("ghost", "CS201")])
+    assert [r[2] for r in result] == ["ok", "not_registered", "unknown"]
+
+    # Bulk adds
+    assert system.add_students_batch([("Dave", "pw"), ("carol", "pw"), ("dave", "pw")]) == \
+        [("dave", "ok"), ("carol", "duplicate"), ("dave", "duplicate")]
+    assert system.add_courses_batch([("ph101", "Physics", "Motion", 3, 10), ("CS101", "x", "x", 1, 1)]) == \
+        [("PH101", "ok"), ("CS101", "duplicate")]
+    assert [c.course_id for c in system.search_courses("physics")] == ["PH101"]
+    system.remove_course("PH101")
+
+    # Waitlists
+    system.student_course_register("carol", "CS201")
+    expect_error("Course is not full. Register for it instead.", system.join_waitlist, "student2", "MA101")
+    system.join_waitlist("student2", "cs201")
+    system.join_waitlist("Dave", "CS201")
+    expect_error("Student is already on the waitlist for this course.", system.join_waitlist, "student2", "CS201")
+    expect_error("Student already registered for this course.", system.join_waitlist, "carol", "CS201")
+    assert system.waitlist_position("dave", "CS201") == 2
+    assert system.student_waitlists("dave") == [("CS201", 2)]
+    system.student_course_remove("carol", "CS201")
+    assert system.list_students_for_course("CS201") == ["student2"]
+    assert system.waitlist_position("dave", "CS201") == 1
+    system.leave_waitlist("dave", "CS201")
+    expect_error("Student is not on the waitlist for this course.", system.leave_waitlist, "dave", "CS201")
+    assert system.waitlist_position("dave", "CS201") == 0
+    system.join_waitlist("dave", "CS201")
+    system.update_course("CS201", capacity=2)
+    assert system.list_students_for_course("CS201") == ["student2", "dave"]
+    assert system.student_waitlists("dave") == []
+    system.student_course_remove("dave", "CS201")
+
+    # Removal
+    expect_error("Course not found.", system.remove_course, "ZZ1")
+    expect_error("Course not found: ZZ1.", system.remove_courses, ["CS201", "zz1"])
+    system.remove_course("cs101")
+    assert system.list_courses_for_student("student1") == ["MA101"]
+    system.remove_courses(["CS201", "ma101"])
+    assert system.list_courses_for_student("student1") == []
+    assert len(system.courses) == 0
+    assert system.check_consistency() == []
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_waitlist_by_standing(make_system):
+    """
+    Checks that waitlists ordered by class standing seat older students first.
+    """
+    system = make_system(waitlist_by_standing=True)
+    system.add_course("BI101", "Biology", "Cells", 3, 1)
+    system.add_student("fresh", "pw", 1)
+    system.add_student("senior", "pw", 4)
+    system.student_course_register("student1", "BI101")
+    for student_id in ("fresh", "student2", "senior"):
+        system.join_waitlist(student_id, "BI101")
+    assert [system.waitlist_position(sid, "BI101") for sid in ("senior", "fresh", "student2")] == [1, 2, 3]
+    system.student_course_remove("student1", "BI101")
+    assert system.list_students_for_course("BI101") == ["senior"]
+    assert system.waitlist_position("fresh", "BI101") == 1
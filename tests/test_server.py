@@ -0,0 +1,66 @@
+"""
+Tests of the network server.
+"""
+
+import asyncio
+
+import pytest
+
+from server import RegistrationClient, RegistrationServer
+from tests.support import LOCAL, expect_async_error
+
+
+@pytest.mark.parametrize("make_system", LOCAL, indirect=True)
+def test_server(make_system):
+    """
+    Checks the network server: logins, who may call what, reads, writes and read coalescing.
+    """
+    system = make_system()
+    async def run():
+        server = RegistrationServer(system, port=0)
+        await server.start()
+        admin = await RegistrationClient.connect(port=server.port)
+        student = await RegistrationClient.connect(port=server.port)
+        try:
+            await expect_async_error("Please log in first.", student.call("catalog_size"))
+            await expect_async_error("Invalid username or password.", student.login("student1", "wrong"))
+            login = await student.login("Student1", "pass123")
+            assert login == {"user_id": "student1", "role": "student", "token": login["token"]}
+            assert (await admin.login("admin", "password"))["role"] == "admin"
+            await admin.call("add_course", "NE101", "Networks", "Sockets", 3, 1, "Mon 09:00-10:00")
+            await admin.call("add_course", "NE102", "Protocols", "Packets", 3, 5)
+            await expect_async_error("Not allowed.", student.call("add_course", "X1", "x", "x", 1, 1))
+            await expect_async_error("Not allowed.", student.call("student_course_register", "student2", "NE101"))
+            await expect_async_error("Unknown operation: reindex.", admin.call("reindex"))
+            await student.call("student_course_register", "student1", "ne101")
+            await expect_async_error("Course is full.", admin.call("student_course_register", "student2", "NE101"))
+            assert await student.call("list_courses_for_student", "student1") == ["NE101"]
+            found = await student.call("search_courses", "net")
+            assert found == [{"course_id": "NE101", "title": "Networks", "description": "Sockets", "credits": 3,
+                              "capacity": 1, "enrolled": 1, "meetings": "Mon 09:00-10:00", "prerequisites": []}]
+            # Writes are applied in the order they were sent, even when sent without waiting
+            results = await asyncio.gather(admin.call("student_course_register", "student2", "NE102"),
+                                           admin.call("student_course_remove", "student2", "NE102"),
+                                           admin.call("credit_load", "student2"))
+            assert results == [None, None, 0]
+            rows = await asyncio.gather(*(student.call("catalog_rows") for _ in range(50)))
+            assert all(r == rows[0] for r in rows) and [r.split()[0] for r in rows[0]] == ["NE101", "NE102"]
+            stats = await admin.call("server_stats")
+            assert stats["coalesced"] > 0 and stats["writes"] == 6 and stats["connections"] == 2, stats
+            assert stats["sessions"] == 2 and stats["logins"] == 2 and stats["failed"] == 1, stats
+            # A session can be picked up on another connection with its token, and ends everywhere at logout
+            other = await RegistrationClient.connect(port=server.port)
+            await expect_async_error("Invalid session. Please log in.", other.resume("not-a-token"))
+            assert await other.resume(login["token"]) == login
+            assert await other.call("credit_load", "student1") == 3
+            await student.logout()
+            await expect_async_error("Please log in first.", student.call("catalog_size"))
+            await expect_async_error("Invalid session. Please log in.", other.call("catalog_size"))
+            await other.close()
+        finally:
+            await admin.close()
+            await student.close()
+            await server.close()
+        assert system.list_students_for_course("NE101") == ["student1"]
+
+    asyncio.run(run())
@@ -0,0 +1,58 @@
+"""
+Tests of password hashing, login sessions and lockouts.
+"""
+
+import pytest
+
+from auth import SessionManager, is_password_hash
+from sharding import ShardedRegistrationSystem
+from tests.support import ALL, expect_error
+
+
+@pytest.mark.parametrize("make_system", ALL, indirect=True)
+def test_sessions(make_system):
+    """
+    Checks password hashing, session expiry, logout and the lockout after failed logins.
+    """
+    system = make_system()
+    now = [0.0]
+    sessions = SessionManager(system, ttl=60, max_failures=3, lockout=10, clock=lambda: now[0])
+    try:
+        system.add_student("dana", "secret-pw")
+        system.add_students_batch([("eli", "other-pw"), ("fay", "third-pw")])
+        if not isinstance(system, ShardedRegistrationSystem):
+            assert all(is_password_hash(system.students[sid].password) for sid in ("dana", "eli", "fay"))
+        session = sessions.login("Dana", "secret-pw")
+        assert session.user.user_id == "dana" and sessions.login("fay", "third-pw").user.user_id == "fay"
+        assert len(sessions) == 2
+        now[0] = 50.0
+        assert sessions.validate(session.token) is session
+        now[0] = 100.0
+        # Using the session moved its expiry to 110
+        assert sessions.validate(session.token).user.user_id == "dana"
+        now[0] = 170.0
+        expect_error("Session expired. Please log in again.", sessions.validate, session.token)
+        expect_error("Invalid session. Please log in.", sessions.validate, session.token)
+        session = sessions.login("dana", "secret-pw")
+        sessions.logout(session.token)
+        expect_error("Invalid session. Please log in.", sessions.validate, session.token)
+
+        # Unknown users fail the same way as wrong passwords
+        expect_error("Invalid username or password.", sessions.login, "nobody", "secret-pw")
+        for _ in range(3):
+            expect_error("Invalid username or password.", sessions.login, "eli", "guess")
+        # Locked now, even with the right password, and no more passwords are checked
+        expect_error("Too many failed logins. Try again in 10 seconds.", sessions.login, "eli", "other-pw")
+        assert sessions.stats["failed"] == 4 and sessions.stats["throttled"] == 1
+        now[0] = 180.0
+        expect_error("Invalid username or password.", sessions.login, "eli", "guess again")
+        # Every failure after the lockout doubles it
+        expect_error("Too many failed logins. Try again in 20 seconds.", sessions.login, "eli", "other-pw")
+        now[0] = 200.0
+        assert sessions.login("eli", "other-pw").user.user_id == "eli"
+        # A good login clears the failures
+        expect_error("Invalid username or password.", sessions.login, "eli", "guess")
+        assert sessions.login("eli", "other-pw").user.user_id == "eli"
+        assert sessions.stats == {"logins": 5, "failed": 6, "throttled": 2, "expired": 1}
+    finally:
+        sessions.close()
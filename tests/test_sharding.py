@@ -0,0 +1,36 @@
+"""
+Tests specific to the sharded (multi-process) system.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("make_system", ("sharded",), indirect=True)
+def test_promotion_race(make_system):
+    """
+    Checks that a student being promoted keeps their place when another registration takes the seat first.
+    """
+    system = make_system()
+    system.add_course("SH101", "Shards", "Seats", 3, 1)
+    system.add_student("kim", "pw")
+    system.student_course_register("student1", "SH101")
+    system.join_waitlist("kim", "SH101")
+    call = system._call
+
+    def racing_call(shard: int, method: str, *args):
+        if method == "seat_waiting":
+            # Another registration takes the seat between the router's checks and the seating
+            system._call = call
+            system.student_course_register("student2", "SH101")
+        return call(shard, method, *args)
+
+    system._call = racing_call
+    try:
+        system.student_course_remove("student1", "SH101")
+    finally:
+        system._call = call
+    assert system.list_students_for_course("SH101") == ["student2"]
+    assert system.waitlist_position("kim", "SH101") == 1
+    system.student_course_remove("student2", "SH101")
+    assert system.list_students_for_course("SH101") == ["kim"]
+    assert system.credit_load("kim") == 3 and system.credit_load("student2") == 0
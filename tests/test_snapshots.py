@@ -0,0 +1,84 @@
+"""
+Tests of point-in-time snapshots.
+"""
+
+import io
+import os
+
+import pytest
+
+from App import RegistrationSystem
+from export import export_report
+from sqlite_storage import SQLiteRegistrationSystem
+from tests.support import LOCAL, expect_error
+
+
+def check_snapshots(system: RegistrationSystem):
+    """
+    Checks that a snapshot keeps showing the data as it was while the system changes, and can be exported.
+
+    Argument:
+        system (RegistrationSystem): A freshly created system of any backend.
+    """
+    system.add_course("SN101", "Storage", "Pages", 3, 2)
+    system.add_course("SN102", "Indexes", "Trees", 4, 5, prerequisites=["SN101"])
+    system.add_course("SN103", "Logs", "Records", 2, 5)
+    system.add_student("sam", "pw")
+    system.student_course_register("student1", "SN101")
+    system.student_course_register("sam", "SN103")
+    with system.snapshot() as snapshot:
+        expected = io.StringIO()
+        export_report(snapshot, "rosters", "csv", expected)
+        later = system.snapshot()
+        assert later.version > snapshot.version
+        later.close()
+
+        system.student_course_register("student2", "SN101")
+        system.student_course_remove("sam", "SN103")
+        system.update_course("SN101", title="Storage II", capacity=3)
+        system.remove_course("SN103")
+        system.add_course("SN104", "Caches", "Lines", 1, 5)
+        system.add_student("tia", "pw")
+        system.register_batch([("tia", "SN101"), ("student1", "SN104")])
+        system.complete_course("student1", "SN101")
+
+        assert list(snapshot.courses) == ["SN101", "SN102", "SN103"] and len(snapshot.courses) == 3
+        assert "SN104" not in snapshot.courses and "SN103" in snapshot.courses
+        assert "tia" not in snapshot.students and sorted(snapshot.students) == ["sam", "student1", "student2"]
+        assert snapshot.list_students_for_course("SN101") == ["student1"]
+        assert snapshot.list_courses_for_student("sam") == ["SN103"]
+        assert snapshot.student_registered_course("student1") == "SN101: Storage (3 credits)"
+        assert snapshot.courses["SN101"].capacity == 2 and snapshot.courses["SN102"].prerequisites == ("SN101",)
+        assert list(snapshot.students["student1"].completed_courses) == []
+        expect_error("Course not found.", snapshot.list_students_for_course, "SN104")
+        expect_error("Student not found.", snapshot.list_courses_for_student, "tia")
+        again = io.StringIO()
+        export_report(snapshot, "rosters", "csv", again)
+        assert again.getvalue() == expected.getvalue()
+        assert system.list_students_for_course("SN101") == ["student1", "student2", "tia"]
+    expect_error("Snapshot is closed.", snapshot.list_students_for_course, "SN101")
+    assert system.snapshots == []
+    live = io.StringIO()
+    assert export_report(system, "schedules", "csv", live, consistent=True) == 4
+    assert "tia,SN101,Storage II,3" in live.getvalue()
+    assert system.check_consistency() == []
+
+
+@pytest.mark.parametrize("make_system", LOCAL + ("thread safe",), indirect=True)
+def test_snapshots(make_system):
+    """
+    Checks snapshots of each backend.
+    """
+    system = make_system()
+    check_snapshots(system)
+
+
+def test_snapshots_sqlite_file(tmp_path):
+    """
+    Checks snapshots of a SQLite system kept in a file.
+    """
+    system = SQLiteRegistrationSystem(os.path.join(tmp_path, "snapshots.db"))
+    try:
+        check_snapshots(system)
+    finally:
+        system.close()
@@ -0,0 +1,56 @@
+"""
+Tests of trace recording and replay.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+import pytest
+
+from App import RegistrationSystem
+from auth import is_password_hash
+from compact import CompactRegistrationSystem
+from sqlite_storage import SQLiteRegistrationSystem
+from tests.support import LOCAL, expect_error
+from tracing import PASSWORD_PLACEHOLDER, TraceRecorder, replay_trace
+
+
+@pytest.mark.parametrize("make_system", LOCAL, indirect=True)
+def test_trace_replay(make_system):
+    """
+    Records a session on one backend and checks that it replays identically on every backend.
+    """
+    system = make_system()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "session.trace.gz")
+        recorder = TraceRecorder(system, path)
+        system.add_course("TR101", "Tracing", "Calls", 3, 1)
+        system.add_course("TR102", "Replays", "More calls", 3, 5, prerequisites=["TR101"])
+        system.student_course_register("student1", "TR101")
+        expect_error("Course is full.", system.student_course_register, "student2", "TR101")
+        system.join_waitlist("student2", "TR101")
+        system.student_course_remove("student1", "TR101")
+        assert [c.course_id for c in system.search_courses("replay")] == ["TR102"]
+        assert system.register_batch(iter([("student1", "TR102"), ("student2", "TR101")]))[0][2] == "prerequisite"
+        system.update_course("TR101", capacity=2)
+        system.list_students_for_course("TR101")
+        # Passwords of logins and new accounts never reach the file, and logins aren't replayed
+        system.add_student("tracer", "hunter2")
+        system.add_students_batch([("tracer2", "secret9")])
+        system.authenticate_user("tracer", "hunter2")
+        expect_error("Invalid username or password.", system.authenticate_user, "student1", "pass124")
+        recorder.close()
+        assert recorder.calls == 14
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            text = f.read()
+        assert "hunter2" not in text and "secret9" not in text and "pass124" not in text
+        # Nor do the password hashes of the students already there when recording began
+        hashes = {student.password for student in system.students.values()}
+        assert all(is_password_hash(h) for h in hashes) and not any(h in text for h in hashes)
+        state = json.loads(text.split("\n", 1)[0])["state"]
+        assert state["students"] and all(row[1] == PASSWORD_PLACEHOLDER for row in state["students"])
+        for system_class in (RegistrationSystem, CompactRegistrationSystem, SQLiteRegistrationSystem):
+            report = replay_trace(path, system_class)
+            assert report.calls == 12 and report.skipped == 2 and report.identical, report.mismatches
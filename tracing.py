@@ -0,0 +1,429 @@
+"""
+Title:       Portfolio Project - Tracing
+Author:      Minh Nguyen
+Created:     2025-07-06
+Description:
+    Records every call made into a RegistrationSystem and plays recorded calls back.
+    Unlike the persistence journal, which keeps only changes, a trace keeps every call
+    (reads too) with when it started, how long it took and what came out of it, so a busy
+    registration day can be run again exactly as it happened.
+
+    A trace file is JSON lines, gzip-compressed if its name ends in ".gz":
+        first line:  {"trace": 1, "operations": [...], "settings": {...}, "state": {...}}
+        other lines: [start_us, operation, args, duration_us, error, result_crc]
+    The operation is a number (its place in the "operations" list), start_us is measured from
+    the start of the recording, error is the error message (or null), and result_crc is a
+    CRC-32 of the result turned into plain data (Course and User objects become their IDs).
+    The state is the system's data when recording began (see persistence.snapshot_state),
+    so a replay starts from the same place.
+    Passwords are never written: the password arguments of logins and new accounts, and the
+    password hashes of the students in the state, are replaced with PASSWORD_PLACEHOLDER.
+    Replayed accounts get that placeholder, and logins are not replayed
+    (they are counted as skipped), since the password that was given isn't known.
+
+    The replay engine builds a fresh system, loads the state and runs the calls in order,
+    as fast as possible or at the recorded pace, and checks that every call gives the same
+    result or the same error.
+
+    Usage:
+        python tracing.py registration-day.trace.gz
+        python tracing.py registration-day.trace.gz --paced --speed 4 --backend compact
+
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from functools import wraps
+from typing import Iterator, List, Optional, Tuple
+
+from App import Course, LotteryResult, RegistrationSystem, User
+from persistence import restore_state, snapshot_state
+
+# Every public RegistrationSystem method, so a trace holds every call a user or program makes
+TRACED = (
+    "authenticate_user", "add_student", "add_students_batch", "add_course", "add_courses_batch",
+    "remove_course", "remove_courses", "update_course", "search_courses", "list_students_for_course",
+    "list_courses_for_student", "view_available_courses", "catalog_rows", "catalog_size", "seat_totals",
+    "student_course_register", "student_course_remove", "register_batch", "drop_batch",
+    "student_registered_course", "join_waitlist", "leave_waitlist", "waitlist_position", "student_waitlists",
+    "promote_waitlist", "complete_course", "completed_courses", "eligible_courses", "find_conflicts",
+    "credit_load", "overloaded_students", "underloaded_students", "check_consistency", "submit_preferences",
+    "withdraw_preferences", "lottery_preferences", "clear_preferences", "run_lottery",
+)
+TRACE_VERSION = 1
+# Written in place of every password: a stored password (see auth.is_password_hash) that no password
+# matches, so replaying a new account hashes nothing and the account can't be logged into
+PASSWORD_PLACEHOLDER = "pbkdf2_sha256$1$$"
+# Operations with passwords among their arguments, and those replay_trace skips
+WITH_PASSWORDS = ("authenticate_user", "add_student", "add_students_batch")
+NOT_REPLAYED = ("authenticate_user",)
+# Mismatches kept in a ReplayReport (the count includes all of them)
+MAX_MISMATCHES = 20
+
+
+def plain(value):
+    """
+    Turns a result or argument into JSON-friendly data.
+
+    Courses and users become their IDs, lottery results their seed, seats and stats;
+    tuples, sets, iterators and other collections become lists.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Course):
+        return value.course_id
+    if isinstance(value, User):
+        return value.user_id
+    if isinstance(value, LotteryResult):
+        return [value.seed, plain(value.pairs()), value.stats]
+    if isinstance(value, dict):
+        return {str(k): plain(v) for k, v in value.items()}
+    return [plain(v) for v in value]
+
+
+def without_passwords(operation: str, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+    """
+    Gets the arguments of a call with every password replaced by PASSWORD_PLACEHOLDER.
+
+    Arguments:
+        operation (str): One of WITH_PASSWORDS.
+        args (tuple): The positional arguments of the call.
+        kwargs (dict): The keyword arguments of the call.
+
+    Returns:
+        Tuple[tuple, dict]: The arguments to write to the trace.
+    """
+    if operation == "add_students_batch":
+        rows = [(row[0], PASSWORD_PLACEHOLDER) + tuple(row[2:]) for row in (args[0] if args else kwargs["rows"])]
+        return ((rows,) + args[1:], kwargs) if args else (args, dict(kwargs, rows=rows))
+    if len(args) > 1:
+        return args[:1] + (PASSWORD_PLACEHOLDER,) + args[2:], kwargs
+    if "password" in kwargs:
+        return args, dict(kwargs, password=PASSWORD_PLACEHOLDER)
+    return args, kwargs
+
+
+def state_without_passwords(state: dict) -> dict:
+    """
+    Gets snapshot data with every student's password hash replaced by PASSWORD_PLACEHOLDER.
+
+    Argument:
+        state (dict): Data made by persistence.snapshot_state.
+
+    Returns:
+        dict: The state to write to the trace header.
+    """
+    students = [[row[0], PASSWORD_PLACEHOLDER] + row[2:] for row in state["students"]]
+    return dict(state, students=students)
+
+
+def result_crc(value) -> int:
+    """
+    Gets a CRC-32 of a result, so results can be compared without storing them.
+    """
+    return zlib.crc32(json.dumps(plain(value), separators=(",", ":")).encode("utf-8"))
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def settings_of(system) -> dict:
+    """
+    Gets the settings needed to build a system that behaves like this one.
+    """
+    return {"max_credits": system.max_credits, "min_credits": system.min_credits,
+            "waitlist_by_standing": system.waitlist_by_standing}
+
+
+class TraceRecorder:
+
+    def __init__(self, system, path: str):
+        """
+        Starts recording every call into a system to a trace file.
+
+        The public methods are replaced on this one object only. Calls made from inside other
+        calls (like the promote_waitlist done by a drop) are not recorded separately, because
+        replaying the outer call makes them again.
+
+        Calls from several threads are written in the order they finish. Replays run them one at
+        a time in that order, so traces of systems used by many threads may not replay exactly.
+
+        Arguments:
+            system (RegistrationSystem): The system to record (any backend).
+            path (str): The trace file to write (replaced if it exists). Ends in ".gz" to compress it.
+
+        Attributes:
+            calls (int): How many calls have been recorded.
+        """
+        self.system = system
+        self.path = path
+        self.calls = 0
+        self._index = {name: i for i, name in enumerate(TRACED)}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = _open(path, "w")
+        header = {"trace": TRACE_VERSION, "operations": list(TRACED), "backend": type(system).__name__,
+                  "settings": settings_of(system), "state": state_without_passwords(snapshot_state(system))}
+        self._file.write(json.dumps(header, separators=(",", ":")) + "\n")
+        self._started = time.perf_counter_ns()
+        self._originals = {}
+        for operation in TRACED:
+            method = getattr(system, operation, None)
+            if method is not None:
+                self._originals[operation] = method
+                setattr(system, operation, self._wrap(operation, method))
+
+    def _wrap(self, operation: str, method):
+        index = self._index[operation]
+        clock = time.perf_counter_ns
+        local = self._local
+        passwords = operation in WITH_PASSWORDS
+
+        @wraps(method)
+        def traced(*args, **kwargs):
+            if getattr(local, "inside", False):
+                return method(*args, **kwargs)
+            # Generators can only be read once, so read them here and hand the method a list
+            args = tuple(list(a) if isinstance(a, Iterator) else a for a in args)
+            kwargs = {k: list(v) if isinstance(v, Iterator) else v for k, v in kwargs.items()}
+            local.inside = True
+            start = clock()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                if passwords:
+                    args, kwargs = without_passwords(operation, args, kwargs)
+                self._write(start, index, args, kwargs, clock() - start, str(e), None)
+                raise
+            finally:
+                local.inside = False
+            duration = clock() - start
+            if passwords:
+                args, kwargs = without_passwords(operation, args, kwargs)
+            if isinstance(result, LotteryResult):
+                # Record the seed that was actually used, so a lottery with a random seed replays the same way
+                kwargs.pop("seed", None)
+                args = (result.seed,) + args[1:]
+            self._write(start, index, args, kwargs, duration, None, result_crc(result))
+            return result
+
+        return traced
+
+    def _write(self, start: int, index: int, args: tuple, kwargs: dict, duration: int, error: Optional[str],
+               crc: Optional[int]):
+        call_args = plain(args)
+        if kwargs:
+            call_args.append(plain(kwargs))
+            index = -1 - index
+        record = [(start - self._started) // 1000, index, call_args, duration // 1000, error, crc]
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+                self.calls += 1
+
+    def close(self):
+        """
+        Stops recording, puts the original methods back and closes the file.
+        """
+        for operation, method in self._originals.items():
+            setattr(self.system, operation, method)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_trace(path: str) -> Tuple[dict, Iterator[list]]:
+    """
+    Opens a trace file.
+
+    Argument:
+        path (str): The trace file.
+
+    Returns:
+        Tuple[dict, Iterator[list]]: The header, and the call records read one line at a time
+        (the file is closed when they have all been read).
+
+    Raises:
+        ValueError: If the file isn't a trace this version can read.
+    """
+    f = _open(path, "r")
+    header = json.loads(f.readline() or "{}")
+    if header.get("trace") != TRACE_VERSION:
+        f.close()
+        raise ValueError(f"Not a version {TRACE_VERSION} trace file: {path}")
+
+    def records() -> Iterator[list]:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            f.close()
+
+    return header, records()
+
+
+class ReplayReport:
+
+    def __init__(self):
+        """
+        The outcome of a replay.
+
+        Attributes:
+            calls (int): How many calls were replayed.
+            seconds (float): How long the replay took.
+            recorded_seconds (float): How long the same calls took when they were recorded
+                (from the first call's start to the last call's end).
+            operations (Counter): Calls per operation.
+            skipped (int): Recorded logins, which aren't replayed (the trace has no passwords).
+            mismatch_count (int): Calls whose result or error differed from the recording.
+            mismatches (List[Tuple[int, str, str, str]]): The first few of them, as
+                (call number, operation, what was recorded, what happened now).
+        """
+        self.calls = 0
+        self.seconds = 0.0
+        self.recorded_seconds = 0.0
+        self.operations: Counter = Counter()
+        self.skipped = 0
+        self.mismatch_count = 0
+        self.mismatches: List[Tuple[int, str, str, str]] = []
+
+    @property
+    def throughput(self) -> float:
+        """
+        Calls per second during the replay.
+        """
+        return self.calls / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def identical(self) -> bool:
+        """
+        True if every call gave the same result or error as when it was recorded.
+        """
+        return self.mismatch_count == 0
+
+
+def _outcome(error: Optional[str], crc: Optional[int]) -> str:
+    return f"error {error!r}" if error is not None else f"result crc {crc}"
+
+
+def replay_trace(path: str, system_class: type = RegistrationSystem, paced: bool = False,
+                 speed: float = 1.0, verify: bool = True) -> ReplayReport:
+    """
+    Runs the calls of a trace against a fresh system.
+
+    Logins are skipped, because the trace doesn't keep passwords (see without_passwords).
+
+    Arguments:
+        path (str): The trace file.
+        system_class (type, optional): The kind of system to replay into, built with the recorded
+            settings. Default is RegistrationSystem.
+        paced (bool, optional): If True, each call waits until its recorded start time (divided by speed).
+            Default is False (as fast as possible).
+        speed (float, optional): How much faster than recorded to go when paced. Default is 1.0.
+        verify (bool, optional): If True, compare every result and error with the recording.
+
+    Returns:
+        ReplayReport: Throughput and any differences found.
+
+    Raises:
+        ValueError: If the file isn't a trace, or if the trace started with courses already in the
+                    system and system_class keeps its data outside memory (restore_state fills in
+                    rosters directly, which only works for the in-memory backends).
+    """
+    header, records = read_trace(path)
+    system = system_class(**header["settings"])
+    if header["state"]["courses"] and not isinstance(system.courses, dict):
+        records.close()
+        raise ValueError("This trace starts with saved data, so it can only be replayed into an in-memory system.")
+    restore_state(system, header["state"])
+    operations = header["operations"]
+    methods = [getattr(system, name) for name in operations]
+    skip = [name in NOT_REPLAYED for name in operations]
+    report = ReplayReport()
+    clock = time.perf_counter
+    start = clock()
+    for number, (start_us, index, args, duration_us, error, crc) in enumerate(records):
+        kwargs = {}
+        if index < 0:
+            index = -1 - index
+            kwargs = args.pop()
+        if skip[index]:
+            report.skipped += 1
+            continue
+        if paced:
+            wait = start + start_us / 1e6 / speed - clock()
+            if wait > 0:
+                time.sleep(wait)
+        got_error = got_crc = None
+        try:
+            result = methods[index](*args, **kwargs)
+        except Exception as e:
+            got_error = str(e)
+        else:
+            if verify:
+                got_crc = result_crc(result)
+        report.calls += 1
+        report.operations[operations[index]] += 1
+        report.recorded_seconds = max(report.recorded_seconds, (start_us + duration_us) / 1e6)
+        if verify and (got_error != error or (error is None and got_crc != crc)):
+            report.mismatch_count += 1
+            if len(report.mismatches) < MAX_MISMATCHES:
+                report.mismatches.append((number + 1, operations[index], _outcome(error, crc),
+                                          _outcome(got_error, got_crc)))
+    report.seconds = clock() - start
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a RegistrationSystem trace and check the results.")
+    parser.add_argument("path", help="trace file to replay")
+    parser.add_argument("--paced", action="store_true", help="keep the recorded time between calls")
+    parser.add_argument("--speed", type=float, default=1.0, help="how much faster than recorded to go when paced")
+    parser.add_argument("--backend", choices=("memory", "compact", "sqlite"), default="memory")
+    parser.add_argument("--no-verify", action="store_true", help="don't compare results with the recording")
+    args = parser.parse_args(argv)
+
+    system_class = RegistrationSystem
+    if args.backend == "compact":
+        from compact import CompactRegistrationSystem
+        system_class = CompactRegistrationSystem
+    elif args.backend == "sqlite":
+        from sqlite_storage import SQLiteRegistrationSystem
+        system_class = SQLiteRegistrationSystem
+    try:
+        report = replay_trace(args.path, system_class, args.paced, args.speed, not args.no_verify)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+
+    print(f"Replayed {report.calls:,} calls in {report.seconds:.3f} seconds "
+          f"({report.throughput:,.0f} calls/s; recorded over {report.recorded_seconds:.3f} seconds).")
+    for operation, count in report.operations.most_common():
+        print(f"  {operation}: {count:,}")
+    if report.skipped:
+        print(f"Skipped {report.skipped:,} login(s), since the trace has no passwords.")
+    if args.no_verify:
+        return 0
+    if report.identical:
+        print("Every call gave the same result as recorded.")
+        return 0
+    print(f"{report.mismatch_count:,} call(s) differed from the recording:")
+    for number, operation, expected, got in report.mismatches:
+        print(f"  #{number} {operation}: recorded {expected}, got {got}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())